@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: pydantic TradeModel vs slotted Trade for the monitoring loop
+Usage: python scripts/benchmark_trade_record.py [open_trades] [cycles]
+
+Memory: tracemalloc delta for building the open trades, divided by the count
+Scan:   one manage_trades_cycle-style pass (status/symbol/direction/SL/TP reads
+        plus a PnL estimate per trade) and one /status to_dict pass
+"""
+import sys
+import os
+import time
+import tracemalloc
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade, TradeModel
+
+SYMBOLS = ["XAUUSD", "EURUSD", "GBPUSD", "USDJPY", "AUDUSD"]
+PRICES = {"XAUUSD": 2651.0, "EURUSD": 1.0851, "GBPUSD": 1.2702, "USDJPY": 149.55, "AUDUSD": 0.6603}
+
+def build(cls, count: int):
+    return [
+        cls(
+            symbol=SYMBOLS[i % len(SYMBOLS)], entry=PRICES[SYMBOLS[i % len(SYMBOLS)]], sl=0.0, tp=1e9,
+            lot_size=0.1, direction="buy" if i % 2 else "sell", strategy=f"LOGIC{i % 3 + 1}",
+            open_time="2025-01-01T00:00:00", trade_id=100000 + i, chain_id=f"CHAIN_{i // 4}",
+            order_type="TP_TRAIL" if i % 2 else "PROFIT_TRAIL",
+            profit_chain_id=f"PROFIT_{i // 8}" if i % 2 == 0 else None
+        )
+        for i in range(count)
+    ]
+
+def memory_per_trade(cls, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    trades = build(cls, count)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del trades
+    return allocated / count
+
+def scan(trades) -> float:
+    total = 0.0
+    for trade in trades:
+        if trade.status == "closed":
+            continue
+        price = PRICES[trade.symbol]
+        if trade.direction == "buy":
+            hit = price <= trade.sl or price >= trade.tp
+            total += (price - trade.entry) * trade.lot_size
+        else:
+            hit = price >= trade.sl or price <= trade.tp
+            total += (trade.entry - price) * trade.lot_size
+        if hit or (trade.profit_chain_id and trade.profit_level < 0):
+            total += 1
+    return total
+
+def status_dicts(trades):
+    return [Trade.to_dict(trade) for trade in trades]
+
+def measure(func, trades, cycles: int) -> float:
+    """Microseconds per pass"""
+    func(trades)  # warm-up
+    started = time.perf_counter()
+    for _ in range(cycles):
+        func(trades)
+    return (time.perf_counter() - started) / cycles * 1e6
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    print("=" * 60)
+    print(f"TRADE RECORD BENCHMARK ({count} open trades, {cycles} cycles)")
+    print("=" * 60)
+
+    results = {}
+    for name, cls in [("TradeModel (pydantic)", TradeModel), ("Trade (slotted)", Trade)]:
+        trades = build(cls, count)
+        started = time.perf_counter()
+        build(cls, count)
+        build_us = (time.perf_counter() - started) / count * 1e6
+        results[name] = (memory_per_trade(cls, count), build_us,
+                         measure(scan, trades, cycles), measure(status_dicts, trades, cycles))
+
+    print(f"{'':24}{'bytes/trade':>12}{'build us/trade':>16}{'scan us/cycle':>15}{'to_dict us':>12}")
+    for name, (memory, build_us, scan_us, dict_us) in results.items():
+        print(f"{name:24}{memory:12.0f}{build_us:16.2f}{scan_us:15.1f}{dict_us:12.1f}")
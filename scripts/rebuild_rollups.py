@@ -0,0 +1,33 @@
+"""
+Rebuild performance rollups (trade_rollups) from the trades table
+Usage: python scripts/rebuild_rollups.py [path/to/trading_bot.db]
+"""
+import sys
+import os
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path and run from it (default db path is relative)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+os.chdir(project_root)
+
+from src.database import TradeDatabase
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'data/trading_bot.db'
+    print("=" * 60)
+    print(f"REBUILDING TRADE ROLLUPS: {db_path}")
+    print("=" * 60)
+
+    db = TradeDatabase(db_path)
+    rows = db.rebuild_rollups()
+    summary = db.get_rollup_summary(days=36500)
+    db.close()
+
+    print(f"SUCCESS: {rows} rollup rows rebuilt")
+    print(f"Closed trades: {summary['total_trades']} | Net PnL: ${summary['total_pnl']:.2f}")
@@ -0,0 +1,73 @@
+"""
+Replay historical ticks and recorded webhook alerts through the trading engine
+Usage:
+  python scripts/run_backtest.py --ticks data/XAUUSD_ticks.csv --alerts data/alerts.jsonl
+  python scripts/run_backtest.py --ticks data/XAUUSD.npy --symbol XAUUSD --alerts alerts.jsonl
+  python scripts/run_backtest.py --bars data/XAUUSD_M1.csv --symbol XAUUSD --alerts alerts.jsonl
+  python scripts/run_backtest.py --ticks ticks.csv --symbol XAUUSD --save-npy data/XAUUSD.npy
+"""
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import json
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path and run from it (config path is relative)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+os.chdir(project_root)
+
+from src.backtest.tick_feed import load_ticks, load_bar_csv, load_alerts, merge_ticks, save_ticks
+from src.backtest.replay import BacktestRunner, BacktestConfig
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick-replay backtest of the trading engine")
+    parser.add_argument("--ticks", action="append", default=[], help="tick CSV or .npy file (repeatable)")
+    parser.add_argument("--bars", help="OHLC bar CSV (needs --symbol)")
+    parser.add_argument("--symbol", help="symbol for single-symbol tick/bar files")
+    parser.add_argument("--spread-pips", type=float, default=0.0, help="spread added to bar prices")
+    parser.add_argument("--alerts", help="recorded alerts (JSON lines or JSON array)")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--save-npy", help="write the loaded ticks to this .npy file and exit")
+    parser.add_argument("--verbose", action="store_true", help="show the engine's own output")
+    args = parser.parse_args()
+
+    series = {}
+    for path in args.ticks:
+        series.update(load_ticks(path, args.symbol))
+    if args.bars:
+        if not args.symbol:
+            parser.error("--bars needs --symbol")
+        pip_size = BacktestConfig()["symbol_config"][args.symbol]["pip_size"]
+        series.update(load_bar_csv(args.bars, args.symbol, pip_size, args.spread_pips))
+    if not series:
+        parser.error("no tick data given (--ticks or --bars)")
+
+    if args.save_npy:
+        if len(series) != 1:
+            parser.error("--save-npy needs exactly one symbol")
+        save_ticks(args.save_npy, next(iter(series.values())))
+        print(f"SUCCESS: {len(next(iter(series.values())))} ticks written to {args.save_npy}")
+        return
+
+    alerts = load_alerts(args.alerts) if args.alerts else []
+    print("=" * 60)
+    print(f"BACKTEST: {', '.join(f'{s} ({len(t)} ticks)' for s, t in series.items())} | {len(alerts)} alerts")
+    print("=" * 60)
+
+    runner = BacktestRunner(balance=args.balance)
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    with output:
+        result = asyncio.run(runner.run(merge_ticks(series), alerts))
+
+    print(json.dumps(result.summary(), indent=2))
+
+if __name__ == "__main__":
+    main()
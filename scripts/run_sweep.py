@@ -0,0 +1,97 @@
+"""
+Sweep profit-booking / re-entry settings over recorded ticks and alerts in parallel
+Usage:
+  python scripts/run_sweep.py --ticks data/XAUUSD.npy --alerts alerts.jsonl --space sweep.json
+  python scripts/run_sweep.py --ticks ticks.csv --alerts alerts.jsonl \\
+      --param "re_entry_config.sl_hunt_offset_pips=[0.5, 1.0, 2.0]" \\
+      --param "profit_booking_config.profit_targets=[[10,20,40,80,160],[5,10,20,40,80]]"
+  python scripts/run_sweep.py ... --samples 50 --seed 7 --workers 8 --results data/sweep_results.csv
+
+The space file maps "section.key" to a JSON list of candidate values. Interrupt
+at any time; running the same command again resumes from the results file.
+"""
+import sys
+import os
+import argparse
+import json
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path and run from it (config path is relative)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+os.chdir(project_root)
+
+from src.backtest.tick_feed import load_ticks, load_bar_csv, load_alerts
+from src.backtest.replay import BacktestConfig
+from src.backtest.sweep import ParameterSweep, grid, random_sample, validate_space, results_table
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over backtest replays")
+    parser.add_argument("--ticks", action="append", default=[], help="tick CSV or .npy file (repeatable)")
+    parser.add_argument("--bars", help="OHLC bar CSV (needs --symbol)")
+    parser.add_argument("--symbol", help="symbol for single-symbol tick/bar files")
+    parser.add_argument("--spread-pips", type=float, default=0.0, help="spread added to bar prices")
+    parser.add_argument("--alerts", required=True, help="recorded alerts (JSON lines or JSON array)")
+    parser.add_argument("--space", help="JSON file: {\"section.key\": [values...]}")
+    parser.add_argument("--param", action="append", default=[], help="section.key=[JSON list] (repeatable)")
+    parser.add_argument("--samples", type=int, help="random sample of this many points instead of the full grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="processes (default: CPU count)")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--results", default="data/sweep_results.csv", help="results CSV (appended, resumable)")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    args = parser.parse_args()
+
+    space = {}
+    if args.space:
+        with open(args.space) as f:
+            space.update(json.load(f))
+    for item in args.param:
+        key, _, values = item.partition("=")
+        try:
+            space[key.strip()] = json.loads(values)
+        except json.JSONDecodeError as e:
+            parser.error(f"--param {key}: values must be a JSON list ({e})")
+    if not space:
+        parser.error("nothing to sweep (--space or --param)")
+    try:
+        validate_space(space, BacktestConfig().config)
+    except ValueError as e:
+        parser.error(str(e))
+
+    series = {}
+    for path in args.ticks:
+        series.update(load_ticks(path, args.symbol))
+    if args.bars:
+        if not args.symbol:
+            parser.error("--bars needs --symbol")
+        pip_size = BacktestConfig()["symbol_config"][args.symbol]["pip_size"]
+        series.update(load_bar_csv(args.bars, args.symbol, pip_size, args.spread_pips))
+    if not series:
+        parser.error("no tick data given (--ticks or --bars)")
+    alerts = load_alerts(args.alerts)
+
+    points = random_sample(space, args.samples, args.seed) if args.samples else grid(space)
+    sweep = ParameterSweep(series, alerts, args.results, balance=args.balance, workers=args.workers)
+    print("=" * 60)
+    print(f"SWEEP: {len(points)} configurations x {sum(len(t) for t in series.values())} ticks, "
+          f"{len(alerts)} alerts | {sweep.workers} workers")
+    print("=" * 60)
+
+    try:
+        rows = sweep.run(points)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted - {sweep.stats['evaluated']} new rows saved to {args.results}; rerun to resume")
+        sys.exit(1)
+
+    print(results_table(rows, args.top))
+    print(f"\nEvaluated {sweep.stats['evaluated']}, resumed {sweep.stats['skipped']}, "
+          f"failed {sweep.stats['failed']} in {sweep.stats['wall_seconds']:.1f}s -> {args.results}")
+
+if __name__ == "__main__":
+    main()
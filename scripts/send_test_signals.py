@@ -16,17 +16,21 @@ if sys.platform == 'win32':
 
 BASE_URL = "http://localhost:5000"
 
-def send_signal(symbol, signal, price, signal_type="entry", strategy="LOGIC1"):
-    """Send signal to bot"""
-    signal_data = {
+def build_signal(symbol, signal, price, signal_type="entry", strategy="LOGIC1", tf=None):
+    """Alert payload in the TradingView webhook format"""
+    return {
         "symbol": symbol,
         "signal": signal,
         "price": price,
         "type": signal_type,
         "strategy": strategy,
-        "tf": "5m" if signal_type == "entry" else "15m",
+        "tf": tf or ("5m" if signal_type == "entry" else "15m"),
         "timestamp": datetime.now().isoformat()
     }
+
+def send_signal(symbol, signal, price, signal_type="entry", strategy="LOGIC1"):
+    """Send signal to bot"""
+    signal_data = build_signal(symbol, signal, price, signal_type, strategy)
     
     try:
         print(f"\nSending {signal_type} signal: {symbol} {signal.upper()} @ {price}")
@@ -37,9 +41,10 @@ def send_signal(symbol, signal, price, signal_type="entry", strategy="LOGIC1"):
             timeout=10
         )
         
-        if response.status_code == 200:
+        # 202 = accepted into the alert queue (processed in the background)
+        if response.status_code in (200, 202):
             result = response.json()
-            print(f"SUCCESS: Signal accepted: {result.get('message', 'OK')}")
+            print(f"SUCCESS: Signal accepted: {result.get('message', result.get('alert_id', 'OK'))}")
             return True, result
         else:
             print(f"FAILED: Signal rejected: Status {response.status_code}")
@@ -52,6 +57,29 @@ def send_signal(symbol, signal, price, signal_type="entry", strategy="LOGIC1"):
         print(f"ERROR: {str(e)}")
         return False, None
 
+def send_batch(signals):
+    """Send several signals in one request to /webhook/batch"""
+    try:
+        print(f"\nSending batch of {len(signals)} signals")
+        response = requests.post(f"{BASE_URL}/webhook/batch", json=signals, timeout=10)
+        
+        if response.status_code in (200, 202):
+            result = response.json()
+            for item in result.get("results", []):
+                signal = signals[item["index"]]
+                print(f"  [{item['index']}] {signal['type']} {signal['symbol']} {signal['signal']}: {item['status']}")
+            return True, result
+        else:
+            print(f"FAILED: Batch rejected: Status {response.status_code}")
+            print(f"Response: {response.text}")
+            return False, None
+    except requests.exceptions.ConnectionError:
+        print("ERROR: Cannot connect to server. Is bot running?")
+        return False, None
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        return False, None
+
 def get_status():
     """Get bot status"""
     try:
@@ -110,6 +138,17 @@ def main():
     success, result = send_signal("EURUSD", "reversal_bear", 1.09900, "reversal", "LOGIC1")
     time.sleep(2)
     
+    # Test 4: Same-bar batch (trend updates are applied before the entry)
+    print("\n" + "=" * 60)
+    print("TEST 4: Batch - Entry + Trend + Bias for One Bar")
+    print("=" * 60)
+    success, result = send_batch([
+        build_signal("USDJPY", "buy", 149.500, "entry", "LOGIC1"),
+        build_signal("USDJPY", "bull", 149.500, "trend", "LOGIC1", tf="15m"),
+        build_signal("USDJPY", "bull", 149.500, "bias", "LOGIC1", tf="1h")
+    ])
+    time.sleep(2)
+    
     # Final status
     print("\n" + "=" * 60)
     print("FINAL STATUS")
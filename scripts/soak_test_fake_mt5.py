@@ -0,0 +1,177 @@
+"""
+Soak-test the whole trading engine against the local fake MT5 terminal
+Entry alerts are fired at a steady rate while the engine's own background loops
+(trade manager, price monitor, tick stream, account snapshot) run; the fake
+terminal moves prices, fills orders with latency/errors and closes positions on
+broker-side SL/TP. At the end the bot's open trades are reconciled against the
+terminal's positions.
+Usage:
+  python scripts/soak_test_fake_mt5.py --duration 60 --rate 5
+  python scripts/soak_test_fake_mt5.py --duration 600 --rate 20 --latency-ms 30 --jitter-ms 20 --error-rate 0.02
+"""
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import shutil
+import tempfile
+import time
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path and run from it (config path is relative)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+os.chdir(project_root)
+
+from src.models import Alert
+from src.database import TradeDatabase
+from src.managers.risk_manager import RiskManager
+from src.processors.alert_processor import AlertProcessor
+from src.core.trading_engine import TradingEngine
+from src.clients.mt5_client import MT5Client
+from src.clients.fake_mt5 import FakeMT5Terminal
+from src.backtest.replay import BacktestConfig, ReplayNotifier
+
+def build(args, workdir):
+    """Engine wired to a fake terminal; all state in workdir, caps raised so trading never stops"""
+    config = BacktestConfig({
+        "fake_mt5_config": {
+            "balance": args.balance, "latency_ms": args.latency_ms, "latency_jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate, "api_error_rate": args.api_error_rate,
+            "volatility_pips_per_second": args.volatility, "margin_per_lot": args.margin_per_lot,
+            "seed": args.seed
+        }
+    })
+    config.config["tick_stream_config"] = {**config["tick_stream_config"], "enabled": True}
+    config.config["risk_tiers"] = {
+        tier: {**limits, "daily_loss_limit": 1e12, "max_total_loss": 1e12}
+        for tier, limits in config["risk_tiers"].items()
+    }
+    terminal = FakeMT5Terminal(config)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        risk_manager = RiskManager(config, stats_file=os.path.join(workdir, "stats.json"))
+    risk_manager.reset_daily_stats()
+    risk_manager.reset_lifetime_loss()
+    engine = TradingEngine(
+        config, risk_manager, MT5Client(config, terminal=terminal), ReplayNotifier(), AlertProcessor(config),
+        db=TradeDatabase(os.path.join(workdir, "soak.db"), config)
+    )
+    engine.trend_manager.config_file = os.path.join(workdir, "timeframe_trends.json")
+    engine.trend_manager.trends = engine.trend_manager.load_trends()
+    return config, terminal, engine
+
+async def soak(args, engine, terminal):
+    rng = random.Random(args.seed)
+    symbols = args.symbols.split(",")
+    report = {"alerts": 0, "alerts_failed": 0}
+
+    if not await engine.initialize():
+        raise RuntimeError("engine failed to initialize against the fake terminal")
+    manager = asyncio.create_task(engine.manage_open_trades())
+
+    trends = {}
+    for symbol in symbols:
+        trends[symbol] = rng.choice(["bull", "bear"])
+        for tf in ("1h", "15m"):
+            await engine.process_alert(Alert(type="trend", symbol=symbol, signal=trends[symbol], tf=tf))
+
+    started = time.perf_counter()
+    interval = 1.0 / args.rate
+    next_alert = started
+    while time.perf_counter() - started < args.duration:
+        symbol = rng.choice(symbols)
+        price = await engine.price_cache.get_price(symbol)
+        signal = "buy" if trends[symbol] == "bull" else "sell"
+        report["alerts"] += 1
+        if not await engine.process_alert(Alert(type="entry", symbol=symbol, signal=signal, tf="5m", price=price)):
+            report["alerts_failed"] += 1
+        next_alert += interval
+        await asyncio.sleep(max(0.0, next_alert - time.perf_counter()))
+    elapsed = time.perf_counter() - started
+
+    manager.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await manager
+    await engine.price_monitor.stop()
+    await engine.tick_stream.stop()
+    await engine.account_snapshot.stop()
+    # Market closed: no more price moves (and broker stops) while the book is compared
+    terminal.volatility = 0.0
+    terminal.api_error_rate = 0.0
+    await engine.reconcile_with_mt5()
+
+    broker_tickets = {position.ticket for position in terminal.positions_get() or ()}
+    bot_tickets = {trade.trade_id for trade in engine.open_trades if trade.status != "closed"}
+    report.update({
+        "seconds": round(elapsed, 1),
+        "alert_rate": round(report["alerts"] / elapsed, 2),
+        "orders_filled": terminal.stats["orders_filled"],
+        "orders_rejected": terminal.stats["orders_rejected"],
+        "rejections_by_retcode": terminal.stats["rejections"],
+        "order_rate": round(terminal.stats["orders_filled"] / elapsed, 2),
+        "broker_sl_hits": terminal.stats["sl_hits"],
+        "broker_tp_hits": terminal.stats["tp_hits"],
+        "api_errors": terminal.stats["api_errors"],
+        "bot_open_trades": len(bot_tickets),
+        "broker_positions": len(broker_tickets),
+        "bot_trades_missing_at_broker": len(bot_tickets - broker_tickets),
+        "broker_positions_untracked": len(broker_tickets - bot_tickets),
+        "balance": round(terminal.balance, 2),
+        "mt5_latency_ms": {method: {"calls": stats["calls"], "avg": round(stats["avg_ms"], 2),
+                                    "max": round(stats["max_ms"], 2), "timeouts": stats["timeouts"]}
+                           for method, stats in engine.async_mt5_client.get_stats().items()}
+    })
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test of the engine against the fake MT5 terminal")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of alert traffic")
+    parser.add_argument("--rate", type=float, default=5.0, help="entry alerts per second")
+    parser.add_argument("--symbols", default="XAUUSD,EURUSD,GBPUSD,USDJPY")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--margin-per-lot", type=float, default=100.0, help="low so margin never caps the order rate")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.01, help="order_send rejection probability")
+    parser.add_argument("--api-error-rate", type=float, default=0.0, help="query failure probability")
+    parser.add_argument("--volatility", type=float, default=2.0, help="random walk, pips per sqrt(second)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="show the engine's own output")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"SOAK TEST: {args.rate}/s entry alerts for {args.duration:.0f}s on {args.symbols}")
+    print("=" * 60)
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="soak_")
+    try:
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+        with output:
+            config, terminal, engine = build(args, workdir)
+            try:
+                report = asyncio.run(soak(args, engine, terminal))
+            finally:
+                engine.async_mt5_client.close()
+                engine.db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    if report["bot_trades_missing_at_broker"]:
+        print("ERROR: bot still tracks trades the terminal no longer has")
+        sys.exit(1)
+    print("SUCCESS: bot trade book consistent with the terminal")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Historical Replay / Backtesting
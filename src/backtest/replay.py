@@ -0,0 +1,229 @@
+import copy
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from src.config import Config
+from src.database import TradeDatabase
+from src.managers.risk_manager import RiskManager
+from src.processors.alert_processor import AlertProcessor
+from src.core.trading_engine import TradingEngine
+from src.utils.clock import VirtualClock
+from src.backtest.simulated_broker import SimulatedBroker, SimulatedDeal
+from src.backtest.tick_feed import Tick
+
+class BacktestConfig(Config):
+    """Copy of the live config with replay overrides; never written back to disk"""
+
+    def __init__(self, overrides: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.config = copy.deepcopy(self.config)
+        for key, value in (overrides or {}).items():
+            if isinstance(value, dict) and isinstance(self.config.get(key), dict):
+                self.config[key] = {**self.config[key], **value}
+            else:
+                self.config[key] = value
+        # Orders go to the simulated broker; ticks are pushed by the replay, not polled
+        self.config["simulate_orders"] = False
+        self.config["tick_stream_config"] = {**self.config.get("tick_stream_config", {}), "enabled": False}
+
+    def save_config(self):
+        pass
+
+class ReplayNotifier:
+    """TelegramBot stand-in: counts messages instead of sending them"""
+
+    def __init__(self):
+        self.messages = 0
+        self.last_message = None
+
+    def send_message(self, message: str, priority: bool = False, group: str = None):
+        self.messages += 1
+        self.last_message = message
+
+    def set_trend_manager(self, trend_manager):
+        pass
+
+@dataclass
+class BacktestResult:
+    start_balance: float
+    final_balance: float
+    ticks: int = 0
+    alerts: int = 0
+    alerts_failed: int = 0
+    alerts_rejected: int = 0  # invalid or duplicate: dropped by AlertProcessor like the webhook does
+    orders: int = 0
+    deals: List[SimulatedDeal] = field(default_factory=list)
+    open_positions: int = 0
+    chains: int = 0  # profit-booking chains started
+    chains_completed: int = 0  # ... that booked every level
+    virtual_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def net_pnl(self) -> float:
+        return self.final_balance - self.start_balance
+
+    @property
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough fall of the realized balance"""
+        peak, drawdown = self.start_balance, 0.0
+        for deal in self.deals:
+            peak = max(peak, deal.balance)
+            drawdown = max(drawdown, peak - deal.balance)
+        return drawdown
+
+    @property
+    def chain_completion_rate(self) -> float:
+        return (self.chains_completed / self.chains * 100) if self.chains else 0.0
+
+    @property
+    def speedup(self) -> float:
+        return self.virtual_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        wins = sum(1 for deal in self.deals if deal.profit > 0)
+        return {
+            "ticks": self.ticks,
+            "alerts": self.alerts,
+            "alerts_failed": self.alerts_failed,
+            "alerts_rejected": self.alerts_rejected,
+            "orders": self.orders,
+            "deals": len(self.deals),
+            "win_rate": (wins / len(self.deals) * 100) if self.deals else 0.0,
+            "net_pnl": round(self.net_pnl, 2),
+            "max_drawdown": round(self.max_drawdown, 2),
+            "final_balance": round(self.final_balance, 2),
+            "open_positions": self.open_positions,
+            "chains": self.chains,
+            "chain_completion_rate": round(self.chain_completion_rate, 1),
+            "virtual_hours": round(self.virtual_seconds / 3600, 2),
+            "wall_seconds": round(self.wall_seconds, 2),
+            "speedup": round(self.speedup, 1)
+        }
+
+class BacktestRunner:
+    """
+    Pushes historical ticks and recorded alerts through the real TradingEngine
+    - The engine runs unmodified against a SimulatedBroker and a VirtualClock;
+      the clock jumps from event to event, so replay speed is bounded by CPU only
+    - After every tick the runner performs what the live loops would: SL/TP
+      check for symbols with open-trade triggers, re-entry / profit-booking
+      checks for watched symbols, broker-side stops, and a full sweep every
+      sweep_seconds / price_monitor_interval_seconds of virtual time
+    - State (trade DB, risk stats, trends) lives in a scratch directory, never
+      in the live data files
+    """
+
+    def __init__(self, config_overrides: Optional[Dict[str, Any]] = None,
+                 balance: float = 10000.0, workdir: Optional[str] = None,
+                 sweep_seconds: float = 5.0):
+        self.config_overrides = config_overrides
+        self.balance = balance
+        self.workdir = workdir
+        self.sweep_seconds = sweep_seconds
+        self.engine: Optional[TradingEngine] = None  # last run's engine and broker, for inspection
+        self.broker: Optional[SimulatedBroker] = None
+
+    def _build(self, workdir: str, start: float):
+        config = BacktestConfig(self.config_overrides)
+        clock = VirtualClock(start)
+        broker = SimulatedBroker(config, clock, balance=self.balance)
+        risk_manager = RiskManager(config, stats_file=os.path.join(workdir, "stats.json"), clock=clock)
+        risk_manager.reset_daily_stats()
+        risk_manager.reset_lifetime_loss()
+        engine = TradingEngine(
+            config, risk_manager, broker, ReplayNotifier(), AlertProcessor(config, clock=clock),
+            clock=clock, db=TradeDatabase(os.path.join(workdir, "backtest.db"), config, clock=clock)
+        )
+        engine.trend_manager.config_file = os.path.join(workdir, "timeframe_trends.json")
+        engine.trend_manager.trends = engine.trend_manager.load_trends()
+        return clock, broker, engine
+
+    async def run(self, ticks: Iterable[Tick],
+                  alerts: List[Tuple[float, Dict[str, Any]]]) -> BacktestResult:
+        """Replay ticks (time ordered, see merge_ticks) and alerts (see load_alerts)"""
+        ticks = iter(ticks)
+        first_tick = next(ticks, None)
+        if first_tick is None and not alerts:
+            return BacktestResult(self.balance, self.balance)
+        start = min(([first_tick[0]] if first_tick else []) + ([alerts[0][0]] if alerts else []))
+
+        workdir = self.workdir or tempfile.mkdtemp(prefix="backtest_")
+        clock, broker, engine = self._build(workdir, start)
+        self.engine, self.broker = engine, broker
+        monitor = engine.price_monitor
+        monitor_interval = engine.config["re_entry_config"]["price_monitor_interval_seconds"]
+        result = BacktestResult(self.balance, self.balance)
+        started = time.perf_counter()
+
+        await engine.async_mt5_client.initialize()
+        await engine.account_snapshot.refresh()
+
+        next_alert = 0
+        next_sweep = start
+        next_monitor = start
+
+        async def replay_alerts(until: float):
+            nonlocal next_alert
+            while next_alert < len(alerts) and alerts[next_alert][0] <= until:
+                when, payload = alerts[next_alert]
+                next_alert += 1
+                clock.advance_to(when)
+                result.alerts += 1
+                # Same validation and dedup window as the webhook
+                alert = engine.alert_processor.parse_alert(
+                    {**payload, "timestamp": datetime.fromtimestamp(when).isoformat()}
+                )
+                if alert is None:
+                    result.alerts_rejected += 1
+                    continue
+                if not await engine.process_alert(alert):
+                    result.alerts_failed += 1
+
+        try:
+            tick = first_tick
+            while tick is not None:
+                when, symbol, bid, ask = tick
+                await replay_alerts(when)
+                clock.advance_to(when)
+                broker.set_tick(symbol, bid, ask)
+                engine.price_cache.invalidate(symbol)
+                result.ticks += 1
+
+                if when >= next_sweep:
+                    engine.price_cache.invalidate()
+                    await engine.manage_trades_cycle()
+                    next_sweep = when + self.sweep_seconds
+                elif symbol in engine.trigger_index.symbols():
+                    await engine.manage_trades_cycle({symbol})
+
+                if when >= next_monitor:
+                    await monitor.check_opportunities()
+                    next_monitor = when + monitor_interval
+                elif symbol in monitor.watched_symbols():
+                    await monitor.check_opportunities({symbol})
+
+                broker.check_stops(symbol)
+                tick = next(ticks, None)
+
+            await replay_alerts(float("inf"))
+        finally:
+            result.wall_seconds = time.perf_counter() - started
+            result.virtual_seconds = clock.time() - start
+            result.final_balance = broker.balance
+            result.deals = list(broker.deals)
+            result.orders = broker.orders_filled
+            result.open_positions = len(broker.positions)
+            chains = engine.profit_booking_manager.get_all_chains().values()
+            result.chains = len(chains)
+            result.chains_completed = sum(1 for chain in chains if chain.status == "COMPLETED")
+            engine.async_mt5_client.close()
+            engine.db.close()
+            if self.workdir is None:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        return result
@@ -0,0 +1,173 @@
+import itertools
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from src.config import Config
+from src.clients.mt5_client import MT5Client
+from src.services.exposure_engine import position_pnl
+from src.utils.clock import Clock
+
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+@dataclass
+class SimulatedPosition:
+    """Open position, with the attribute names of an MT5 TradePosition"""
+    ticket: int
+    symbol: str
+    type: int
+    volume: float
+    price_open: float
+    sl: float
+    tp: Optional[float]
+    comment: str
+    time: float
+    profit: float = 0.0
+
+@dataclass
+class SimulatedDeal:
+    """Closing deal (full or partial) with the PnL it realized"""
+    ticket: int
+    symbol: str
+    direction: str
+    volume: float
+    price_open: float
+    price_close: float
+    profit: float
+    reason: str  # "CLIENT", "SL" or "TP"
+    time: float
+    balance: float  # account balance after the deal
+
+class SimulatedBroker(MT5Client):
+    """
+    MT5Client stand-in that fills against replayed ticks
+    - Market orders fill at the current ask (buy) or bid (sell); no tick, no fill
+    - Closes realize PnL with the bot's own pip formula into the balance
+    - Broker-side SL/TP (check_stops) closes positions the bot did not close itself
+    Every method keeps the MT5Client contract, so the engine runs unmodified
+    """
+
+    def __init__(self, config: Config, clock: Clock, balance: float = 10000.0):
+        super().__init__(config)
+        self.clock = clock
+        self.balance = balance
+        self.ticks: Dict[str, Tuple[float, float]] = {}  # symbol -> (bid, ask)
+        self.positions: Dict[int, SimulatedPosition] = {}
+        self.deals: List[SimulatedDeal] = []
+        self.tickets = itertools.count(1000001)
+        self.orders_filled = 0
+        self.orders_rejected = 0
+
+    def set_tick(self, symbol: str, bid: float, ask: float):
+        self.ticks[symbol] = (bid, ask)
+
+    def _symbol_config(self, symbol: str) -> Dict[str, Any]:
+        return self.config["symbol_config"][symbol]
+
+    def _pnl(self, position: SimulatedPosition, price: float, volume: float) -> float:
+        symbol_config = self._symbol_config(position.symbol)
+        sign = 1 if position.type == POSITION_TYPE_BUY else -1
+        return position_pnl(position.price_open, price, sign, volume,
+                            symbol_config["pip_size"], symbol_config.get("pip_value_per_std_lot", 10.0))
+
+    def _close_price(self, position: SimulatedPosition) -> float:
+        bid, ask = self.ticks[position.symbol]
+        return bid if position.type == POSITION_TYPE_BUY else ask
+
+    def _realize(self, position: SimulatedPosition, price: float, volume: float, reason: str):
+        profit = self._pnl(position, price, volume)
+        self.balance += profit
+        position.volume = round(position.volume - volume, 8)
+        if position.volume <= 0:
+            del self.positions[position.ticket]
+        self.deals.append(SimulatedDeal(
+            ticket=position.ticket, symbol=position.symbol,
+            direction="buy" if position.type == POSITION_TYPE_BUY else "sell",
+            volume=volume, price_open=position.price_open, price_close=price, profit=profit,
+            reason=reason, time=self.clock.time(), balance=self.balance
+        ))
+
+    def initialize(self) -> bool:
+        self.initialized = True
+        return True
+
+    def shutdown(self):
+        self.initialized = False
+
+    def place_order(self, symbol: str, order_type: str, lot_size: float,
+                    price: float, sl: float, tp: float = None,
+                    comment: str = "") -> Optional[int]:
+        with self.lock:
+            tick = self.ticks.get(symbol)
+            if tick is None or lot_size <= 0:
+                self.orders_rejected += 1
+                return None
+            fill_price = tick[1] if order_type == "buy" else tick[0]
+            ticket = next(self.tickets)
+            self.positions[ticket] = SimulatedPosition(
+                ticket=ticket, symbol=symbol,
+                type=POSITION_TYPE_BUY if order_type == "buy" else POSITION_TYPE_SELL,
+                volume=lot_size, price_open=fill_price, sl=sl, tp=tp, comment=comment,
+                time=self.clock.time()
+            )
+            self._record_fill(ticket, fill_price)
+            self.orders_filled += 1
+            return ticket
+
+    def close_position(self, position_id: int, percentage: float = 100) -> bool:
+        with self.lock:
+            position = self.positions.get(position_id)
+            if position is None:
+                return True  # Same as MT5Client: already closed counts as closed
+            volume = position.volume if percentage >= 100 else round(position.volume * percentage / 100, 2)
+            self._realize(position, self._close_price(position), volume, "CLIENT")
+            return True
+
+    def check_stops(self, symbol: str) -> List[SimulatedDeal]:
+        """Close positions whose SL/TP the current tick crossed (fills at the tick, gaps included)"""
+        with self.lock:
+            tick = self.ticks.get(symbol)
+            if tick is None:
+                return []
+            bid, ask = tick
+            closed = []
+            for position in list(self.positions.values()):
+                if position.symbol != symbol:
+                    continue
+                if position.type == POSITION_TYPE_BUY:
+                    hit_sl = position.sl and bid <= position.sl
+                    hit_tp = position.tp and bid >= position.tp
+                else:
+                    hit_sl = position.sl and ask >= position.sl
+                    hit_tp = position.tp and ask <= position.tp
+                if hit_sl or hit_tp:
+                    self._realize(position, self._close_price(position), position.volume,
+                                  "SL" if hit_sl else "TP")
+                    closed.append(self.deals[-1])
+            return closed
+
+    def get_current_price(self, symbol: str) -> float:
+        tick = self.ticks.get(symbol)
+        return (tick[0] + tick[1]) / 2 if tick else 0.0
+
+    def get_tick(self, symbol: str) -> Optional[Dict[str, float]]:
+        tick = self.ticks.get(symbol)
+        return {"bid": tick[0], "ask": tick[1]} if tick else None
+
+    def floating_pnl(self) -> float:
+        with self.lock:
+            return sum(self._pnl(p, self._close_price(p), p.volume)
+                       for p in self.positions.values() if p.symbol in self.ticks)
+
+    def get_account_balance(self) -> float:
+        return self.balance
+
+    def get_account_info(self) -> Optional[Dict[str, float]]:
+        equity = self.balance + self.floating_pnl()
+        return {"balance": self.balance, "equity": equity, "margin": 0.0, "free_margin": equity}
+
+    def get_positions(self) -> Optional[List[Any]]:
+        with self.lock:
+            for position in self.positions.values():
+                if position.symbol in self.ticks:
+                    position.profit = self._pnl(position, self._close_price(position), position.volume)
+            return list(self.positions.values())
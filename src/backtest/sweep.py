@@ -0,0 +1,212 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from src.backtest.replay import BacktestRunner, BacktestConfig
+from src.backtest.tick_feed import merge_ticks
+
+# "section.key" -> candidate values, e.g. {"re_entry_config.sl_hunt_offset_pips": [0.5, 1.0, 2.0]}
+ParameterSpace = Dict[str, List[Any]]
+
+# Results table columns (one CSV row per evaluated configuration)
+RESULT_FIELDS = ["config_id", "params", "net_pnl", "max_drawdown", "win_rate", "deals", "orders",
+                 "chains", "chain_completion_rate", "open_positions", "wall_seconds"]
+NUMERIC_FIELDS = RESULT_FIELDS[2:]
+COUNT_FIELDS = {"deals", "orders", "chains", "open_positions"}
+
+def grid(space: ParameterSpace) -> List[Dict[str, Any]]:
+    """Every combination of the candidate values"""
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+def random_sample(space: ParameterSpace, samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """samples distinct grid points drawn at random (the whole grid if it is smaller)"""
+    keys = sorted(space)
+    sizes = [len(space[key]) for key in keys]
+    total = math.prod(sizes)
+    if samples >= total:
+        return grid(space)
+    points = []
+    for index in random.Random(seed).sample(range(total), samples):
+        point = {}
+        for key, size in zip(reversed(keys), reversed(sizes)):  # mixed-radix decode, last key fastest
+            index, choice = divmod(index, size)
+            point[key] = space[key][choice]
+        points.append({key: point[key] for key in keys})
+    return points
+
+def validate_space(space: ParameterSpace, config: Dict[str, Any]):
+    """Reject keys that do not name an existing setting (a typo would silently sweep nothing)"""
+    for key, values in space.items():
+        section, _, name = key.partition(".")
+        if not name or not isinstance(config.get(section), dict) or name not in config[section]:
+            raise ValueError(f"Unknown sweep parameter: {key}")
+        if not values:
+            raise ValueError(f"No candidate values for {key}")
+
+def to_overrides(params: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """{"section.key": value} as BacktestConfig overrides ({"section": {"key": value}})"""
+    overrides: Dict[str, Dict[str, Any]] = {}
+    for key, value in params.items():
+        section, _, name = key.partition(".")
+        overrides.setdefault(section, {})[name] = value
+    return overrides
+
+def config_id(params: Dict[str, Any]) -> str:
+    """Stable id of a parameter set; a resumed sweep skips ids already in the results file"""
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+# Replay inputs of this worker process (set once by the pool initializer, not per job)
+_worker_inputs: Dict[str, Any] = {}
+
+def _init_worker(series: Dict[str, np.ndarray], alerts: List[Tuple[float, Dict[str, Any]]],
+                 balance: float, quiet: bool):
+    _worker_inputs.update(series=series, alerts=alerts, balance=balance, quiet=quiet)
+    if quiet:
+        logging.disable(logging.CRITICAL)
+
+def evaluate(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Replay the worker's history with one parameter set; returns a results-table row"""
+    runner = BacktestRunner(to_overrides(params), balance=_worker_inputs["balance"])
+    output = open(os.devnull, "w") if _worker_inputs["quiet"] else None
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        result = asyncio.run(runner.run(merge_ticks(_worker_inputs["series"]), _worker_inputs["alerts"]))
+    if output:
+        output.close()
+    summary = result.summary()
+    row = {"config_id": config_id(params), "params": json.dumps(params, sort_keys=True)}
+    row.update({field: summary[field] for field in NUMERIC_FIELDS})
+    return row
+
+class ParameterSweep:
+    """
+    Evaluates parameter sets against recorded ticks and alerts, one replay per set
+    - Replays are independent, so a process pool runs one per core; every worker
+      receives the history once (pool initializer) and then only parameter sets
+    - Each finished row is appended to the results CSV straight away; running the
+      same sweep again skips configurations already in the file (resume)
+    - workers=1 evaluates in this process (no pool)
+    """
+
+    def __init__(self, series: Dict[str, np.ndarray], alerts: List[Tuple[float, Dict[str, Any]]],
+                 results_path: str, balance: float = 10000.0, workers: Optional[int] = None,
+                 quiet: bool = True):
+        self.series = series
+        self.alerts = alerts
+        self.results_path = results_path
+        self.balance = balance
+        self.workers = workers or os.cpu_count() or 1
+        self.quiet = quiet
+        self.stats = {
+            "evaluated": 0,
+            "skipped": 0,
+            "failed": 0,
+            "wall_seconds": 0.0
+        }
+
+    def load_results(self) -> List[Dict[str, Any]]:
+        """Rows already in the results file (empty if it does not exist yet)"""
+        if not os.path.exists(self.results_path):
+            return []
+        with open(self.results_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            for field in NUMERIC_FIELDS:
+                row[field] = int(float(row[field])) if field in COUNT_FIELDS else float(row[field])
+        return rows
+
+    def _append(self, row: Dict[str, Any]):
+        new_file = not os.path.exists(self.results_path) or os.path.getsize(self.results_path) == 0
+        with open(self.results_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow(row)
+
+    def run(self, points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Evaluate every point not yet in the results file; returns the points' rows, best net PnL first"""
+        validate_space({key: [value] for point in points for key, value in point.items()},
+                       BacktestConfig().config)
+        results_dir = os.path.dirname(self.results_path)
+        if results_dir:
+            os.makedirs(results_dir, exist_ok=True)
+
+        rows = self.load_results()
+        done = {row["config_id"] for row in rows}
+        pending, queued = [], set()
+        for point in points:
+            point_id = config_id(point)
+            if point_id in done or point_id in queued:
+                self.stats["skipped"] += 1
+                continue
+            queued.add(point_id)
+            pending.append(point)
+
+        started = time.perf_counter()
+        for params, row, error in self._evaluate_all(pending):
+            if error is not None:
+                self.stats["failed"] += 1
+                print(f"WARNING: Sweep configuration failed {json.dumps(params, sort_keys=True)}: {error}")
+                continue
+            self._append(row)
+            rows.append(row)
+            self.stats["evaluated"] += 1
+        self.stats["wall_seconds"] += time.perf_counter() - started
+
+        wanted = {config_id(point) for point in points}
+        return sorted((row for row in rows if row["config_id"] in wanted),
+                      key=lambda row: row["net_pnl"], reverse=True)
+
+    def _evaluate_all(self, pending: List[Dict[str, Any]]):
+        """Yields (params, row, error) as configurations finish"""
+        if not pending:
+            return
+        if self.workers <= 1:
+            _init_worker(self.series, self.alerts, self.balance, self.quiet)
+            try:
+                for params in pending:
+                    try:
+                        yield params, evaluate(params), None
+                    except Exception as e:
+                        yield params, None, e
+            finally:
+                if self.quiet:
+                    logging.disable(logging.NOTSET)
+            return
+
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(self.workers, len(pending)), initializer=_init_worker,
+            initargs=(self.series, self.alerts, self.balance, self.quiet)
+        )
+        try:
+            futures = {executor.submit(evaluate, params): params for params in pending}
+            for future in concurrent.futures.as_completed(futures):
+                error = future.exception()
+                yield futures[future], (None if error else future.result()), error
+        finally:
+            # Interrupted: drop queued configurations; finished rows are already on disk
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def results_table(rows: List[Dict[str, Any]], top: Optional[int] = None) -> str:
+    """Plain-text table of result rows (in the given order)"""
+    columns = [("config_id", 12), ("net_pnl", 10), ("max_drawdown", 12), ("win_rate", 8),
+               ("deals", 6), ("chains", 6), ("chain_completion_rate", 10)]
+    headers = {"chain_completion_rate": "chain_done%", "win_rate": "win%", "max_drawdown": "max_dd"}
+    lines = [" ".join(headers.get(name, name).rjust(width) for name, width in columns) + "  params"]
+    for row in rows[:top] if top else rows:
+        cells = []
+        for name, width in columns:
+            value = row[name]
+            cells.append((f"{value:.2f}" if isinstance(value, float) else str(value)).rjust(width))
+        lines.append(" ".join(cells) + "  " + row["params"])
+    return "\n".join(lines)
@@ -0,0 +1,105 @@
+import csv
+import heapq
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+import numpy as np
+
+# One row per tick; files saved with save_ticks() are opened memory-mapped
+TICK_DTYPE = np.dtype([("time", "<f8"), ("bid", "<f8"), ("ask", "<f8")])
+MERGE_CHUNK = 65536
+
+Tick = Tuple[float, str, float, float]  # (epoch seconds, symbol, bid, ask)
+
+def to_epoch(value: Union[str, float, int]) -> float:
+    """Epoch seconds from a number or an ISO timestamp (naive = local time, like datetime.now())"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).strip()).timestamp()
+
+def _sorted_ticks(rows: List[Tuple[float, float, float]]) -> np.ndarray:
+    ticks = np.array(rows, dtype=TICK_DTYPE)
+    return ticks[np.argsort(ticks["time"], kind="stable")]
+
+def load_tick_csv(path: str, symbol: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Tick CSV with a header row: time,bid,ask plus a symbol column
+    (or pass symbol= for single-symbol files)
+    """
+    rows: Dict[str, List[Tuple[float, float, float]]] = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            row_symbol = symbol or row["symbol"]
+            rows.setdefault(row_symbol, []).append(
+                (to_epoch(row["time"]), float(row["bid"]), float(row["ask"]))
+            )
+    return {name: _sorted_ticks(symbol_rows) for name, symbol_rows in rows.items()}
+
+def load_bar_csv(path: str, symbol: str, pip_size: float, spread_pips: float = 0.0,
+                 bar_seconds: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    OHLC bar CSV (time,open,high,low,close[,spread]) as four ticks per bar
+    Bars are assumed to be bid prices; ask = bid + spread. The intrabar path is
+    open -> low -> high -> close for up bars and open -> high -> low -> close for
+    down bars, so an SL and TP inside one bar resolve in the adverse order
+    """
+    with open(path, newline="") as f:
+        bars = [row for row in csv.DictReader(f)]
+    times = [to_epoch(row["time"]) for row in bars]
+    if bar_seconds is None:
+        bar_seconds = float(np.median(np.diff(times))) if len(times) > 1 else 60.0
+
+    rows = []
+    for start, row in zip(times, bars):
+        o, h, l, c = (float(row[key]) for key in ("open", "high", "low", "close"))
+        spread = float(row["spread"]) if row.get("spread") not in (None, "") else spread_pips
+        path_prices = (o, l, h, c) if c >= o else (o, h, l, c)
+        for step, price in enumerate(path_prices):
+            rows.append((start + bar_seconds * step / 4, price, price + spread * pip_size))
+    return {symbol: _sorted_ticks(rows)}
+
+def save_ticks(path: str, ticks: np.ndarray):
+    """Write ticks as a .npy file for memory-mapped replay"""
+    np.save(path, np.ascontiguousarray(ticks, dtype=TICK_DTYPE))
+
+def open_ticks(path: str) -> np.ndarray:
+    """Memory-map a .npy tick file (pages are read as the replay reaches them)"""
+    ticks = np.load(path, mmap_mode="r")
+    if ticks.dtype != TICK_DTYPE:
+        raise ValueError(f"{path}: expected tick dtype {TICK_DTYPE}, got {ticks.dtype}")
+    return ticks
+
+def load_ticks(path: str, symbol: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Tick file by extension: .npy (memory-mapped, needs symbol=) or CSV"""
+    if path.endswith(".npy"):
+        name = symbol or os.path.splitext(os.path.basename(path))[0]
+        return {name: open_ticks(path)}
+    return load_tick_csv(path, symbol)
+
+def _iter_symbol(symbol: str, ticks: np.ndarray) -> Iterator[Tick]:
+    for start in range(0, len(ticks), MERGE_CHUNK):
+        chunk = ticks[start:start + MERGE_CHUNK]
+        for time, bid, ask in zip(chunk["time"].tolist(), chunk["bid"].tolist(), chunk["ask"].tolist()):
+            yield time, symbol, bid, ask
+
+def merge_ticks(series: Dict[str, np.ndarray]) -> Iterator[Tick]:
+    """All symbols' ticks in time order (ties keep symbol order)"""
+    return heapq.merge(*(_iter_symbol(symbol, ticks) for symbol, ticks in series.items()),
+                       key=lambda tick: tick[0])
+
+def load_alerts(path: str) -> List[Tuple[float, Dict[str, Any]]]:
+    """
+    Recorded webhook payloads (JSON lines or a JSON array), sorted by timestamp
+    Each payload is the alert body as received, with its "timestamp" field
+    """
+    with open(path) as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        payloads = json.loads(text)
+    else:
+        payloads = [json.loads(line) for line in text.splitlines() if line.strip()]
+    alerts = [(to_epoch(payload["timestamp"]), payload) for payload in payloads]
+    alerts.sort(key=lambda item: item[0])
+    return alerts
@@ -0,0 +1,166 @@
+import asyncio
+import bisect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from src.config import Config
+from src.clients.mt5_client import MT5Client
+
+# Upper bounds (ms) of the call-latency histogram buckets; last bucket is open-ended
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+class AsyncMT5Client:
+    """
+    Awaitable facade over MT5Client
+    - Every terminal call runs on one dedicated worker thread (the MT5 API is not thread-safe)
+    - Per-call timeouts so a slow broker round trip never stalls the event loop
+    - Per-method call-latency histogram exposed through get_stats()
+    A timed-out query keeps running on the worker thread; its result is discarded
+    and the caller receives the same failure value the blocking client uses.
+    Order calls (ORDER_METHODS) are never abandoned: an order_send still running
+    can fill, so past its timeout the call is only counted and logged and the
+    caller keeps waiting for the broker's answer. Their timeout starts when the
+    worker picks the call up, so orders queued behind a batch are not flagged
+    """
+
+    ORDER_METHODS = ("place_order", "close_position")
+
+    def __init__(self, mt5_client: MT5Client, config: Config):
+        self.mt5_client = mt5_client
+        self.config = config
+
+        async_config = config.get("mt5_async_config", {})
+        self.timeouts = {
+            "initialize": async_config.get("initialize_timeout_seconds", 120.0),
+            "place_order": async_config.get("order_timeout_seconds", 30.0),
+            "close_position": async_config.get("order_timeout_seconds", 30.0),
+            "get_current_price": async_config.get("price_timeout_seconds", 5.0),
+            "get_tick": async_config.get("price_timeout_seconds", 5.0),
+            "get_account_balance": async_config.get("account_timeout_seconds", 10.0),
+            "get_account_info": async_config.get("account_timeout_seconds", 10.0),
+            "get_positions": async_config.get("account_timeout_seconds", 10.0)
+        }
+
+        # Single worker - all terminal calls are serialized in submission order
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5")
+
+        self.call_stats: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def initialized(self) -> bool:
+        return self.mt5_client.initialized
+
+    async def _call(self, method: str, default, *args, **kwargs):
+        """Run an MT5Client method on the worker thread with timeout and latency tracking"""
+        loop = asyncio.get_running_loop()
+        func = getattr(self.mt5_client, method)
+        started = time.perf_counter()
+        picked_up = loop.create_future() if method in self.ORDER_METHODS else None
+
+        def run():
+            if picked_up is not None:
+                loop.call_soon_threadsafe(_resolve, picked_up)
+            return func(*args, **kwargs)
+
+        future = loop.run_in_executor(self.executor, run)
+
+        try:
+            if picked_up is not None:
+                return await self._await_order(method, future, picked_up)
+            return await asyncio.wait_for(future, timeout=self.timeouts[method])
+        except asyncio.TimeoutError:
+            self._stats_for(method)["timeouts"] += 1
+            print(f"WARNING: MT5 {method} timed out after {self.timeouts[method]}s")
+            return default
+        except Exception as e:
+            self._stats_for(method)["errors"] += 1
+            print(f"ERROR: MT5 {method} failed: {str(e)}")
+            return default
+        finally:
+            self._record_latency(method, (time.perf_counter() - started) * 1000)
+
+    async def _await_order(self, method: str, future: asyncio.Future, picked_up: asyncio.Future):
+        """Result of an order call; past the timeout only warn, never hand back a failure"""
+        await asyncio.wait((picked_up, future), return_when=asyncio.FIRST_COMPLETED)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeouts[method])
+        except asyncio.TimeoutError:
+            self._stats_for(method)["timeouts"] += 1
+            print(f"WARNING: MT5 {method} still running after {self.timeouts[method]}s - waiting for the broker")
+            return await future
+
+    def _stats_for(self, method: str) -> Dict[str, Any]:
+        stats = self.call_stats.get(method)
+        if stats is None:
+            stats = {
+                "calls": 0,
+                "timeouts": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            }
+            self.call_stats[method] = stats
+        return stats
+
+    def _record_latency(self, method: str, elapsed_ms: float):
+        stats = self._stats_for(method)
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    async def initialize(self) -> bool:
+        return await self._call("initialize", False)
+
+    async def place_order(self, symbol: str, order_type: str, lot_size: float,
+                          price: float, sl: float, tp: float = None,
+                          comment: str = "") -> Optional[int]:
+        return await self._call("place_order", None, symbol, order_type, lot_size,
+                                price, sl, tp=tp, comment=comment)
+
+    async def close_position(self, position_id: int, percentage: float = 100) -> bool:
+        return await self._call("close_position", False, position_id, percentage)
+
+    def pop_fill_price(self, ticket: int) -> Optional[float]:
+        """Deal price recorded by the client for a ticket (no terminal call)"""
+        return self.mt5_client.pop_fill_price(ticket)
+
+    async def get_current_price(self, symbol: str) -> float:
+        return await self._call("get_current_price", 0.0, symbol)
+
+    async def get_tick(self, symbol: str) -> Optional[Dict[str, float]]:
+        return await self._call("get_tick", None, symbol)
+
+    async def get_account_balance(self) -> float:
+        return await self._call("get_account_balance", 0.0)
+
+    async def get_account_info(self) -> Optional[Dict[str, float]]:
+        return await self._call("get_account_info", None)
+
+    async def get_positions(self) -> Optional[List[Any]]:
+        return await self._call("get_positions", None)
+
+    def close(self):
+        """Stop the worker thread; calls already queued are allowed to finish"""
+        self.executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-method call counts, timeouts and latency histogram"""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        result = {}
+        for method, stats in self.call_stats.items():
+            calls = stats["calls"]
+            result[method] = {
+                "calls": calls,
+                "timeouts": stats["timeouts"],
+                "errors": stats["errors"],
+                "avg_ms": (stats["total_ms"] / calls) if calls else 0.0,
+                "max_ms": stats["max_ms"],
+                "histogram": dict(zip(labels, stats["buckets"]))
+            }
+        return result
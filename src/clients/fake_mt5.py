@@ -0,0 +1,421 @@
+import itertools
+import math
+import random
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.services.exposure_engine import position_pnl
+from src.utils.clock import Clock
+
+# Result types with the field names of the MetaTrader5 package (its results are named tuples too)
+SymbolInfo = namedtuple("SymbolInfo", "name visible digits point trade_contract_size volume_min volume_max volume_step")
+Tick = namedtuple("Tick", "time bid ask last volume time_msc")
+TradePosition = namedtuple("TradePosition", "ticket time type magic identifier volume price_open sl tp "
+                                            "price_current profit symbol comment")
+TradeDeal = namedtuple("TradeDeal", "ticket order time type entry magic reason position_id volume price "
+                                    "profit symbol comment")
+AccountInfo = namedtuple("AccountInfo", "login balance equity margin margin_free currency server leverage")
+OrderSendResult = namedtuple("OrderSendResult", "retcode deal order volume price bid ask comment request_id")
+
+# Start prices for the bot's symbols (fake_mt5_config.prices overrides, keyed like symbol_config)
+DEFAULT_PRICES = {
+    "XAUUSD": 2650.0, "EURUSD": 1.0850, "GBPUSD": 1.2650, "USDJPY": 149.50, "USDCAD": 1.3550,
+    "AUDUSD": 0.6550, "NZDUSD": 0.5950, "EURJPY": 162.00, "GBPJPY": 189.00, "AUDJPY": 98.00
+}
+
+class FakeMT5Terminal:
+    """
+    Local stand-in for the MetaTrader5 package (inject with MT5Client(config, terminal=...)
+    or enable fake_mt5_config) for load and integration tests on any platform
+    - Same call surface the bot uses: initialize/login/shutdown/last_error,
+      symbol_info/symbol_select/symbol_info_tick, order_send, positions_get,
+      account_info and history_deals_get, with the package's constants
+    - Stateful hedging account: market deals open positions (ticket = order
+      ticket) or close them fully/partially, realizing PnL with the bot's
+      pip formula into the balance; every deal lands in the deal history
+    - Prices come from a feed callable, set_price(), or a random walk
+      (volatility_pips_per_second); each price update runs broker-side SL/TP
+    - latency_ms/latency_jitter_ms delay every call; error_rate rejects
+      order_send with a retcode from error_codes; api_error_rate makes queries
+      return None like a dropped terminal connection; fail_next() scripts one
+      failure deterministically
+    """
+
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    DEAL_TYPE_BUY = 0
+    DEAL_TYPE_SELL = 1
+    DEAL_ENTRY_IN = 0
+    DEAL_ENTRY_OUT = 1
+    DEAL_REASON_CLIENT = 0
+    DEAL_REASON_SL = 4
+    DEAL_REASON_TP = 5
+    TRADE_RETCODE_REQUOTE = 10004
+    TRADE_RETCODE_REJECT = 10006
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_INVALID_PRICE = 10015
+    TRADE_RETCODE_INVALID_STOPS = 10016
+    TRADE_RETCODE_MARKET_CLOSED = 10018
+    TRADE_RETCODE_NO_MONEY = 10019
+    TRADE_RETCODE_PRICE_OFF = 10021
+    TRADE_RETCODE_CONNECTION = 10031
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+    RES_S_OK = 1
+    RES_E_NOT_FOUND = -4
+    RES_E_INTERNAL_FAIL_TIMEOUT = -10005
+    RES_E_NO_IPC = -10004
+
+    def __init__(self, config, clock: Clock = None,
+                 feed: Optional[Callable[[str, float], Optional[Tuple[float, float]]]] = None):
+        self.config = config
+        self.clock = clock or Clock()
+        self.feed = feed  # (broker symbol, epoch) -> (bid, ask) or None to keep the last price
+        self.lock = threading.RLock()
+
+        fake_config = config.get("fake_mt5_config", {})
+        self.login_id = fake_config.get("login", 0)
+        self.password = fake_config.get("password", "")
+        self.server = fake_config.get("server", "FakeMT5-Local")
+        self.balance = float(fake_config.get("balance", 10000.0))
+        self.leverage = fake_config.get("leverage", 100)
+        self.margin_per_lot = fake_config.get("margin_per_lot", 1000.0)
+        self.volatility = fake_config.get("volatility_pips_per_second", 0.0)
+        self.spread_pips = fake_config.get("spread_pips", 2.0)
+        self.latency = fake_config.get("latency_ms", 0.0) / 1000.0
+        self.latency_jitter = fake_config.get("latency_jitter_ms", 0.0) / 1000.0
+        self.error_rate = fake_config.get("error_rate", 0.0)
+        self.error_codes = fake_config.get("error_codes", [self.TRADE_RETCODE_REQUOTE, self.TRADE_RETCODE_CONNECTION])
+        self.api_error_rate = fake_config.get("api_error_rate", 0.0)
+        self.rng = random.Random(fake_config.get("seed"))
+
+        # Broker symbol name -> spec/price; the bot's symbols under their mapped names
+        mapping = config.get("symbol_mapping", {})
+        prices = {**DEFAULT_PRICES, **fake_config.get("prices", {})}
+        self.symbols: Dict[str, Dict[str, Any]] = {}
+        for symbol, spec in config.get("symbol_config", {}).items():
+            pip_size = spec["pip_size"]
+            digits = fake_config.get("digits", {}).get(symbol, max(0, round(-math.log10(pip_size))) + 1)
+            mid = prices.get(symbol, 1.0)
+            half_spread = self.spread_pips * pip_size / 2
+            self.symbols[mapping.get(symbol, symbol)] = {
+                "pip_size": pip_size,
+                "pip_value": spec.get("pip_value_per_std_lot", 10.0),
+                "digits": digits,
+                "point": 10 ** -digits,
+                "visible": True,
+                "bid": round(mid - half_spread, digits),
+                "ask": round(mid + half_spread, digits),
+                "updated": None
+            }
+
+        self.positions: Dict[int, Dict[str, Any]] = {}
+        self.deals: List[TradeDeal] = []
+        self.tickets = itertools.count(fake_config.get("first_ticket", 50000001))
+        self.initialized = False
+        self.logged_in = False
+        self.error = (self.RES_S_OK, "Success")
+        self.scripted_failures: Dict[str, List[Optional[int]]] = {}
+        self.stats = {
+            "calls": {},
+            "orders_filled": 0,
+            "orders_rejected": 0,
+            "rejections": {},
+            "positions_closed": 0,
+            "sl_hits": 0,
+            "tp_hits": 0,
+            "api_errors": 0
+        }
+
+    # ---- test controls -------------------------------------------------------
+
+    def set_price(self, symbol: str, bid: float, ask: Optional[float] = None):
+        """Move a (broker) symbol's quote and run broker-side SL/TP against it"""
+        with self.lock:
+            info = self.symbols[symbol]
+            if ask is None:
+                ask = bid + self.spread_pips * info["pip_size"]
+            info["bid"], info["ask"] = round(bid, info["digits"]), round(ask, info["digits"])
+            info["updated"] = self.clock.time()
+            self._check_stops(symbol)
+
+    def fail_next(self, method: str, retcode: Optional[int] = None):
+        """Make the next call of method fail (order_send with retcode, queries return None)"""
+        with self.lock:
+            self.scripted_failures.setdefault(method, []).append(retcode)
+
+    # ---- internals -----------------------------------------------------------
+
+    def _enter(self, method: str) -> Optional[int]:
+        """Per-call bookkeeping: latency, then any injected failure (None = proceed)"""
+        self.stats["calls"][method] = self.stats["calls"].get(method, 0) + 1
+        if self.latency or self.latency_jitter:
+            time.sleep(max(0.0, self.latency + self.rng.uniform(-self.latency_jitter, self.latency_jitter)))
+        scripted = self.scripted_failures.get(method)
+        if scripted:
+            retcode = scripted.pop(0)
+            return retcode if retcode is not None else self.TRADE_RETCODE_CONNECTION
+        rate = self.error_rate if method == "order_send" else self.api_error_rate
+        if rate and self.rng.random() < rate:
+            return self.rng.choice(self.error_codes) if method == "order_send" else self.TRADE_RETCODE_CONNECTION
+        return None
+
+    def _api_error(self, code: int = RES_E_NO_IPC, message: str = "No IPC connection"):
+        self.error = (code, message)
+        self.stats["api_errors"] += 1
+        return None
+
+    def _refresh(self, symbol: str):
+        """Bring a symbol's quote up to the clock (feed or random walk), then check stops"""
+        info = self.symbols[symbol]
+        now = self.clock.time()
+        if self.feed is not None:
+            quote = self.feed(symbol, now)
+            if quote is not None:
+                info["bid"], info["ask"] = round(quote[0], info["digits"]), round(quote[1], info["digits"])
+        elif self.volatility and info["updated"] is not None and now > info["updated"]:
+            step = self.rng.gauss(0.0, self.volatility * math.sqrt(now - info["updated"])) * info["pip_size"]
+            info["bid"] = round(info["bid"] + step, info["digits"])
+            info["ask"] = round(info["ask"] + step, info["digits"])
+        info["updated"] = now
+        self._check_stops(symbol)
+
+    def _check_stops(self, symbol: str):
+        info = self.symbols[symbol]
+        for position in list(self.positions.values()):
+            if position["symbol"] != symbol:
+                continue
+            buy = position["type"] == self.POSITION_TYPE_BUY
+            price = info["bid"] if buy else info["ask"]
+            sl, tp = position["sl"], position["tp"]
+            hit_sl = bool(sl) and (price <= sl if buy else price >= sl)
+            hit_tp = bool(tp) and (price >= tp if buy else price <= tp)
+            if hit_sl or hit_tp:
+                reason = self.DEAL_REASON_SL if hit_sl else self.DEAL_REASON_TP
+                self.stats["sl_hits" if hit_sl else "tp_hits"] += 1
+                self._close(position, position["volume"], price, reason, "[sl]" if hit_sl else "[tp]")
+
+    def _profit(self, position: Dict[str, Any], price: float, volume: float) -> float:
+        info = self.symbols[position["symbol"]]
+        sign = 1 if position["type"] == self.POSITION_TYPE_BUY else -1
+        return position_pnl(position["price_open"], price, sign, volume, info["pip_size"], info["pip_value"])
+
+    def _deal(self, position, deal_type, entry, reason, volume, price, profit, comment) -> int:
+        ticket = next(self.tickets)
+        self.deals.append(TradeDeal(
+            ticket=ticket, order=ticket, time=int(self.clock.time()), type=deal_type, entry=entry,
+            magic=position["magic"], reason=reason, position_id=position["ticket"], volume=volume,
+            price=price, profit=profit, symbol=position["symbol"], comment=comment
+        ))
+        return ticket
+
+    def _close(self, position, volume: float, price: float, reason: int, comment: str) -> int:
+        profit = self._profit(position, price, volume)
+        self.balance += profit
+        position["volume"] = round(position["volume"] - volume, 8)
+        if position["volume"] <= 0:
+            del self.positions[position["ticket"]]
+            self.stats["positions_closed"] += 1
+        closing_type = self.DEAL_TYPE_SELL if position["type"] == self.POSITION_TYPE_BUY else self.DEAL_TYPE_BUY
+        return self._deal(position, closing_type, self.DEAL_ENTRY_OUT, reason, volume, price, profit, comment)
+
+    def _floating(self) -> float:
+        total = 0.0
+        for position in self.positions.values():
+            info = self.symbols[position["symbol"]]
+            price = info["bid"] if position["type"] == self.POSITION_TYPE_BUY else info["ask"]
+            total += self._profit(position, price, position["volume"])
+        return total
+
+    def _margin(self) -> float:
+        return sum(position["volume"] for position in self.positions.values()) * self.margin_per_lot
+
+    def _position_tuple(self, position: Dict[str, Any]) -> TradePosition:
+        info = self.symbols[position["symbol"]]
+        price = info["bid"] if position["type"] == self.POSITION_TYPE_BUY else info["ask"]
+        return TradePosition(
+            ticket=position["ticket"], time=int(position["time"]), type=position["type"],
+            magic=position["magic"], identifier=position["ticket"], volume=position["volume"],
+            price_open=position["price_open"], sl=position["sl"], tp=position["tp"],
+            price_current=price, profit=self._profit(position, price, position["volume"]),
+            symbol=position["symbol"], comment=position["comment"]
+        )
+
+    # ---- MetaTrader5 API -----------------------------------------------------
+
+    def initialize(self, path: str = None, **kwargs) -> bool:
+        with self.lock:
+            if self._enter("initialize") is not None:
+                self._api_error(self.RES_E_INTERNAL_FAIL_TIMEOUT, "IPC timeout")
+                return False
+            self.initialized = True
+            self.error = (self.RES_S_OK, "Success")
+            return True
+
+    def login(self, login: int, password: str = "", server: str = "", timeout: int = 60000) -> bool:
+        with self.lock:
+            if not self.initialized or self._enter("login") is not None:
+                self._api_error()
+                return False
+            if (self.login_id and int(login) != int(self.login_id)) or (self.password and password != self.password):
+                self.error = (-6, "Terminal: Authorization failed")
+                return False
+            self.login_id = int(login)
+            self.server = server or self.server
+            self.logged_in = True
+            return True
+
+    def shutdown(self):
+        with self.lock:
+            self.initialized = False
+            self.logged_in = False
+
+    def last_error(self) -> Tuple[int, str]:
+        return self.error
+
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        with self.lock:
+            if self._enter("symbol_info") is not None:
+                return self._api_error()
+            info = self.symbols.get(symbol)
+            if info is None:
+                self.error = (self.RES_E_NOT_FOUND, "Not found")
+                return None
+            return SymbolInfo(name=symbol, visible=info["visible"], digits=info["digits"], point=info["point"],
+                              trade_contract_size=100000.0, volume_min=0.01, volume_max=100.0, volume_step=0.01)
+
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        with self.lock:
+            if symbol not in self.symbols:
+                return False
+            self.symbols[symbol]["visible"] = enable
+            return True
+
+    def symbol_info_tick(self, symbol: str) -> Optional[Tick]:
+        with self.lock:
+            if self._enter("symbol_info_tick") is not None:
+                return self._api_error()
+            if symbol not in self.symbols:
+                self.error = (self.RES_E_NOT_FOUND, "Not found")
+                return None
+            self._refresh(symbol)
+            info = self.symbols[symbol]
+            now = self.clock.time()
+            return Tick(time=int(now), bid=info["bid"], ask=info["ask"], last=0.0, volume=0,
+                        time_msc=int(now * 1000))
+
+    def order_send(self, request: Dict[str, Any]) -> OrderSendResult:
+        with self.lock:
+            def reply(retcode, comment, deal=0, order=0, volume=0.0, price=0.0, bid=0.0, ask=0.0):
+                if retcode != self.TRADE_RETCODE_DONE:
+                    self.stats["orders_rejected"] += 1
+                    self.stats["rejections"][retcode] = self.stats["rejections"].get(retcode, 0) + 1
+                return OrderSendResult(retcode=retcode, deal=deal, order=order, volume=volume, price=price,
+                                       bid=bid, ask=ask, comment=comment, request_id=0)
+
+            injected = self._enter("order_send")
+            if injected is not None:
+                return reply(injected, "Injected failure")
+            if not self.logged_in:
+                return reply(self.TRADE_RETCODE_CONNECTION, "No connection")
+            if request.get("action") != self.TRADE_ACTION_DEAL:
+                return reply(self.TRADE_RETCODE_INVALID, "Only market deals are supported")
+
+            symbol = request.get("symbol")
+            if symbol not in self.symbols:
+                return reply(self.TRADE_RETCODE_INVALID, "Unknown symbol")
+            self._refresh(symbol)
+            info = self.symbols[symbol]
+            order_type = request.get("type")
+            if order_type not in (self.ORDER_TYPE_BUY, self.ORDER_TYPE_SELL):
+                return reply(self.TRADE_RETCODE_INVALID, "Invalid order type")
+            fill = info["ask"] if order_type == self.ORDER_TYPE_BUY else info["bid"]
+            volume = round(float(request.get("volume", 0.0)), 2)
+            if volume < 0.01:
+                return reply(self.TRADE_RETCODE_INVALID_VOLUME, "Invalid volume")
+            requested = request.get("price")
+            if requested and abs(fill - requested) > request.get("deviation", 0) * info["point"]:
+                return reply(self.TRADE_RETCODE_REQUOTE, "Requote", bid=info["bid"], ask=info["ask"])
+
+            if request.get("position"):
+                position = self.positions.get(request["position"])
+                if position is None:
+                    return reply(self.TRADE_RETCODE_POSITION_CLOSED, "Position doesn't exist")
+                if order_type == position["type"] or volume > position["volume"]:
+                    return reply(self.TRADE_RETCODE_INVALID, "Invalid close request")
+                deal = self._close(position, volume, fill, self.DEAL_REASON_CLIENT, request.get("comment", ""))
+                self.stats["orders_filled"] += 1
+                return reply(self.TRADE_RETCODE_DONE, "Request executed", deal, deal, volume, fill,
+                             info["bid"], info["ask"])
+
+            sl, tp = request.get("sl") or 0.0, request.get("tp") or 0.0
+            buy = order_type == self.ORDER_TYPE_BUY
+            exit_price = info["bid"] if buy else info["ask"]
+            if (sl and (sl >= exit_price if buy else sl <= exit_price)) or \
+               (tp and (tp <= exit_price if buy else tp >= exit_price)):
+                return reply(self.TRADE_RETCODE_INVALID_STOPS, "Invalid stops")
+            equity = self.balance + self._floating()
+            if equity - self._margin() < volume * self.margin_per_lot:
+                return reply(self.TRADE_RETCODE_NO_MONEY, "No money")
+
+            ticket = next(self.tickets)
+            position = {
+                "ticket": ticket, "symbol": symbol, "type": order_type, "volume": volume,
+                "price_open": fill, "sl": sl, "tp": tp, "magic": request.get("magic", 0),
+                "comment": request.get("comment", ""), "time": self.clock.time()
+            }
+            self.positions[ticket] = position
+            deal = self._deal(position, self.DEAL_TYPE_BUY if buy else self.DEAL_TYPE_SELL,
+                              self.DEAL_ENTRY_IN, self.DEAL_REASON_CLIENT, volume, fill, 0.0, position["comment"])
+            self.stats["orders_filled"] += 1
+            return reply(self.TRADE_RETCODE_DONE, "Request executed", deal, ticket, volume, fill,
+                         info["bid"], info["ask"])
+
+    def positions_get(self, symbol: str = None, group: str = None, ticket: int = None):
+        with self.lock:
+            if self._enter("positions_get") is not None:
+                return self._api_error()
+            for name in {position["symbol"] for position in self.positions.values()}:
+                self._refresh(name)  # broker-side stops fire before the snapshot
+            positions = [
+                self._position_tuple(position) for position in self.positions.values()
+                if (ticket is None or position["ticket"] == ticket)
+                and (symbol is None or position["symbol"] == symbol)
+            ]
+            return tuple(positions)
+
+    def account_info(self) -> Optional[AccountInfo]:
+        with self.lock:
+            if self._enter("account_info") is not None:
+                return self._api_error()
+            for name in {position["symbol"] for position in self.positions.values()}:
+                self._refresh(name)
+            equity = self.balance + self._floating()
+            margin = self._margin()
+            return AccountInfo(login=self.login_id, balance=self.balance, equity=equity, margin=margin,
+                               margin_free=equity - margin, currency="USD", server=self.server,
+                               leverage=self.leverage)
+
+    def history_deals_get(self, date_from=None, date_to=None, group: str = None,
+                          ticket: int = None, position: int = None):
+        with self.lock:
+            if self._enter("history_deals_get") is not None:
+                return self._api_error()
+            to_epoch = lambda value: value.timestamp() if isinstance(value, datetime) else value
+            start, end = to_epoch(date_from), to_epoch(date_to)
+            return tuple(
+                deal for deal in self.deals
+                if (ticket is None or deal.ticket == ticket)
+                and (position is None or deal.position_id == position)
+                and (start is None or deal.time >= start)
+                and (end is None or deal.time <= end)
+            )
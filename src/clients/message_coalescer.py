@@ -0,0 +1,89 @@
+import asyncio
+from typing import Dict, Any, List, Callable
+
+# Telegram rejects messages longer than 4096 characters
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+def trade_group(trade) -> str:
+    """Coalescing group for a trade notification: its chain if any, else its symbol"""
+    if getattr(trade, "profit_chain_id", None):
+        return f"chain:{trade.profit_chain_id}"
+    if getattr(trade, "chain_id", None):
+        return f"chain:{trade.chain_id}"
+    return f"symbol:{trade.symbol}"
+
+class MessageCoalescer:
+    """
+    Merges bursty notifications that share a group key into one digest
+    - First message of a group opens a window (coalesce_window_seconds)
+    - Every message for that group arriving inside the window is buffered
+    - When the window closes (or the buffer is full) one digest is emitted
+    Must be used from the event loop thread only
+    """
+
+    def __init__(self, window_seconds: float, max_messages: int,
+                 emit: Callable[[Dict[str, Any]], None]):
+        self.window_seconds = window_seconds
+        self.max_messages = max_messages
+        self.emit = emit  # Receives the final sendMessage payload
+        self.pending: Dict[str, Dict[str, Any]] = {}  # group -> {"payload": ..., "messages": [...], "handle": ...}
+        self.stats = {"coalesced_messages": 0, "digests_sent": 0}
+
+    def add(self, group: str, payload: Dict[str, Any]):
+        """Buffer a message for its group, opening a window if needed"""
+        entry = self.pending.get(group)
+        if entry is None:
+            loop = asyncio.get_running_loop()
+            entry = {
+                "payload": payload,
+                "messages": [],
+                "handle": loop.call_later(self.window_seconds, self.flush, group)
+            }
+            self.pending[group] = entry
+
+        entry["messages"].append(payload["text"])
+        if len(entry["messages"]) >= self.max_messages:
+            self.flush(group)
+
+    def flush(self, group: str):
+        """Emit the digest for a group (no-op if nothing is buffered)"""
+        entry = self.pending.pop(group, None)
+        if entry is None:
+            return
+        entry["handle"].cancel()
+
+        messages = entry["messages"]
+        if len(messages) > 1:
+            self.stats["coalesced_messages"] += len(messages)
+            self.stats["digests_sent"] += 1
+
+        for text in self._build_digest(group, messages):
+            self.emit({**entry["payload"], "text": text})
+
+    def flush_all(self):
+        """Emit every open window immediately (used on shutdown)"""
+        for group in list(self.pending.keys()):
+            self.flush(group)
+
+    def pending_count(self) -> int:
+        """Messages currently held in open windows"""
+        return sum(len(entry["messages"]) for entry in self.pending.values())
+
+    def _build_digest(self, group: str, messages: List[str]) -> List[str]:
+        """Join buffered messages, splitting into Telegram-sized chunks"""
+        if len(messages) == 1:
+            return messages
+
+        separator = "\n────────────────────\n"
+        header = f"📦 DIGEST: {len(messages)} updates ({group})\n\n"
+        chunks = []
+        current = header
+        for text in messages:
+            addition = text if current == header else separator + text
+            if len(current) + len(addition) > TELEGRAM_MAX_MESSAGE_LENGTH and current != header:
+                chunks.append(current)
+                current = header + text
+            else:
+                current += addition
+        chunks.append(current[:TELEGRAM_MAX_MESSAGE_LENGTH])
+        return chunks
@@ -5,17 +5,41 @@ except ImportError:
     MT5_AVAILABLE = False
     print("WARNING: MetaTrader5 not available (Windows only). Running in simulation mode.")
 
+import functools
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from src.config import Config
 from src.models import Trade
 
+# Fill prices kept for callers that compare legs (oldest dropped first)
+FILL_PRICE_HISTORY = 256
+
+def _serialized(method):
+    """Hold the client lock for the whole terminal call - the MT5 API is not thread-safe"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class MT5Client:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, terminal=None):
         self.config = config
         self.initialized = False
+        # MetaTrader5 API: the installed package, or a stand-in with the same calls
+        # (FakeMT5Terminal, also selected by fake_mt5_config.enabled); None = simulation
+        if terminal is None and config.get("fake_mt5_config", {}).get("enabled", False):
+            from src.clients.fake_mt5 import FakeMT5Terminal
+            terminal = FakeMT5Terminal(config)
+        self.mt5 = terminal if terminal is not None else (mt5 if MT5_AVAILABLE else None)
+        # Async code goes through AsyncMT5Client's worker thread; the lock also
+        # protects the remaining direct callers (Telegram thread, sync endpoints)
+        self.lock = threading.RLock()
         # Load symbol mapping from config for broker compatibility
         self.symbol_mapping = config.get("symbol_mapping", {})
+        # Deal price per ticket of recent orders (read with pop_fill_price)
+        self.fill_prices: Dict[int, float] = {}
 
     def _map_symbol(self, symbol: str) -> str:
         """
@@ -27,16 +51,27 @@ class MT5Client:
             print(f"Symbol mapping: {symbol} -> {mapped}")
         return mapped
 
+    def _record_fill(self, ticket: int, price: float):
+        self.fill_prices[ticket] = price
+        while len(self.fill_prices) > FILL_PRICE_HISTORY:
+            del self.fill_prices[next(iter(self.fill_prices))]
+
+    def pop_fill_price(self, ticket: int) -> Optional[float]:
+        """Deal price of a recent order placed through this client, if known"""
+        with self.lock:
+            return self.fill_prices.pop(ticket, None)
+
+    @_serialized
     def initialize(self) -> bool:
         """Initialize MT5 connection with retry logic"""
-        if not MT5_AVAILABLE:
+        if self.mt5 is None:
             print("WARNING: Running in simulation mode (MT5 not available on this platform)")
             self.initialized = True
             return True
             
         for i in range(self.config["mt5_retries"]):
             try:
-                if not mt5.initialize():
+                if not self.mt5.initialize():
                     print(f"MT5 initialization failed, retry {i+1}/{self.config['mt5_retries']}")
                     time.sleep(self.config["mt5_wait"])
                     continue
@@ -51,18 +86,18 @@ class MT5Client:
                     time.sleep(self.config["mt5_wait"])
                     continue
                 
-                authorized = mt5.login(login, password, server)
+                authorized = self.mt5.login(login, password, server)
                 
                 if authorized:
                     self.initialized = True
                     print("SUCCESS: MT5 connection established")
-                    account_info = mt5.account_info()
+                    account_info = self.mt5.account_info()
                     if account_info:
                         print(f"Account Balance: ${account_info.balance:.2f}")
                         print(f"Account: {account_info.login} | Server: {account_info.server}")
                     return True
                 else:
-                    error = mt5.last_error()
+                    error = self.mt5.last_error()
                     print(f"MT5 login failed, retry {i+1}/{self.config['mt5_retries']}")
                     print(f"ERROR: MT5 login error: {error}")
                     time.sleep(self.config["mt5_wait"])
@@ -86,6 +121,7 @@ class MT5Client:
         
         return False
 
+    @_serialized
     def place_order(self, symbol: str, order_type: str, lot_size: float, 
                    price: float, sl: float, tp: float = None, 
                    comment: str = "") -> Optional[int]:
@@ -98,10 +134,11 @@ class MT5Client:
                 return None
         
         # Simulation mode
-        if not MT5_AVAILABLE or self.config.get("simulate_orders", True):
+        if self.mt5 is None or self.config.get("simulate_orders", True):
             import random
             simulated_ticket = random.randint(100000, 999999)
             print(f"SIMULATED ORDER: {order_type.upper()} {lot_size} lots {symbol} @ {price}, SL={sl}, TP={tp} (Ticket #{simulated_ticket})")
+            self._record_fill(simulated_ticket, price)
             return simulated_ticket
         
         # Map symbol for broker compatibility - CRITICAL FOR XM BROKER
@@ -109,24 +146,24 @@ class MT5Client:
         
         try:
             # Get symbol info using the mapped broker symbol
-            symbol_info = mt5.symbol_info(mt5_symbol)
+            symbol_info = self.mt5.symbol_info(mt5_symbol)
             if symbol_info is None:
                 print(f"ERROR: Symbol {mt5_symbol} not found in MT5")
                 return None
                 
             if not symbol_info.visible:
                 print(f"Symbol {mt5_symbol} is not visible, attempting to enable")
-                if not mt5.symbol_select(mt5_symbol, True):
+                if not self.mt5.symbol_select(mt5_symbol, True):
                     print(f"ERROR: Failed to enable symbol {mt5_symbol}")
                     return None
             
             # Determine order type and get current price
             if order_type == "buy":
-                order_type_mt5 = mt5.ORDER_TYPE_BUY
-                price = mt5.symbol_info_tick(mt5_symbol).ask
+                order_type_mt5 = self.mt5.ORDER_TYPE_BUY
+                price = self.mt5.symbol_info_tick(mt5_symbol).ask
             else:
-                order_type_mt5 = mt5.ORDER_TYPE_SELL
-                price = mt5.symbol_info_tick(mt5_symbol).bid
+                order_type_mt5 = self.mt5.ORDER_TYPE_SELL
+                price = self.mt5.symbol_info_tick(mt5_symbol).bid
             
             # Round prices to symbol's digit precision
             digits = symbol_info.digits
@@ -137,7 +174,7 @@ class MT5Client:
             
             # Prepare order request with mapped symbol
             request = {
-                "action": mt5.TRADE_ACTION_DEAL,
+                "action": self.mt5.TRADE_ACTION_DEAL,
                 "symbol": mt5_symbol,  # Use broker's symbol name
                 "volume": lot_size,
                 "type": order_type_mt5,
@@ -146,8 +183,8 @@ class MT5Client:
                 "deviation": 20,
                 "magic": 234000,
                 "comment": comment,
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_time": self.mt5.ORDER_TIME_GTC,
+                "type_filling": self.mt5.ORDER_FILLING_IOC,
             }
             
             # Add TP if provided
@@ -155,14 +192,15 @@ class MT5Client:
                 request["tp"] = tp
             
             # Send order to MT5
-            result = mt5.order_send(request)
+            result = self.mt5.order_send(request)
             
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
+            if result.retcode != self.mt5.TRADE_RETCODE_DONE:
                 print(f"ERROR: Order failed: {result.comment} (Error code: {result.retcode})")
                 print(f"Request details: Symbol={mt5_symbol}, Lot={lot_size}, Price={price}, SL={sl}, TP={tp}")
                 return None
             
             print(f"SUCCESS: Order placed successfully: Ticket #{result.order}")
+            self._record_fill(result.order, result.price or price)
             return result.order
             
         except Exception as e:
@@ -171,6 +209,7 @@ class MT5Client:
             traceback.print_exc()
             return None
 
+    @_serialized
     def close_position(self, position_id: int, percentage: float = 100):
         """Close a position completely"""
         if not self.initialized:
@@ -178,17 +217,17 @@ class MT5Client:
                 return False
         
         # Simulation mode - always return success
-        if not MT5_AVAILABLE or self.config.get("simulate_orders", True):
+        if self.mt5 is None or self.config.get("simulate_orders", True):
             print(f"SIMULATED CLOSE: Position #{position_id}")
             return True
         
         try:
             # Get position by ticket
-            positions = mt5.positions_get(ticket=position_id)
+            positions = self.mt5.positions_get(ticket=position_id)
             
             # Check if it's an API error vs position not found
             if positions is None:
-                error = mt5.last_error()
+                error = self.mt5.last_error()
                 print(f"ERROR: MT5 API error when getting position {position_id}: {error}")
                 return False  # API error - don't mark as closed
             
@@ -199,17 +238,17 @@ class MT5Client:
             position = positions[0]
             
             # Prepare close request
-            symbol_info = mt5.symbol_info(position.symbol)
+            symbol_info = self.mt5.symbol_info(position.symbol)
             
-            if position.type == mt5.ORDER_TYPE_BUY:
-                order_type = mt5.ORDER_TYPE_SELL
-                price = mt5.symbol_info_tick(position.symbol).bid
+            if position.type == self.mt5.ORDER_TYPE_BUY:
+                order_type = self.mt5.ORDER_TYPE_SELL
+                price = self.mt5.symbol_info_tick(position.symbol).bid
             else:
-                order_type = mt5.ORDER_TYPE_BUY
-                price = mt5.symbol_info_tick(position.symbol).ask
+                order_type = self.mt5.ORDER_TYPE_BUY
+                price = self.mt5.symbol_info_tick(position.symbol).ask
             
             request = {
-                "action": mt5.TRADE_ACTION_DEAL,
+                "action": self.mt5.TRADE_ACTION_DEAL,
                 "position": position_id,
                 "symbol": position.symbol,
                 "volume": position.volume,
@@ -218,13 +257,13 @@ class MT5Client:
                 "deviation": 20,
                 "magic": 234000,
                 "comment": f"Close_{percentage}%",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_time": self.mt5.ORDER_TIME_GTC,
+                "type_filling": self.mt5.ORDER_FILLING_IOC,
             }
             
-            result = mt5.order_send(request)
+            result = self.mt5.order_send(request)
             
-            if result.retcode == mt5.TRADE_RETCODE_DONE:
+            if result.retcode == self.mt5.TRADE_RETCODE_DONE:
                 print(f"SUCCESS: Position {position_id} closed successfully")
                 return True
             else:
@@ -235,6 +274,7 @@ class MT5Client:
             print(f"Position close error: {str(e)}")
             return False
 
+    @_serialized
     def get_current_price(self, symbol: str) -> float:
         """
         Get current price for a symbol with automatic mapping support
@@ -245,7 +285,7 @@ class MT5Client:
                 return 0.0
         
         # Simulation mode - return dummy prices
-        if not MT5_AVAILABLE or self.config.get("simulate_orders", True):
+        if self.mt5 is None or self.config.get("simulate_orders", True):
             dummy_prices = {
                 "XAUUSD": 2650.0, "GOLD": 2650.0,
                 "EURUSD": 1.0850, "GBPUSD": 1.2650,
@@ -257,13 +297,39 @@ class MT5Client:
         mt5_symbol = self._map_symbol(symbol)
         
         try:
-            tick = mt5.symbol_info_tick(mt5_symbol)
+            tick = self.mt5.symbol_info_tick(mt5_symbol)
             if tick:
                 return (tick.ask + tick.bid) / 2
             return 0.0
         except:
             return 0.0
 
+    @_serialized
+    def get_tick(self, symbol: str) -> Optional[Dict[str, float]]:
+        """
+        Get current bid/ask for a symbol with automatic mapping support
+        Returns None if the tick is unavailable
+        """
+        if not self.initialized:
+            if not self.initialize():
+                return None
+        
+        # Simulation mode - dummy price on both sides
+        if self.mt5 is None or self.config.get("simulate_orders", True):
+            price = self.get_current_price(symbol)
+            return {"bid": price, "ask": price}
+        
+        mt5_symbol = self._map_symbol(symbol)
+        
+        try:
+            tick = self.mt5.symbol_info_tick(mt5_symbol)
+            if tick:
+                return {"bid": tick.bid, "ask": tick.ask}
+            return None
+        except:
+            return None
+
+    @_serialized
     def get_account_balance(self) -> float:
         """Get current account balance"""
         if not self.initialized:
@@ -271,20 +337,69 @@ class MT5Client:
                 return 0.0
         
         # Simulation mode - return dummy balance
-        if not MT5_AVAILABLE or self.config.get("simulate_orders", True):
+        if self.mt5 is None or self.config.get("simulate_orders", True):
             return 10000.0
         
         try:
-            account_info = mt5.account_info()
+            account_info = self.mt5.account_info()
             if account_info:
                 return account_info.balance
             return 0.0
         except:
             return 0.0
 
+    @_serialized
+    def get_account_info(self) -> Optional[Dict[str, float]]:
+        """Balance, equity, margin and free margin in one account_info() round trip"""
+        if not self.initialized:
+            if not self.initialize():
+                return None
+        
+        # Simulation mode - flat dummy account
+        if self.mt5 is None or self.config.get("simulate_orders", True):
+            return {"balance": 10000.0, "equity": 10000.0, "margin": 0.0, "free_margin": 10000.0}
+        
+        try:
+            account_info = self.mt5.account_info()
+            if account_info:
+                return {
+                    "balance": account_info.balance,
+                    "equity": account_info.equity,
+                    "margin": account_info.margin,
+                    "free_margin": account_info.margin_free
+                }
+            return None
+        except:
+            return None
+
+    @_serialized
+    def get_positions(self) -> Optional[List[Any]]:
+        """
+        Get all open MT5 positions
+        Returns None on API error so callers can tell it apart from "no positions"
+        """
+        if not self.initialized:
+            if not self.initialize():
+                return None
+        
+        # Simulation mode - no broker-side positions
+        if self.mt5 is None or self.config.get("simulate_orders", True):
+            return []
+        
+        try:
+            positions = self.mt5.positions_get()
+            if positions is None:
+                print(f"ERROR: MT5 API error when getting positions: {self.mt5.last_error()}")
+                return None
+            return list(positions)
+        except Exception as e:
+            print(f"ERROR: Position query error: {str(e)}")
+            return None
+
+    @_serialized
     def shutdown(self):
         """Shutdown MT5 connection gracefully"""
-        if self.initialized:
-            mt5.shutdown()
+        if self.initialized and self.mt5 is not None:
+            self.mt5.shutdown()
             self.initialized = False
             print("MT5 connection closed")
\ No newline at end of file
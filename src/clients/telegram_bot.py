@@ -6,7 +6,9 @@ from typing import Dict, Any, TYPE_CHECKING
 from src.config import Config
 from src.managers.risk_manager import RiskManager
 from src.services.analytics_engine import AnalyticsEngine
+from src.services.pyramid_risk import PyramidRiskSimulator
 from src.managers.timeframe_trend_manager import TimeframeTrendManager
+from src.clients.telegram_notifier import TelegramNotifier
 
 if TYPE_CHECKING:
     from src.core.trading_engine import TradingEngine
@@ -18,6 +20,9 @@ class TelegramBot:
         self.chat_id = config["telegram_chat_id"]
         self.base_url = f"https://api.telegram.org/bot{self.token}"
         
+        # Outbound messages go through a queue drained by an async worker
+        self.notifier = TelegramNotifier(config, self.base_url)
+        
         self.trend_manager = None
         
         self.command_handlers = {
@@ -90,7 +95,8 @@ class TelegramBot:
             "/set_chain_multipliers": self.handle_set_chain_multipliers,
             "/set_sl_reductions": self.handle_set_sl_reductions,
             "/close_profit_chain": self.handle_stop_profit_chain,  # Alias for stop_profit_chain
-            "/profit_config": self.handle_profit_config
+            "/profit_config": self.handle_profit_config,
+            "/pyramid_risk": self.handle_pyramid_risk
         }
         self.risk_manager = None
         self.trading_engine = None
@@ -100,25 +106,56 @@ class TelegramBot:
         """Set dependent modules"""
         self.risk_manager = risk_manager
         self.trading_engine = trading_engine
+        # Report from the engine's database instead of a second connection set
+        engine_db = getattr(trading_engine, 'db', None)
+        if engine_db is not None and self.analytics_engine.db is not engine_db:
+            self.analytics_engine.db.close()
+            self.analytics_engine = AnalyticsEngine(engine_db)
 
     def set_trend_manager(self, trend_manager: TimeframeTrendManager):
         """Set trend manager"""
         self.trend_manager = trend_manager
         print("SUCCESS: Trend manager set in Telegram bot")
 
-    def send_message(self, message: str):
-        """Send message to Telegram"""
+    async def start_notifier(self):
+        """Start the non-blocking notification worker (call from the event loop)"""
+        await self.notifier.start()
+
+    async def stop_notifier(self):
+        """Flush queued notifications and stop the worker"""
+        await self.notifier.stop()
+
+    def get_notification_stats(self) -> Dict[str, Any]:
+        """Queue depth, drop count and send latency of outbound notifications"""
+        return self.notifier.get_stats()
+
+    def send_message(self, message: str, group: str = None, priority: bool = False):
+        """
+        Send message to Telegram
+        Returns immediately when the notification worker is running;
+        falls back to a direct blocking send otherwise (scripts, startup)
+        - group: related messages (e.g. "chain:<id>") are merged into one digest
+        - priority: risk alerts that must skip coalescing and go out first
+        """
         if not self.token or not self.chat_id:
             print("WARNING: Telegram credentials not configured - message not sent")
             return False
         
+        payload = {
+            "chat_id": self.chat_id,
+            "text": message,
+            "parse_mode": "HTML"
+        }
+        
+        if self.notifier.is_running():
+            return self.notifier.enqueue(payload, group=group, priority=priority)
+        
+        return self._send_message_sync(payload)
+
+    def _send_message_sync(self, payload: Dict[str, Any]):
+        """Blocking send used when the notification worker is not running"""
         try:
             url = f"{self.base_url}/sendMessage"
-            payload = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            }
             response = requests.post(url, json=payload, timeout=10)
             if response.status_code == 200:
                 return True
@@ -218,7 +255,8 @@ class TelegramBot:
             "/set_chain_multipliers MULTIPLIERS - Set order multipliers\n"
             "/set_sl_reductions REDUCTIONS - Set SL reductions\n"
             "/close_profit_chain CHAIN_ID - Close specific chain\n"
-            "/profit_config - Show profit booking configuration"
+            "/profit_config - Show profit booking configuration\n"
+            "/pyramid_risk [SYMBOL] [PATHS] - Monte Carlo loss risk of the pyramid"
         )
         self.send_message(welcome_msg)
 
@@ -473,6 +511,14 @@ class TelegramBot:
             f"📉 Daily Loss: ${stats['daily_loss']:.2f}\n"
             f"🔻 Lifetime Loss: ${stats['lifetime_loss']:.2f}"
         )
+        report = self.analytics_engine.get_performance_report()
+        performance_msg += (
+            f"\n\n🗓 <b>Last 30 Days</b>\n"
+            f"🔸 Closed Trades: {report['total_trades']}\n"
+            f"🔸 Win Rate: {report['win_rate']:.1f}%\n"
+            f"🔸 Net PnL: ${report['total_pnl']:.2f}\n"
+            f"🔸 Best / Worst: ${report['max_win']:.2f} / ${report['max_loss']:.2f}"
+        )
         self.send_message(performance_msg)
 
     def handle_stats(self, message):
@@ -596,9 +642,13 @@ class TelegramBot:
             self.send_message("❌ Risk manager not initialized")
             return
         
-        balance = self.risk_manager.mt5_client.get_account_balance()
-        current_lot = self.risk_manager.get_fixed_lot_size(balance)
-        tier = self.risk_manager.get_risk_tier(balance)
+        snapshot = self.risk_manager.account_snapshot.snapshot if self.risk_manager.account_snapshot else None
+        if snapshot:
+            balance, current_lot, tier = snapshot.balance, snapshot.lot_size, snapshot.risk_tier
+        else:
+            balance = self.risk_manager.mt5_client.get_account_balance()
+            current_lot = self.risk_manager.get_fixed_lot_size(balance)
+            tier = self.risk_manager.get_risk_tier(balance)
         
         msg = (
             "📦 <b>Lot Size Configuration</b>\n\n"
@@ -1555,6 +1605,12 @@ class TelegramBot:
                     f"Total Profit: ${stats.get('total_profit', 0):.2f}\n"
                     f"Avg Profit/Chain: ${stats.get('avg_profit_per_chain', 0):.2f}"
                 )
+                booked = self.analytics_engine.get_order_type_performance("PROFIT_TRAIL")
+                stats_msg += (
+                    f"\n\nProfit Trail Orders (30 Days): {booked['total_trades']}\n"
+                    f"Booked PnL: ${booked['total_pnl']:.2f}\n"
+                    f"Largest Booking: ${booked['max_win']:.2f}"
+                )
                 self.send_message(stats_msg)
             else:
                 # Fallback: count active chains
@@ -1767,6 +1823,53 @@ class TelegramBot:
         except Exception as e:
             self.send_message(f"❌ Error: {str(e)}")
 
+    def handle_pyramid_risk(self, message):
+        """Monte Carlo risk of the profit-booking pyramid - /pyramid_risk XAUUSD 1000000"""
+        try:
+            if not self.risk_manager:
+                self.send_message("❌ Risk manager not available")
+                return
+            
+            parts = message['text'].split()
+            symbols = self.config.get("symbol_config", {})
+            symbol = parts[1].upper() if len(parts) > 1 else ("XAUUSD" if "XAUUSD" in symbols else next(iter(symbols)))
+            if symbol not in symbols:
+                self.send_message(f"❌ Unknown symbol: {symbol}")
+                return
+            paths = int(parts[2]) if len(parts) > 2 else None
+            if paths is not None and not 1000 <= paths <= 10000000:
+                self.send_message("❌ PATHS must be between 1000 and 10000000")
+                return
+            
+            db = getattr(self.trading_engine, 'db', None) if self.trading_engine else None
+            report = PyramidRiskSimulator(self.config, self.risk_manager).simulate(symbol, paths, db=db)
+            
+            levels = ", ".join(
+                f"L{i} {p * 100:.0f}%{'' if source == 'config' else ' (hist)'}"
+                for i, (p, source) in enumerate(zip(report["level_probabilities"], report["probability_sources"]))
+            )
+            risk_msg = (
+                f"🎲 PYRAMID RISK - {symbol}\n"
+                f"{report['paths']:,} chains | {report['chains_per_day']} chains/day | "
+                f"{report['elapsed_ms']:.0f} ms\n"
+                f"Level hit rates: {levels}\n"
+            )
+            for tier, result in report["tiers"].items():
+                daily = result["daily_loss_quantiles"]
+                risk_msg += (
+                    f"\n<b>${int(tier):,} tier</b> (lot {result['lot_size']})\n"
+                    f"  Expected profit/chain: ${result['expected_profit_per_chain']:.2f}\n"
+                    f"  Worst chain loss: ${result['worst_chain_loss']:.2f}\n"
+                    f"  Daily loss p95/p99: ${daily.get('p95', 0):.2f} / ${daily.get('p99', 0):.2f}\n"
+                    f"  P(daily limit ${result['daily_loss_limit']}): {result['daily_breach_probability'] * 100:.2f}%\n"
+                    f"  P(lifetime cap in {report['horizon_days']}d): {result['lifetime_breach_probability'] * 100:.2f}%\n"
+                )
+            self.send_message(risk_msg)
+        except ValueError:
+            self.send_message("❌ Usage: /pyramid_risk [SYMBOL] [PATHS]")
+        except Exception as e:
+            self.send_message(f"❌ Error: {str(e)}")
+
     def start_polling(self):
         """Start polling for Telegram commands"""
         def poll_commands():
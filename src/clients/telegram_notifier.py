@@ -0,0 +1,228 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+import aiohttp
+from src.config import Config
+from src.clients.message_coalescer import MessageCoalescer
+
+# Queue ranks - lower is delivered first
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+
+class TelegramNotifier:
+    """
+    Non-blocking outbound notification pipeline for Telegram
+    - enqueue() returns immediately and is safe to call from any thread
+    - A single async worker drains a bounded queue over a pooled HTTP session
+    - Per-chat and global rate limiting (Telegram: ~1 msg/sec per chat, 30 msg/sec per bot)
+    - Retry with exponential backoff, honouring Telegram's retry_after on 429
+    - Optional coalescing of grouped messages into digests; priority messages
+      skip coalescing, jump the queue and are never dropped for capacity
+    """
+
+    def __init__(self, config: Config, base_url: str):
+        self.config = config
+        self.base_url = base_url
+
+        notify_config = config.get("telegram_notification_config", {})
+        self.queue_size = notify_config.get("queue_size", 500)
+        self.per_chat_interval = notify_config.get("per_chat_interval_seconds", 1.0)
+        self.global_interval = 1.0 / max(notify_config.get("global_messages_per_second", 25), 1)
+        self.max_retries = notify_config.get("max_retries", 3)
+        self.retry_backoff = notify_config.get("retry_backoff_seconds", 1.0)
+        self.request_timeout = notify_config.get("request_timeout_seconds", 10)
+        self.drain_timeout = notify_config.get("shutdown_drain_seconds", 5.0)
+        self.coalesce_enabled = notify_config.get("coalesce_enabled", True)
+
+        self.coalescer = MessageCoalescer(
+            window_seconds=notify_config.get("coalesce_window_seconds", 2.0),
+            max_messages=notify_config.get("max_digest_messages", 20),
+            emit=lambda payload: self._put(payload, PRIORITY_NORMAL)
+        )
+        self.sequence = itertools.count()  # FIFO tie-breaker inside a priority rank
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.worker_task: Optional[asyncio.Task] = None
+
+        # Rate limiting state (monotonic timestamps of last send)
+        self.last_sent_per_chat: Dict[Any, float] = {}
+        self.last_sent_global = 0.0
+
+        # Metrics
+        self.stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "dropped": 0,
+            "retries": 0,
+            "priority_sent": 0
+        }
+        self.latencies = deque(maxlen=500)  # Seconds from enqueue to delivery
+
+    def is_running(self) -> bool:
+        """Check if the delivery worker is active"""
+        return self.worker_task is not None and not self.worker_task.done()
+
+    async def start(self):
+        """Start the delivery worker on the running event loop"""
+        if self.is_running():
+            return
+
+        self.loop = asyncio.get_running_loop()
+        # Capacity is enforced in _put so priority messages can bypass it
+        self.queue = asyncio.PriorityQueue()
+        self.session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60)
+        )
+        self.worker_task = asyncio.create_task(self._worker())
+        print("SUCCESS: Telegram notification worker started")
+
+    async def stop(self):
+        """Flush pending messages (bounded by drain timeout) and stop the worker"""
+        if not self.is_running():
+            return
+
+        self.coalescer.flush_all()
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"WARNING: Telegram queue not drained on shutdown - {self.queue.qsize()} messages discarded")
+
+        self.worker_task.cancel()
+        try:
+            await self.worker_task
+        except asyncio.CancelledError:
+            pass
+        self.worker_task = None
+
+        await self.session.close()
+        self.session = None
+        print("STOPPED: Telegram notification worker stopped")
+
+    def enqueue(self, payload: Dict[str, Any], group: Optional[str] = None,
+                priority: bool = False) -> bool:
+        """
+        Queue a sendMessage payload for delivery
+        - group: messages with the same group inside the coalesce window become one digest
+        - priority: skip coalescing and deliver ahead of normal messages
+        Returns False only if the message was dropped (queue full, same-loop callers)
+        """
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+
+        if current_loop is self.loop:
+            return self._submit(payload, group, priority)
+
+        # Called from another thread (e.g. Telegram command polling thread)
+        self.loop.call_soon_threadsafe(self._submit, payload, group, priority)
+        return True
+
+    def _submit(self, payload: Dict[str, Any], group: Optional[str], priority: bool) -> bool:
+        if priority:
+            return self._put(payload, PRIORITY_URGENT)
+        if group and self.coalesce_enabled:
+            self.coalescer.add(group, payload)
+            return True
+        return self._put(payload, PRIORITY_NORMAL)
+
+    def _put(self, payload: Dict[str, Any], rank: int) -> bool:
+        if rank != PRIORITY_URGENT and self.queue.qsize() >= self.queue_size:
+            self.stats["dropped"] += 1
+            print(f"WARNING: Telegram queue full ({self.queue_size}) - message dropped")
+            return False
+
+        self.queue.put_nowait((rank, next(self.sequence), payload, time.monotonic()))
+        self.stats["enqueued"] += 1
+        return True
+
+    async def _worker(self):
+        """Drain the queue one message at a time"""
+        while True:
+            rank, _, payload, enqueued_at = await self.queue.get()
+            try:
+                delivered = await self._deliver(payload, enqueued_at)
+                if delivered and rank == PRIORITY_URGENT:
+                    self.stats["priority_sent"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"WARNING: Telegram delivery error: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _wait_for_rate_limit(self, chat_id):
+        """Sleep until both the per-chat and the global send slot are free"""
+        next_allowed = max(
+            self.last_sent_per_chat.get(chat_id, 0.0) + self.per_chat_interval,
+            self.last_sent_global + self.global_interval
+        )
+        delay = next_allowed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _deliver(self, payload: Dict[str, Any], enqueued_at: float) -> bool:
+        """Send one message with retry/backoff"""
+        url = f"{self.base_url}/sendMessage"
+        chat_id = payload.get("chat_id")
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_rate_limit(chat_id)
+            sent_at = time.monotonic()
+            self.last_sent_per_chat[chat_id] = sent_at
+            self.last_sent_global = sent_at
+
+            delay = self.retry_backoff * (2 ** attempt)
+            try:
+                async with self.session.post(url, json=payload) as response:
+                    if response.status == 200:
+                        self.stats["sent"] += 1
+                        self.latencies.append(time.monotonic() - enqueued_at)
+                        return True
+
+                    body = await response.text()
+                    if response.status == 429:
+                        # Telegram tells us exactly how long to back off
+                        try:
+                            data = await response.json(content_type=None)
+                            delay = float(data.get("parameters", {}).get("retry_after", delay))
+                        except Exception:
+                            pass
+                    elif response.status < 500:
+                        # Bad request / forbidden - retrying will not help
+                        print(f"WARNING: Telegram API error: Status {response.status}, Response: {body}")
+                        self.stats["failed"] += 1
+                        return False
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"WARNING: Telegram API request failed: {str(e)}")
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+
+        self.stats["failed"] += 1
+        print(f"WARNING: Telegram message dropped after {self.max_retries + 1} attempts")
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, drop count and enqueue-to-delivery latency"""
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "worker_running": self.is_running(),
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.queue_size,
+            "coalescing_pending": self.coalescer.pending_count(),
+            **self.stats,
+            **self.coalescer.stats,
+            "latency_avg_ms": (sum(latencies) / count * 1000) if count else 0.0,
+            "latency_p95_ms": (latencies[min(count - 1, int(count * 0.95))] * 1000) if count else 0.0,
+            "latency_max_ms": (latencies[-1] * 1000) if count else 0.0
+        }
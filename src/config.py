@@ -68,7 +68,8 @@ class Config:
                 "check_interval_seconds": 5
             },
             "dual_order_config": {
-                "enabled": True
+                "enabled": True,
+                "leg_failure_policy": "keep"
             },
             "profit_booking_config": {
                 "enabled": True,
@@ -77,6 +78,74 @@ class Config:
                 "multipliers": [1, 2, 4, 8, 16],
                 "profit_targets": [10, 20, 40, 80, 160],
                 "sl_reductions": [0, 10, 25, 40, 50]
+            },
+            "risk_simulation_config": {
+                "level_hit_probabilities": [0.6, 0.55, 0.5, 0.45, 0.4],
+                "paths": 1000000,
+                "chains_per_day": 5,
+                "horizon_days": 20,
+                "min_samples": 20,
+                "quantiles": [0.5, 0.9, 0.95, 0.99, 0.999],
+                "seed": None
+            },
+            "telegram_notification_config": {
+                "queue_size": 500,
+                "per_chat_interval_seconds": 1.0,
+                "global_messages_per_second": 25,
+                "max_retries": 3,
+                "retry_backoff_seconds": 1.0,
+                "request_timeout_seconds": 10,
+                "shutdown_drain_seconds": 5.0,
+                "coalesce_enabled": True,
+                "coalesce_window_seconds": 2.0,
+                "max_digest_messages": 20
+            },
+            "mt5_async_config": {
+                "initialize_timeout_seconds": 120.0,
+                "order_timeout_seconds": 30.0,
+                "price_timeout_seconds": 5.0,
+                "account_timeout_seconds": 10.0
+            },
+            "price_cache_config": {
+                "ttl_seconds": 1.0
+            },
+            "account_snapshot_config": {
+                "ttl_seconds": 5.0
+            },
+            "fake_mt5_config": {
+                "enabled": False,
+                "balance": 10000.0,
+                "spread_pips": 2.0,
+                "volatility_pips_per_second": 0.0,
+                "latency_ms": 0.0,
+                "latency_jitter_ms": 0.0,
+                "error_rate": 0.0,
+                "api_error_rate": 0.0,
+                "seed": None
+            },
+            "clock_config": {
+                "mode": "wall",
+                "speed": 1.0,
+                "start": None
+            },
+            "tick_stream_config": {
+                "enabled": True,
+                "fast_interval_ms": 250,
+                "idle_interval_ms": 2000,
+                "subscriber_queue_size": 256
+            },
+            "database_config": {
+                "batch_window_ms": 50,
+                "max_batch_size": 500,
+                "durable_order_writes": True,
+                "durable_timeout_seconds": 5.0
+            },
+            "alert_queue_config": {
+                "enabled": True,
+                "workers": 8,
+                "max_queue_size": 1000,
+                "status_retention": 1000,
+                "shutdown_drain_seconds": 10.0
             }
         }
         self.load_config()
@@ -112,6 +181,26 @@ class Config:
                 self.config["dual_order_config"] = self.default_config["dual_order_config"]
             if "profit_booking_config" not in self.config:
                 self.config["profit_booking_config"] = self.default_config["profit_booking_config"]
+            if "risk_simulation_config" not in self.config:
+                self.config["risk_simulation_config"] = self.default_config["risk_simulation_config"]
+            if "telegram_notification_config" not in self.config:
+                self.config["telegram_notification_config"] = self.default_config["telegram_notification_config"]
+            if "mt5_async_config" not in self.config:
+                self.config["mt5_async_config"] = self.default_config["mt5_async_config"]
+            if "price_cache_config" not in self.config:
+                self.config["price_cache_config"] = self.default_config["price_cache_config"]
+            if "account_snapshot_config" not in self.config:
+                self.config["account_snapshot_config"] = self.default_config["account_snapshot_config"]
+            if "fake_mt5_config" not in self.config:
+                self.config["fake_mt5_config"] = self.default_config["fake_mt5_config"]
+            if "clock_config" not in self.config:
+                self.config["clock_config"] = self.default_config["clock_config"]
+            if "tick_stream_config" not in self.config:
+                self.config["tick_stream_config"] = self.default_config["tick_stream_config"]
+            if "database_config" not in self.config:
+                self.config["database_config"] = self.default_config["database_config"]
+            if "alert_queue_config" not in self.config:
+                self.config["alert_queue_config"] = self.default_config["alert_queue_config"]
             
             # Debug: Show loaded credentials (mask password)
             if self.config.get("debug", False):
@@ -1,63 +1,99 @@
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Set, Union
 from src.models import Alert, Trade, ReEntryChain, ProfitBookingChain
 from src.config import Config
 from src.managers.risk_manager import RiskManager
 from src.clients.mt5_client import MT5Client
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.clients.message_coalescer import trade_group
 from src.processors.alert_processor import AlertProcessor
 from src.database import TradeDatabase
 from src.utils.pip_calculator import PipCalculator
 from src.managers.timeframe_trend_manager import TimeframeTrendManager
 from src.managers.reentry_manager import ReEntryManager
 from src.services.price_monitor_service import PriceMonitorService
+from src.services.price_cache import PriceCache
+from src.services.tick_stream import TickStream
 from src.services.reversal_exit_handler import ReversalExitHandler
+from src.services.exposure_engine import ExposureEngine
+from src.services.account_snapshot import AccountSnapshotService
 from src.managers.dual_order_manager import DualOrderManager
 from src.managers.profit_booking_manager import ProfitBookingManager
+from src.utils.trigger_index import PriceTriggerIndex, ABOVE, BELOW
+from src.utils.trade_book import TradeBook
+from src.utils.clock import Clock, make_clock
 import json
 
 class TradingEngine:
     def __init__(self, config: Config, risk_manager: RiskManager, 
                  mt5_client: MT5Client, telegram_bot, 
-                 alert_processor: AlertProcessor):
+                 alert_processor: AlertProcessor, clock: Clock = None,
+                 db: TradeDatabase = None):
         self.config = config
+        # Wall clock live (clock_config picks accelerated/virtual); a VirtualClock when replaying history
+        self.clock = clock or make_clock(config)
         self.risk_manager = risk_manager
         self.mt5_client = mt5_client
+        # All terminal calls from coroutines go through this single-thread facade
+        self.async_mt5_client = AsyncMT5Client(mt5_client, config)
+        # One bid/ask snapshot per symbol shared by every price consumer
+        self.price_cache = PriceCache(self.async_mt5_client, config, clock=self.clock)
+        # Fast polling of symbols with pending triggers, published to monitors
+        self.tick_stream = TickStream(self.price_cache, config, clock=self.clock)
         self.telegram_bot = telegram_bot
         self.alert_processor = alert_processor
         
         # Risk manager ko MT5 client set karo
         self.risk_manager.set_mt5_client(mt5_client)
+        # Balance/equity/margin plus tier and lot size, cached for entry decisions
+        self.account_snapshot = AccountSnapshotService(self.async_mt5_client, risk_manager, config, clock=self.clock)
+        self.risk_manager.set_account_snapshot(self.account_snapshot)
         
-        # Database for trade history
-        self.db = TradeDatabase()
+        # Database for trade history (writes are group-committed by a background thread)
+        self.db = db or TradeDatabase(config=config, clock=self.clock)
+        
+        # Columnar PnL/exposure over all open positions - the one PnL formula
+        self.exposure = ExposureEngine(config)
         
         # Core managers
         self.pip_calculator = PipCalculator(config)
-        self.trend_manager = TimeframeTrendManager()
-        self.reentry_manager = ReEntryManager(config)
+        self.trend_manager = TimeframeTrendManager(clock=self.clock)
+        self.reentry_manager = ReEntryManager(config, clock=self.clock)
         
         # NEW: Dual order and profit booking managers
         self.dual_order_manager = DualOrderManager(
-            config, risk_manager, mt5_client, self.pip_calculator
+            config, risk_manager, mt5_client, self.pip_calculator,
+            async_mt5_client=self.async_mt5_client, clock=self.clock
         )
         self.profit_booking_manager = ProfitBookingManager(
-            config, mt5_client, self.pip_calculator, risk_manager, self.db
+            config, mt5_client, self.pip_calculator, risk_manager, self.db,
+            async_mt5_client=self.async_mt5_client, price_cache=self.price_cache,
+            exposure_engine=self.exposure, account_snapshot=self.account_snapshot,
+            clock=self.clock
         )
         
         # NEW: Advanced re-entry and exit handlers
         self.price_monitor = PriceMonitorService(
             config, mt5_client, self.reentry_manager, 
-            self.trend_manager, self.pip_calculator, self
+            self.trend_manager, self.pip_calculator, self,
+            async_mt5_client=self.async_mt5_client, price_cache=self.price_cache,
+            tick_stream=self.tick_stream, clock=self.clock
         )
         self.reversal_handler = ReversalExitHandler(
-            config, mt5_client, telegram_bot, self.db, price_monitor=self.price_monitor
+            config, mt5_client, telegram_bot, self.db, price_monitor=self.price_monitor,
+            async_mt5_client=self.async_mt5_client, exposure_engine=self.exposure,
+            clock=self.clock
         )
         
         # Current signals per symbol
         self.current_signals = {}
         
-        self.open_trades: List[Trade] = []
+        # Single open-trade book (ticket + symbol/chain/strategy indexes) shared with the managers
+        self.open_trades = TradeBook(listeners=[self.exposure, self.account_snapshot])
+        self.risk_manager.set_trade_book(self.open_trades)
+        # SL/TP levels of open trades - a tick only visits the trades it crossed
+        self.trigger_index = PriceTriggerIndex()
         self.is_paused = False
         self.trade_count = 0
         
@@ -68,12 +104,14 @@ class TradingEngine:
 
     async def initialize(self):
         """Initialize the trading engine"""
-        success = self.mt5_client.initialize()
+        success = await self.async_mt5_client.initialize()
         if success:
             self.telegram_bot.send_message("✅ MT5 Connection Established")
             self.telegram_bot.set_trend_manager(self.trend_manager)
             
-            # Start background price monitor
+            # Start account snapshot, tick stream and background price monitor
+            await self.account_snapshot.start()
+            await self.tick_stream.start()
             await self.price_monitor.start()
             
             # Recover profit booking chains from database
@@ -88,6 +126,37 @@ class TradingEngine:
                 print("SUCCESS: Profit booking manager initialized")
         return success
 
+    def add_open_trade(self, trade: Trade):
+        """Track a newly opened trade (shared trade book, SL/TP trigger index)"""
+        self.open_trades.add(trade)
+        self._index_trade(trade)
+
+    async def save_order_record(self, trade: Trade) -> bool:
+        """Durably record a placed order; retried once, then a priority alert if still not on disk"""
+        for attempt in range(2):
+            if await self.db.confirm(self.db.save_trade(trade)):
+                return True
+            print(f"WARNING: Order record for ticket {trade.trade_id} not committed (attempt {attempt + 1})")
+        self.telegram_bot.send_message(
+            f"🚨 Order record NOT saved to database\n"
+            f"Ticket: {trade.trade_id} | {trade.symbol} {trade.direction.upper()} {trade.lot_size}\n"
+            f"The position is live in MT5 - check the database",
+            priority=True
+        )
+        return False
+
+    def _index_trade(self, trade: Trade):
+        if trade.direction == "buy":
+            self.trigger_index.add(("SL", id(trade)), trade.symbol, trade.sl, BELOW, trade)
+            self.trigger_index.add(("TP", id(trade)), trade.symbol, trade.tp, ABOVE, trade)
+        else:
+            self.trigger_index.add(("SL", id(trade)), trade.symbol, trade.sl, ABOVE, trade)
+            self.trigger_index.add(("TP", id(trade)), trade.symbol, trade.tp, BELOW, trade)
+
+    def _unindex_trade(self, trade: Trade):
+        self.trigger_index.remove(("SL", id(trade)))
+        self.trigger_index.remove(("TP", id(trade)))
+
     def initialize_symbol_signals(self, symbol: str):
         """Initialize signal tracking for a new symbol"""
         if symbol not in self.current_signals:
@@ -98,10 +167,10 @@ class TradingEngine:
                 '1d': None
             }
 
-    async def process_alert(self, data: Dict[str, Any]) -> bool:
-        """Process incoming alert from webhook"""
+    async def process_alert(self, data: Union[Alert, Dict[str, Any]]) -> bool:
+        """Process incoming alert from webhook (a validated Alert is used as-is)"""
         try:
-            alert = Alert(**data)
+            alert = data if isinstance(data, Alert) else Alert(**data)
             symbol = alert.symbol
             
             # Initialize symbol signals if not exists
@@ -120,9 +189,8 @@ class TradingEngine:
                         close_info['exit_reason']
                     )
                     # Remove from open trades
-                    if close_info['trade'] in self.open_trades:
-                        self.open_trades.remove(close_info['trade'])
-                        self.risk_manager.remove_closed_trade(close_info['trade'])
+                    self._unindex_trade(close_info['trade'])
+                    self.open_trades.remove(close_info['trade'])
                     
                     # Stop TP continuation monitoring for this symbol (opposite signal received)
                     self.price_monitor.stop_tp_continuation(
@@ -135,13 +203,15 @@ class TradingEngine:
                 # Update timeframe trend for bias
                 self.trend_manager.update_trend(symbol, alert.tf, alert.signal)
                 self.current_signals[symbol][alert.tf] = alert.signal
-                self.telegram_bot.send_message(f"📊 {symbol} {alert.tf.upper()} Bias Updated: {alert.signal.upper()}")
+                self.telegram_bot.send_message(f"📊 {symbol} {alert.tf.upper()} Bias Updated: {alert.signal.upper()}",
+                                               group=f"trend:{symbol}")
                 
             elif alert.type == 'trend':
                 # Update timeframe trend for trend signals
                 self.trend_manager.update_trend(symbol, alert.tf, alert.signal)
                 self.current_signals[symbol][alert.tf] = alert.signal
-                self.telegram_bot.send_message(f"📊 {symbol} {alert.tf.upper()} Trend Updated: {alert.signal.upper()}")
+                self.telegram_bot.send_message(f"📊 {symbol} {alert.tf.upper()} Trend Updated: {alert.signal.upper()}",
+                                               group=f"trend:{symbol}")
             
             elif alert.type == 'entry':
                 # Execute trade based on entry signal
@@ -160,7 +230,7 @@ class TradingEngine:
             
         except Exception as e:
             error_msg = f"Alert processing error: {str(e)}"
-            self.telegram_bot.send_message(f"❌ {error_msg}")
+            self.telegram_bot.send_message(f"❌ {error_msg}", priority=True)
             print(f"Error: {e}")
             return False
 
@@ -181,7 +251,7 @@ class TradingEngine:
             
         # Check risk limits before trading
         if not self.risk_manager.can_trade():
-            self.telegram_bot.send_message("⛔ Trading paused due to risk limits")
+            self.telegram_bot.send_message("⛔ Trading paused due to risk limits", priority=True)
             return
         
         # Determine which logic this trade belongs to
@@ -221,8 +291,9 @@ class TradingEngine:
         """Place a new trade order - now with dual orders (Order A: TP Trail, Order B: Profit Trail)"""
         try:
             # Get account balance and lot size
-            account_balance = self.mt5_client.get_account_balance()
-            lot_size = self.risk_manager.get_fixed_lot_size(account_balance)
+            account = await self.account_snapshot.get()
+            account_balance = account.balance if account else 0.0
+            lot_size = account.lot_size if account else 0.0
             
             if lot_size <= 0:
                 self.telegram_bot.send_message("⚠️ Invalid lot size")
@@ -231,7 +302,7 @@ class TradingEngine:
             # Check if dual orders enabled
             if self.dual_order_manager.is_enabled():
                 # Use dual order manager to create both orders
-                dual_result = self.dual_order_manager.create_dual_orders(
+                dual_result = await self.dual_order_manager.create_dual_orders(
                     alert, strategy, account_balance
                 )
                 
@@ -243,9 +314,8 @@ class TradingEngine:
                     # Register for SL hunt monitoring
                     if self.config.get("re_entry_config", {}).get("sl_hunt_reentry_enabled", True):
                         self.price_monitor.register_sl_hunt(order_a, strategy)
-                    self.open_trades.append(order_a)
-                    self.risk_manager.add_open_trade(order_a)
-                    self.db.save_trade(order_a)
+                    self.add_open_trade(order_a)
+                    await self.save_order_record(order_a)
                     self.trade_count += 1
                 
                 # Handle Order B (Profit Trail)
@@ -257,9 +327,8 @@ class TradingEngine:
                         if profit_chain:
                             order_b.profit_chain_id = profit_chain.chain_id
                             order_b.profit_level = 0
-                    self.open_trades.append(order_b)
-                    self.risk_manager.add_open_trade(order_b)
-                    self.db.save_trade(order_b)
+                    self.add_open_trade(order_b)
+                    await self.save_order_record(order_b)
                 
                 # Send notification
                 rr_ratio = self.config.get("rr_ratio", 1.0)
@@ -362,14 +431,14 @@ class TradingEngine:
                 lot_size=lot_size,
                 direction=alert.signal,
                 strategy=strategy,
-                open_time=datetime.now().isoformat(),
+                open_time=self.clock.now().isoformat(),
                 original_entry=alert.price,
                 original_sl_distance=sl_distance
             )
             
             # Execute trade
             if not self.config.get("simulate_orders", False):
-                trade_id = self.mt5_client.place_order(
+                trade_id = await self.async_mt5_client.place_order(
                     symbol=alert.symbol,
                     order_type=alert.signal,
                     lot_size=lot_size,
@@ -381,7 +450,7 @@ class TradingEngine:
                 if trade_id:
                     trade.trade_id = trade_id
                 else:
-                    self.telegram_bot.send_message(f"❌ Order placement failed for {alert.symbol}")
+                    self.telegram_bot.send_message(f"❌ Order placement failed for {alert.symbol}", priority=True)
                     return
             
             # Create re-entry chain for this trade
@@ -391,9 +460,8 @@ class TradingEngine:
             if self.config.get("re_entry_config", {}).get("sl_hunt_reentry_enabled", True):
                 self.price_monitor.register_sl_hunt(trade, strategy)
             
-            self.open_trades.append(trade)
-            self.risk_manager.add_open_trade(trade)
-            self.db.save_trade(trade)
+            self.add_open_trade(trade)
+            await self.save_order_record(trade)
             self.trade_count += 1
             
             # Send notification
@@ -413,7 +481,7 @@ class TradingEngine:
             
         except Exception as e:
             error_msg = f"Trade execution error: {str(e)}"
-            self.telegram_bot.send_message(f"❌ {error_msg}")
+            self.telegram_bot.send_message(f"❌ {error_msg}", priority=True)
             print(f"Error: {e}")
             import traceback
             traceback.print_exc()
@@ -422,9 +490,14 @@ class TradingEngine:
         """Place a re-entry trade - now with dual orders (Order A: TP Trail, Order B: Profit Trail)"""
         try:
             # Get account balance and lot size
-            account_balance = self.mt5_client.get_account_balance()
-            lot_size = self.risk_manager.get_fixed_lot_size(account_balance)
-            
+            account = await self.account_snapshot.get()
+            account_balance = account.balance if account else 0.0
+            lot_size = account.lot_size if account else 0.0
+
+            if lot_size <= 0:
+                self.telegram_bot.send_message("⚠️ Invalid lot size")
+                return
+
             # Get original SL distance from chain
             chain = self.reentry_manager.active_chains.get(reentry_info["chain_id"])
             if not chain:
@@ -459,7 +532,7 @@ class TradingEngine:
                     lot_size=lot_size,
                     direction=alert.signal,
                     strategy=strategy,
-                    open_time=datetime.now().isoformat(),
+                    open_time=self.clock.now().isoformat(),
                     chain_id=reentry_info["chain_id"],
                     chain_level=reentry_info["level"],
                     is_re_entry=True,
@@ -468,26 +541,6 @@ class TradingEngine:
                     order_type="TP_TRAIL"
                 )
                 
-                # Place Order A
-                order_a_placed = False
-                if not self.config.get("simulate_orders", False):
-                    trade_id_a = self.mt5_client.place_order(
-                        symbol=alert.symbol,
-                        order_type=alert.signal,
-                        lot_size=lot_size,
-                        price=alert.price,
-                        sl=sl_price,
-                        tp=tp_price,
-                        comment=f"{strategy}_RE{reentry_info['level']}_TP"
-                    )
-                    if trade_id_a:
-                        order_a.trade_id = trade_id_a
-                        order_a_placed = True
-                else:
-                    # Simulation mode
-                    order_a.trade_id = int(datetime.now().timestamp() * 1000) % 1000000
-                    order_a_placed = True
-                
                 # Create Order B (Profit Trail) for re-entry
                 order_b = Trade(
                     symbol=alert.symbol,
@@ -497,7 +550,7 @@ class TradingEngine:
                     lot_size=lot_size,
                     direction=alert.signal,
                     strategy=strategy,
-                    open_time=datetime.now().isoformat(),
+                    open_time=self.clock.now().isoformat(),
                     chain_id=reentry_info["chain_id"],
                     chain_level=reentry_info["level"],
                     is_re_entry=True,
@@ -506,33 +559,21 @@ class TradingEngine:
                     order_type="PROFIT_TRAIL"
                 )
                 
-                # Place Order B independently
-                order_b_placed = False
-                if not self.config.get("simulate_orders", False):
-                    trade_id_b = self.mt5_client.place_order(
-                        symbol=alert.symbol,
-                        order_type=alert.signal,
-                        lot_size=lot_size,
-                        price=alert.price,
-                        sl=sl_price,
-                        tp=tp_price,
-                        comment=f"{strategy}_RE{reentry_info['level']}_PROFIT"
-                    )
-                    if trade_id_b:
-                        order_b.trade_id = trade_id_b
-                        order_b_placed = True
-                else:
-                    # Simulation mode
-                    order_b.trade_id = int(datetime.now().timestamp() * 1000) % 1000000 + 1
-                    order_b_placed = True
+                # Submit both legs as one pair (leg failure policy applied by the manager)
+                pair = await self.dual_order_manager.place_order_pair(
+                    order_a, order_b,
+                    f"{strategy}_RE{reentry_info['level']}_TP",
+                    f"{strategy}_RE{reentry_info['level']}_PROFIT"
+                )
+                order_a_placed = pair["order_a_placed"]
+                order_b_placed = pair["order_b_placed"]
                 
                 # Handle Order A
                 if order_a_placed:
                     # Update chain with Order A
                     self.reentry_manager.update_chain_level(reentry_info["chain_id"], order_a.trade_id)
-                    self.open_trades.append(order_a)
-                    self.risk_manager.add_open_trade(order_a)
-                    self.db.save_trade(order_a)
+                    self.add_open_trade(order_a)
+                    await self.save_order_record(order_a)
                     self.trade_count += 1
                 
                 # Handle Order B
@@ -543,9 +584,8 @@ class TradingEngine:
                         if profit_chain:
                             order_b.profit_chain_id = profit_chain.chain_id
                             order_b.profit_level = 0
-                    self.open_trades.append(order_b)
-                    self.risk_manager.add_open_trade(order_b)
-                    self.db.save_trade(order_b)
+                    self.add_open_trade(order_b)
+                    await self.save_order_record(order_b)
                 
                 # Send notification
                 re_type = "TP Continuation" if reentry_info.get("type") == "tp_continuation" else "SL Recovery"
@@ -607,7 +647,7 @@ class TradingEngine:
                 lot_size=lot_size,
                 direction=alert.signal,
                 strategy=strategy,
-                open_time=datetime.now().isoformat(),
+                open_time=self.clock.now().isoformat(),
                 chain_id=reentry_info["chain_id"],
                 chain_level=reentry_info["level"],
                 is_re_entry=True,
@@ -617,7 +657,7 @@ class TradingEngine:
             
             # Execute trade
             if not self.config.get("simulate_orders", False):
-                trade_id = self.mt5_client.place_order(
+                trade_id = await self.async_mt5_client.place_order(
                     symbol=alert.symbol,
                     order_type=alert.signal,
                     lot_size=lot_size,
@@ -629,18 +669,17 @@ class TradingEngine:
                 if trade_id:
                     trade.trade_id = trade_id
                 else:
-                    self.telegram_bot.send_message(f"❌ Re-entry order failed for {alert.symbol}")
+                    self.telegram_bot.send_message(f"❌ Re-entry order failed for {alert.symbol}", priority=True)
                     return
             else:
                 # Simulation mode: generate pseudo trade ID
-                trade.trade_id = int(datetime.now().timestamp() * 1000) % 1000000
+                trade.trade_id = int(self.clock.time() * 1000) % 1000000
             
             # Update chain with new trade (both live and simulation modes)
             self.reentry_manager.update_chain_level(reentry_info["chain_id"], trade.trade_id)
             
-            self.open_trades.append(trade)
-            self.risk_manager.add_open_trade(trade)
-            self.db.save_trade(trade)
+            self.add_open_trade(trade)
+            await self.save_order_record(trade)
             self.trade_count += 1
             
             # Send notification
@@ -660,7 +699,7 @@ class TradingEngine:
             
         except Exception as e:
             error_msg = f"Re-entry execution error: {str(e)}"
-            self.telegram_bot.send_message(f"❌ {error_msg}")
+            self.telegram_bot.send_message(f"❌ {error_msg}", priority=True)
             print(f"Error: {e}")
             import traceback
             traceback.print_exc()
@@ -668,20 +707,20 @@ class TradingEngine:
     async def reconcile_with_mt5(self):
         """Sync bot's trade list with MT5 positions - auto-close orphaned trades"""
         try:
-            import MetaTrader5 as mt5
-            
             # Get all open positions from MT5
-            mt5_positions = mt5.positions_get()
-            mt5_ticket_ids = {pos.ticket for pos in mt5_positions} if mt5_positions else set()
+            mt5_positions = await self.async_mt5_client.get_positions()
+            if mt5_positions is None:
+                return  # API error/timeout - never treat as "all positions closed"
+            mt5_ticket_ids = {pos.ticket for pos in mt5_positions}
             
             # Check each bot trade against MT5
-            for trade in self.open_trades[:]:  # Use slice to avoid modifying list during iteration
+            for trade in self.open_trades:  # Iterates a snapshot - safe to close while looping
                 if trade.status == "closed":
                     continue
                     
                 if trade.trade_id and trade.trade_id not in mt5_ticket_ids:
                     # Position doesn't exist in MT5 - was auto-closed by TP/SL
-                    current_price = self.mt5_client.get_current_price(trade.symbol)
+                    current_price = await self.price_cache.get_price(trade.symbol)
                     print(f"Auto-reconciliation: Position {trade.trade_id} already closed in MT5")
                     await self.close_trade(trade, "MT5_AUTO_CLOSED", current_price)
                     
@@ -689,58 +728,99 @@ class TradingEngine:
             print(f"WARNING: Reconciliation error: {e}")
     
     async def manage_open_trades(self):
-        """Monitor and manage open trades"""
+        """
+        Monitor and manage open trades
+        Full sweep (with MT5 reconciliation) every 5 seconds; in between, trades
+        are re-checked as soon as the tick stream publishes a tick for their symbol
+        """
+        queue = self.tick_stream.subscribe() if self.tick_stream.enabled else None
+        next_sweep = 0.0
+        
         while True:
             try:
-                # MT5 Reconciliation - Check if positions still exist in MT5
-                if not self.config["simulate_orders"]:
-                    await self.reconcile_with_mt5()
+                if self.clock.monotonic() >= next_sweep:
+                    await self.manage_trades_cycle()
+                    next_sweep = self.clock.monotonic() + 5
                 
-                # Remove closed trades from list
-                self.open_trades = [t for t in self.open_trades if t.status != "closed"]
+                self.tick_stream.set_interest(
+                    "trade_manager", set(self.open_trades.symbols())
+                )
                 
-                for trade in self.open_trades:
-                    if trade.status == "closed":
-                        continue
-                    
-                    # Get current price
-                    current_price = self.mt5_client.get_current_price(trade.symbol)
-                    if current_price == 0:
-                        continue
-                    
-                    # Check SL hit
-                    if ((trade.direction == "buy" and current_price <= trade.sl) or
-                        (trade.direction == "sell" and current_price >= trade.sl)):
-                        await self.close_trade(trade, "SL_HIT", current_price)
-                        self.reentry_manager.record_sl_hit(trade)
-                        
-                        # NEW: Register for SL hunt re-entry monitoring
-                        if self.config["re_entry_config"]["sl_hunt_reentry_enabled"]:
-                            self.price_monitor.register_sl_hunt(trade, trade.strategy)
-                        continue
-                    
-                    # Check TP hit
-                    if ((trade.direction == "buy" and current_price >= trade.tp) or
-                        (trade.direction == "sell" and current_price <= trade.tp)):
-                        await self.close_trade(trade, "TP_HIT", current_price)
-                        self.reentry_manager.record_tp_hit(trade, current_price)
-                        
-                        # NEW: Register for TP continuation re-entry monitoring
-                        if self.config["re_entry_config"]["tp_reentry_enabled"]:
-                            self.price_monitor.register_tp_continuation(trade, current_price, trade.strategy)
-                        continue
-                    
-                    # Check trend reversal exit
-                    if self.should_exit_by_trend_reversal(trade):
-                        await self.close_trade(trade, "TREND_REVERSAL", current_price)
-                        continue
+                if queue is None:
+                    await self.clock.sleep(max(next_sweep - self.clock.monotonic(), 0))
+                    continue
                 
-                await asyncio.sleep(5)
+                symbols = await self.tick_stream.wait_for_symbols(queue, next_sweep - self.clock.monotonic())
+                if symbols:
+                    await self.manage_trades_cycle(symbols)
                 
             except Exception as e:
                 error_msg = f"Trade management error: {str(e)}"
                 print(f"Error: {e}")
-                await asyncio.sleep(30)
+                await self.clock.sleep(30)
+    
+    async def manage_trades_cycle(self, symbols: Set[str] = None):
+        """
+        One pass of SL/TP/trend-reversal checks
+        symbols=None is a full sweep (MT5 reconciliation + trend reversal for all
+        trades); otherwise only SL/TP triggers on the given symbols are checked
+        SL/TP hits come from the trigger index, so cost grows with hits, not trades
+        """
+        full_sweep = symbols is None
+        if full_sweep:
+            # MT5 Reconciliation - Check if positions still exist in MT5
+            if not self.config["simulate_orders"]:
+                await self.reconcile_with_mt5()
+            
+            # Remove closed trades from the book (and any triggers they left behind)
+            for trade in self.open_trades.purge_closed():
+                self._unindex_trade(trade)
+            symbols = set(self.trigger_index.symbols())
+        
+        # Fetch each symbol once for this cycle, not once per trade
+        await self.price_cache.refresh(symbols)
+        
+        for symbol in symbols:
+            # Get current price
+            current_price = await self.price_cache.get_price(symbol)
+            if current_price == 0:
+                continue
+            
+            for kind, trade_key in self.trigger_index.crossed(symbol, current_price):
+                trade = self.trigger_index.get((kind, trade_key))
+                if trade is None or trade.status == "closed":
+                    continue
+                
+                if kind == "SL":
+                    await self.close_trade(trade, "SL_HIT", current_price)
+                    if trade.status != "closed":
+                        continue  # MT5 close failed - trigger stays indexed, retried next tick
+                    self.reentry_manager.record_sl_hit(trade)
+                    
+                    # NEW: Register for SL hunt re-entry monitoring
+                    if self.config["re_entry_config"]["sl_hunt_reentry_enabled"]:
+                        self.price_monitor.register_sl_hunt(trade, trade.strategy)
+                else:
+                    await self.close_trade(trade, "TP_HIT", current_price)
+                    if trade.status != "closed":
+                        continue
+                    self.reentry_manager.record_tp_hit(trade, current_price)
+                    
+                    # NEW: Register for TP continuation re-entry monitoring
+                    if self.config["re_entry_config"]["tp_reentry_enabled"]:
+                        self.price_monitor.register_tp_continuation(trade, current_price, trade.strategy)
+        
+        if not full_sweep:
+            return
+        
+        # Check trend reversal exit (depends on trend state, not on price levels)
+        for trade in self.open_trades:
+            if trade.status == "closed":
+                continue
+            if self.should_exit_by_trend_reversal(trade):
+                current_price = await self.price_cache.get_price(trade.symbol)
+                if current_price:
+                    await self.close_trade(trade, "TREND_REVERSAL", current_price)
 
     def should_exit_by_trend_reversal(self, trade: Trade) -> bool:
         """Check if we should exit due to trend reversal"""
@@ -749,7 +829,7 @@ class TradingEngine:
         try:
             from datetime import datetime, timedelta
             trade_open_time = datetime.fromisoformat(trade.open_time)
-            time_since_open = datetime.now() - trade_open_time
+            time_since_open = self.clock.now() - trade_open_time
             
             if time_since_open < timedelta(minutes=5):
                 return False  # Grace period - don't check trend reversal yet
@@ -768,37 +848,30 @@ class TradingEngine:
         
         return False
 
-    async def close_trade(self, trade: Trade, reason: str, current_price: float):
-        """Close a trade"""
+    async def close_trade(self, trade: Trade, reason: str, current_price: float,
+                          broker_closed: bool = False):
+        """Close a trade (broker_closed=True when a batch already closed it in MT5)"""
         try:
-            # Try to close in MT5 (skip if simulating)
-            if not self.config["simulate_orders"] and trade.trade_id:
-                success = self.mt5_client.close_position(trade.trade_id)
+            # Try to close in MT5 (skip if simulating or already closed by the caller)
+            if not broker_closed and not self.config["simulate_orders"] and trade.trade_id:
+                success = await self.async_mt5_client.close_position(trade.trade_id)
                 if not success:
-                    self.telegram_bot.send_message(f"❌ Failed to close trade {trade.trade_id} - will retry on next cycle")
+                    self.telegram_bot.send_message(f"❌ Failed to close trade {trade.trade_id} - will retry on next cycle",
+                                                   priority=True)
                     return  # Don't mark as closed if MT5 close failed - keep retrying!
             
             # Only mark as closed if MT5 close succeeded or we're in simulation
             trade.status = "closed"
-            trade.close_time = datetime.now().isoformat()
-            self.risk_manager.remove_open_trade(trade)
+            trade.close_time = self.clock.now().isoformat()
+            trade.exit_price = current_price
             
-            # Remove from open trades list immediately
-            if trade in self.open_trades:
-                self.open_trades.remove(trade)
+            # Remove from the open trade book immediately
+            self._unindex_trade(trade)
+            self.open_trades.remove(trade)
             
-            # Calculate PnL using proper pip values per symbol
-            symbol_config = self.config["symbol_config"][trade.symbol]
-            pip_size = symbol_config["pip_size"]
-            pip_value_per_std_lot = symbol_config["pip_value_per_std_lot"]
-            
-            # Calculate price difference in pips
-            price_diff = current_price - trade.entry if trade.direction == "buy" else trade.entry - current_price
-            pips_moved = price_diff / pip_size
-            
-            # Calculate PnL: pips × pip_value × lot_size
-            pip_value = pip_value_per_std_lot * trade.lot_size
-            pnl = pips_moved * pip_value
+            # Calculate PnL using proper pip values per symbol (pips × pip_value × lot_size)
+            pips_moved = self.exposure.trade_pips(trade, current_price)
+            pnl = self.exposure.trade_pnl(trade, current_price)
             
             trade.pnl = pnl
             
@@ -825,11 +898,12 @@ class TradingEngine:
                 f"Strategy: {trade.strategy}\n"
                 f"PnL: ${pnl:.2f}"
             )
-            self.telegram_bot.send_message(message)
+            # Chain closes fire one message per order - merge them into a digest
+            self.telegram_bot.send_message(message, group=trade_group(trade))
             
         except Exception as e:
             error_msg = f"Trade close error: {str(e)}"
-            self.telegram_bot.send_message(f"❌ {error_msg}")
+            self.telegram_bot.send_message(f"❌ {error_msg}", priority=True)
 
     # Logic control methods
     def enable_logic(self, logic_number: int):
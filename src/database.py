@@ -1,15 +1,264 @@
+import asyncio
+import atexit
+import json
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import time
 from src.models import Trade, ReEntryChain
-from typing import List, Dict, Any
+from src.utils.clock import Clock
+from typing import List, Dict, Any, Optional, Tuple
+
+# Trade lifecycle events recorded in trade_events
+TRADE_EVENTS = ("opened", "sl_modified", "level_up", "closed")
+
+class _ThreadSignal(threading.Event):
+    """Commit signal for a blocking caller; ok is False if the write was lost"""
+    ok = True
+
+    def set(self, ok: bool = True):
+        self.ok = ok
+        super().set()
+
+class _LoopSignal:
+    """Commit signal for a durable write queued from an event loop; set() runs on the writer thread"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def set(self, ok: bool = True):
+        try:
+            self.loop.call_soon_threadsafe(self._resolve, ok)
+        except RuntimeError:
+            pass  # loop already closed, nobody is waiting
+
+    def _resolve(self, ok: bool):
+        if not self.future.done():
+            self.future.set_result(ok)
 
 class TradeDatabase:
-    def __init__(self):
-        self.conn = sqlite3.connect('data/trading_bot.db', check_same_thread=False)
-        self.create_tables()
+    """
+    Trade history store (SQLite, WAL journal)
+    - Writes are queued and applied by a single writer thread that group-commits
+      everything arriving within batch_window_ms into one transaction
+    - Durable writes (order placement records) commit immediately with
+      synchronous=FULL, together with whatever is already queued; thread callers
+      block until they are on disk, event loop callers get a future to pass to
+      confirm() instead, which resolves False if the write was lost
+    - Reads use a per-thread connection, so they never wait on the writer
+    - flush() waits for every queued write; close() flushes and stops the writer
+    """
 
-    def create_tables(self):
-        cursor = self.conn.cursor()
+    def __init__(self, db_path: str = 'data/trading_bot.db', config: Dict[str, Any] = None,
+                 clock: Clock = None):
+        self.db_path = db_path
+        self.clock = clock or Clock()  # event/record timestamps
+
+        db_config = config.get("database_config", {}) if config is not None else {}
+        self.batch_window = db_config.get("batch_window_ms", 50) / 1000.0
+        self.max_batch_size = db_config.get("max_batch_size", 500)
+        self.durable_order_writes = db_config.get("durable_order_writes", True)
+        self.durable_timeout = db_config.get("durable_timeout_seconds", 5.0)
+
+        self.write_queue: "queue.Queue[Optional[Tuple]]" = queue.Queue()
+        self.local = threading.local()
+        self.closed = False
+        self.stats = {
+            "writes_queued": 0,
+            "writes_committed": 0,
+            "writes_failed": 0,
+            "durable_writes": 0,
+            "commits": 0,
+            "largest_batch": 0
+        }
+
+        setup_conn = self._connect()
+        self.create_tables(setup_conn)
+        setup_conn.close()
+
+        self.writer_thread = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+        self.writer_thread.start()
+        atexit.register(self.close)
+
+        # Databases created before trade_rollups existed get backfilled once
+        if self._rollups_need_backfill():
+            print(f"Backfilling trade rollups: {self.rebuild_rollups()} rows")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Read connection owned by the calling thread"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self.local.conn = conn
+        return conn
+
+    def _write(self, sql: str, params: tuple = (), durable: bool = False) -> Optional[asyncio.Future]:
+        """
+        Queue a write; durable writes wait until their transaction is committed
+        On an event loop thread a durable write never blocks: it returns a
+        future that the writer resolves with True once committed, or False if
+        the statement failed or the transaction rolled back (see confirm())
+        """
+        if self.closed:
+            raise RuntimeError("TradeDatabase is closed")
+
+        done = None
+        if durable:
+            try:
+                done = _LoopSignal(asyncio.get_running_loop())
+            except RuntimeError:
+                done = _ThreadSignal()
+        self.stats["writes_queued"] += 1
+        self.write_queue.put((sql, params, done))
+        if isinstance(done, _LoopSignal):
+            return done.future
+        if done is not None:
+            if not done.wait(self.durable_timeout):
+                print(f"WARNING: Durable database write not confirmed within {self.durable_timeout}s")
+            elif not done.ok:
+                print("ERROR: Durable database write was not committed")
+        return None
+
+    async def confirm(self, pending: Optional[asyncio.Future]) -> bool:
+        """
+        Await a durable write queued from the loop (None = nothing to wait for)
+        False if it failed, rolled back or was not confirmed within durable_timeout
+        """
+        if pending is None:
+            return True
+        try:
+            return await asyncio.wait_for(asyncio.shield(pending), self.durable_timeout)
+        except asyncio.TimeoutError:
+            print(f"WARNING: Durable database write not confirmed within {self.durable_timeout}s")
+            return False
+
+    async def confirm_all(self, pending: List[Optional[asyncio.Future]]) -> List[bool]:
+        """confirm() for several writes queued back to back (they share one commit)"""
+        return list(await asyncio.gather(*(self.confirm(item) for item in pending)))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every write queued so far has been committed"""
+        if self.closed:
+            return True
+        done = _ThreadSignal()
+        self.write_queue.put((None, None, done))
+        return done.wait(timeout)
+
+    def close(self):
+        """Commit queued writes and stop the writer thread (idempotent)"""
+        if self.closed:
+            return
+        self.closed = True
+        self.write_queue.put(None)
+        self.writer_thread.join(timeout=10.0)
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def _writer_loop(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch = [self.write_queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            # Gather everything that arrives within the window; a durable write
+            # or shutdown request commits straight away
+            while (batch[-1] is not None and batch[-1][2] is None
+                   and len(batch) < self.max_batch_size):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.write_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # A durable write takes everything already queued behind it into the
+            # same FULL commit, so a burst of order records costs one fsync
+            if batch[-1] is not None and batch[-1][2] is not None:
+                while len(batch) < self.max_batch_size:
+                    try:
+                        item = self.write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                    if item is None:
+                        break
+
+            if batch[-1] is None:
+                stopping = True
+                batch.pop()
+            # Drain leftovers so close() never loses a write
+            if stopping:
+                while True:
+                    try:
+                        item = self.write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        batch.append(item)
+
+            self._commit_batch(conn, batch)
+        conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[Tuple]):
+        writes = [item for item in batch if item[0] is not None]
+        durable = any(item[2] is not None for item in writes)
+        failed = set()  # indexes into writes that did not make it to disk
+
+        if writes:
+            try:
+                if durable:
+                    conn.execute('PRAGMA synchronous=FULL')
+                cursor = conn.cursor()
+                for index, (sql, params, _) in enumerate(writes):
+                    try:
+                        cursor.execute(sql, params)
+                        self.stats["writes_committed"] += 1
+                    except sqlite3.Error as e:
+                        self.stats["writes_failed"] += 1
+                        failed.add(index)
+                        print(f"ERROR: Database write failed: {str(e)}")
+                conn.commit()
+                self.stats["commits"] += 1
+                self.stats["largest_batch"] = max(self.stats["largest_batch"], len(writes))
+                if durable:
+                    self.stats["durable_writes"] += sum(1 for item in writes if item[2] is not None)
+                    conn.execute('PRAGMA synchronous=NORMAL')
+            except sqlite3.Error as e:
+                self.stats["writes_failed"] += len(writes)
+                failed = set(range(len(writes)))
+                print(f"ERROR: Database commit failed: {str(e)}")
+                conn.rollback()
+
+        # Wake durable writers (with their outcome) and flush() callers
+        for index, (_, _, done) in enumerate(writes):
+            if done is not None:
+                done.set(index not in failed)
+        for sql, _, done in batch:
+            if sql is None and done is not None:
+                done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending_writes": self.write_queue.qsize(),
+            "batch_window_ms": self.batch_window * 1000,
+            "durable_order_writes": self.durable_order_writes
+        }
+
+    def create_tables(self, conn: sqlite3.Connection = None):
+        conn = conn or self.conn
+        cursor = conn.cursor()
         
         # Main trades table
         cursor.execute('''
@@ -53,6 +302,31 @@ class TradeDatabase:
         except sqlite3.OperationalError:
             pass  # Column already exists
         
+        # One current-state row per ticket: collapse duplicates left by the old
+        # plain INSERT (keep the latest row) before adding the unique index
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_trades_trade_id'")
+        if cursor.fetchone() is None:
+            cursor.execute('''
+                DELETE FROM trades WHERE trade_id IS NOT NULL AND id NOT IN (
+                    SELECT MAX(id) FROM trades WHERE trade_id IS NOT NULL GROUP BY trade_id
+                )
+            ''')
+            # exit_price used to be filled with close_time
+            cursor.execute("UPDATE trades SET exit_price = NULL WHERE typeof(exit_price) = 'text'")
+            cursor.execute('CREATE UNIQUE INDEX idx_trades_trade_id ON trades(trade_id)')
+        
+        # Append-only trade lifecycle log; seq is a monotonic cursor for consumers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trade_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                trade_id TEXT,
+                event TEXT NOT NULL,
+                timestamp DATETIME,
+                data TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trade_events_trade ON trade_events(trade_id, seq)')
+        
         # Re-entry chains table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS reentry_chains (
@@ -162,38 +436,247 @@ class TradeDatabase:
             )
         ''')
         
-        self.conn.commit()
-
-    def save_trade(self, trade: Trade):
-        cursor = self.conn.cursor()
+        # Performance rollups: one row per day x symbol x strategy x order_type,
+        # updated incrementally as trades close (order_type '' when unset)
         cursor.execute('''
-            INSERT INTO trades VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        ''', (None, trade.trade_id, trade.symbol, trade.entry, trade.close_time, 
+            CREATE TABLE IF NOT EXISTS trade_rollups (
+                day TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                order_type TEXT NOT NULL DEFAULT '',
+                trades INTEGER DEFAULT 0,
+                wins INTEGER DEFAULT 0,
+                losses INTEGER DEFAULT 0,
+                gross_profit REAL DEFAULT 0,
+                gross_loss REAL DEFAULT 0,
+                max_win REAL DEFAULT 0,
+                max_loss REAL DEFAULT 0,
+                PRIMARY KEY (day, symbol, strategy, order_type)
+            )
+        ''')
+        
+        # Indexes for history/report queries (close_time range + grouping columns)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_close_time ON trades(close_time)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol, close_time)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_strategy ON trades(strategy, close_time)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_profit_chain ON trades(profit_chain_id)')
+        
+        conn.commit()
+
+    def save_trade(self, trade: Trade) -> Optional[asyncio.Future]:
+        """
+        Upsert the ticket's current-state row and log its lifecycle transition
+        Repeat saves of an already opened/closed ticket update the row but add
+        no second event or rollup entry
+        Returns the commit future of a durable save made on the event loop
+        """
+        if trade.status == "closed" and trade.pnl is not None and trade.close_time:
+            self._update_rollup(trade)
+        if trade.status == "open":
+            self._record_transition(trade, "opened", symbol=trade.symbol, direction=trade.direction,
+                                    entry=trade.entry, sl=trade.sl, tp=trade.tp, lot_size=trade.lot_size)
+        elif trade.status == "closed":
+            self._record_transition(trade, "closed", exit_price=trade.exit_price, pnl=trade.pnl)
+        
+        # The record of a freshly placed order is the one worth waiting for
+        durable = self.durable_order_writes and trade.status == "open"
+        return self._write('''
+            INSERT INTO trades
+            (trade_id, symbol, entry_price, exit_price, sl_price, tp_price, lot_size, direction,
+             strategy, pnl, status, open_time, close_time, chain_id, chain_level, is_re_entry,
+             order_type, profit_chain_id, profit_level)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            ON CONFLICT(trade_id) DO UPDATE SET
+                exit_price = excluded.exit_price,
+                sl_price = excluded.sl_price,
+                tp_price = excluded.tp_price,
+                lot_size = excluded.lot_size,
+                pnl = excluded.pnl,
+                status = excluded.status,
+                close_time = excluded.close_time,
+                chain_id = excluded.chain_id,
+                chain_level = excluded.chain_level,
+                order_type = excluded.order_type,
+                profit_chain_id = excluded.profit_chain_id,
+                profit_level = excluded.profit_level
+        ''', (trade.trade_id, trade.symbol, trade.entry, trade.exit_price,
               trade.sl, trade.tp, trade.lot_size, trade.direction, trade.strategy,
               trade.pnl, trade.status, trade.open_time, trade.close_time,
               trade.chain_id, trade.chain_level, trade.is_re_entry,
-              trade.order_type, trade.profit_chain_id, trade.profit_level))
-        self.conn.commit()
+              trade.order_type, trade.profit_chain_id, trade.profit_level), durable=durable)
 
-    def save_chain(self, chain: ReEntryChain):
+    def _record_transition(self, trade: Trade, event: str, **data):
+        """Log opened/closed once per ticket (skipped if the stored row already has that status)"""
+        status = "open" if event == "opened" else "closed"
+        self._write('''
+            INSERT INTO trade_events (trade_id, event, timestamp, data)
+            SELECT ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM trades WHERE trade_id = ? AND status = ?)
+        ''', (trade.trade_id, event, self.clock.now().isoformat(),
+              json.dumps(data, separators=(',', ':')), trade.trade_id, status))
+
+    def record_trade_event(self, trade_id, event: str, **data):
+        """Append a lifecycle event (e.g. sl_modified, level_up) for a ticket"""
+        if event not in TRADE_EVENTS:
+            raise ValueError(f"Unknown trade event: {event}")
+        self._write('''
+            INSERT INTO trade_events (trade_id, event, timestamp, data) VALUES (?, ?, ?, ?)
+        ''', (trade_id, event, self.clock.now().isoformat(), json.dumps(data, separators=(',', ':'))))
+
+    def get_trade_events(self, after_seq: int = 0, limit: int = 1000,
+                         trade_id=None) -> List[Dict[str, Any]]:
+        """Events with seq > after_seq in order; pass the last seq back in to tail the log"""
+        sql = 'SELECT seq, trade_id, event, timestamp, data FROM trade_events WHERE seq > ?'
+        params = [after_seq]
+        if trade_id is not None:
+            sql += ' AND trade_id = ?'
+            params.append(str(trade_id))
+        sql += ' ORDER BY seq LIMIT ?'
+        params.append(limit)
+        
+        return [
+            {'seq': seq, 'trade_id': tid, 'event': event, 'timestamp': timestamp,
+             'data': json.loads(data) if data else {}}
+            for seq, tid, event, timestamp, data in self.conn.execute(sql, params).fetchall()
+        ]
+
+    def _update_rollup(self, trade: Trade):
+        """Fold a closed trade into its rollup row (skipped if the ticket was already closed)"""
+        pnl = trade.pnl
+        self._write('''
+            INSERT INTO trade_rollups
+            (day, symbol, strategy, order_type, trades, wins, losses,
+             gross_profit, gross_loss, max_win, max_loss)
+            SELECT ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM trades WHERE trade_id = ? AND status = 'closed')
+            ON CONFLICT(day, symbol, strategy, order_type) DO UPDATE SET
+                trades = trades + 1,
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                gross_profit = gross_profit + excluded.gross_profit,
+                gross_loss = gross_loss + excluded.gross_loss,
+                max_win = MAX(max_win, excluded.max_win),
+                max_loss = MIN(max_loss, excluded.max_loss)
+        ''', (trade.close_time[:10], trade.symbol, trade.strategy, trade.order_type or '',
+              int(pnl > 0), int(pnl < 0), max(pnl, 0), min(pnl, 0), max(pnl, 0), min(pnl, 0),
+              trade.trade_id))
+
+    def _rollups_need_backfill(self) -> bool:
+        if self.conn.execute('SELECT 1 FROM trade_rollups LIMIT 1').fetchone():
+            return False
+        return self.conn.execute(
+            "SELECT 1 FROM trades WHERE status = 'closed' AND pnl IS NOT NULL LIMIT 1"
+        ).fetchone() is not None
+
+    def rebuild_rollups(self) -> int:
+        """Recompute trade_rollups from the trades table (one row per closed ticket); returns row count"""
+        self._write('DELETE FROM trade_rollups')
+        self._write('''
+            INSERT INTO trade_rollups
+            (day, symbol, strategy, order_type, trades, wins, losses,
+             gross_profit, gross_loss, max_win, max_loss)
+            SELECT 
+                substr(close_time, 1, 10),
+                symbol,
+                strategy,
+                COALESCE(order_type, ''),
+                COUNT(*),
+                COUNT(CASE WHEN pnl > 0 THEN 1 END),
+                COUNT(CASE WHEN pnl < 0 THEN 1 END),
+                COALESCE(SUM(CASE WHEN pnl > 0 THEN pnl END), 0),
+                COALESCE(SUM(CASE WHEN pnl < 0 THEN pnl END), 0),
+                COALESCE(MAX(CASE WHEN pnl > 0 THEN pnl END), 0),
+                COALESCE(MIN(CASE WHEN pnl < 0 THEN pnl END), 0)
+            FROM trades
+            WHERE id IN (
+                SELECT MIN(id) FROM trades
+                WHERE status = 'closed' AND pnl IS NOT NULL AND close_time IS NOT NULL
+                GROUP BY COALESCE(trade_id, 'row:' || id)
+            )
+            GROUP BY 1, 2, 3, 4
+        ''')
+        self.flush()
+        return self.conn.execute('SELECT COUNT(*) FROM trade_rollups').fetchone()[0]
+
+    def get_rollup_summary(self, days=30, order_type: str = None) -> Dict[str, Any]:
+        """Performance summary over the last N days read from trade_rollups (O(days))"""
+        sql = '''
+            SELECT 
+                COALESCE(SUM(trades), 0) as total_trades,
+                COALESCE(SUM(wins), 0) as winning_trades,
+                COALESCE(SUM(losses), 0) as losing_trades,
+                COALESCE(SUM(gross_profit), 0) as gross_profit,
+                COALESCE(SUM(gross_loss), 0) as gross_loss,
+                COALESCE(MAX(max_win), 0) as max_win,
+                COALESCE(MIN(max_loss), 0) as max_loss
+            FROM trade_rollups
+            WHERE day >= date('now', ?)
+        '''
+        params = [f'-{days} days']
+        if order_type is not None:
+            sql += ' AND order_type = ?'
+            params.append(order_type)
+        
         cursor = self.conn.cursor()
-        cursor.execute('''
+        cursor.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        summary = dict(zip(columns, cursor.fetchone()))
+        
+        summary['total_pnl'] = summary['gross_profit'] + summary['gross_loss']
+        summary['average_win'] = summary['gross_profit'] / summary['winning_trades'] if summary['winning_trades'] else 0
+        summary['average_loss'] = summary['gross_loss'] / summary['losing_trades'] if summary['losing_trades'] else 0
+        return summary
+
+    def get_rollup_grouped(self, group_by: str, days=30) -> Dict[str, Dict[str, Any]]:
+        """Trade count, PnL and wins per symbol or strategy read from trade_rollups"""
+        if group_by not in ("symbol", "strategy"):
+            raise ValueError(f"Unsupported grouping column: {group_by}")
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT 
+                {group_by},
+                SUM(trades) as trades,
+                SUM(gross_profit + gross_loss) as pnl,
+                SUM(wins) as wins
+            FROM trade_rollups
+            WHERE day >= date('now', ?)
+            GROUP BY {group_by}
+            ORDER BY {group_by}
+        ''', (f'-{days} days',))
+        
+        return {row[0]: {'trades': row[1], 'pnl': row[2], 'wins': row[3]} for row in cursor.fetchall()}
+
+    def save_chain(self, chain: ReEntryChain):
+        self._write('''
             INSERT OR REPLACE INTO reentry_chains VALUES (?,?,?,?,?,?,?,?,?,?)
         ''', (chain.chain_id, chain.symbol, chain.direction, 
               chain.original_entry, chain.original_sl_distance,
               chain.current_level, chain.total_profit, chain.status,
-              chain.created_at, datetime.now().isoformat() if chain.status == "completed" else None))
-        self.conn.commit()
+              chain.created_at, self.clock.now().isoformat() if chain.status == "completed" else None))
 
     def save_sl_event(self, trade_id: str, symbol: str, sl_price: float, 
                      original_entry: float, recovery_attempted: bool = False,
                      recovery_successful: bool = False):
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT INTO sl_events VALUES (?,?,?,?,?,?,?,?)
         ''', (None, trade_id, symbol, sl_price, original_entry, 
-              datetime.now().isoformat(), recovery_attempted, recovery_successful))
-        self.conn.commit()
+              self.clock.now().isoformat(), recovery_attempted, recovery_successful))
+
+    def save_tp_reentry_event(self, chain_id: str, symbol: str, tp_level: int, tp_price: float,
+                              reentry_price: float, sl_reduction_percent: float, pnl: float = 0):
+        """Save TP re-entry event to database"""
+        self._write('''
+            INSERT INTO tp_reentry_events VALUES (?,?,?,?,?,?,?,?,?)
+        ''', (None, chain_id, symbol, tp_level, tp_price, reentry_price,
+              sl_reduction_percent, pnl, self.clock.now().isoformat()))
+
+    def save_reversal_exit_event(self, trade_id: str, symbol: str, exit_price: float,
+                                 exit_signal: str, pnl: float):
+        """Save reversal exit event to database"""
+        self._write('''
+            INSERT INTO reversal_exit_events VALUES (?,?,?,?,?,?,?)
+        ''', (None, trade_id, symbol, exit_price, exit_signal, pnl, self.clock.now().isoformat()))
 
     def get_trade_history(self, days=30) -> List[Dict[str, Any]]:
         cursor = self.conn.cursor()
@@ -244,11 +727,9 @@ class TradeDatabase:
     
     def clear_lifetime_losses(self):
         """Reset lifetime loss counter (database side)"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        self._write('''
             UPDATE system_state SET value = '0', updated_at = ? WHERE key = 'lifetime_loss'
-        ''', (datetime.now().isoformat(),))
-        self.conn.commit()
+        ''', (self.clock.now().isoformat(),))
         
     def get_tp_reentry_stats(self) -> Dict[str, Any]:
         """Get TP re-entry statistics"""
@@ -282,8 +763,7 @@ class TradeDatabase:
     
     def save_profit_chain(self, chain):
         """Save profit booking chain to database"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT OR REPLACE INTO profit_booking_chains 
             (chain_id, symbol, direction, base_lot, current_level, total_profit, status, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -298,7 +778,6 @@ class TradeDatabase:
             chain.created_at,
             chain.updated_at
         ))
-        self.conn.commit()
     
     def get_active_profit_chains(self) -> List[Dict[str, Any]]:
         """Get all active profit booking chains from database"""
@@ -311,26 +790,24 @@ class TradeDatabase:
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def save_profit_booking_order(self, order_id: str, chain_id: str, level: int, 
-                                  profit_target: float, sl_reduction: int, status: str):
-        """Save profit booking order to database"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
+                                  profit_target: float, sl_reduction: int,
+                                  status: str) -> Optional[asyncio.Future]:
+        """Save profit booking order to database (durable; see save_trade for the return value)"""
+        return self._write('''
             INSERT OR REPLACE INTO profit_booking_orders
             (order_id, chain_id, level, profit_target, sl_reduction, status, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (order_id, chain_id, level, profit_target, sl_reduction, status, datetime.now().isoformat()))
-        self.conn.commit()
+        ''', (order_id, chain_id, level, profit_target, sl_reduction, status, self.clock.now().isoformat()),
+           durable=self.durable_order_writes)
     
     def save_profit_booking_event(self, chain_id: str, level: int, profit_booked: float,
                                   orders_closed: int, orders_placed: int):
         """Save profit booking event to database"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT INTO profit_booking_events
             (chain_id, level, profit_booked, orders_closed, orders_placed, timestamp)
             VALUES (?, ?, ?, ?, ?, ?)
-        ''', (chain_id, level, profit_booked, orders_closed, orders_placed, datetime.now().isoformat()))
-        self.conn.commit()
+        ''', (chain_id, level, profit_booked, orders_closed, orders_placed, self.clock.now().isoformat()))
     
     def get_profit_chain_stats(self) -> Dict[str, Any]:
         """Get profit booking chain statistics"""
@@ -347,4 +824,21 @@ class TradeDatabase:
         ''')
         result = cursor.fetchone()
         columns = [desc[0] for desc in cursor.description]
-        return dict(zip(columns, result)) if result else {}
\ No newline at end of file
+        return dict(zip(columns, result)) if result else {}
+    def get_profit_level_reach_counts(self) -> Dict[int, int]:
+        """
+        Finished (non-ACTIVE) profit chains by the highest level they booked
+        Returns {level: chains}; -1 counts chains that never booked a level
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT top_level, COUNT(*) FROM (
+                SELECT COALESCE(MAX(e.level), -1) AS top_level
+                FROM profit_booking_chains c
+                LEFT JOIN profit_booking_events e ON e.chain_id = c.chain_id
+                WHERE c.status != 'ACTIVE'
+                GROUP BY c.chain_id
+            )
+            GROUP BY top_level
+        ''')
+        return {int(level): count for level, count in cursor.fetchall()}
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
-import json
+import logging
 import os
 import sys
 import asyncio
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from datetime import datetime, date, timedelta, timezone
 from typing import Dict, Any
 from contextlib import asynccontextmanager
@@ -26,25 +26,36 @@ from src.clients.mt5_client import MT5Client
 from src.clients.telegram_bot import TelegramBot
 from src.processors.alert_processor import AlertProcessor
 from src.services.analytics_engine import AnalyticsEngine 
+from src.services.alert_queue import AlertQueue
 from src.models import Alert
+from src.utils import json_codec
+from src.utils.clock import make_clock
+
+webhook_logger = logging.getLogger("src.webhook")
 
 # Initialize components
 config = Config()
-risk_manager = RiskManager(config)
+# One clock for every time-dependent component (wall time unless clock_config says otherwise)
+clock = make_clock(config)
+risk_manager = RiskManager(config, clock=clock)
 mt5_client = MT5Client(config)
 telegram_bot = TelegramBot(config)
-alert_processor = AlertProcessor(config)
+alert_processor = AlertProcessor(config, clock=clock)
 
 # Initialize trading engine with all components
-trading_engine = TradingEngine(config, risk_manager, mt5_client, telegram_bot, alert_processor)
+trading_engine = TradingEngine(config, risk_manager, mt5_client, telegram_bot, alert_processor, clock=clock)
 
 # Set dependencies
 telegram_bot.set_dependencies(risk_manager, trading_engine)
 
+# Webhook alerts are queued and processed by per-symbol ordered workers
+alert_queue = AlertQueue(trading_engine.process_alert, config, clock=clock)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown"""
     # Startup
+    await telegram_bot.start_notifier()
     success = await trading_engine.initialize()
     
     if success:
@@ -77,38 +88,124 @@ async def lifespan(app: FastAPI):
             print(error_msg)
             raise RuntimeError("Bot initialization failed")
     
+    await alert_queue.start()
+    
     yield
     
     # Shutdown (cleanup if needed)
     print("Trading bot shutting down...")
+    await alert_queue.stop()
+    await trading_engine.price_monitor.stop()
+    await trading_engine.tick_stream.stop()
+    await trading_engine.account_snapshot.stop()
+    await telegram_bot.stop_notifier()
+    trading_engine.async_mt5_client.close()
+    trading_engine.db.close()
 
 app = FastAPI(title="Zepix Automated Trading Bot v2.0", lifespan=lifespan)
 
+# Webhook replies never change - serialize them once
+WEBHOOK_RESPONSES = {
+    "processed": json_codec.dumps({"status": "success", "message": "Alert processed"}),
+    "invalid": json_codec.dumps({"status": "rejected", "message": "Alert validation failed"}),
+    "failed": json_codec.dumps({"status": "rejected", "message": "Alert processing failed"}),
+    "queue_full": json_codec.dumps({"status": "rejected", "message": "Alert queue full, retry later"})
+}
+
+def webhook_response(outcome: str, status_code: int = 200) -> Response:
+    return Response(content=WEBHOOK_RESPONSES[outcome], status_code=status_code, media_type="application/json")
+
 @app.post("/webhook")
 async def handle_webhook(request: Request):
     """Handle incoming webhook alerts from TradingView/Zepix"""
     try:
-        data = await request.json()
+        # Single parse: body -> dict -> immutable Alert handed straight to the engine
+        data = json_codec.loads(await request.body())
+        if not isinstance(data, dict):
+            raise ValueError("Alert payload must be a JSON object")
+        
+        webhook_logger.info("Webhook received type=%s symbol=%s tf=%s signal=%s",
+                            data.get("type"), data.get("symbol"), data.get("tf"), data.get("signal"))
         
-        print(f"Webhook received: {json.dumps(data, indent=2)}")
+        # Backpressure before validation so a rejected alert is not recorded as seen
+        # (the sender's retry must not be dropped as a duplicate)
+        if alert_queue.is_running and not alert_queue.has_capacity():
+            return webhook_response("queue_full", status_code=429)
         
         # Validate alert
-        if not alert_processor.validate_alert(data):
-            return JSONResponse(content={"status": "rejected", "message": "Alert validation failed"})
+        alert = alert_processor.parse_alert(data)
+        if alert is None:
+            return webhook_response("invalid")
+        
+        # Queue mode: acknowledge now, process in the background
+        if alert_queue.is_running:
+            alert_id = alert_queue.submit(alert)
+            return Response(
+                content=json_codec.dumps({"status": "accepted", "alert_id": alert_id}),
+                status_code=202,
+                media_type="application/json"
+            )
         
         # Process alert
-        result = await trading_engine.process_alert(data)
+        result = await trading_engine.process_alert(alert)
         
-        if result:
-            return JSONResponse(content={"status": "success", "message": "Alert processed"})
-        else:
-            return JSONResponse(content={"status": "rejected", "message": "Alert processing failed"})
+        return webhook_response("processed" if result else "failed")
             
     except Exception as e:
         error_msg = f"Webhook processing error: {str(e)}"
         telegram_bot.send_message(f"ERROR: {error_msg}")
         raise HTTPException(status_code=400, detail=error_msg)
 
+# Upper bound on alerts per /webhook/batch request
+MAX_BATCH_ALERTS = 100
+
+@app.post("/webhook/batch")
+async def handle_webhook_batch(request: Request):
+    """Handle several alerts in one request (JSON array or {"alerts": [...]})"""
+    try:
+        data = json_codec.loads(await request.body())
+        items = data.get("alerts") if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            raise ValueError("Batch payload must be a non-empty JSON array of alerts")
+        if len(items) > MAX_BATCH_ALERTS:
+            raise ValueError(f"Batch too large: {len(items)} alerts (max {MAX_BATCH_ALERTS})")
+        
+        webhook_logger.info("Webhook batch received alerts=%d", len(items))
+        
+        queued = alert_queue.is_running
+        if queued and not alert_queue.has_capacity(len(items)):
+            return webhook_response("queue_full", status_code=429)
+        
+        # Bias/trend updates come first, so entries in the same batch see them
+        results = [None] * len(items)
+        for index, alert in alert_processor.parse_batch(items):
+            if alert is None:
+                results[index] = {"index": index, "status": "rejected", "message": "Alert validation failed"}
+            elif queued:
+                results[index] = {"index": index, "status": "accepted", "alert_id": alert_queue.submit(alert)}
+            else:
+                result = await trading_engine.process_alert(alert)
+                results[index] = {"index": index, "status": "processed" if result else "failed"}
+        
+        return Response(
+            content=json_codec.dumps({"status": "success", "results": results}),
+            status_code=202 if queued else 200,
+            media_type="application/json"
+        )
+    
+    except Exception as e:
+        error_msg = f"Batch webhook processing error: {str(e)}"
+        telegram_bot.send_message(f"ERROR: {error_msg}")
+        raise HTTPException(status_code=400, detail=error_msg)
+
+@app.get("/alerts/{alert_id}")
+async def get_alert_status(alert_id: str):
+    """Processing status of a queued webhook alert"""
+    status = alert_queue.get_status(alert_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown alert id")
+    return {"status": "success", "alert_id": alert_id, "alert": status}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -127,6 +224,23 @@ async def health_check():
         }
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Internal pipeline metrics (queue depths, drops, latencies)"""
+    return {
+        "status": "success",
+        "notifications": telegram_bot.get_notification_stats(),
+        "mt5_calls": trading_engine.async_mt5_client.get_stats(),
+        "price_cache": trading_engine.price_cache.get_stats(),
+        "tick_stream": trading_engine.tick_stream.get_stats(),
+        "database": trading_engine.db.get_stats(),
+        "alert_dedup": alert_processor.get_dedup_stats(),
+        "alert_queue": alert_queue.get_stats(),
+        "order_batches": trading_engine.profit_booking_manager.order_executor.get_stats(),
+        "account_snapshot": trading_engine.account_snapshot.get_stats(),
+        "dual_orders": trading_engine.dual_order_manager.get_pair_stats()
+    }
+
 @app.get("/stats")
 async def get_stats():
     """Get current statistics"""
@@ -197,11 +311,12 @@ async def get_reentry_chains():
 @app.get("/lot_config")
 async def get_lot_config():
     """Get lot size configuration"""
+    account = await trading_engine.account_snapshot.get()
     return {
         "fixed_lots": config["fixed_lot_sizes"],
         "manual_overrides": config.get("manual_lot_overrides", {}),
-        "current_balance": mt5_client.get_account_balance(),
-        "current_lot": risk_manager.get_fixed_lot_size(mt5_client.get_account_balance())
+        "current_balance": account.balance if account else 0.0,
+        "current_lot": account.lot_size if account else 0.0
     }
 
 @app.post("/set_lot_size")
@@ -252,6 +367,14 @@ async def get_status():
         "profit_booking_enabled": config.get("profit_booking_config", {}).get("enabled", True)
     }
 
+@app.get("/exposure")
+async def get_exposure():
+    """Unrealized PnL, net lots and margin-at-risk per symbol and chain at current prices"""
+    symbols = trading_engine.open_trades.symbols()
+    await trading_engine.price_cache.refresh(symbols)
+    prices = {symbol: await trading_engine.price_cache.get_price(symbol) for symbol in symbols}
+    return {"status": "success", **trading_engine.exposure.snapshot(prices)}
+
 def check_port_available(host: str, port: int) -> bool:
     """Check if port is available"""
     import socket
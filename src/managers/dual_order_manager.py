@@ -3,26 +3,53 @@ from src.models import Trade, Alert
 from src.config import Config
 from src.managers.risk_manager import RiskManager
 from src.clients.mt5_client import MT5Client
+from src.clients.async_mt5_client import AsyncMT5Client
 from src.utils.pip_calculator import PipCalculator
-from datetime import datetime
+from src.services.order_batch_executor import BatchOrderExecutor, OrderRequest
+from src.utils.clock import Clock
+import random
 import logging
 
+# What to do with the filled leg when the other leg of a pair fails
+LEG_FAILURE_POLICIES = ("keep", "close_survivor")
+
 class DualOrderManager:
     """
     Manages dual order placement system
     - Order A: TP Continuation Trail (existing system)
     - Order B: Profit Booking Trail (new pyramid system)
     - Both orders use SAME lot size (no split)
-    - Orders work independently (no rollback if one fails)
+    - Both legs are submitted as one pair (back to back on the MT5 worker)
+    - If one leg fails, dual_order_config.leg_failure_policy decides:
+      "keep" (default) leaves the filled leg running alone, "close_survivor"
+      closes it at market
     """
     
     def __init__(self, config: Config, risk_manager: RiskManager, 
-                 mt5_client: MT5Client, pip_calculator: PipCalculator):
+                 mt5_client: MT5Client, pip_calculator: PipCalculator,
+                 async_mt5_client: AsyncMT5Client = None, clock: Clock = None):
         self.config = config
+        self.clock = clock or Clock()
         self.risk_manager = risk_manager
         self.mt5_client = mt5_client
+        self.async_mt5_client = async_mt5_client or AsyncMT5Client(mt5_client, config)
         self.pip_calculator = pip_calculator
+        self.order_executor = BatchOrderExecutor(self.async_mt5_client, config)
         self.logger = logging.getLogger(__name__)
+        
+        self.pair_stats = {
+            "pairs": 0,
+            "both_filled": 0,
+            "one_leg_failed": 0,
+            "both_failed": 0,
+            "compensated": 0,
+            "compensation_failed": 0,
+            "gap_total_ms": 0.0,
+            "gap_max_ms": 0.0,
+            "price_diff_samples": 0,
+            "price_diff_total_pips": 0.0,
+            "price_diff_max_pips": 0.0
+        }
     
     def is_enabled(self) -> bool:
         """Check if dual order system is enabled"""
@@ -84,7 +111,7 @@ class DualOrderManager:
         
         return {"valid": True, "reason": "Risk validation passed"}
     
-    def create_dual_orders(self, alert: Alert, strategy: str, 
+    async def create_dual_orders(self, alert: Alert, strategy: str, 
                           account_balance: float) -> Dict[str, Any]:
         """
         Create Order A (TP Trail) and Order B (Profit Trail) with same lot size
@@ -143,7 +170,7 @@ class DualOrderManager:
                 lot_size=lot_size,
                 direction=alert.signal,
                 strategy=strategy,
-                open_time=datetime.now().isoformat(),
+                open_time=self.clock.now().isoformat(),
                 original_entry=alert.price,
                 original_sl_distance=sl_distance,
                 order_type="TP_TRAIL"
@@ -158,7 +185,7 @@ class DualOrderManager:
                 lot_size=lot_size,  # Same lot size
                 direction=alert.signal,
                 strategy=strategy,
-                open_time=datetime.now().isoformat(),
+                open_time=self.clock.now().isoformat(),
                 original_entry=alert.price,
                 original_sl_distance=sl_distance,
                 order_type="PROFIT_TRAIL"
@@ -167,23 +194,13 @@ class DualOrderManager:
             result["order_a"] = order_a
             result["order_b"] = order_b
             
-            # Place Order A independently
-            order_a_result = self._place_single_order(order_a, strategy, "TP_TRAIL")
-            if order_a_result["success"]:
-                result["order_a_placed"] = True
-                order_a.trade_id = order_a_result["trade_id"]
-            else:
-                result["errors"].append(f"Order A failed: {order_a_result.get('error', 'Unknown error')}")
-                # Order A failed - but we continue to try Order B (independent)
-            
-            # Place Order B independently (regardless of Order A result)
-            order_b_result = self._place_single_order(order_b, strategy, "PROFIT_TRAIL")
-            if order_b_result["success"]:
-                result["order_b_placed"] = True
-                order_b.trade_id = order_b_result["trade_id"]
-            else:
-                result["errors"].append(f"Order B failed: {order_b_result.get('error', 'Unknown error')}")
-                # Order B failed - but Order A continues independently (no rollback)
+            # Submit both legs as one pair
+            pair = await self.place_order_pair(
+                order_a, order_b, f"{strategy}_TP_TRAIL", f"{strategy}_PROFIT_TRAIL"
+            )
+            result["order_a_placed"] = pair["order_a_placed"]
+            result["order_b_placed"] = pair["order_b_placed"]
+            result["errors"].extend(pair["errors"])
             
             # Log results
             if result["order_a_placed"] and result["order_b_placed"]:
@@ -203,38 +220,111 @@ class DualOrderManager:
             result["errors"].append(error_msg)
             return result
     
-    def _place_single_order(self, trade: Trade, strategy: str, 
-                           order_type: str) -> Dict[str, Any]:
+    def get_leg_failure_policy(self) -> str:
+        policy = self.config.get("dual_order_config", {}).get("leg_failure_policy", "keep")
+        return policy if policy in LEG_FAILURE_POLICIES else "keep"
+    
+    async def place_order_pair(self, order_a: Trade, order_b: Trade,
+                               comment_a: str, comment_b: str) -> Dict[str, Any]:
         """
-        Place a single order in MT5
-        Returns: {"success": bool, "trade_id": Optional[int], "error": Optional[str]}
+        Place Order A and Order B as one pipelined pair and set their trade_ids
+        Applies the leg failure policy when exactly one leg fills
+        Returns: {"order_a_placed": bool, "order_b_placed": bool, "errors": List[str],
+                  "fill_gap_ms": Optional[float], "price_diff_pips": Optional[float]}
         """
-        try:
-            if self.config.get("simulate_orders", False):
-                # Simulation mode
-                import random
-                trade_id = random.randint(100000, 999999)
-                self.logger.info(f"SIMULATED: {order_type}: {trade.symbol} {trade.direction.upper()} @ {trade.entry}")
-                return {"success": True, "trade_id": trade_id, "error": None}
-            
-            # Live trading mode
-            trade_id = self.mt5_client.place_order(
-                symbol=trade.symbol,
-                order_type=trade.direction,
-                lot_size=trade.lot_size,
-                price=trade.entry,
-                sl=trade.sl,
-                tp=trade.tp,
-                comment=f"{strategy}_{order_type}"
-            )
-            
-            if trade_id:
-                return {"success": True, "trade_id": trade_id, "error": None}
+        pair = {
+            "order_a_placed": False,
+            "order_b_placed": False,
+            "errors": [],
+            "fill_gap_ms": None,
+            "price_diff_pips": None
+        }
+        
+        if self.config.get("simulate_orders", False):
+            # Simulation mode - both legs fill at the signal price
+            order_a.trade_id = random.randint(100000, 999999)
+            order_b.trade_id = random.randint(100000, 999999)
+            pair["order_a_placed"] = pair["order_b_placed"] = True
+            self.logger.info(f"SIMULATED: Dual pair: {order_a.symbol} {order_a.direction.upper()} @ {order_a.entry}")
+            return pair
+        
+        legs = [(order_a, comment_a), (order_b, comment_b)]
+        requests = [
+            OrderRequest(symbol=trade.symbol, direction=trade.direction, lot_size=trade.lot_size,
+                         price=trade.entry, sl=trade.sl, tp=trade.tp, comment=comment)
+            for trade, comment in legs
+        ]
+        batch = await self.order_executor.execute([], requests)
+        
+        tickets = {id(request): ticket for request, ticket in batch.opened}
+        for key, (trade, _), request in zip(("order_a", "order_b"), legs, requests):
+            ticket = tickets.get(id(request))
+            if ticket:
+                trade.trade_id = ticket
+                pair[f"{key}_placed"] = True
             else:
-                return {"success": False, "trade_id": None, "error": "MT5 order placement failed"}
-                
-        except Exception as e:
-            error_msg = f"Order placement error: {str(e)}"
-            self.logger.error(error_msg)
-            return {"success": False, "trade_id": None, "error": error_msg}
-
+                pair["errors"].append(f"{'Order A' if key == 'order_a' else 'Order B'} failed: MT5 order placement failed")
+        
+        self.pair_stats["pairs"] += 1
+        if pair["order_a_placed"] and pair["order_b_placed"]:
+            self.pair_stats["both_filled"] += 1
+            self._record_fill_gap(pair, order_a, order_b, batch.latencies_ms)
+        elif pair["order_a_placed"] or pair["order_b_placed"]:
+            self.pair_stats["one_leg_failed"] += 1
+            if self.get_leg_failure_policy() == "close_survivor":
+                survivor_key = "order_a" if pair["order_a_placed"] else "order_b"
+                await self._close_survivor(pair, survivor_key, order_a if survivor_key == "order_a" else order_b)
+        else:
+            self.pair_stats["both_failed"] += 1
+        
+        return pair
+    
+    async def _close_survivor(self, pair: Dict[str, Any], key: str, trade: Trade):
+        """Compensate a half-filled pair by closing the leg that did fill"""
+        if await self.async_mt5_client.close_position(trade.trade_id):
+            self.pair_stats["compensated"] += 1
+            pair[f"{key}_placed"] = False
+            pair["errors"].append(f"Closed filled leg #{trade.trade_id} (other leg failed)")
+            self.async_mt5_client.pop_fill_price(trade.trade_id)
+            trade.trade_id = None
+        else:
+            # Could not undo - keep tracking the leg so it is managed like any open trade
+            self.pair_stats["compensation_failed"] += 1
+            pair["errors"].append(f"Failed to close filled leg #{trade.trade_id} - kept open")
+    
+    def _record_fill_gap(self, pair: Dict[str, Any], order_a: Trade, order_b: Trade,
+                         latencies_ms: List[float]):
+        gap_ms = abs(latencies_ms[1] - latencies_ms[0])
+        pair["fill_gap_ms"] = gap_ms
+        self.pair_stats["gap_total_ms"] += gap_ms
+        self.pair_stats["gap_max_ms"] = max(self.pair_stats["gap_max_ms"], gap_ms)
+        
+        price_a = self.async_mt5_client.pop_fill_price(order_a.trade_id)
+        price_b = self.async_mt5_client.pop_fill_price(order_b.trade_id)
+        if price_a is None or price_b is None:
+            return
+        pip_size = self.config["symbol_config"][order_a.symbol]["pip_size"]
+        diff_pips = abs(price_a - price_b) / pip_size
+        pair["price_diff_pips"] = diff_pips
+        self.pair_stats["price_diff_samples"] += 1
+        self.pair_stats["price_diff_total_pips"] += diff_pips
+        self.pair_stats["price_diff_max_pips"] = max(self.pair_stats["price_diff_max_pips"], diff_pips)
+    
+    def get_pair_stats(self) -> Dict[str, Any]:
+        """Pair outcomes plus A-to-B fill time gap and fill price difference"""
+        stats = self.pair_stats
+        filled = stats["both_filled"]
+        samples = stats["price_diff_samples"]
+        return {
+            "pairs": stats["pairs"],
+            "both_filled": filled,
+            "one_leg_failed": stats["one_leg_failed"],
+            "both_failed": stats["both_failed"],
+            "compensated": stats["compensated"],
+            "compensation_failed": stats["compensation_failed"],
+            "leg_failure_policy": self.get_leg_failure_policy(),
+            "avg_fill_gap_ms": (stats["gap_total_ms"] / filled) if filled else 0.0,
+            "max_fill_gap_ms": stats["gap_max_ms"],
+            "avg_price_diff_pips": (stats["price_diff_total_pips"] / samples) if samples else 0.0,
+            "max_price_diff_pips": stats["price_diff_max_pips"]
+        }
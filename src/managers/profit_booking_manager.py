@@ -1,11 +1,17 @@
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 from src.models import Trade, ProfitBookingChain
 from src.config import Config
 from src.database import TradeDatabase
 from src.clients.mt5_client import MT5Client
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.services.price_cache import PriceCache
+from src.services.exposure_engine import ExposureEngine
+from src.services.account_snapshot import AccountSnapshotService
+from src.services.order_batch_executor import BatchOrderExecutor, OrderRequest
 from src.utils.pip_calculator import PipCalculator
 from src.managers.risk_manager import RiskManager
+from src.utils.trade_book import TradeBook
+from src.utils.clock import Clock
 import uuid
 import logging
 
@@ -21,9 +27,19 @@ class ProfitBookingManager:
     
     def __init__(self, config: Config, mt5_client: MT5Client, 
                  pip_calculator: PipCalculator, risk_manager: RiskManager,
-                 db: TradeDatabase):
+                 db: TradeDatabase, async_mt5_client: AsyncMT5Client = None,
+                 price_cache: PriceCache = None, exposure_engine: ExposureEngine = None,
+                 account_snapshot: AccountSnapshotService = None, clock: Clock = None):
         self.config = config
+        self.clock = clock or Clock()
         self.mt5_client = mt5_client
+        self.async_mt5_client = async_mt5_client or AsyncMT5Client(mt5_client, config)
+        self.price_cache = price_cache or PriceCache(self.async_mt5_client, config, clock=self.clock)
+        self.exposure_engine = exposure_engine or ExposureEngine(config)
+        self.account_snapshot = account_snapshot or AccountSnapshotService(
+            self.async_mt5_client, risk_manager, config, clock=self.clock
+        )
+        self.order_executor = BatchOrderExecutor(self.async_mt5_client, config)
         self.pip_calculator = pip_calculator
         self.risk_manager = risk_manager
         self.db = db
@@ -69,8 +85,8 @@ class ProfitBookingManager:
                 total_profit=0.0,
                 active_orders=[trade.trade_id] if trade.trade_id else [],
                 status="ACTIVE",
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat(),
+                created_at=self.clock.now().isoformat(),
+                updated_at=self.clock.now().isoformat(),
                 profit_targets=self.profit_targets.copy(),
                 multipliers=self.multipliers.copy(),
                 sl_reductions=self.sl_reductions.copy(),
@@ -125,58 +141,39 @@ class ProfitBookingManager:
         return 0.0
     
     def calculate_combined_pnl(self, chain: ProfitBookingChain, 
-                               open_trades: List[Trade]) -> float:
+                               open_trades: TradeBook,
+                               current_price: Optional[float] = None) -> float:
         """
         Calculate combined unrealized PnL for all orders in current level
+        Async callers pass current_price so no blocking MT5 call is made here
         Returns total PnL in dollars
         """
         try:
-            # Get all trades for this chain at current level
+            # Get all trades for this chain at current level (indexed lookup)
             chain_trades = [
-                t for t in open_trades
-                if t.profit_chain_id == chain.chain_id 
-                and t.profit_level == chain.current_level
-                and t.status == "open"
+                t for t in open_trades.by_profit_level(chain.chain_id, chain.current_level)
+                if t.status == "open"
             ]
             
             if not chain_trades:
                 return 0.0
             
             # Get current price
-            current_price = self.mt5_client.get_current_price(chain.symbol)
-            if current_price == 0:
+            if current_price is None:
+                current_price = self.mt5_client.get_current_price(chain.symbol)
+            if not current_price:
                 return 0.0
             
-            # Calculate PnL for each trade and sum
-            total_pnl = 0.0
-            
-            for trade in chain_trades:
-                symbol_config = self.config["symbol_config"][trade.symbol]
-                pip_size = symbol_config["pip_size"]
-                pip_value_per_std_lot = symbol_config["pip_value_per_std_lot"]
-                
-                # Calculate price difference in pips
-                if trade.direction == "buy":
-                    price_diff = current_price - trade.entry
-                else:
-                    price_diff = trade.entry - current_price
-                
-                pips_moved = price_diff / pip_size
-                
-                # Calculate PnL: pips × pip_value × lot_size
-                pip_value = pip_value_per_std_lot * trade.lot_size
-                trade_pnl = pips_moved * pip_value
-                
-                total_pnl += trade_pnl
-            
-            return total_pnl
+            # Sum PnL over the level's rows in the exposure engine (pips × pip_value × lot_size)
+            return self.exposure_engine.positions_pnl(chain_trades, current_price)
             
         except Exception as e:
             self.logger.error(f"Error calculating combined PnL: {str(e)}")
             return 0.0
     
     def check_profit_targets(self, chain: ProfitBookingChain, 
-                            open_trades: List[Trade]) -> bool:
+                            open_trades: TradeBook,
+                            current_price: Optional[float] = None) -> bool:
         """
         Check if profit target is reached for current level
         Returns True if target reached, False otherwise
@@ -188,7 +185,7 @@ class ProfitBookingManager:
             return False
         
         # Calculate combined PnL for current level
-        combined_pnl = self.calculate_combined_pnl(chain, open_trades)
+        combined_pnl = self.calculate_combined_pnl(chain, open_trades, current_price)
         
         # Get profit target for current level
         profit_target = self.get_profit_target(chain.current_level)
@@ -202,8 +199,35 @@ class ProfitBookingManager:
         
         return False
     
+    async def _save_order_records(self, chain: ProfitBookingChain, trade_ids: List[int], level: int,
+                                  profit_target: float, sl_reduction: int, trading_engine) -> bool:
+        """Queue every order record first, then confirm them together; retry failures once, then alert"""
+        pending = list(trade_ids)
+        for attempt in range(2):
+            if not pending:
+                return True
+            confirmed = await self.db.confirm_all([
+                self.db.save_profit_booking_order(str(trade_id), chain.chain_id, level,
+                                                  profit_target, sl_reduction, "OPEN")
+                for trade_id in pending
+            ])
+            pending = [trade_id for trade_id, ok in zip(pending, confirmed) if not ok]
+            if pending:
+                self.logger.warning(f"{len(pending)} order record(s) of {chain.chain_id} not committed "
+                                    f"(attempt {attempt + 1})")
+        if not pending:
+            return True
+        trading_engine.telegram_bot.send_message(
+            f"🚨 Profit booking order records NOT saved to database\n"
+            f"Chain: {chain.chain_id} | Level {level}\n"
+            f"Tickets: {', '.join(str(trade_id) for trade_id in pending)}\n"
+            f"The positions are live in MT5 - check the database",
+            priority=True
+        )
+        return False
+
     async def execute_profit_booking(self, chain: ProfitBookingChain, 
-                                    open_trades: List[Trade],
+                                    open_trades: TradeBook,
                                     trading_engine) -> bool:
         """
         Execute profit booking: close current level orders and place next level orders
@@ -216,36 +240,33 @@ class ProfitBookingManager:
             if chain.current_level >= chain.max_level:
                 # Max level reached - complete chain
                 chain.status = "COMPLETED"
-                chain.updated_at = datetime.now().isoformat()
+                chain.updated_at = self.clock.now().isoformat()
                 self.db.save_profit_chain(chain)
                 self.logger.info(f"SUCCESS: Chain {chain.chain_id} completed - max level reached")
                 return True
             
             # Get all trades for current level
             current_level_trades = [
-                t for t in open_trades
-                if t.profit_chain_id == chain.chain_id 
-                and t.profit_level == chain.current_level
-                and t.status == "open"
+                t for t in open_trades.by_profit_level(chain.chain_id, chain.current_level)
+                if t.status == "open"
             ]
             
             if not current_level_trades:
                 self.logger.warning(f"No open trades found for chain {chain.chain_id} level {chain.current_level}")
                 return False
             
-            # Calculate profit booked (combined PnL)
-            profit_booked = self.calculate_combined_pnl(chain, open_trades)
-            
-            # Close all orders in current level
-            orders_closed = 0
-            for trade in current_level_trades:
-                current_price = self.mt5_client.get_current_price(trade.symbol)
-                if current_price > 0:
-                    await trading_engine.close_trade(trade, "PROFIT_BOOKING", current_price)
-                    orders_closed += 1
+            # Orders whose close failed at an earlier level-up are retried with this batch
+            carried_trades = [
+                t for t in (open_trades.get(order_id) for order_id in chain.active_orders)
+                if t is not None and t.status == "open" and t.profit_level < chain.current_level
+            ]
+            closing_trades = current_level_trades + carried_trades
             
-            # Update chain profit
-            chain.total_profit += profit_booked
+            # All orders in a chain share one symbol - fetch the price once
+            close_price = await self.price_cache.get_price(chain.symbol)
+            if close_price == 0:
+                self.logger.error(f"Failed to get current price for {chain.symbol}")
+                return False
             
             # Progress to next level
             next_level = chain.current_level + 1
@@ -253,16 +274,13 @@ class ProfitBookingManager:
             next_profit_target = self.get_profit_target(next_level)
             next_sl_reduction = self.get_sl_reduction(next_level)
             
-            # Place new orders for next level
-            orders_placed = 0
-            account_balance = self.mt5_client.get_account_balance()
-            lot_size = self.risk_manager.get_fixed_lot_size(account_balance)
-            
-            # Get current price
-            current_price = self.mt5_client.get_current_price(chain.symbol)
-            if current_price == 0:
-                self.logger.error(f"Failed to get current price for {chain.symbol}")
+            account = await self.account_snapshot.get()
+            if not account:
+                self.logger.error("Account snapshot unavailable - level-up skipped")
                 return False
+            account_balance = account.balance
+            lot_size = account.lot_size
+            current_price = close_price
             
             # Calculate SL with reduction for next level
             sl_adjustment = 1.0 - (next_sl_reduction / 100.0)
@@ -275,10 +293,25 @@ class ProfitBookingManager:
                 current_price, sl_price, chain.direction, self.config.get("rr_ratio", 1.0)
             )
             
-            # Place multiple orders for next level
+            # Close this level and open the next one as one pipelined batch
+            strategy = chain.metadata.get("strategy", "LOGIC1")
+            requests = [
+                OrderRequest(
+                    symbol=chain.symbol, direction=chain.direction, lot_size=lot_size,
+                    price=current_price, sl=sl_price, tp=tp_price,
+                    comment=f"{strategy}_PROFIT_L{next_level}"
+                )
+                for _ in range(next_order_count)
+            ]
+            result = await self.order_executor.execute(closing_trades, requests)
+            
+            # Profit booked = combined PnL of the orders the broker actually closed
+            profit_booked = self.exposure_engine.positions_pnl(result.closed, close_price)
+            for trade in result.closed:
+                await trading_engine.close_trade(trade, "PROFIT_BOOKING", close_price, broker_closed=True)
+            
             new_trade_ids = []
-            for i in range(next_order_count):
-                # Create trade object
+            for request, trade_id in result.opened:
                 new_trade = Trade(
                     symbol=chain.symbol,
                     entry=current_price,
@@ -286,87 +319,84 @@ class ProfitBookingManager:
                     tp=tp_price,
                     lot_size=lot_size,
                     direction=chain.direction,
-                    strategy=chain.metadata.get("strategy", "LOGIC1"),
-                    open_time=datetime.now().isoformat(),
+                    strategy=strategy,
+                    open_time=self.clock.now().isoformat(),
+                    trade_id=trade_id,
                     original_entry=chain.metadata.get("original_entry", current_price),
                     original_sl_distance=sl_distance,
                     order_type="PROFIT_TRAIL",
                     profit_chain_id=chain.chain_id,
                     profit_level=next_level
                 )
-                
-                # Place order
-                if not self.config.get("simulate_orders", False):
-                    trade_id = self.mt5_client.place_order(
-                        symbol=chain.symbol,
-                        order_type=chain.direction,
-                        lot_size=lot_size,
-                        price=current_price,
-                        sl=sl_price,
-                        tp=tp_price,
-                        comment=f"{chain.metadata.get('strategy', 'LOGIC1')}_PROFIT_L{next_level}"
-                    )
-                    if trade_id:
-                        new_trade.trade_id = trade_id
-                        new_trade_ids.append(trade_id)
-                else:
-                    # Simulation mode
-                    import random
-                    trade_id = random.randint(100000, 999999)
-                    new_trade.trade_id = trade_id
-                    new_trade_ids.append(trade_id)
-                
-                # Add to open trades
-                trading_engine.open_trades.append(new_trade)
-                trading_engine.risk_manager.add_open_trade(new_trade)
-                
-                # Save to database
-                if new_trade.trade_id:
-                    self.db.save_profit_booking_order(
-                        str(new_trade.trade_id),
-                        chain.chain_id,
-                        next_level,
-                        next_profit_target,
-                        int(next_sl_reduction),
-                        "OPEN"
-                    )
-                
-                orders_placed += 1
+                trading_engine.add_open_trade(new_trade)
+                new_trade_ids.append(trade_id)
+                self.db.record_trade_event(
+                    trade_id, "level_up",
+                    chain_id=chain.chain_id, level=next_level, entry=current_price, sl=sl_price
+                )
+            
+            
+            # Save to database: all of the level's order records share one durable commit
+            await self._save_order_records(
+                chain, new_trade_ids, next_level, next_profit_target, int(next_sl_reduction), trading_engine
+            )
+            
+            orders_closed = len(result.closed)
+            orders_placed = len(new_trade_ids)
             
-            # Update chain
-            chain.current_level = next_level
-            chain.active_orders = new_trade_ids
-            chain.updated_at = datetime.now().isoformat()
+            # Apply the batch outcome to the chain in one step
+            chain.total_profit += profit_booked
+            chain.metadata["last_batch"] = result.summary()
+            # Close-failed orders are still open at the broker: the chain keeps tracking them
+            chain.active_orders = new_trade_ids + [t.trade_id for t in result.close_failed]
+            if new_trade_ids:
+                chain.current_level = next_level
+            else:
+                chain.status = "STOPPED"
+                self.logger.error(f"Chain {chain.chain_id} stopped: no level {next_level} order was filled")
+            chain.updated_at = self.clock.now().isoformat()
             self.db.save_profit_chain(chain)
             
             # Save profit booking event
             self.db.save_profit_booking_event(
                 chain.chain_id,
-                chain.current_level - 1,  # Previous level
+                next_level - 1,  # Previous level
                 profit_booked,
                 orders_closed,
                 orders_placed
             )
             
+            if not result.complete:
+                self.logger.warning(
+                    f"Partial level-up for chain {chain.chain_id}: "
+                    f"{len(result.close_failed)} close(s) and {len(result.open_failed)} order(s) failed"
+                )
+            
             # Send Telegram notification
+            close_failed_note = (
+                f"Close Failed: {len(result.close_failed)} (kept in chain, retried next level)\n"
+                if result.close_failed else ""
+            )
             trading_engine.telegram_bot.send_message(
                 f"🔁 PROFIT BOOKING LEVEL UP!\n"
                 f"Chain: {chain.chain_id}\n"
-                f"Level: {chain.current_level - 1} → {chain.current_level}\n"
+                f"Level: {next_level - 1} → {next_level}\n"
                 f"Profit Booked: ${profit_booked:.2f}\n"
-                f"Orders Closed: {orders_closed}\n"
-                f"Orders Placed: {orders_placed}\n"
+                f"Orders Closed: {orders_closed}/{len(closing_trades)}\n"
+                f"{close_failed_note}"
+                f"Orders Placed: {orders_placed}/{next_order_count}\n"
                 f"Next Target: ${next_profit_target}\n"
-                f"SL Reduction: {next_sl_reduction}%"
+                f"SL Reduction: {next_sl_reduction}%",
+                group=f"chain:{chain.chain_id}"
             )
             
             self.logger.info(
                 f"✅ Profit booking executed: Chain {chain.chain_id} "
-                f"Level {chain.current_level - 1} → {chain.current_level}, "
+                f"Level {next_level - 1} → {next_level}, "
                 f"Profit: ${profit_booked:.2f}"
             )
             
-            return True
+            return bool(new_trade_ids)
             
         except Exception as e:
             self.logger.error(f"Error executing profit booking: {str(e)}")
@@ -379,7 +409,7 @@ class ProfitBookingManager:
         if chain_id in self.active_chains:
             chain = self.active_chains[chain_id]
             chain.status = "STOPPED"
-            chain.updated_at = datetime.now().isoformat()
+            chain.updated_at = self.clock.now().isoformat()
             self.db.save_profit_chain(chain)
             self.logger.info(f"STOPPED: Chain {chain_id} stopped: {reason}")
     
@@ -388,7 +418,7 @@ class ProfitBookingManager:
         for chain_id in list(self.active_chains.keys()):
             self.stop_chain(chain_id, reason)
     
-    def recover_chains_from_database(self, open_trades: List[Trade]):
+    def recover_chains_from_database(self, open_trades: TradeBook):
         """
         Recover active profit booking chains from database on bot restart
         """
@@ -407,8 +437,8 @@ class ProfitBookingManager:
                         total_profit=chain_data.get("total_profit", 0.0),
                         active_orders=[],  # Will be populated from open_trades
                         status=chain_data.get("status", "ACTIVE"),
-                        created_at=chain_data.get("created_at", datetime.now().isoformat()),
-                        updated_at=chain_data.get("updated_at", datetime.now().isoformat()),
+                        created_at=chain_data.get("created_at", self.clock.now().isoformat()),
+                        updated_at=chain_data.get("updated_at", self.clock.now().isoformat()),
                         profit_targets=self.profit_targets.copy(),
                         multipliers=self.multipliers.copy(),
                         sl_reductions=self.sl_reductions.copy(),
@@ -417,9 +447,8 @@ class ProfitBookingManager:
                     
                     # Find active orders for this chain
                     chain_orders = [
-                        t.trade_id for t in open_trades
-                        if t.profit_chain_id == chain.chain_id
-                        and t.status == "open"
+                        t.trade_id for t in open_trades.by_profit_chain(chain.chain_id)
+                        if t.status == "open"
                     ]
                     chain.active_orders = chain_orders
                     
@@ -443,7 +472,7 @@ class ProfitBookingManager:
         return self.active_chains.copy()
     
     def validate_chain_state(self, chain: ProfitBookingChain, 
-                            open_trades: List[Trade]) -> bool:
+                            open_trades: TradeBook) -> bool:
         """
         Validate chain state integrity
         Returns True if valid, False otherwise
@@ -453,16 +482,21 @@ class ProfitBookingManager:
             if chain.chain_id not in self.active_chains:
                 return False
             
-            # Check if all active orders still exist
-            for order_id in chain.active_orders:
-                order_exists = any(
-                    t.trade_id == order_id and t.status == "open"
-                    for t in open_trades
+            # Check if all active orders still exist - drop the ones closed
+            # elsewhere (SL/TP/reversal) so they are reported once, not every tick
+            missing = [order_id for order_id in chain.active_orders
+                       if (open_trades.get(order_id) is None
+                           or open_trades.get(order_id).status != "open")]
+            for order_id in missing:
+                self.logger.warning(
+                    f"Chain {chain.chain_id} has missing order: {order_id}"
                 )
-                if not order_exists:
-                    self.logger.warning(
-                        f"Chain {chain.chain_id} has missing order: {order_id}"
-                    )
+            if missing:
+                chain.active_orders = [order_id for order_id in chain.active_orders
+                                       if order_id not in missing]
+                if not chain.active_orders:
+                    self.stop_chain(chain.chain_id, "All orders closed outside profit booking")
+                    return False
             
             return True
             
@@ -470,19 +504,22 @@ class ProfitBookingManager:
             self.logger.error(f"Error validating chain state: {str(e)}")
             return False
     
-    def handle_orphaned_orders(self, open_trades: List[Trade]):
+    def handle_orphaned_orders(self, open_trades: TradeBook):
         """
         Handle orders that have profit_chain_id but chain doesn't exist
         """
         try:
-            for trade in open_trades:
-                if trade.profit_chain_id and trade.profit_chain_id not in self.active_chains:
+            for chain_id in open_trades.profit_chain_ids():
+                if chain_id in self.active_chains:
+                    continue
+                for trade in open_trades.by_profit_chain(chain_id):
                     # Orphaned order - clear profit_chain_id
                     trade.profit_chain_id = None
                     trade.profit_level = 0
+                    open_trades.reindex(trade)
                     self.logger.warning(
                         f"Cleared orphaned order: {trade.trade_id} "
-                        f"from missing chain: {trade.profit_chain_id}"
+                        f"from missing chain: {chain_id}"
                     )
         except Exception as e:
             self.logger.error(f"Error handling orphaned orders: {str(e)}")
@@ -1,20 +1,25 @@
 import json
 import os
-from datetime import datetime, date
 from typing import Dict, Any, List
 from src.config import Config
+from src.utils.trade_book import TradeBook
+from src.utils.clock import Clock
 
 class RiskManager:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, stats_file: str = "data/stats.json", clock: Clock = None):
         self.config = config
-        self.stats_file = "data/stats.json"
+        self.stats_file = stats_file
+        self.clock = clock or Clock()
         self.daily_loss = 0.0
         self.lifetime_loss = 0.0
         self.daily_profit = 0.0
         self.total_trades = 0
         self.winning_trades = 0
-        self.open_trades = []
+        self.open_trades = TradeBook()
         self.mt5_client = None
+        self.account_snapshot = None
+        self._lot_tiers_key = None
+        self._lot_tiers = []  # [(tier_balance, lot_size)] highest tier first
         self.load_stats()
         
     def load_stats(self):
@@ -24,7 +29,7 @@ class RiskManager:
                 with open(self.stats_file, 'r') as f:
                     stats = json.load(f)
                     
-                if stats.get("date") != str(date.today()):
+                if stats.get("date") != str(self.clock.now().date()):
                     self.daily_loss = 0.0
                     self.daily_profit = 0.0
                 else:
@@ -64,7 +69,7 @@ class RiskManager:
     def save_stats(self):
         """Save statistics to file"""
         stats = {
-            "date": str(date.today()),
+            "date": str(self.clock.now().date()),
             "daily_loss": self.daily_loss,
             "daily_profit": self.daily_profit,
             "lifetime_loss": self.lifetime_loss,
@@ -87,14 +92,21 @@ class RiskManager:
             return manual_overrides[str(int(balance))]
         
         # Then tier-based sizing
-        fixed_lots = self.config["fixed_lot_sizes"]
-        
-        for tier_balance in sorted(fixed_lots.keys(), key=int, reverse=True):
-            if balance >= int(tier_balance):
-                return fixed_lots[tier_balance]
+        for tier_balance, lot_size in self._sorted_lot_tiers():
+            if balance >= tier_balance:
+                return lot_size
         
         return 0.05  # Default minimum
     
+    def _sorted_lot_tiers(self) -> List:
+        """fixed_lot_sizes as (balance, lot) pairs, re-sorted only when the config changes"""
+        fixed_lots = self.config["fixed_lot_sizes"]
+        key = tuple(fixed_lots.items())
+        if key != self._lot_tiers_key:
+            self._lot_tiers = sorted(((int(tier), lot) for tier, lot in fixed_lots.items()), reverse=True)
+            self._lot_tiers_key = key
+        return self._lot_tiers
+    
     def set_manual_lot_size(self, balance_tier: int, lot_size: float):
         """Manually override lot size for a balance tier"""
         
@@ -103,6 +115,8 @@ class RiskManager:
         
         self.config.config["manual_lot_overrides"][str(balance_tier)] = lot_size
         self.config.save_config()
+        if self.account_snapshot:
+            self.account_snapshot.invalidate()
     
     def get_risk_tier(self, balance: float) -> str:
         """Get risk tier based on account balance"""
@@ -113,16 +127,19 @@ class RiskManager:
     
     def can_trade(self) -> bool:
         """Check if trading is allowed based on risk limits"""
-        if not self.mt5_client:
-            return False
-            
-        account_balance = self.mt5_client.get_account_balance()
-        risk_tier = self.get_risk_tier(account_balance)
+        snapshot = self.account_snapshot.snapshot if self.account_snapshot else None
+        if snapshot is not None:
+            # Tier and caps were worked out when the snapshot was taken - no broker call
+            risk_params = snapshot.risk_params
+        else:
+            if not self.mt5_client:
+                return False
+            risk_params = self.config["risk_tiers"].get(
+                self.get_risk_tier(self.mt5_client.get_account_balance())
+            )
         
-        if risk_tier not in self.config["risk_tiers"]:
+        if risk_params is None:
             return False
-            
-        risk_params = self.config["risk_tiers"][risk_tier]
         
         # Check closed loss limits
         if self.lifetime_loss >= risk_params["max_total_loss"]:
@@ -151,19 +168,26 @@ class RiskManager:
         
         self.save_stats()
     
+    def set_trade_book(self, trade_book: TradeBook):
+        """Share the trading engine's open trade book instead of keeping a copy"""
+        self.open_trades = trade_book
+    
     def add_open_trade(self, trade):
-        """Add trade to open trades list"""
-        self.open_trades.append(trade)
+        """Add trade to the open trade book"""
+        self.open_trades.add(trade)
     
     def remove_open_trade(self, trade):
-        """Remove trade from open trades list"""
-        self.open_trades = [t for t in self.open_trades 
-                          if getattr(t, 'trade_id', None) != getattr(trade, 'trade_id', None)]
+        """Remove trade from the open trade book"""
+        self.open_trades.remove(trade)
     
     def set_mt5_client(self, mt5_client):
         """Set MT5 client for balance checking"""
         self.mt5_client = mt5_client
     
+    def set_account_snapshot(self, account_snapshot):
+        """Read balance/tier from the shared AccountSnapshotService instead of the broker"""
+        self.account_snapshot = account_snapshot
+    
     def validate_dual_orders(self, symbol: str, lot_size: float, 
                             account_balance: float) -> Dict[str, Any]:
         """
@@ -261,12 +285,17 @@ class RiskManager:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get current statistics"""
-        if not self.mt5_client:
+        snapshot = self.account_snapshot.snapshot if self.account_snapshot else None
+        if snapshot is not None:
+            account_balance = snapshot.balance
+            risk_tier = snapshot.risk_tier
+            lot_size = snapshot.lot_size
+        elif self.mt5_client:
+            account_balance = self.mt5_client.get_account_balance()
+            risk_tier = self.get_risk_tier(account_balance)
+            lot_size = self.get_fixed_lot_size(account_balance)
+        else:
             return {}
-            
-        account_balance = self.mt5_client.get_account_balance()
-        risk_tier = self.get_risk_tier(account_balance)
-        lot_size = self.get_fixed_lot_size(account_balance)
         
         if risk_tier not in self.config["risk_tiers"]:
             return {}
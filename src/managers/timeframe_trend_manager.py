@@ -1,13 +1,14 @@
 from typing import Dict, Any, Optional
-from datetime import datetime
 import json
 import os
+from src.utils.clock import Clock
 
 class TimeframeTrendManager:
     """Manage trends per timeframe instead of per logic"""
     
-    def __init__(self, config_file="config/timeframe_trends.json"):
+    def __init__(self, config_file="config/timeframe_trends.json", clock: Clock = None):
         self.config_file = config_file
+        self.clock = clock or Clock()
         self.trends = self.load_trends()
         
     def load_trends(self) -> Dict[str, Any]:
@@ -64,7 +65,7 @@ class TimeframeTrendManager:
         self.trends["symbols"][symbol][timeframe] = {
             "trend": trend,
             "mode": mode,
-            "last_update": datetime.now().isoformat()
+            "last_update": self.clock.now().isoformat()
         }
         self.save_trends()
         print(f"SUCCESS: Trend updated: {symbol} {timeframe} -> {trend} ({mode})")
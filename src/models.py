@@ -1,15 +1,20 @@
 from typing import Dict, Any, Optional, List
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ConfigDict, validator
+from dataclasses import dataclass, fields
 from datetime import datetime
 import json
 
 class Alert(BaseModel):
+    # Immutable once validated: the webhook builds it once and hands it to the engine
+    model_config = ConfigDict(frozen=True)
+    
     type: str  # "bias", "trend", "entry", "reversal", or "exit"
     symbol: str
     signal: str  # "buy", "sell", "bull", "bear", "reversal_bull", "reversal_bear"
     tf: str  # "1h", "15m", "5m", "1d" - REQUIRED FIELD (no default)
     price: Optional[float] = None
     strategy: Optional[str] = None
+    timestamp: Optional[str] = None
     raw_data: Optional[Dict[str, Any]] = None
     
     @validator('type')
@@ -24,7 +29,8 @@ class Alert(BaseModel):
             raise ValueError('Timeframe must be 1h, 15m, 5m, or 1d')
         return v
 
-class Trade(BaseModel):
+class TradeModel(BaseModel):
+    """Validated trade for API/DB boundaries - the engine works on Trade"""
     symbol: str
     entry: float
     sl: float
@@ -36,6 +42,42 @@ class Trade(BaseModel):
     trade_id: Optional[int] = None
     open_time: str
     close_time: Optional[str] = None
+    exit_price: Optional[float] = None
+    pnl: Optional[float] = None
+    
+    # Re-entry tracking
+    chain_id: Optional[str] = None
+    chain_level: int = 1
+    original_entry: Optional[float] = None
+    original_sl_distance: Optional[float] = None
+    is_re_entry: bool = False
+    parent_trade_id: Optional[int] = None
+    
+    # Dual order system tracking
+    order_type: Optional[str] = None  # "TP_TRAIL" or "PROFIT_TRAIL"
+    profit_chain_id: Optional[str] = None  # Link to profit booking chain
+    profit_level: int = 0  # Level in profit booking chain (0-4)
+
+@dataclass(slots=True, kw_only=True)
+class Trade:
+    """
+    Open/closed trade as held by the engine and managers
+    Slotted dataclass: no per-instance __dict__ and no validation on
+    construction or attribute access - it is read on every monitoring pass
+    Same fields as TradeModel; use from_dict/to_model at the boundaries
+    """
+    symbol: str
+    entry: float
+    sl: float
+    tp: float  # Single TP now (1:1 RR)
+    lot_size: float
+    direction: str  # "buy" or "sell"
+    strategy: str  # "LOGIC1", "LOGIC2", "LOGIC3"
+    status: str = "open"  # open, closed
+    trade_id: Optional[int] = None
+    open_time: str
+    close_time: Optional[str] = None
+    exit_price: Optional[float] = None
     pnl: Optional[float] = None
     
     # Re-entry tracking
@@ -64,6 +106,7 @@ class Trade(BaseModel):
             "trade_id": self.trade_id,
             "open_time": self.open_time,
             "close_time": self.close_time,
+            "exit_price": self.exit_price,
             "pnl": self.pnl,
             "chain_id": self.chain_id,
             "chain_level": self.chain_level,
@@ -73,9 +116,20 @@ class Trade(BaseModel):
             "profit_level": self.profit_level
         }
     
+    def to_model(self) -> TradeModel:
+        """Validated copy for API/DB boundaries"""
+        return TradeModel(**{name: getattr(self, name) for name in TRADE_FIELDS})
+    
+    @classmethod
+    def from_model(cls, model: TradeModel) -> "Trade":
+        return cls(**{name: getattr(model, name) for name in TRADE_FIELDS})
+    
     @classmethod
     def from_dict(cls, data):
-        return cls(**data)
+        """Build from external data - validated once by TradeModel"""
+        return cls.from_model(TradeModel(**data))
+
+TRADE_FIELDS = tuple(field.name for field in fields(Trade))
 
 class ReEntryChain(BaseModel):
     chain_id: str
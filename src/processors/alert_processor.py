@@ -1,108 +1,122 @@
-from typing import Dict, Any, List, Optional
+import logging
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from src.config import Config
 from src.models import Alert
+from src.utils.expiring_index import ExpiringIndex
+from src.utils.clock import Clock
+
+logger = logging.getLogger(__name__)
+
+# State updates applied before anything else in the same batch (entries read the trend)
+STATE_ALERT_TYPES = ('bias', 'trend')
 
 class AlertProcessor:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, clock: Clock = None):
         self.config = config
-        self.recent_alerts: List[Alert] = []
+        self.clock = clock or Clock()
         self.alert_window = timedelta(minutes=5)
+        # (type, symbol, tf, signal) -> Alert, expiring alert_window after the alert's timestamp
+        self.recent_alerts = ExpiringIndex(self.alert_window.total_seconds(), clock=self.clock.monotonic)
     
     def validate_alert(self, alert_data: Dict[str, Any]) -> bool:
         """Validate incoming alert"""
+        return self.parse_alert(alert_data) is not None
+    
+    def parse_alert(self, alert_data: Dict[str, Any]) -> Optional[Alert]:
+        """
+        Validate an incoming alert payload once and return it as an immutable Alert
+        Returns None if the alert is invalid or a duplicate
+        """
         try:
-            print(f"ALERT: Received alert: {alert_data}")
+            logger.debug("Alert received: %s", alert_data)
             
             # Add timestamp if not present
             if 'timestamp' not in alert_data:
-                alert_data['timestamp'] = datetime.now().isoformat()
+                alert_data['timestamp'] = self.clock.now().isoformat()
             
             # NO DEFAULT TF FIELD - tf field is REQUIRED
             # If tf missing, Alert() will raise ValidationError
+            alert = Alert(**alert_data)
             
-            # Store raw_data properly
-            alert = Alert(**alert_data, raw_data=alert_data)
+            # Parse the timestamp once: remaining dedup lifetime = window - alert age
+            alert_age = (self.clock.now() - self._parse_timestamp(alert_data['timestamp'])).total_seconds()
             
             # Clean old alerts BEFORE checking for duplicates
             self.clean_old_alerts()
             
             # Check if alert is duplicate
             if self.is_duplicate_alert(alert):
-                print("ERROR: Duplicate alert detected")
-                return False
+                logger.info("Alert rejected reason=duplicate type=%s symbol=%s tf=%s signal=%s",
+                            alert.type, alert.symbol, alert.tf, alert.signal)
+                return None
                 
             # Check if symbol is valid
             if not self.is_valid_symbol(alert.symbol):
-                print(f"ERROR: Invalid symbol: {alert.symbol}")
-                return False
+                logger.warning("Alert rejected reason=invalid_symbol symbol=%s", alert.symbol)
+                return None
                 
             # Check if timeframe is valid
             if alert.tf not in ['1h', '15m', '5m', '1d']:
-                print(f"ERROR: Invalid timeframe: {alert.tf}")
-                return False
+                logger.warning("Alert rejected reason=invalid_tf tf=%s", alert.tf)
+                return None
                 
             # Check if signal type is valid
-            if alert.type == 'bias' or alert.type == 'trend':
-                if alert.signal not in ['bull', 'bear']:
-                    print(f"ERROR: Invalid signal for {alert.type}: {alert.signal}")
-                    return False
-            elif alert.type == 'entry':
-                if alert.signal not in ['buy', 'sell']:
-                    print(f"ERROR: Invalid signal for {alert.type}: {alert.signal}")
-                    return False
-            elif alert.type == 'reversal':
-                if alert.signal not in ['reversal_bull', 'reversal_bear', 'bull', 'bear']:
-                    print(f"ERROR: Invalid signal for {alert.type}: {alert.signal}")
-                    return False
-            elif alert.type == 'exit':
-                if alert.signal not in ['bull', 'bear']:
-                    print(f"ERROR: Invalid signal for {alert.type}: {alert.signal}")
-                    return False
+            valid_signals = {
+                'bias': ['bull', 'bear'],
+                'trend': ['bull', 'bear'],
+                'entry': ['buy', 'sell'],
+                'reversal': ['reversal_bull', 'reversal_bear', 'bull', 'bear'],
+                'exit': ['bull', 'bear']
+            }
+            if alert.signal not in valid_signals.get(alert.type, [alert.signal]):
+                logger.warning("Alert rejected reason=invalid_signal type=%s signal=%s", alert.type, alert.signal)
+                return None
                     
             # Store alert
-            self.recent_alerts.append(alert)
+            self.recent_alerts.add(self._alert_key(alert), alert,
+                                   ttl=self.alert_window.total_seconds() - max(alert_age, 0.0))
             
-            print("SUCCESS: Alert validation successful")
-            return True
+            logger.debug("Alert accepted type=%s symbol=%s tf=%s signal=%s",
+                         alert.type, alert.symbol, alert.tf, alert.signal)
+            return alert
             
         except Exception as e:
-            print(f"ERROR: Alert validation error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return False
+            logger.warning("Alert rejected reason=validation_error error=%s", e)
+            return None
     
-    def is_duplicate_alert(self, alert: Alert) -> bool:
-        """Check if this is a duplicate alert"""
-        # Get incoming alert's timestamp
-        incoming_timestamp = datetime.now()
-        if alert.raw_data and isinstance(alert.raw_data, dict):
-            timestamp_str = alert.raw_data.get('timestamp')
-            if timestamp_str:
-                try:
-                    incoming_timestamp = datetime.fromisoformat(timestamp_str)
-                except (ValueError, TypeError):
-                    pass
+    def parse_batch(self, items: List[Any]) -> List[Tuple[int, Optional[Alert]]]:
+        """
+        Validate a batch of alert payloads together
+        Returns (original index, Alert or None) with bias/trend updates first and
+        everything else in arrival order
+        """
+        def priority(index):
+            item = items[index]
+            return 0 if isinstance(item, dict) and item.get('type') in STATE_ALERT_TYPES else 1
         
-        for recent_alert in self.recent_alerts:
-            # Skip alerts older than alert_window relative to incoming alert
-            if recent_alert.raw_data and isinstance(recent_alert.raw_data, dict):
-                recent_timestamp_str = recent_alert.raw_data.get('timestamp')
-                if recent_timestamp_str:
-                    try:
-                        recent_alert_time = datetime.fromisoformat(recent_timestamp_str)
-                        if incoming_timestamp - recent_alert_time >= self.alert_window:
-                            continue  # Skip old alerts (>5 min apart)
-                    except (ValueError, TypeError):
-                        pass  # If timestamp invalid, still check for duplicate
-            
-            if (recent_alert.type == alert.type and
-                recent_alert.symbol == alert.symbol and
-                recent_alert.tf == alert.tf and
-                recent_alert.signal == alert.signal):
-                return True
-                
-        return False
+        return [
+            (index, self.parse_alert(items[index]) if isinstance(items[index], dict) else None)
+            for index in sorted(range(len(items)), key=priority)
+        ]
+    
+    @staticmethod
+    def _alert_key(alert: Alert) -> tuple:
+        return (alert.type, alert.symbol, alert.tf, alert.signal)
+    
+    def _parse_timestamp(self, timestamp_str: Any) -> datetime:
+        """ISO timestamp as local naive datetime (now if missing or invalid)"""
+        try:
+            parsed = datetime.fromisoformat(timestamp_str)
+        except (ValueError, TypeError):
+            return self.clock.now()
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+    
+    def is_duplicate_alert(self, alert: Alert) -> bool:
+        """Check if this is a duplicate alert (same type/symbol/tf/signal still inside the window)"""
+        return self.recent_alerts.contains(self._alert_key(alert))
     
     def is_valid_symbol(self, symbol: str) -> bool:
         """Check if symbol is valid for trading"""
@@ -112,34 +126,11 @@ class AlertProcessor:
     
     def clean_old_alerts(self):
         """Remove alerts older than the alert window"""
-        try:
-            current_time = datetime.now()
-            cleaned_alerts = []
-            
-            for alert in self.recent_alerts:
-                timestamp_str = None
-                
-                if alert.raw_data and isinstance(alert.raw_data, dict):
-                    timestamp_str = alert.raw_data.get('timestamp')
-                
-                if timestamp_str:
-                    try:
-                        alert_time = datetime.fromisoformat(timestamp_str)
-                        if current_time - alert_time < self.alert_window:
-                            cleaned_alerts.append(alert)
-                    except (ValueError, TypeError):
-                        cleaned_alerts.append(alert)
-                else:
-                    cleaned_alerts.append(alert)
-            
-            self.recent_alerts = cleaned_alerts
-            
-        except Exception as e:
-            print(f"WARNING: Error cleaning alerts: {str(e)}")
+        self.recent_alerts.expire()
     
     def get_recent_alerts(self, alert_type: Optional[str] = None, symbol: Optional[str] = None, tf: Optional[str] = None) -> List[Alert]:
         """Get recent alerts filtered by type, symbol, or timeframe"""
-        filtered = self.recent_alerts
+        filtered = list(self.recent_alerts.values())
         
         if alert_type:
             filtered = [alert for alert in filtered if alert.type == alert_type]
@@ -150,4 +141,8 @@ class AlertProcessor:
         if tf:
             filtered = [alert for alert in filtered if alert.tf == tf]
             
-        return filtered
\ No newline at end of file
+        return filtered
+    
+    def get_dedup_stats(self) -> Dict[str, Any]:
+        """Dedup index size and duplicate hit rate"""
+        return self.recent_alerts.get_stats()
@@ -0,0 +1,223 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Optional
+from src.config import Config
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.managers.risk_manager import RiskManager
+from src.utils.clock import Clock
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    """Account state plus the risk decisions derived from it"""
+    balance: float
+    equity: float
+    margin: float
+    free_margin: float
+    risk_tier: str
+    lot_size: float
+    risk_params: Optional[Dict[str, Any]]  # None if the tier has no risk_tiers entry
+    fetched_at: float  # clock.monotonic()
+    taken_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    clock: Clock = field(default_factory=Clock, repr=False, compare=False)
+
+    @property
+    def age(self) -> float:
+        return self.clock.monotonic() - self.fetched_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "balance": self.balance,
+            "equity": self.equity,
+            "margin": self.margin,
+            "free_margin": self.free_margin,
+            "risk_tier": self.risk_tier,
+            "lot_size": self.lot_size,
+            "risk_params": self.risk_params,
+            "taken_at": self.taken_at,
+            "age_ms": self.age * 1000
+        }
+
+class AccountSnapshotService:
+    """
+    Cached account snapshot shared by every entry path
+    - One account_info() round trip fills balance, equity, margin and free margin;
+      risk tier, lot size and loss caps are worked out once per snapshot
+    - Refreshed at most once per TTL, and straight after a trade opens or
+      closes (TradeBook listener); a background task keeps it warm so entry
+      decisions read it without waiting on the broker
+    - get() only waits for the very first snapshot (or when asked for a
+      max_age); a dirty or expired one is served while the refresh runs
+    - Concurrent refreshes share one in-flight request; a failed refresh keeps
+      the previous snapshot
+    """
+
+    def __init__(self, async_mt5_client: AsyncMT5Client, risk_manager: RiskManager, config: Config,
+                 clock: Clock = None):
+        self.async_mt5_client = async_mt5_client
+        self.risk_manager = risk_manager
+        self.config = config
+        self.clock = clock or Clock()  # TTL, refresh loop and snapshot timestamps
+
+        snapshot_config = config.get("account_snapshot_config", {})
+        self.ttl = snapshot_config.get("ttl_seconds", 5.0)
+
+        self.snapshot: Optional[AccountSnapshot] = None
+        self.dirty = True
+        self.in_flight: Optional[asyncio.Future] = None
+        self.background: Optional[asyncio.Task] = None  # one-off refresh when the loop is not running
+
+        self.is_running = False
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.changed: Optional[asyncio.Event] = None
+
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "refreshes": 0,
+            "coalesced": 0,
+            "failures": 0,
+            "trade_events": 0
+        }
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.snapshot is not None and not self.dirty and self.snapshot.age < self.ttl
+
+    async def get(self, max_age: Optional[float] = None) -> Optional[AccountSnapshot]:
+        """
+        Last good snapshot, without a broker round trip
+        Waits only when there is no snapshot yet, or when max_age is given and
+        the snapshot is dirty or older than that; otherwise a stale snapshot is
+        served and refreshed in the background
+        """
+        if self.snapshot is None:
+            return await self.refresh()
+        if max_age is not None and (self.dirty or self.snapshot.age > max_age):
+            return await self.refresh()
+
+        self.stats["hits"] += 1
+        if not self.is_fresh:
+            self.stats["stale_hits"] += 1
+            self._refresh_in_background()
+        return self.snapshot
+
+    def _refresh_in_background(self):
+        # The refresh loop already reacts to trade events and TTL expiry
+        if self.is_running or self.in_flight is not None:
+            return
+        if self.background is None or self.background.done():
+            self.background = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"ERROR: Account snapshot refresh error: {str(e)}")
+
+    async def refresh(self) -> Optional[AccountSnapshot]:
+        """Fetch account info now, bypassing the TTL"""
+        if self.in_flight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self.in_flight)
+
+        self.in_flight = asyncio.get_running_loop().create_future()
+        pending = self.in_flight
+        try:
+            self.dirty = False  # trade events during the fetch mark it dirty again
+            self.stats["refreshes"] += 1
+            info = await self.async_mt5_client.get_account_info()
+            if info:
+                self.snapshot = self.build(info)
+            else:
+                self.stats["failures"] += 1
+                self.dirty = True
+            pending.set_result(self.snapshot)
+            return self.snapshot
+        finally:
+            if not pending.done():
+                pending.set_result(self.snapshot)
+            self.in_flight = None
+
+    def build(self, info: Dict[str, float]) -> AccountSnapshot:
+        """Derive tier, lot size and caps from raw account info"""
+        balance = info["balance"]
+        risk_tier = self.risk_manager.get_risk_tier(balance)
+        return AccountSnapshot(
+            balance=balance,
+            equity=info.get("equity", balance),
+            margin=info.get("margin", 0.0),
+            free_margin=info.get("free_margin", balance),
+            risk_tier=risk_tier,
+            lot_size=self.risk_manager.get_fixed_lot_size(balance),
+            risk_params=self.config.get("risk_tiers", {}).get(risk_tier),
+            fetched_at=self.clock.monotonic(),
+            taken_at=self.clock.now().isoformat(),
+            clock=self.clock
+        )
+
+    def invalidate(self):
+        """Force a refresh (trade opened/closed, lot settings changed)"""
+        self.dirty = True
+        if self.changed:
+            self.changed.set()
+
+    # TradeBook listener - margin and balance move when positions open or close
+    def track(self, trade):
+        self.stats["trade_events"] += 1
+        self.invalidate()
+
+    def untrack(self, trade):
+        self.stats["trade_events"] += 1
+        self.invalidate()
+
+    async def start(self):
+        """Take the first snapshot and keep it warm in the background"""
+        if self.is_running:
+            return
+
+        await self.refresh()
+        self.is_running = True
+        self.changed = asyncio.Event()
+        self.refresh_task = asyncio.create_task(self._refresh_loop())
+        print("SUCCESS: Account snapshot service started")
+
+    async def stop(self):
+        self.is_running = False
+        if self.background and not self.background.done():
+            self.background.cancel()
+        self.background = None
+        if self.refresh_task:
+            self.refresh_task.cancel()
+            try:
+                await self.refresh_task
+            except asyncio.CancelledError:
+                pass
+            self.refresh_task = None
+
+    async def _refresh_loop(self):
+        while self.is_running:
+            try:
+                self.changed.clear()
+                if not self.is_fresh:
+                    await self.refresh()
+                timeout = self.ttl - self.snapshot.age if self.snapshot and not self.dirty else self.ttl
+                try:
+                    await self.clock.wait_for(self.changed.wait(), max(timeout, 0.0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"ERROR: Account snapshot refresh error: {str(e)}")
+                await self.clock.sleep(self.ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hits vs broker refreshes and the current snapshot"""
+        lookups = self.stats["hits"] + self.stats["refreshes"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "ttl_seconds": self.ttl,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "snapshot": self.snapshot.to_dict() if self.snapshot else None
+        }
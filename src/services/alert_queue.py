@@ -0,0 +1,192 @@
+import asyncio
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from src.config import Config
+from src.models import Alert
+from src.utils.clock import Clock
+
+class AlertQueue:
+    """
+    Bounded asynchronous alert queue with per-symbol ordering
+    - submit() only enqueues, so the webhook can answer immediately
+    - Each symbol has its own FIFO; a symbol is handed to at most one worker at a
+      time, so alerts for one symbol run strictly in order while different
+      symbols are processed concurrently by the worker pool
+    - submit() refuses new alerts once max_queue_size are pending (backpressure)
+    - The outcome of recent alerts is kept for the status endpoint
+    """
+
+    def __init__(self, handler: Callable[[Alert], Awaitable[bool]], config: Config, clock: Clock = None):
+        self.handler = handler
+        self.config = config
+        self.clock = clock or Clock()  # status timestamps and the shutdown drain timeout
+
+        queue_config = config.get("alert_queue_config", {})
+        self.enabled = queue_config.get("enabled", True)
+        self.worker_count = queue_config.get("workers", 8)
+        self.max_queue_size = queue_config.get("max_queue_size", 1000)
+        self.status_retention = queue_config.get("status_retention", 1000)
+        self.drain_timeout = queue_config.get("shutdown_drain_seconds", 10.0)
+
+        self.pending: Dict[str, Deque[tuple]] = {}  # symbol -> deque of (alert_id, alert)
+        self.ready: Optional[asyncio.Queue] = None  # symbols with pending alerts and no active worker
+        self.active_symbols = set()
+        self.depth = 0
+        self.statuses: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        self.is_running = False
+        self.workers = []
+        self.idle: Optional[asyncio.Event] = None
+
+        self.stats = {
+            "accepted": 0,
+            "rejected_full": 0,
+            "processed": 0,
+            "failed": 0,
+            "errors": 0,
+            "max_depth": 0,
+            "max_wait_ms": 0.0
+        }
+
+    async def start(self):
+        """Start the worker pool on the running event loop"""
+        if self.is_running or not self.enabled:
+            return
+
+        self.is_running = True
+        self.ready = asyncio.Queue()
+        self.idle = asyncio.Event()
+        if self.depth == 0:
+            self.idle.set()
+        # Alerts submitted before start() are picked up now
+        for symbol, alerts in self.pending.items():
+            if alerts:
+                self.ready.put_nowait(symbol)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        print(f"SUCCESS: Alert queue started ({self.worker_count} workers)")
+
+    async def stop(self):
+        """Let queued alerts finish (up to the drain timeout), then stop the workers"""
+        if not self.is_running:
+            return
+        if self.depth:
+            try:
+                await self.clock.wait_for(self.idle.wait(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"WARNING: Alert queue stopped with {self.depth} alerts unprocessed")
+
+        self.is_running = False
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def has_capacity(self, count: int = 1) -> bool:
+        """False (and counted as a rejection) if count more alerts would exceed max_queue_size"""
+        if self.depth + count > self.max_queue_size:
+            self.stats["rejected_full"] += count
+            return False
+        return True
+
+    def submit(self, alert: Alert) -> Optional[str]:
+        """Queue an alert; returns its id, or None if the queue is full"""
+        if not self.has_capacity():
+            return None
+
+        alert_id = uuid.uuid4().hex[:16]
+        symbol_queue = self.pending.setdefault(alert.symbol, deque())
+        symbol_queue.append((alert_id, alert))
+        self.depth += 1
+        self.stats["accepted"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.depth)
+        self._set_status(alert_id, {
+            "status": "queued",
+            "symbol": alert.symbol,
+            "type": alert.type,
+            "signal": alert.signal,
+            "tf": alert.tf,
+            "enqueued_at": self.clock.time()
+        })
+
+        if self.idle:
+            self.idle.clear()
+        # Only hand the symbol to the pool if no worker owns it and it was not already waiting
+        if self.ready is not None and alert.symbol not in self.active_symbols and len(symbol_queue) == 1:
+            self.ready.put_nowait(alert.symbol)
+        return alert_id
+
+    def get_status(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        status = self.statuses.get(alert_id)
+        if status is None:
+            return None
+        status = dict(status)
+        if status["status"] == "queued":
+            status["position"] = next(
+                (i for i, (queued_id, _) in enumerate(self.pending.get(status["symbol"], ())) if queued_id == alert_id),
+                None
+            )
+        return status
+
+    def _set_status(self, alert_id: str, status: Dict[str, Any]):
+        self.statuses[alert_id] = status
+        # Forget the oldest finished alerts beyond the retention limit
+        while len(self.statuses) > self.status_retention:
+            oldest_id, oldest = next(iter(self.statuses.items()))
+            if oldest["status"] in ("queued", "processing"):
+                break
+            del self.statuses[oldest_id]
+
+    async def _worker(self):
+        while self.is_running:
+            try:
+                symbol = await self.ready.get()
+            except asyncio.CancelledError:
+                break
+
+            symbol_queue = self.pending.get(symbol)
+            if not symbol_queue:
+                continue
+
+            self.active_symbols.add(symbol)
+            alert_id, alert = symbol_queue.popleft()
+            status = self.statuses.get(alert_id, {})
+            started = self.clock.time()
+            wait_ms = (started - status.get("enqueued_at", started)) * 1000
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+            status.update({"status": "processing", "started_at": started})
+
+            try:
+                result = await self.handler(alert)
+                status["status"] = "processed" if result else "failed"
+                self.stats["processed" if result else "failed"] += 1
+            except asyncio.CancelledError:
+                status["status"] = "cancelled"
+                raise
+            except Exception as e:
+                status.update({"status": "error", "error": str(e)})
+                self.stats["errors"] += 1
+                print(f"ERROR: Alert queue handler error ({symbol}): {str(e)}")
+            finally:
+                status["finished_at"] = self.clock.time()
+                status["processing_ms"] = (status["finished_at"] - started) * 1000
+                self.depth -= 1
+                self.active_symbols.discard(symbol)
+                if symbol_queue:
+                    # Next alert for this symbol goes to the back of the line (fair across symbols)
+                    self.ready.put_nowait(symbol)
+                else:
+                    del self.pending[symbol]
+                if self.depth == 0:
+                    self.idle.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self.is_running,
+            **self.stats,
+            "depth": self.depth,
+            "max_queue_size": self.max_queue_size,
+            "symbols_pending": {symbol: len(alerts) for symbol, alerts in self.pending.items() if alerts},
+            "symbols_active": len(self.active_symbols)
+        }
@@ -0,0 +1,199 @@
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional
+from src.config import Config
+
+def position_pnl(entry, price, sign, lot_size, pip_size, pip_value_per_std_lot):
+    """
+    PnL in account currency: pips moved x pip value per standard lot x lots
+    The one PnL formula of the bot - works on scalars and NumPy arrays alike
+    """
+    return (price - entry) * sign / pip_size * pip_value_per_std_lot * lot_size
+
+class ExposureEngine:
+    """
+    Columnar view of every open position for vectorized PnL and exposure
+    - One row per open trade: entry, SL, lot, direction sign, pip size and
+      pip value, plus symbol and profit chain codes
+    - Rows are kept dense (removal moves the last row into the hole), so
+      track/untrack are O(1) and a price snapshot is one NumPy pass
+    - Subscribed to the TradeBook, so it always holds exactly the open trades
+    Margin-at-risk is the loss each position takes if its SL is hit
+    """
+
+    COLUMNS = ("entry", "sl", "lot", "sign", "pip_size", "pip_value")
+
+    def __init__(self, config: Config, capacity: int = 64):
+        self.config = config
+        self.size = 0
+        self.columns = {name: np.zeros(capacity) for name in self.COLUMNS}
+        self.symbol_code = np.zeros(capacity, dtype=np.int32)
+        self.chain_code = np.full(capacity, -1, dtype=np.int32)
+        self.rows: Dict[int, int] = {}  # id(trade) -> row
+        self.trades: List[Any] = []  # row -> trade
+        self.symbols: Dict[str, int] = {}
+        self.chains: Dict[str, int] = {}
+        self.chain_ids: Dict[int, str] = {}
+        self.chain_refs: Dict[int, int] = {}
+        self.free_chain_codes: List[int] = []
+
+    def _grow(self):
+        capacity = len(self.symbol_code) * 2
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        symbol_code = np.zeros(capacity, dtype=np.int32)
+        symbol_code[:self.size] = self.symbol_code[:self.size]
+        chain_code = np.full(capacity, -1, dtype=np.int32)
+        chain_code[:self.size] = self.chain_code[:self.size]
+        self.symbol_code, self.chain_code = symbol_code, chain_code
+
+    def _symbol_params(self, symbol: str):
+        symbol_config = self.config["symbol_config"][symbol]
+        return symbol_config["pip_size"], symbol_config["pip_value_per_std_lot"]
+
+    def _chain_code(self, chain_id: Optional[str]) -> int:
+        if not chain_id:
+            return -1
+        code = self.chains.get(chain_id)
+        if code is None:
+            code = self.free_chain_codes.pop() if self.free_chain_codes else len(self.chains)
+            self.chains[chain_id] = code
+            self.chain_ids[code] = chain_id
+        self.chain_refs[code] = self.chain_refs.get(code, 0) + 1
+        return code
+
+    def _release_chain(self, code: int):
+        if code < 0:
+            return
+        self.chain_refs[code] -= 1
+        if self.chain_refs[code] == 0:
+            del self.chain_refs[code]
+            del self.chains[self.chain_ids.pop(code)]
+            self.free_chain_codes.append(code)
+
+    def track(self, trade):
+        """Add an open trade (TradeBook listener hook)"""
+        key = id(trade)
+        if key in self.rows:
+            return
+        if self.size == len(self.symbol_code):
+            self._grow()
+
+        row = self.size
+        pip_size, pip_value = self._symbol_params(trade.symbol)
+        values = {
+            "entry": trade.entry, "sl": trade.sl, "lot": trade.lot_size,
+            "sign": 1.0 if trade.direction == "buy" else -1.0,
+            "pip_size": pip_size, "pip_value": pip_value
+        }
+        for name, value in values.items():
+            self.columns[name][row] = value
+        self.symbol_code[row] = self.symbols.setdefault(trade.symbol, len(self.symbols))
+        self.chain_code[row] = self._chain_code(trade.profit_chain_id)
+
+        self.rows[key] = row
+        self.trades.append(trade)
+        self.size += 1
+
+    def untrack(self, trade):
+        """Drop a closed trade (TradeBook listener hook)"""
+        row = self.rows.pop(id(trade), None)
+        if row is None:
+            return
+        self._release_chain(int(self.chain_code[row]))
+
+        last = self.size - 1
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            self.symbol_code[row] = self.symbol_code[last]
+            self.chain_code[row] = self.chain_code[last]
+            moved = self.trades[last]
+            self.trades[row] = moved
+            self.rows[id(moved)] = row
+        self.trades.pop()
+        self.chain_code[last] = -1
+        self.size = last
+
+    def trade_pips(self, trade, price: float) -> float:
+        """Pips moved in the trade's favour at price"""
+        pip_size, _ = self._symbol_params(trade.symbol)
+        sign = 1.0 if trade.direction == "buy" else -1.0
+        return (price - trade.entry) * sign / pip_size
+
+    def trade_pnl(self, trade, price: float) -> float:
+        """PnL of one trade at price (tracked or not)"""
+        pip_size, pip_value = self._symbol_params(trade.symbol)
+        sign = 1.0 if trade.direction == "buy" else -1.0
+        return float(position_pnl(trade.entry, price, sign, trade.lot_size, pip_size, pip_value))
+
+    def positions_pnl(self, trades: Iterable, price: float) -> float:
+        """Combined PnL of same-symbol trades at one price, vectorized over their rows"""
+        rows = []
+        total = 0.0
+        for trade in trades:
+            row = self.rows.get(id(trade))
+            if row is None:
+                total += self.trade_pnl(trade, price)
+            else:
+                rows.append(row)
+        if rows:
+            c = {name: column[rows] for name, column in self.columns.items()}
+            total += float(position_pnl(c["entry"], price, c["sign"], c["lot"],
+                                        c["pip_size"], c["pip_value"]).sum())
+        return total
+
+    def snapshot(self, prices: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Unrealized PnL, per-chain sums, per-symbol net exposure and
+        margin-at-risk for all open positions in one pass
+        Positions whose symbol has no (non-zero) price are left unpriced
+        """
+        n = self.size
+        c = {name: column[:n] for name, column in self.columns.items()}
+        symbol_code = self.symbol_code[:n]
+        chain_code = self.chain_code[:n]
+        names = list(self.symbols)
+
+        price_by_code = np.full(len(names), np.nan)
+        for symbol, price in prices.items():
+            code = self.symbols.get(symbol)
+            if code is not None and price:
+                price_by_code[code] = price
+        price = price_by_code[symbol_code]
+        priced = ~np.isnan(price)
+
+        pnl = np.where(priced, position_pnl(c["entry"], price, c["sign"], c["lot"],
+                                            c["pip_size"], c["pip_value"]), 0.0)
+        at_risk = np.abs(c["entry"] - c["sl"]) / c["pip_size"] * c["pip_value"] * c["lot"]
+
+        bins = len(names)
+        positions = np.bincount(symbol_code, minlength=bins)
+        net_lots = np.bincount(symbol_code, weights=c["sign"] * c["lot"], minlength=bins)
+        symbol_pnl = np.bincount(symbol_code, weights=pnl, minlength=bins)
+        symbol_risk = np.bincount(symbol_code, weights=at_risk, minlength=bins)
+
+        in_chain = chain_code >= 0
+        chain_pnl = np.bincount(chain_code[in_chain], weights=pnl[in_chain],
+                                minlength=len(self.chains) + len(self.free_chain_codes))
+
+        return {
+            "positions": n,
+            "priced_positions": int(priced.sum()),
+            "unrealized_pnl": float(pnl.sum()),
+            "margin_at_risk": float(at_risk.sum()),
+            "symbols": {
+                symbol: {
+                    "positions": int(positions[code]),
+                    "net_lots": round(float(net_lots[code]), 6),
+                    "unrealized_pnl": float(symbol_pnl[code]),
+                    "margin_at_risk": float(symbol_risk[code])
+                }
+                for symbol, code in self.symbols.items() if positions[code]
+            },
+            "chains": {chain_id: float(chain_pnl[code]) for chain_id, code in self.chains.items()}
+        }
+
+    def __len__(self) -> int:
+        return self.size
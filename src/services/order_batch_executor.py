@@ -0,0 +1,132 @@
+import asyncio
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from src.config import Config
+from src.clients.async_mt5_client import AsyncMT5Client, LATENCY_BUCKETS_MS
+
+@dataclass
+class OrderRequest:
+    """One market order of a batch"""
+    symbol: str
+    direction: str  # "buy" or "sell"
+    lot_size: float
+    price: float
+    sl: float
+    tp: Optional[float] = None
+    comment: str = ""
+
+@dataclass
+class BatchResult:
+    """Per-order outcome of a batch, known only once every order has settled"""
+    closed: List[Any] = field(default_factory=list)
+    close_failed: List[Any] = field(default_factory=list)
+    opened: List[Tuple[OrderRequest, int]] = field(default_factory=list)
+    open_failed: List[OrderRequest] = field(default_factory=list)
+    latencies_ms: List[float] = field(default_factory=list)  # submit-to-fill, in submission order
+
+    @property
+    def complete(self) -> bool:
+        return not self.close_failed and not self.open_failed
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "closed": len(self.closed),
+            "close_failed": len(self.close_failed),
+            "opened": len(self.opened),
+            "open_failed": len(self.open_failed),
+            "max_latency_ms": round(max(self.latencies_ms), 1) if self.latencies_ms else 0.0
+        }
+
+class BatchOrderExecutor:
+    """
+    Submits a group of closes and opens as one pipelined batch
+    - Every order is handed to the MT5 worker in the same event-loop step, so
+      they run back to back on the single terminal thread (closes first, then
+      opens) with no round trip through the loop between fills and no other
+      caller's request interleaved
+    - Failures never abort the rest; orders are never abandoned on timeout
+      (AsyncMT5Client waits for the broker's answer and starts each order's
+      timeout when the worker picks it up), so a leg queued behind a large
+      level is not reported failed while it can still fill
+    - Submit-to-fill latency is recorded per order (the spread between the
+      first and last fill is what later orders of a level pay in slippage)
+    """
+
+    def __init__(self, async_mt5_client: AsyncMT5Client, config: Config):
+        self.async_mt5_client = async_mt5_client
+        self.config = config
+        self.stats = {
+            "batches": 0,
+            "orders": 0,
+            "failed": 0,
+            "partial_batches": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        }
+
+    async def _timed(self, call, submitted: float):
+        result = await call
+        return result, (time.perf_counter() - submitted) * 1000
+
+    async def _simulated_close(self):
+        return True
+
+    async def execute(self, closes: List[Any], opens: List[OrderRequest]) -> BatchResult:
+        """Close the given trades and place the given orders in one batch"""
+        simulate = self.config.get("simulate_orders", False)
+        submitted = time.perf_counter()
+        calls = []
+        for trade in closes:
+            if simulate or not trade.trade_id:
+                calls.append(self._timed(self._simulated_close(), submitted))
+            else:
+                calls.append(self._timed(self.async_mt5_client.close_position(trade.trade_id), submitted))
+        for request in opens:
+            calls.append(self._timed(self.async_mt5_client.place_order(
+                symbol=request.symbol, order_type=request.direction, lot_size=request.lot_size,
+                price=request.price, sl=request.sl, tp=request.tp, comment=request.comment
+            ), submitted))
+
+        outcomes = await asyncio.gather(*calls)
+
+        result = BatchResult()
+        for trade, (success, elapsed_ms) in zip(closes, outcomes):
+            (result.closed if success else result.close_failed).append(trade)
+            result.latencies_ms.append(elapsed_ms)
+        for request, (ticket, elapsed_ms) in zip(opens, outcomes[len(closes):]):
+            if ticket:
+                result.opened.append((request, ticket))
+            else:
+                result.open_failed.append(request)
+            result.latencies_ms.append(elapsed_ms)
+
+        self._record(result)
+        return result
+
+    def _record(self, result: BatchResult):
+        self.stats["batches"] += 1
+        self.stats["orders"] += len(result.latencies_ms)
+        self.stats["failed"] += len(result.close_failed) + len(result.open_failed)
+        if not result.complete:
+            self.stats["partial_batches"] += 1
+        for elapsed_ms in result.latencies_ms:
+            self.stats["total_ms"] += elapsed_ms
+            self.stats["max_ms"] = max(self.stats["max_ms"], elapsed_ms)
+            self.stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch counts, failures and the submit-to-fill latency histogram"""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        orders = self.stats["orders"]
+        return {
+            "batches": self.stats["batches"],
+            "orders": orders,
+            "failed": self.stats["failed"],
+            "partial_batches": self.stats["partial_batches"],
+            "avg_ms": (self.stats["total_ms"] / orders) if orders else 0.0,
+            "max_ms": self.stats["max_ms"],
+            "histogram": dict(zip(labels, self.stats["buckets"]))
+        }
@@ -0,0 +1,119 @@
+import asyncio
+from typing import Dict, Any, Iterable, Optional
+from src.config import Config
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.utils.clock import Clock
+
+class PriceCache:
+    """
+    Shared bid/ask snapshot per symbol, refreshed at most once per TTL
+    - Every monitor (trade manager, price monitor, profit booking, exit strategies)
+      reads from the same snapshot, so broker calls scale with symbols, not trades
+    - Concurrent misses for one symbol share a single in-flight broker request
+    - Failed fetches are not cached; the next caller retries
+    """
+
+    def __init__(self, async_mt5_client: AsyncMT5Client, config: Config, clock: Clock = None):
+        self.async_mt5_client = async_mt5_client
+        self.config = config
+        self.clock = clock or Clock()  # TTL and snapshot ages
+
+        cache_config = config.get("price_cache_config", {})
+        self.ttl = cache_config.get("ttl_seconds", 1.0)
+
+        self.snapshots: Dict[str, Dict[str, float]] = {}  # symbol -> {"bid", "ask", "mid", "fetched_at"}
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "broker_calls": 0,
+            "fetch_failures": 0
+        }
+        self.served_age_total = 0.0  # Sum of snapshot ages at hit time (staleness)
+        self.served_age_max = 0.0
+
+    async def get_tick(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Bid/ask snapshot no older than the TTL (None if the broker has no tick)"""
+        snapshot = self.snapshots.get(symbol)
+        if snapshot is not None:
+            age = self.clock.monotonic() - snapshot["fetched_at"]
+            if age <= self.ttl:
+                self.stats["hits"] += 1
+                self.served_age_total += age
+                self.served_age_max = max(self.served_age_max, age)
+                return snapshot
+
+        pending = self.in_flight.get(symbol)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        self.stats["misses"] += 1
+        pending = asyncio.get_running_loop().create_future()
+        self.in_flight[symbol] = pending
+        try:
+            snapshot = await self.fetch(symbol)
+            pending.set_result(snapshot)
+            return snapshot
+        finally:
+            if not pending.done():
+                pending.set_result(None)
+            del self.in_flight[symbol]
+
+    async def fetch(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Fetch a fresh tick, bypassing the TTL, and store it as the symbol's snapshot"""
+        self.stats["broker_calls"] += 1
+        tick = await self.async_mt5_client.get_tick(symbol)
+        if not tick or not tick.get("bid") or not tick.get("ask"):
+            self.stats["fetch_failures"] += 1
+            return None
+
+        snapshot = {
+            "bid": tick["bid"],
+            "ask": tick["ask"],
+            "mid": (tick["bid"] + tick["ask"]) / 2,
+            "fetched_at": self.clock.monotonic()
+        }
+        self.snapshots[symbol] = snapshot
+        return snapshot
+
+    async def get_price(self, symbol: str) -> float:
+        """Mid price, 0.0 if unavailable (same contract as MT5Client.get_current_price)"""
+        snapshot = await self.get_tick(symbol)
+        return snapshot["mid"] if snapshot else 0.0
+
+    async def get_entry_price(self, symbol: str, direction: str) -> Optional[float]:
+        """Price a new order would fill at: ask for buy, bid for sell"""
+        snapshot = await self.get_tick(symbol)
+        if not snapshot:
+            return None
+        return snapshot["ask"] if direction == "buy" else snapshot["bid"]
+
+    async def refresh(self, symbols: Iterable[str]):
+        """Warm the snapshot for every symbol concurrently (once per monitoring cycle)"""
+        await asyncio.gather(*(self.get_tick(symbol) for symbol in set(symbols)))
+
+    def invalidate(self, symbol: str = None):
+        """Drop one symbol's snapshot, or all of them"""
+        if symbol is None:
+            self.snapshots.clear()
+        else:
+            self.snapshots.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and staleness of served snapshots"""
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        now = self.clock.monotonic()
+        return {
+            **self.stats,
+            "ttl_seconds": self.ttl,
+            "symbols_cached": len(self.snapshots),
+            "hit_rate": (self.stats["hits"] + self.stats["coalesced"]) / lookups if lookups else 0.0,
+            "avg_served_age_ms": (self.served_age_total / self.stats["hits"] * 1000) if self.stats["hits"] else 0.0,
+            "max_served_age_ms": self.served_age_max * 1000,
+            "oldest_snapshot_age_ms": max(
+                ((now - s["fetched_at"]) * 1000 for s in self.snapshots.values()), default=0.0
+            )
+        }
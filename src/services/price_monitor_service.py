@@ -1,22 +1,36 @@
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from src.models import Trade
 from src.config import Config
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.services.price_cache import PriceCache
+from src.services.tick_stream import TickStream
+from src.utils.trigger_index import PriceTriggerIndex, ABOVE, BELOW
+from src.utils.clock import Clock
 import logging
 
 class PriceMonitorService:
     """
-    Background service to monitor prices every 30 seconds for:
+    Background service to monitor prices for:
     1. SL hunt re-entry (price reaches SL + offset)
     2. TP continuation re-entry (after TP hit with price gap)
     3. Reversal exit opportunities
+    Reacts to the tick stream for symbols with pending triggers; a full sweep
+    still runs every price_monitor_interval_seconds (and is the only mode
+    when the tick stream is disabled)
     """
     
     def __init__(self, config: Config, mt5_client, reentry_manager, 
-                 trend_manager, pip_calculator, trading_engine):
+                 trend_manager, pip_calculator, trading_engine,
+                 async_mt5_client: AsyncMT5Client = None, price_cache: PriceCache = None,
+                 tick_stream: TickStream = None, clock: Clock = None):
         self.config = config
+        self.clock = clock or Clock()
         self.mt5_client = mt5_client
+        self.async_mt5_client = async_mt5_client or AsyncMT5Client(mt5_client, config)
+        self.price_cache = price_cache or PriceCache(self.async_mt5_client, config, clock=self.clock)
+        self.tick_stream = tick_stream
         self.reentry_manager = reentry_manager
         self.trend_manager = trend_manager
         self.pip_calculator = pip_calculator
@@ -37,6 +51,14 @@ class PriceMonitorService:
         # Exit continuation tracking (Exit Appeared/Reversal signals)
         self.exit_continuation_pending = {}  # symbol -> {'exit_price': ..., 'direction': ..., 'exit_reason': ...}
         
+        # Trigger price of every pending re-entry, keyed (kind, symbol)
+        self.trigger_index = PriceTriggerIndex()
+        self.pending_by_kind = {
+            "SL_HUNT": self.sl_hunt_pending,
+            "TP_CONTINUATION": self.tp_continuation_pending,
+            "EXIT_CONTINUATION": self.exit_continuation_pending
+        }
+        
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
@@ -61,35 +83,110 @@ class PriceMonitorService:
         self.logger.info("STOPPED: Price Monitor Service stopped")
     
     async def _monitor_loop(self):
-        """Main monitoring loop - runs every 30 seconds"""
+        """Main monitoring loop - tick driven, with a full sweep every interval"""
         interval = self.config["re_entry_config"]["price_monitor_interval_seconds"]
         
-        while self.is_running:
-            try:
-                await self._check_all_opportunities()
-                await asyncio.sleep(interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Monitor loop error: {e}")
-                await asyncio.sleep(interval)
+        use_stream = self.tick_stream is not None and self.tick_stream.enabled
+        queue = self.tick_stream.subscribe() if use_stream else None
+        next_sweep = 0.0
+        
+        try:
+            while self.is_running:
+                try:
+                    if queue is None:
+                        await self._check_all_opportunities()
+                        await self.clock.sleep(interval)
+                        continue
+                    
+                    self._update_tick_interest()
+                    symbols = await self.tick_stream.wait_for_symbols(queue, next_sweep - self.clock.monotonic())
+                    if symbols:
+                        await self._check_all_opportunities(symbols)
+                    
+                    if self.clock.monotonic() >= next_sweep:
+                        await self._check_all_opportunities()
+                        next_sweep = self.clock.monotonic() + interval
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    self.logger.error(f"Monitor loop error: {e}")
+                    await self.clock.sleep(interval)
+        finally:
+            if queue is not None:
+                self.tick_stream.unsubscribe(queue)
+    
+    def watched_symbols(self) -> Set[str]:
+        """Symbols with a pending re-entry trigger or an active profit chain"""
+        symbols = (set(self.sl_hunt_pending) | set(self.tp_continuation_pending)
+                   | set(self.exit_continuation_pending))
+        profit_manager = getattr(self.trading_engine, 'profit_booking_manager', None)
+        if profit_manager and profit_manager.is_enabled():
+            symbols |= {chain.symbol for chain in profit_manager.get_all_chains().values()
+                        if chain.status == "ACTIVE"}
+        return symbols
     
-    async def _check_all_opportunities(self):
-        """Check all pending re-entry opportunities"""
+    def _update_tick_interest(self):
+        """Ask the tick stream for every symbol with a pending trigger or active profit chain"""
+        if self.tick_stream is None:
+            return
+        self.tick_stream.set_interest("price_monitor", self.watched_symbols())
+    
+    async def check_opportunities(self, symbols: Optional[Set[str]] = None):
+        """One monitoring pass, for drivers that run the service without its loop (replays)"""
+        await self._check_all_opportunities(symbols)
+    
+    async def _check_all_opportunities(self, symbols: Optional[Set[str]] = None):
+        """
+        Check pending re-entry opportunities
+        symbols=None checks everything; otherwise only re-entries whose trigger
+        price was crossed on the given symbols are checked
+        """
+        fired = await self._crossed_triggers(symbols) if symbols is not None else {}
         
         # Check SL hunt re-entries
-        await self._check_sl_hunt_reentries()
+        await self._check_sl_hunt_reentries(fired.get("SL_HUNT", set()) if symbols is not None else None)
         
         # Check TP continuation re-entries
-        await self._check_tp_continuation_reentries()
+        await self._check_tp_continuation_reentries(fired.get("TP_CONTINUATION", set()) if symbols is not None else None)
         
         # Check Exit continuation re-entries (NEW)
-        await self._check_exit_continuation_reentries()
+        await self._check_exit_continuation_reentries(fired.get("EXIT_CONTINUATION", set()) if symbols is not None else None)
         
         # Check Profit Booking chains (NEW)
-        await self._check_profit_booking_chains()
+        await self._check_profit_booking_chains(symbols)
+    
+    async def _crossed_triggers(self, symbols: Set[str]) -> Dict[str, Set[str]]:
+        """Binary-search the trigger index: kind -> symbols whose re-entry level was reached"""
+        fired: Dict[str, Set[str]] = {}
+        for symbol in symbols:
+            tick = await self.price_cache.get_tick(symbol)
+            if not tick:
+                continue
+            # Buy re-entries fill at ask (ABOVE levels), sell re-entries at bid (BELOW levels)
+            for kind, _ in self.trigger_index.crossed(symbol, tick['ask'], tick['bid']):
+                fired.setdefault(kind, set()).add(symbol)
+        return fired
+    
+    def _set_trigger(self, kind: str, symbol: str, level: float, direction: str):
+        self.trigger_index.add((kind, symbol), symbol, level, ABOVE if direction == 'buy' else BELOW)
     
-    async def _check_sl_hunt_reentries(self):
+    def _clear_pending(self, kind: str, symbol: str):
+        """Drop a pending re-entry and its trigger"""
+        self.pending_by_kind[kind].pop(symbol, None)
+        self.trigger_index.remove((kind, symbol))
+    
+    def _continuation_gap(self, symbol: str) -> float:
+        """Price gap required past the TP/exit price before a continuation re-entry"""
+        price_gap_pips = self.config["re_entry_config"]["tp_continuation_price_gap_pips"]
+        return price_gap_pips * self.config["symbol_config"][symbol]["pip_size"]
+    
+    @staticmethod
+    def _pending_symbols(pending: Dict[str, Any], symbols: Optional[Set[str]]) -> List[str]:
+        if symbols is None:
+            return list(pending.keys())
+        return [symbol for symbol in symbols if symbol in pending]
+    
+    async def _check_sl_hunt_reentries(self, symbols: Optional[Set[str]] = None):
         """
         Check if price has reached SL + offset for automatic re-entry
         After SL hunt, wait for price to recover to SL + 1 pip, then re-enter
@@ -97,11 +194,11 @@ class PriceMonitorService:
         if not self.config["re_entry_config"]["sl_hunt_reentry_enabled"]:
             return
         
-        for symbol in list(self.sl_hunt_pending.keys()):
+        for symbol in self._pending_symbols(self.sl_hunt_pending, symbols):
             pending = self.sl_hunt_pending[symbol]
             
             # Get current price from MT5
-            current_price = self._get_current_price(symbol, pending['direction'])
+            current_price = await self._get_current_price(symbol, pending['direction'])
             if current_price is None:
                 continue
             
@@ -123,14 +220,14 @@ class PriceMonitorService:
                 
                 if not alignment['aligned']:
                     self.logger.info(f"ERROR: SL hunt re-entry blocked - trend not aligned for {symbol}")
-                    del self.sl_hunt_pending[symbol]
+                    self._clear_pending("SL_HUNT", symbol)
                     continue
                 
                 # Check signal direction matches alignment
                 signal_direction = "BULLISH" if direction == "buy" else "BEARISH"
                 if alignment['direction'] != signal_direction:
                     self.logger.info(f"ERROR: SL hunt re-entry blocked - direction mismatch for {symbol}")
-                    del self.sl_hunt_pending[symbol]
+                    self._clear_pending("SL_HUNT", symbol)
                     continue
                 
                 # Execute SL hunt re-entry
@@ -146,9 +243,9 @@ class PriceMonitorService:
                 )
                 
                 # Remove from pending
-                del self.sl_hunt_pending[symbol]
+                self._clear_pending("SL_HUNT", symbol)
     
-    async def _check_tp_continuation_reentries(self):
+    async def _check_tp_continuation_reentries(self, symbols: Optional[Set[str]] = None):
         """
         Check if price has moved enough after TP hit for re-entry
         After TP, wait for price gap (e.g., 2 pips), then re-enter with reduced SL
@@ -156,11 +253,11 @@ class PriceMonitorService:
         if not self.config["re_entry_config"]["tp_reentry_enabled"]:
             return
         
-        for symbol in list(self.tp_continuation_pending.keys()):
+        for symbol in self._pending_symbols(self.tp_continuation_pending, symbols):
             pending = self.tp_continuation_pending[symbol]
             
             # Get current price from MT5
-            current_price = self._get_current_price(symbol, pending['direction'])
+            current_price = await self._get_current_price(symbol, pending['direction'])
             if current_price is None:
                 continue
             
@@ -188,13 +285,13 @@ class PriceMonitorService:
                 
                 if not alignment['aligned']:
                     self.logger.info(f"ERROR: TP re-entry blocked - trend not aligned for {symbol}")
-                    del self.tp_continuation_pending[symbol]
+                    self._clear_pending("TP_CONTINUATION", symbol)
                     continue
                 
                 signal_direction = "BULLISH" if direction == "buy" else "BEARISH"
                 if alignment['direction'] != signal_direction:
                     self.logger.info(f"ERROR: TP re-entry blocked - direction mismatch for {symbol}")
-                    del self.tp_continuation_pending[symbol]
+                    self._clear_pending("TP_CONTINUATION", symbol)
                     continue
                 
                 # Execute TP continuation re-entry
@@ -209,9 +306,9 @@ class PriceMonitorService:
                 )
                 
                 # Remove from pending
-                del self.tp_continuation_pending[symbol]
+                self._clear_pending("TP_CONTINUATION", symbol)
     
-    async def _check_exit_continuation_reentries(self):
+    async def _check_exit_continuation_reentries(self, symbols: Optional[Set[str]] = None):
         """
         Check for re-entry after Exit Appeared/Reversal exit signals
         After exit (Exit Appeared/Reversal), continue monitoring for re-entry with price gap
@@ -220,11 +317,11 @@ class PriceMonitorService:
         if not self.config["re_entry_config"].get("exit_continuation_enabled", True):
             return
         
-        for symbol in list(self.exit_continuation_pending.keys()):
+        for symbol in self._pending_symbols(self.exit_continuation_pending, symbols):
             pending = self.exit_continuation_pending[symbol]
             
             # Get current price from MT5
-            current_price = self._get_current_price(symbol, pending['direction'])
+            current_price = await self._get_current_price(symbol, pending['direction'])
             if current_price is None:
                 continue
             
@@ -252,13 +349,13 @@ class PriceMonitorService:
                 
                 if not alignment['aligned']:
                     self.logger.info(f"ERROR: Exit continuation blocked - trend not aligned for {symbol} after {exit_reason}")
-                    del self.exit_continuation_pending[symbol]
+                    self._clear_pending("EXIT_CONTINUATION", symbol)
                     continue
                 
                 signal_direction = "BULLISH" if direction == "buy" else "BEARISH"
                 if alignment['direction'] != signal_direction:
                     self.logger.info(f"ERROR: Exit continuation blocked - direction mismatch for {symbol}")
-                    del self.exit_continuation_pending[symbol]
+                    self._clear_pending("EXIT_CONTINUATION", symbol)
                     continue
                 
                 # Execute Exit continuation re-entry
@@ -268,7 +365,7 @@ class PriceMonitorService:
                 from src.models import Alert
                 entry_signal = Alert(
                     symbol=symbol,
-                    tf=pending.get('timeframe', '15M'),
+                    tf=pending.get('timeframe', '15m').lower(),
                     signal='buy' if direction == 'buy' else 'sell',
                     type='entry',
                     price=current_price
@@ -278,7 +375,7 @@ class PriceMonitorService:
                 await self.trading_engine.process_alert(entry_signal)
                 
                 # Remove from pending
-                del self.exit_continuation_pending[symbol]
+                self._clear_pending("EXIT_CONTINUATION", symbol)
                 
                 self.logger.info(f"SUCCESS: Exit continuation re-entry executed for {symbol}")
     
@@ -295,8 +392,11 @@ class PriceMonitorService:
         reduction_per_level = self.config["re_entry_config"]["sl_reduction_per_level"]
         sl_adjustment = (1 - reduction_per_level) ** chain.current_level
         
-        account_balance = self.mt5_client.get_account_balance()
-        lot_size = self.trading_engine.risk_manager.get_fixed_lot_size(account_balance)
+        account = await self.trading_engine.account_snapshot.get()
+        if not account:
+            return
+        account_balance = account.balance
+        lot_size = account.lot_size
         
         # Calculate SL and TP
         sl_price, sl_distance = self.pip_calculator.calculate_sl_price(
@@ -316,7 +416,7 @@ class PriceMonitorService:
             lot_size=lot_size,
             direction=direction,
             strategy=logic,
-            open_time=datetime.now().isoformat(),
+            open_time=self.clock.now().isoformat(),
             chain_id=chain_id,
             chain_level=chain.current_level + 1,
             is_re_entry=True
@@ -324,7 +424,7 @@ class PriceMonitorService:
         
         # Place order
         if not self.config["simulate_orders"]:
-            trade_id = self.mt5_client.place_order(
+            trade_id = await self.async_mt5_client.place_order(
                 symbol=symbol,
                 order_type=direction,
                 lot_size=lot_size,
@@ -335,13 +435,15 @@ class PriceMonitorService:
             )
             if trade_id:
                 trade.trade_id = trade_id
+            else:
+                self.trading_engine.telegram_bot.send_message(f"❌ SL hunt re-entry order failed for {symbol}", priority=True)
+                return
         
         # Update chain
         self.reentry_manager.update_chain_level(chain_id, trade.trade_id)
         
         # Add to open trades
-        self.trading_engine.open_trades.append(trade)
-        self.trading_engine.risk_manager.add_open_trade(trade)
+        self.trading_engine.add_open_trade(trade)
         
         # Send Telegram notification
         sl_reduction_percent = (1 - sl_adjustment) * 100
@@ -371,8 +473,11 @@ class PriceMonitorService:
         reduction_per_level = self.config["re_entry_config"]["sl_reduction_per_level"]
         sl_adjustment = (1 - reduction_per_level) ** chain.current_level
         
-        account_balance = self.mt5_client.get_account_balance()
-        lot_size = self.trading_engine.risk_manager.get_fixed_lot_size(account_balance)
+        account = await self.trading_engine.account_snapshot.get()
+        if not account:
+            return
+        account_balance = account.balance
+        lot_size = account.lot_size
         
         # Calculate SL and TP
         sl_price, sl_distance = self.pip_calculator.calculate_sl_price(
@@ -392,7 +497,7 @@ class PriceMonitorService:
             lot_size=lot_size,
             direction=direction,
             strategy=logic,
-            open_time=datetime.now().isoformat(),
+            open_time=self.clock.now().isoformat(),
             chain_id=chain_id,
             chain_level=chain.current_level + 1,
             is_re_entry=True
@@ -400,7 +505,7 @@ class PriceMonitorService:
         
         # Place order
         if not self.config["simulate_orders"]:
-            trade_id = self.mt5_client.place_order(
+            trade_id = await self.async_mt5_client.place_order(
                 symbol=symbol,
                 order_type=direction,
                 lot_size=lot_size,
@@ -411,21 +516,21 @@ class PriceMonitorService:
             )
             if trade_id:
                 trade.trade_id = trade_id
+            else:
+                self.trading_engine.telegram_bot.send_message(f"❌ TP re-entry order failed for {symbol}", priority=True)
+                return
         
         # Update chain
         self.reentry_manager.update_chain_level(chain_id, trade.trade_id)
         
         # Add to open trades
-        self.trading_engine.open_trades.append(trade)
-        self.trading_engine.risk_manager.add_open_trade(trade)
+        self.trading_engine.add_open_trade(trade)
         
         # Save to database
         tp_level = chain.current_level + 1
-        self.trading_engine.db.conn.cursor().execute('''
-            INSERT INTO tp_reentry_events VALUES (?,?,?,?,?,?,?,?,?)
-        ''', (None, chain_id, symbol, tp_level, chain.total_profit, price, 
-              (1-sl_adjustment)*100, 0, datetime.now().isoformat()))
-        self.trading_engine.db.conn.commit()
+        self.trading_engine.db.save_tp_reentry_event(
+            chain_id, symbol, tp_level, chain.total_profit, price, (1-sl_adjustment)*100
+        )
         
         # Send Telegram notification
         sl_reduction_percent = (1 - sl_adjustment) * 100
@@ -442,18 +547,14 @@ class PriceMonitorService:
             f"Level: {tp_level}/{chain.max_level}"
         )
     
-    def _get_current_price(self, symbol: str, direction: str) -> Optional[float]:
+    async def _get_current_price(self, symbol: str, direction: str) -> Optional[float]:
         """Get current price from MT5 (or simulation)"""
         try:
             if self.config.get("simulate_orders", True):
                 # Simulation mode - return None or mock price
                 return None
             
-            import MetaTrader5 as mt5
-            tick = mt5.symbol_info_tick(symbol)
-            if tick:
-                return tick.ask if direction == 'buy' else tick.bid
-            return None
+            return await self.price_cache.get_entry_price(symbol, direction)
         except:
             return None
     
@@ -477,8 +578,10 @@ class PriceMonitorService:
             'sl_price': trade.sl,
             'logic': logic
         }
+        self._set_trigger("SL_HUNT", trade.symbol, target_price, trade.direction)
         
         self.monitored_symbols.add(trade.symbol)
+        self._update_tick_interest()
         self.logger.info(f"REGISTERED: SL Hunt monitoring registered: {trade.symbol} @ {target_price:.5f}")
     
     def register_tp_continuation(self, trade: Trade, tp_price: float, logic: str):
@@ -490,14 +593,18 @@ class PriceMonitorService:
             'chain_id': trade.chain_id,
             'logic': logic
         }
+        gap = self._continuation_gap(trade.symbol)
+        self._set_trigger("TP_CONTINUATION", trade.symbol,
+                          tp_price + gap if trade.direction == 'buy' else tp_price - gap, trade.direction)
         
         self.monitored_symbols.add(trade.symbol)
+        self._update_tick_interest()
         self.logger.info(f"REGISTERED: TP continuation monitoring registered: {trade.symbol} after TP @ {tp_price:.5f}")
     
     def stop_tp_continuation(self, symbol: str, reason: str = "Opposite signal received"):
         """Stop TP continuation monitoring for a symbol"""
         if symbol in self.tp_continuation_pending:
-            del self.tp_continuation_pending[symbol]
+            self._clear_pending("TP_CONTINUATION", symbol)
             self.logger.info(f"STOPPED: TP continuation stopped for {symbol}: {reason}")
     
     def register_exit_continuation(self, trade: Trade, exit_price: float, exit_reason: str, logic: str, timeframe: str = '15M'):
@@ -513,20 +620,24 @@ class PriceMonitorService:
             'exit_reason': exit_reason,
             'timeframe': timeframe
         }
+        gap = self._continuation_gap(trade.symbol)
+        self._set_trigger("EXIT_CONTINUATION", trade.symbol,
+                          exit_price + gap if trade.direction == 'buy' else exit_price - gap, trade.direction)
         
         self.monitored_symbols.add(trade.symbol)
+        self._update_tick_interest()
         self.logger.info(f"REGISTERED: Exit continuation monitoring registered: {trade.symbol} after {exit_reason} @ {exit_price:.5f}")
     
     def stop_exit_continuation(self, symbol: str, reason: str = "Alignment lost"):
         """Stop exit continuation monitoring for a symbol"""
         if symbol in self.exit_continuation_pending:
-            del self.exit_continuation_pending[symbol]
+            self._clear_pending("EXIT_CONTINUATION", symbol)
             self.logger.info(f"STOPPED: Exit continuation stopped for {symbol}: {reason}")
     
-    async def _check_profit_booking_chains(self):
+    async def _check_profit_booking_chains(self, symbols: Optional[Set[str]] = None):
         """
         Check profit booking chains for profit target achievement
-        Runs every 30 seconds to monitor combined PnL
+        Runs on every tick of a chain's symbol and on each full sweep
         """
         # Check if profit booking enabled
         profit_config = self.config.get("profit_booking_config", {})
@@ -543,18 +654,22 @@ class PriceMonitorService:
         if not active_chains:
             return
         
-        # Get open trades from trading engine
-        open_trades = getattr(self.trading_engine, 'open_trades', [])
+        # Shared trade book - chain/level lookups are indexed
+        open_trades = self.trading_engine.open_trades
         
         # Check each chain
-        for chain_id, chain in active_chains.items():
+        for chain_id, chain in list(active_chains.items()):
+            if chain.status != "ACTIVE" or (symbols is not None and chain.symbol not in symbols):
+                continue
             try:
                 # Validate chain state
                 if not profit_manager.validate_chain_state(chain, open_trades):
                     continue
                 
+                current_price = await self.price_cache.get_price(chain.symbol)
+                
                 # Check if profit target reached
-                if profit_manager.check_profit_targets(chain, open_trades):
+                if profit_manager.check_profit_targets(chain, open_trades, current_price):
                     # Execute profit booking
                     success = await profit_manager.execute_profit_booking(
                         chain, open_trades, self.trading_engine
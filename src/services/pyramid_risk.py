@@ -0,0 +1,143 @@
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from src.config import Config
+
+class PyramidRiskSimulator:
+    """
+    Monte Carlo of the profit-booking pyramid (1-2-4-8-16 orders) against the risk tiers
+    - A chain books profit_targets[L] and moves up while level L hits its target
+      (probability p[L]); the first miss loses the level's orders at their reduced
+      SL. At the last level the orders exit on their own TP (rr_ratio) or SL
+    - A path is fully described by the level it stops at, so one categorical draw
+      per path is enough; per-tier PnL and loss are table lookups on that array
+    - SL loss per level comes from RiskManager.calculate_profit_booking_risk and
+      scales with the tier's lot size; booked targets are fixed dollar amounts
+    Daily loss sums chain losses like RiskManager.daily_loss (profits do not offset it)
+    """
+
+    def __init__(self, config: Config, risk_manager):
+        self.config = config
+        self.risk_manager = risk_manager
+        sim_config = config.get("risk_simulation_config", {})
+        self.default_probabilities = sim_config.get("level_hit_probabilities", [0.6, 0.55, 0.5, 0.45, 0.4])
+        self.paths = sim_config.get("paths", 1000000)
+        self.chains_per_day = sim_config.get("chains_per_day", 5)
+        self.horizon_days = sim_config.get("horizon_days", 20)
+        self.min_samples = sim_config.get("min_samples", 20)
+        self.quantiles = sim_config.get("quantiles", [0.5, 0.9, 0.95, 0.99, 0.999])
+        self.seed = sim_config.get("seed")
+
+    def levels(self) -> int:
+        """Pyramid levels in use (max_level + 1, bounded by the configured lists)"""
+        profit_config = self.config.get("profit_booking_config", {})
+        multipliers = profit_config.get("multipliers", [1, 2, 4, 8, 16])
+        targets = profit_config.get("profit_targets", [10, 20, 40, 80, 160])
+        max_level = profit_config.get("max_level", len(multipliers) - 1)
+        return max(1, min(max_level + 1, len(multipliers), len(targets) + 1))
+
+    def estimate_probabilities(self, db=None) -> Tuple[List[float], List[str]]:
+        """
+        Per-level hit probabilities and where each came from
+        Levels below the top are estimated from finished chains in profit_booking_events
+        when at least min_samples chains reached them; the rest use level_hit_probabilities
+        """
+        levels = self.levels()
+        defaults = list(self.default_probabilities) + [self.default_probabilities[-1]] * levels
+        probabilities, sources = [], []
+        counts = db.get_profit_level_reach_counts() if db is not None else {}
+        for level in range(levels):
+            reached = sum(chains for top, chains in counts.items() if top >= level - 1)
+            hits = sum(chains for top, chains in counts.items() if top >= level)
+            if level < levels - 1 and reached >= self.min_samples:
+                probabilities.append(hits / reached)
+                sources.append(f"history ({hits}/{reached})")
+            else:
+                probabilities.append(float(defaults[level]))
+                sources.append("config")
+        return probabilities, sources
+
+    def outcome_tables(self, probabilities: List[float], symbol: str) -> Dict[str, np.ndarray]:
+        """
+        Per outcome k (k < levels: booked levels 0..k-1 then SL at level k; k == levels:
+        every level booked and the last one closed at TP): its probability, booked
+        profit, and SL loss / TP win per 1.0 lot
+        """
+        levels = self.levels()
+        p = np.clip(np.asarray(probabilities[:levels], dtype=float), 0.0, 1.0)
+        reach = np.concatenate(([1.0], np.cumprod(p)))  # P(reach level k)
+        probability = np.append(reach[:-1] * (1.0 - p), reach[-1])
+
+        targets = self.config["profit_booking_config"].get("profit_targets", [10, 20, 40, 80, 160])
+        booked = np.concatenate(([0.0], np.cumsum(targets[:levels - 1], dtype=float)))
+        booked = np.append(booked, booked[-1])
+
+        unit_loss = np.array([
+            self.risk_manager.calculate_profit_booking_risk(level, 1.0, symbol, 0.0)["total_risk"]
+            for level in range(levels)
+        ])
+        return {
+            "probability": probability,
+            "booked": booked,
+            "unit_loss": np.append(unit_loss, 0.0),
+            "unit_win": np.append(np.zeros(levels), unit_loss[-1] * self.config.get("rr_ratio", 1.0))
+        }
+
+    def sample_outcomes(self, probability: np.ndarray, paths: int,
+                        rng: np.random.Generator) -> np.ndarray:
+        """Outcome index of every path (one uniform draw each, inverse CDF)"""
+        cdf = np.cumsum(probability)
+        cdf[-1] = 1.0
+        return np.searchsorted(cdf, rng.random(paths), side="right").astype(np.int8)
+
+    def simulate(self, symbol: str, paths: Optional[int] = None, db=None,
+                 probabilities: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Run paths chain simulations and report per-tier loss quantiles and cap breaches"""
+        started = time.perf_counter()
+        paths = paths or self.paths
+        sources = ["given"] * self.levels()
+        if probabilities is None:
+            probabilities, sources = self.estimate_probabilities(db)
+        tables = self.outcome_tables(probabilities, symbol)
+        outcomes = self.sample_outcomes(tables["probability"], paths, np.random.default_rng(self.seed))
+
+        days = paths // self.chains_per_day
+        windows = days // self.horizon_days
+        tiers = {}
+        for tier, limits in sorted(self.config.get("risk_tiers", {}).items(), key=lambda item: int(item[0])):
+            lot = self.risk_manager.get_fixed_lot_size(float(tier))
+            loss_table = tables["unit_loss"] * lot
+            pnl_table = tables["booked"] - loss_table + tables["unit_win"] * lot
+            chain_loss = loss_table[outcomes]
+            daily_loss = chain_loss[:days * self.chains_per_day].reshape(days, self.chains_per_day).sum(axis=1)
+            window_loss = daily_loss[:windows * self.horizon_days].reshape(windows, self.horizon_days).sum(axis=1)
+            tiers[tier] = {
+                "lot_size": lot,
+                "daily_loss_limit": limits["daily_loss_limit"],
+                "max_total_loss": limits["max_total_loss"],
+                "expected_profit_per_chain": float(tables["probability"] @ pnl_table),
+                "simulated_profit_per_chain": float(pnl_table[outcomes].mean()),
+                "worst_chain_loss": float(loss_table.max()),
+                "chain_loss_quantiles": self._quantiles(chain_loss),
+                "daily_loss_quantiles": self._quantiles(daily_loss),
+                "daily_breach_probability": float((daily_loss >= limits["daily_loss_limit"]).mean()) if days else 0.0,
+                "lifetime_breach_probability": float((window_loss >= limits["max_total_loss"]).mean()) if windows else 0.0
+            }
+
+        return {
+            "symbol": symbol,
+            "paths": paths,
+            "chains_per_day": self.chains_per_day,
+            "horizon_days": self.horizon_days,
+            "level_probabilities": [round(float(p), 4) for p in probabilities[:self.levels()]],
+            "probability_sources": sources,
+            "outcome_probabilities": tables["probability"].round(6).tolist(),
+            "simulated_outcome_frequencies": (np.bincount(outcomes, minlength=len(tables["probability"])) / paths).round(6).tolist(),
+            "tiers": tiers,
+            "elapsed_ms": (time.perf_counter() - started) * 1000
+        }
+
+    def _quantiles(self, values: np.ndarray) -> Dict[str, float]:
+        if not len(values):
+            return {}
+        return {f"p{q * 100:g}": float(v) for q, v in zip(self.quantiles, np.quantile(values, self.quantiles))}
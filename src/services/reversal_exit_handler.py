@@ -1,7 +1,11 @@
-from datetime import datetime
 from typing import Dict, Any, Optional
 from src.models import Trade, Alert
 from src.config import Config
+from src.clients.message_coalescer import trade_group
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.utils.trade_book import TradeBook
+from src.services.exposure_engine import ExposureEngine
+from src.utils.clock import Clock
 import logging
 
 class ReversalExitHandler:
@@ -14,15 +18,20 @@ class ReversalExitHandler:
     4. Exit Appeared alerts (type: 'exit', early warning)
     """
     
-    def __init__(self, config: Config, mt5_client, telegram_bot, db, price_monitor=None):
+    def __init__(self, config: Config, mt5_client, telegram_bot, db, price_monitor=None,
+                 async_mt5_client: AsyncMT5Client = None, exposure_engine: ExposureEngine = None,
+                 clock: Clock = None):
         self.config = config
+        self.clock = clock or Clock()
         self.mt5_client = mt5_client
+        self.async_mt5_client = async_mt5_client or AsyncMT5Client(mt5_client, config)
+        self.exposure_engine = exposure_engine or ExposureEngine(config)
         self.telegram_bot = telegram_bot
         self.db = db
         self.price_monitor = price_monitor
         self.logger = logging.getLogger(__name__)
     
-    async def check_reversal_exit(self, alert: Alert, open_trades: list) -> list:
+    async def check_reversal_exit(self, alert: Alert, open_trades: TradeBook) -> list:
         """
         Check if alert triggers reversal exit for any open trade
         Returns list of trades to close
@@ -32,10 +41,7 @@ class ReversalExitHandler:
         
         trades_to_close = []
         
-        for trade in open_trades:
-            if trade.symbol != alert.symbol:
-                continue
-            
+        for trade in open_trades.by_symbol(alert.symbol):
             should_exit = False
             exit_reason = ""
             
@@ -108,11 +114,9 @@ class ReversalExitHandler:
                     profit_manager.stop_chain(trade.profit_chain_id, f"Exit signal: {exit_reason}")
                     
                     # Close all orders in the chain
-                    open_trades = getattr(trading_engine, 'open_trades', [])
                     chain_orders = [
-                        t for t in open_trades
-                        if hasattr(t, 'profit_chain_id') and t.profit_chain_id == trade.profit_chain_id
-                        and t.status == "open"
+                        t for t in trading_engine.open_trades.by_profit_chain(trade.profit_chain_id)
+                        if t.status == "open"
                     ]
                     
                     for chain_trade in chain_orders:
@@ -123,24 +127,17 @@ class ReversalExitHandler:
         
         # Close position in MT5
         if not self.config.get("simulate_orders", True):
-            success = self.mt5_client.close_position(trade.trade_id)
+            success = await self.async_mt5_client.close_position(trade.trade_id)
             if not success:
                 self.logger.error(f"Failed to close position {trade.trade_id}")
                 return False
         
-        # Calculate PnL
-        if trade.direction == 'buy':
-            pnl = (exit_price - trade.entry) * trade.lot_size * 10000
-        else:
-            pnl = (trade.entry - exit_price) * trade.lot_size * 10000
-        
-        # Apply symbol-specific pip value
-        symbol_config = self.config["symbol_config"][trade.symbol]
-        if symbol_config.get("is_gold", False):
-            pnl = pnl * 100  # Gold multiplier
+        # Calculate PnL with the symbol's pip size/value (same formula as close_trade)
+        pnl = self.exposure_engine.trade_pnl(trade, exit_price)
         
         # Update trade
-        trade.close_time = datetime.now().isoformat()
+        trade.close_time = self.clock.now().isoformat()
+        trade.exit_price = exit_price
         trade.pnl = pnl
         trade.status = "closed"
         
@@ -148,12 +145,7 @@ class ReversalExitHandler:
         self.db.save_trade(trade)
         
         # Save reversal exit event
-        cursor = self.db.conn.cursor()
-        cursor.execute('''
-            INSERT INTO reversal_exit_events VALUES (?,?,?,?,?,?,?)
-        ''', (None, trade.trade_id, trade.symbol, exit_price, 
-              exit_reason, pnl, datetime.now().isoformat()))
-        self.db.conn.commit()
+        self.db.save_reversal_exit_event(trade.trade_id, trade.symbol, exit_price, exit_reason, pnl)
         
         # Send Telegram notification
         profit_emoji = "✅" if pnl >= 0 else "❌"
@@ -165,7 +157,8 @@ class ReversalExitHandler:
             f"Exit: {exit_price:.5f}\n"
             f"Direction: {trade.direction.upper()}\n"
             f"PnL: ${pnl:.2f}\n"
-            f"Strategy: {trade.strategy}"
+            f"Strategy: {trade.strategy}",
+            group=trade_group(trade)
         )
         
         # Register continuation monitoring (NEW FEATURE)
@@ -0,0 +1,174 @@
+import asyncio
+from typing import Dict, Any, Iterable, List, Optional, Set
+from src.config import Config
+from src.services.price_cache import PriceCache
+from src.utils.clock import Clock
+
+class TickStream:
+    """
+    Event-driven tick feed for symbols that have pending price triggers
+    - Owners (price monitor, trade manager) declare the symbols they care about
+      with set_interest(); only those symbols are polled
+    - Per-symbol adaptive rate: fast while the tick is moving, backing off to the
+      idle interval while it is unchanged
+    - Every changed tick updates the shared PriceCache and is published to
+      subscriber queues; a full queue drops its oldest tick
+    """
+
+    def __init__(self, price_cache: PriceCache, config: Config, clock: Clock = None):
+        self.price_cache = price_cache
+        self.config = config
+        self.clock = clock or Clock()  # poll schedule and subscriber timeouts
+
+        stream_config = config.get("tick_stream_config", {})
+        self.enabled = stream_config.get("enabled", True)
+        self.fast_interval = stream_config.get("fast_interval_ms", 250) / 1000.0
+        self.idle_interval = stream_config.get("idle_interval_ms", 2000) / 1000.0
+        self.queue_size = stream_config.get("subscriber_queue_size", 256)
+
+        self.interest: Dict[str, Set[str]] = {}  # owner -> symbols
+        self.symbol_state: Dict[str, Dict[str, Any]] = {}  # symbol -> {"interval", "next_poll", "last"}
+        self.subscribers: List[asyncio.Queue] = []
+
+        self.is_running = False
+        self.stream_task: Optional[asyncio.Task] = None
+        self.interest_changed: Optional[asyncio.Event] = None
+
+        self.stats = {
+            "polls": 0,
+            "ticks_published": 0,
+            "unchanged_polls": 0,
+            "failed_polls": 0,
+            "dropped_ticks": 0
+        }
+
+    async def start(self):
+        """Start the polling task on the running event loop"""
+        if self.is_running or not self.enabled:
+            return
+
+        self.is_running = True
+        self.interest_changed = asyncio.Event()
+        self.stream_task = asyncio.create_task(self._stream_loop())
+        print("SUCCESS: Tick stream started")
+
+    async def stop(self):
+        """Stop the polling task"""
+        self.is_running = False
+        if self.stream_task:
+            self.stream_task.cancel()
+            try:
+                await self.stream_task
+            except asyncio.CancelledError:
+                pass
+            self.stream_task = None
+
+    def set_interest(self, owner: str, symbols: Iterable[str]):
+        """Replace the set of symbols an owner needs ticks for"""
+        symbols = set(symbols)
+        if self.interest.get(owner, set()) == symbols:
+            return
+        self.interest[owner] = symbols
+
+        watched = set().union(*self.interest.values())
+        for symbol in watched - self.symbol_state.keys():
+            # New symbol - poll it immediately at the fast rate
+            self.symbol_state[symbol] = {"interval": self.fast_interval, "next_poll": 0.0, "last": None}
+        for symbol in self.symbol_state.keys() - watched:
+            del self.symbol_state[symbol]
+
+        if self.interest_changed:
+            self.interest_changed.set()
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving every published tick"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    async def wait_for_symbols(self, queue: asyncio.Queue, timeout: float) -> Set[str]:
+        """
+        Wait up to timeout for the next tick, then drain everything already queued
+        Returns the set of symbols that ticked (empty on timeout)
+        """
+        try:
+            tick = await self.clock.wait_for(queue.get(), max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            return set()
+
+        symbols = {tick["symbol"]}
+        while not queue.empty():
+            symbols.add(queue.get_nowait()["symbol"])
+        return symbols
+
+    async def _stream_loop(self):
+        while self.is_running:
+            try:
+                now = self.clock.monotonic()
+                due = [symbol for symbol, state in self.symbol_state.items() if state["next_poll"] <= now]
+                if due:
+                    await asyncio.gather(*(self._poll(symbol) for symbol in due))
+
+                # Sleep until the next symbol is due or the interest set changes
+                self.interest_changed.clear()
+                next_poll = min((state["next_poll"] for state in self.symbol_state.values()), default=None)
+                timeout = None if next_poll is None else max(next_poll - self.clock.monotonic(), 0.0)
+                try:
+                    await self.clock.wait_for(self.interest_changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"WARNING: Tick stream error: {str(e)}")
+                await self.clock.sleep(self.idle_interval)
+
+    async def _poll(self, symbol: str):
+        self.stats["polls"] += 1
+        snapshot = await self.price_cache.fetch(symbol)
+
+        state = self.symbol_state.get(symbol)
+        if state is None:
+            return  # Interest dropped while the request was in flight
+
+        if snapshot is None:
+            self.stats["failed_polls"] += 1
+            state["interval"] = self.idle_interval
+        elif state["last"] == (snapshot["bid"], snapshot["ask"]):
+            self.stats["unchanged_polls"] += 1
+            state["interval"] = min(state["interval"] * 2, self.idle_interval)
+        else:
+            state["last"] = (snapshot["bid"], snapshot["ask"])
+            state["interval"] = self.fast_interval
+            self._publish({
+                "symbol": symbol,
+                "bid": snapshot["bid"],
+                "ask": snapshot["ask"],
+                "mid": snapshot["mid"],
+                "time": snapshot["fetched_at"]
+            })
+
+        state["next_poll"] = self.clock.monotonic() + state["interval"]
+
+    def _publish(self, tick: Dict[str, Any]):
+        self.stats["ticks_published"] += 1
+        for queue in self.subscribers:
+            if queue.full():
+                # Slow consumer - the newest price matters more than an old one
+                queue.get_nowait()
+                self.stats["dropped_ticks"] += 1
+            queue.put_nowait(tick)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            **self.stats,
+            "watched_symbols": {
+                symbol: round(state["interval"] * 1000) for symbol, state in self.symbol_state.items()
+            },
+            "subscribers": len(self.subscribers)
+        }
@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+from typing import Any, Awaitable, List, Optional, Tuple, Union
+
+class Clock:
+    """
+    Source of time for time-dependent logic (windows, loop intervals, timestamps)
+    The base class is the wall clock used in live trading
+    """
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def time(self) -> float:
+        """Seconds since the epoch"""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Seconds for measuring intervals (never goes backwards)"""
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait_for(self, awaitable: Awaitable, timeout: Optional[float]) -> Any:
+        """asyncio.wait_for with the timeout measured on this clock"""
+        return await asyncio.wait_for(awaitable, timeout=timeout)
+
+class AcceleratedClock(Clock):
+    """
+    Wall time running speed times faster from a start instant (soak tests, demos)
+    Sleeps and timeouts are divided by speed, so a 5 s loop interval at speed 60
+    takes 1/12 s of real time
+    """
+
+    def __init__(self, speed: float, start: Union[datetime, float, None] = None):
+        if speed <= 0:
+            raise ValueError(f"clock speed must be positive, got {speed}")
+        self.speed = float(speed)
+        self._origin = time.monotonic()
+        if start is None:
+            self._start = time.time()
+        else:
+            self._start = start.timestamp() if isinstance(start, datetime) else float(start)
+
+    def _elapsed(self) -> float:
+        return (time.monotonic() - self._origin) * self.speed
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    def time(self) -> float:
+        return self._start + self._elapsed()
+
+    def monotonic(self) -> float:
+        return self._origin + self._elapsed()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(max(seconds, 0) / self.speed)
+
+    async def wait_for(self, awaitable: Awaitable, timeout: Optional[float]) -> Any:
+        return await asyncio.wait_for(awaitable, timeout=None if timeout is None else max(timeout, 0) / self.speed)
+
+class VirtualClock(Clock):
+    """
+    Clock that only moves when advanced (backtests and replays)
+    - sleep() waits for virtual time, so loops written against the clock run
+      as fast as the driver advances it
+    - Time never goes backwards; advancing to an earlier instant is a no-op
+    """
+
+    def __init__(self, start: Union[datetime, float] = 0.0):
+        self._time = start.timestamp() if isinstance(start, datetime) else float(start)
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._time)
+
+    def time(self) -> float:
+        return self._time
+
+    def monotonic(self) -> float:
+        return self._time
+
+    def advance(self, seconds: float):
+        self.advance_to(self._time + seconds)
+
+    def advance_to(self, when: Union[datetime, float]):
+        """Move to an absolute instant and wake every sleeper that is now due"""
+        when = when.timestamp() if isinstance(when, datetime) else float(when)
+        if when > self._time:
+            self._time = when
+        while self._sleepers and self._sleepers[0][0] <= self._time:
+            _, _, waiter = heapq.heappop(self._sleepers)
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._time + seconds, next(self._order), waiter))
+        await waiter
+
+    async def wait_for(self, awaitable: Awaitable, timeout: Optional[float]) -> Any:
+        """Race the awaitable against a virtual-time sleep"""
+        if timeout is None:
+            return await awaitable
+        task = asyncio.ensure_future(awaitable)
+        timer = asyncio.ensure_future(self.sleep(timeout))
+        try:
+            await asyncio.wait({task, timer}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            timer.cancel()
+        if task.done():
+            return task.result()
+        task.cancel()
+        raise asyncio.TimeoutError()
+
+    async def run_until(self, when: Union[datetime, float], settle_steps: int = 3):
+        """
+        Advance to an absolute instant one sleeper deadline at a time
+        Between deadlines the event loop gets settle_steps turns, so every loop
+        sleeping on this clock runs each of its iterations (and can schedule its
+        next sleep) before time moves on - thousands of simulated minutes per
+        second for loops that do not wait on real I/O
+        """
+        when = when.timestamp() if isinstance(when, datetime) else float(when)
+        while True:
+            for _ in range(settle_steps):
+                await asyncio.sleep(0)
+            deadline = self.next_wakeup()
+            if deadline is None or deadline > when:
+                break
+            self.advance_to(deadline)
+        self.advance_to(when)
+        for _ in range(settle_steps):
+            await asyncio.sleep(0)
+
+    async def run_for(self, seconds: float, settle_steps: int = 3):
+        """run_until() relative to the current virtual time"""
+        await self.run_until(self._time + seconds, settle_steps)
+
+    def next_wakeup(self):
+        """Earliest pending sleeper deadline (None if nothing is sleeping)"""
+        while self._sleepers and self._sleepers[0][2].done():
+            heapq.heappop(self._sleepers)  # cancelled sleeps
+        return self._sleepers[0][0] if self._sleepers else None
+
+def make_clock(config) -> Clock:
+    """
+    Clock from clock_config: mode "wall" (default), "accelerated" (speed) or
+    "virtual" (manually advanced); start is an ISO timestamp or epoch seconds
+    """
+    clock_config = config.get("clock_config", {}) if config is not None else {}
+    mode = clock_config.get("mode", "wall")
+    start = clock_config.get("start")
+    if isinstance(start, str):
+        start = datetime.fromisoformat(start)
+    if mode == "wall":
+        return Clock()
+    if mode == "accelerated":
+        return AcceleratedClock(clock_config.get("speed", 1.0), start)
+    if mode == "virtual":
+        return VirtualClock(start if start is not None else time.time())
+    raise ValueError(f"Unknown clock_config mode: {mode}")
@@ -1,12 +1,17 @@
 import asyncio
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Dict, Any
 from src.models import Trade
+from src.utils.clock import Clock
 
 class ExitStrategyManager:
-    def __init__(self, mt5_client, trading_engine):
+    def __init__(self, mt5_client, trading_engine, clock: Clock = None):
         self.mt5_client = mt5_client
         self.trading_engine = trading_engine
+        # Expiry times and the check interval follow the engine's clock
+        self.clock = clock or getattr(trading_engine, "clock", None) or Clock()
+        # Shared per-symbol snapshot (falls back to direct polling without an engine cache)
+        self.price_cache = getattr(trading_engine, "price_cache", None)
         self.active_strategies = {}
         self.running = False
 
@@ -24,25 +29,30 @@ class ExitStrategyManager:
         while self.running:
             try:
                 for trade_id, strategy in list(self.active_strategies.items()):
-                    current_price = self.mt5_client.get_current_price(strategy['symbol'])
+                    if self.price_cache:
+                        current_price = await self.price_cache.get_price(strategy['symbol'])
+                    else:
+                        current_price = self.mt5_client.get_current_price(strategy['symbol'])
                     
                     if strategy['type'] == 'trailing_stop':
                         if await self.check_trailing_stop(trade_id, current_price, strategy):
                             # Trading engine ke through close karo
                             trade = strategy['trade']
-                            await self.trading_engine.close_trade(trade, 100, "TRAILING_SL_EXIT")
+                            await self.trading_engine.close_trade(trade, "TRAILING_SL_EXIT", current_price)
+                            self.active_strategies.pop(trade_id, None)
                             
                     elif strategy['type'] == 'time_based':
-                        if datetime.now() >= strategy['expiry_time']:
+                        if self.clock.now() >= strategy['expiry_time']:
                             # Trading engine ke through close karo
                             trade = strategy['trade']
-                            await self.trading_engine.close_trade(trade, 100, "TIME_BASED_EXIT")
+                            await self.trading_engine.close_trade(trade, "TIME_BASED_EXIT", current_price)
+                            self.active_strategies.pop(trade_id, None)
                             
-                await asyncio.sleep(5)  # Check every 5 seconds
+                await self.clock.sleep(5)  # Check every 5 seconds
                 
             except Exception as e:
                 print(f"Exit strategy monitoring error: {str(e)}")
-                await asyncio.sleep(30)
+                await self.clock.sleep(30)
 
     async def check_trailing_stop(self, trade_id: str, current_price: float, strategy: Dict[str, Any]) -> bool:
         """Check if trailing stop condition is met"""
@@ -96,7 +106,7 @@ class ExitStrategyManager:
                         return current_price >= sl_price
                         
                 elif strategy['type'] == 'time_based':
-                    return datetime.now() >= strategy['expiry_time']
+                    return self.clock.now() >= strategy['expiry_time']
                     
             return False
             
@@ -112,7 +122,7 @@ class ExitStrategyManager:
             'symbol': trade.symbol,
             'trailing_points': trailing_points,
             'best_price': trade.entry,
-            'added_time': datetime.now()
+            'added_time': self.clock.now()
         }
         print(f"SUCCESS: Trailing SL added for {trade.symbol} - {trailing_points} points")
 
@@ -122,8 +132,8 @@ class ExitStrategyManager:
             'type': 'time_based',
             'trade': trade,
             'symbol': trade.symbol,
-            'expiry_time': datetime.now() + timedelta(hours=exit_after_hours),
-            'added_time': datetime.now()
+            'expiry_time': self.clock.now() + timedelta(hours=exit_after_hours),
+            'added_time': self.clock.now()
         }
         print(f"SUCCESS: Time-based exit added for {trade.symbol} - {exit_after_hours} hours")
 
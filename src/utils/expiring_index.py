@@ -0,0 +1,75 @@
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Tuple
+
+class ExpiringIndex:
+    """
+    Hash index of keys that expire after a TTL (monotonic clock)
+    - contains()/add() are O(1) dict operations
+    - A min-heap of (expiry, seq, key) makes expire() pop only what has expired:
+      O(log n) per evicted key, O(1) when nothing is due
+    - Re-adding a key leaves its old heap entry behind; it is skipped on pop
+      because the stored expiry no longer matches
+    """
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self.entries: Dict[Hashable, Tuple[float, Any]] = {}  # key -> (expiry, value)
+        self.heap: List[Tuple[float, int, Hashable]] = []
+        self.sequence = itertools.count()
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "evictions": 0
+        }
+
+    def add(self, key: Hashable, value: Any = None, ttl: float = None):
+        """Store a key until now + ttl (defaults to the index TTL); non-positive ttl is ignored"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        expiry = self.clock() + ttl
+        self.entries[key] = (expiry, value)
+        heapq.heappush(self.heap, (expiry, next(self.sequence), key))
+
+    def contains(self, key: Hashable) -> bool:
+        """Live (unexpired) membership check, counted towards the hit rate"""
+        self.stats["lookups"] += 1
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > self.clock():
+            self.stats["hits"] += 1
+            return True
+        return False
+
+    def expire(self) -> int:
+        """Evict every expired key; returns how many were removed"""
+        now = self.clock()
+        evicted = 0
+        while self.heap and self.heap[0][0] <= now:
+            expiry, _, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == expiry:
+                del self.entries[key]
+                evicted += 1
+        self.stats["evictions"] += evicted
+        # Superseded heap entries pile up if keys are re-added often; rebuild when mostly stale
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = [(expiry, next(self.sequence), key) for key, (expiry, _) in self.entries.items()]
+            heapq.heapify(self.heap)
+        return evicted
+
+    def values(self) -> Iterator[Any]:
+        now = self.clock()
+        return (value for expiry, value in self.entries.values() if expiry > now)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "size": len(self.entries),
+            "hit_rate": self.stats["hits"] / self.stats["lookups"] if self.stats["lookups"] else 0.0
+        }
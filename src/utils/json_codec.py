@@ -0,0 +1,22 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+BACKEND = "orjson" if ORJSON_AVAILABLE else "json"
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON with orjson when installed, stdlib json otherwise"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes (for pre-serialized responses)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
@@ -0,0 +1,123 @@
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+class TradeBook:
+    """
+    The one in-memory book of open trades, shared by the engine and managers
+    - Primary store is keyed by object identity, with a ticket index on top
+      (a trade without a ticket yet is still tracked)
+    - Secondary indexes by symbol, (profit_chain_id, profit_level), profit
+      chain, re-entry chain_id and strategy; each bucket is an insertion-
+      ordered dict used as a set, so add/remove/lookup are all O(1)
+    - Index keys are captured on add(); call reindex() after changing a
+      trade's symbol/chain/level/strategy while it is in the book
+    - Listeners (e.g. the exposure engine) get track(trade)/untrack(trade)
+      on every insert and removal
+    """
+
+    def __init__(self, listeners: Iterable = ()):
+        self.listeners = list(listeners)
+        self.trades: Dict[int, object] = {}
+        self.by_ticket: Dict[Hashable, object] = {}
+        self.keys: Dict[int, Tuple] = {}
+        self.indexes: Dict[str, Dict[Hashable, Dict[int, object]]] = {
+            "symbol": {},
+            "profit_level": {},
+            "profit_chain": {},
+            "chain": {},
+            "strategy": {}
+        }
+
+    @staticmethod
+    def _index_keys(trade) -> Tuple:
+        profit_chain_id = getattr(trade, 'profit_chain_id', None)
+        return (
+            ("symbol", trade.symbol),
+            ("profit_level", (profit_chain_id, getattr(trade, 'profit_level', 0)) if profit_chain_id else None),
+            ("profit_chain", profit_chain_id),
+            ("chain", getattr(trade, 'chain_id', None)),
+            ("strategy", getattr(trade, 'strategy', None))
+        )
+
+    def add(self, trade):
+        """Insert a trade (adding the same object twice is a no-op)"""
+        key = id(trade)
+        if key in self.trades:
+            return
+        self.trades[key] = trade
+        if trade.trade_id is not None:
+            self.by_ticket[trade.trade_id] = trade
+        keys = self._index_keys(trade)
+        self.keys[key] = keys
+        for index, value in keys:
+            if value is not None:
+                self.indexes[index].setdefault(value, {})[key] = trade
+        for listener in self.listeners:
+            listener.track(trade)
+
+    def remove(self, trade) -> bool:
+        """Drop a trade from the book; returns False if it was not there"""
+        key = id(trade)
+        if self.trades.pop(key, None) is None:
+            return False
+        if trade.trade_id is not None and self.by_ticket.get(trade.trade_id) is trade:
+            del self.by_ticket[trade.trade_id]
+        for index, value in self.keys.pop(key):
+            if value is None:
+                continue
+            bucket = self.indexes[index][value]
+            del bucket[key]
+            if not bucket:
+                del self.indexes[index][value]
+        for listener in self.listeners:
+            listener.untrack(trade)
+        return True
+
+    def reindex(self, trade):
+        """Refresh the secondary indexes after a trade's attributes changed"""
+        if self.remove(trade):
+            self.add(trade)
+
+    def get(self, ticket) -> Optional[object]:
+        """Open trade for a broker ticket, or None"""
+        return self.by_ticket.get(ticket)
+
+    def by_symbol(self, symbol: str) -> List:
+        return list(self.indexes["symbol"].get(symbol, {}).values())
+
+    def by_profit_level(self, profit_chain_id: str, level: int) -> List:
+        return list(self.indexes["profit_level"].get((profit_chain_id, level), {}).values())
+
+    def by_profit_chain(self, profit_chain_id: str) -> List:
+        return list(self.indexes["profit_chain"].get(profit_chain_id, {}).values())
+
+    def by_chain(self, chain_id: str) -> List:
+        return list(self.indexes["chain"].get(chain_id, {}).values())
+
+    def by_strategy(self, strategy: str) -> List:
+        return list(self.indexes["strategy"].get(strategy, {}).values())
+
+    def symbols(self) -> List[str]:
+        return list(self.indexes["symbol"])
+
+    def profit_chain_ids(self) -> List[str]:
+        return list(self.indexes["profit_chain"])
+
+    def purge_closed(self) -> List:
+        """Remove trades already marked closed elsewhere; returns them"""
+        closed = [t for t in self.trades.values() if t.status == "closed"]
+        for trade in closed:
+            self.remove(trade)
+        return closed
+
+    def __iter__(self) -> Iterator:
+        # Snapshot, so callers may close (remove) trades while iterating
+        return iter(list(self.trades.values()))
+
+    def __len__(self) -> int:
+        return len(self.trades)
+
+    def __bool__(self) -> bool:
+        return bool(self.trades)
+
+    def __contains__(self, trade) -> bool:
+        return id(trade) in self.trades
@@ -0,0 +1,84 @@
+import bisect
+import itertools
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Trigger directions
+ABOVE = "above"  # Fires when price >= level (buy TP, sell SL, buy re-entry targets)
+BELOW = "below"  # Fires when price <= level (buy SL, sell TP, sell re-entry targets)
+
+class PriceTriggerIndex:
+    """
+    Per-symbol sorted price levels for SL/TP/re-entry hit detection
+    - ABOVE levels are kept ascending: everything at or below the price has fired
+    - BELOW levels are kept ascending: everything at or above the price has fired
+    - crossed() is a binary search plus the k fired entries: O(log n + k)
+    Triggers stay in the index until remove() is called, so a caller that
+    cannot act on a hit (e.g. broker close failed) sees it again next tick
+    """
+
+    def __init__(self):
+        self.levels: Dict[str, Dict[str, List[Tuple[float, int, Hashable]]]] = {}
+        self.entries: Dict[Hashable, Tuple[str, str, Tuple[float, int, Hashable], Any]] = {}
+        self.sequence = itertools.count()  # Tie-breaker so keys never need to be comparable
+
+    def add(self, key: Hashable, symbol: str, level: float, direction: str, payload: Any = None):
+        """Insert (or move) a trigger"""
+        if direction not in (ABOVE, BELOW):
+            raise ValueError(f"Invalid trigger direction: {direction}")
+        if key in self.entries:
+            self.remove(key)
+
+        item = (level, next(self.sequence), key)
+        sides = self.levels.setdefault(symbol, {ABOVE: [], BELOW: []})
+        bisect.insort(sides[direction], item)
+        self.entries[key] = (symbol, direction, item, payload)
+
+    def remove(self, key: Hashable) -> bool:
+        """Delete a trigger; returns False if it was not indexed"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+
+        symbol, direction, item, _ = entry
+        sides = self.levels[symbol]
+        levels = sides[direction]
+        position = bisect.bisect_left(levels, item)
+        del levels[position]
+
+        if not sides[ABOVE] and not sides[BELOW]:
+            del self.levels[symbol]
+        return True
+
+    def crossed(self, symbol: str, above_price: float,
+                below_price: Optional[float] = None) -> List[Hashable]:
+        """
+        Keys of every trigger the price has reached
+        below_price lets BELOW triggers use a different quote (e.g. ask for ABOVE, bid for BELOW)
+        """
+        sides = self.levels.get(symbol)
+        if sides is None:
+            return []
+        if below_price is None:
+            below_price = above_price
+
+        above = sides[ABOVE]
+        below = sides[BELOW]
+        # (price, inf) sorts after every item at that level; (price, -1) before
+        fired = [item[2] for item in above[:bisect.bisect_right(above, (above_price, float("inf")))]]
+        fired.extend(item[2] for item in below[bisect.bisect_left(below, (below_price, -1)):])
+        return fired
+
+    def get(self, key: Hashable) -> Any:
+        """Payload stored with a trigger (None if not indexed)"""
+        entry = self.entries.get(key)
+        return entry[3] if entry else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def symbols(self) -> List[str]:
+        """Symbols that currently have at least one trigger"""
+        return list(self.levels.keys())
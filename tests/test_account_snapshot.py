@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test for the cached account snapshot
+Entry decisions read tier, lot size and caps without a broker round trip
+"""
+import sys
+import os
+import time
+import asyncio
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade
+from src.utils.trade_book import TradeBook
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.managers.risk_manager import RiskManager
+from src.services.account_snapshot import AccountSnapshotService
+
+CONFIG = {
+    "simulate_orders": False,
+    "account_snapshot_config": {"ttl_seconds": 5.0},
+    "fixed_lot_sizes": {"5000": 0.05, "10000": 0.1, "25000": 1.0},
+    "risk_tiers": {
+        "10000": {"daily_loss_limit": 400, "max_total_loss": 1000},
+        "25000": {"daily_loss_limit": 1000, "max_total_loss": 2500}
+    }
+}
+
+class FakeMT5:
+    """Counts account round trips; balance can be changed between calls"""
+
+    def __init__(self, balance=12000.0):
+        self.balance = balance
+        self.info_calls = 0
+        self.balance_calls = 0
+        self.fail = False
+
+    def get_account_info(self):
+        time.sleep(0.01)
+        self.info_calls += 1
+        if self.fail:
+            return None
+        return {"balance": self.balance, "equity": self.balance - 50, "margin": 200.0,
+                "free_margin": self.balance - 250}
+
+    def get_account_balance(self):
+        self.balance_calls += 1
+        return self.balance
+
+def make_risk_manager(mt5):
+    risk_manager = RiskManager(CONFIG)
+    risk_manager.daily_loss = risk_manager.lifetime_loss = 0.0
+    risk_manager.set_mt5_client(mt5)
+    return risk_manager
+
+def trade(ticket):
+    return Trade(symbol="EURUSD", entry=1.08, sl=1.07, tp=1.09, lot_size=0.1, direction="buy",
+                 strategy="LOGIC1", open_time="2025-01-01T00:00:00", trade_id=ticket)
+
+def test_cached_entry_decisions():
+    """Concurrent lookups share one fetch; can_trade and lot size need no broker call"""
+    print("\n" + "="*80)
+    print("TEST 1: CACHED TIER / LOT / CAPS")
+    print("="*80)
+
+    mt5 = FakeMT5()
+    client = AsyncMT5Client(mt5, CONFIG)
+    risk_manager = make_risk_manager(mt5)
+    service = AccountSnapshotService(client, risk_manager, CONFIG)
+    risk_manager.set_account_snapshot(service)
+    book = TradeBook(listeners=[service])
+
+    async def scenario():
+        first = await asyncio.gather(*(service.get() for _ in range(10)))
+        assert mt5.info_calls == 1 and all(s is first[0] for s in first)
+        snapshot = first[0]
+        assert (snapshot.risk_tier, snapshot.lot_size) == ("10000", 0.1)
+        assert snapshot.risk_params["daily_loss_limit"] == 400 and snapshot.free_margin == 11750.0
+
+        # 100 entry decisions: no account round trip at all
+        for _ in range(100):
+            assert risk_manager.can_trade()
+            assert (await service.get()).lot_size == 0.1
+        assert mt5.info_calls == 1 and mt5.balance_calls == 0
+
+        # Caps come from the snapshot's tier
+        risk_manager.daily_loss = 400
+        assert not risk_manager.can_trade()
+        risk_manager.daily_loss = 0.0
+
+        # A trade event does not make the next entry wait: the last snapshot is
+        # served at once and refreshed in the background
+        mt5.balance = 30000.0
+        book.add(trade(1))
+        stale = await service.get()
+        assert stale is snapshot and mt5.info_calls == 1 and service.stats["stale_hits"] == 1
+        await service.background
+        snapshot = await service.get()
+        assert mt5.info_calls == 2 and (snapshot.risk_tier, snapshot.lot_size) == ("25000", 1.0)
+
+        # max_age asks for a snapshot that is actually fresh
+        mt5.balance = 12000.0
+        book.add(trade(2))
+        snapshot = await service.get(max_age=5.0)
+        assert mt5.info_calls == 3 and snapshot.lot_size == 0.1
+        assert (await service.get(max_age=5.0)) is snapshot and mt5.info_calls == 3
+
+        # A failed refresh keeps serving the last good snapshot
+        mt5.fail = True
+        service.invalidate()
+        assert (await service.get()) is snapshot
+        await service.background
+        assert (await service.get()) is snapshot and service.stats["failures"] == 1
+
+    asyncio.run(scenario())
+    client.close()
+    print("[PASS] 1 fetch for 10 concurrent lookups, 0 broker calls for 100 entry decisions")
+    return True
+
+def test_background_refresh_and_lot_tiers():
+    """The refresh task reacts to trade events; lot tiers re-sort only when config changes"""
+    print("\n" + "="*80)
+    print("TEST 2: BACKGROUND REFRESH + LOT TIERS")
+    print("="*80)
+
+    mt5 = FakeMT5(balance=6000.0)
+    client = AsyncMT5Client(mt5, CONFIG)
+    risk_manager = make_risk_manager(mt5)
+    service = AccountSnapshotService(client, risk_manager, CONFIG)
+    book = TradeBook(listeners=[service])
+
+    async def scenario():
+        await service.start()
+        assert service.snapshot.lot_size == 0.05 and mt5.info_calls == 1
+        mt5.balance = 11000.0
+        book.add(trade(7))
+        await asyncio.sleep(0.1)
+        assert mt5.info_calls == 2 and service.snapshot.lot_size == 0.1
+        hits_before = service.stats["hits"]
+        await service.get()
+        assert service.stats["hits"] == hits_before + 1
+        await service.stop()
+
+    asyncio.run(scenario())
+    client.close()
+
+    tiers = risk_manager._sorted_lot_tiers()
+    assert risk_manager._sorted_lot_tiers() is tiers  # cached
+    CONFIG["fixed_lot_sizes"]["10000"] = 0.2
+    try:
+        assert risk_manager.get_fixed_lot_size(11000) == 0.2
+    finally:
+        CONFIG["fixed_lot_sizes"]["10000"] = 0.1
+    assert risk_manager.get_fixed_lot_size(11000) == 0.1 and risk_manager.get_fixed_lot_size(100) == 0.05
+    print("[PASS] Trade event refreshed the snapshot; lot tier edits picked up")
+    return True
+
+def main():
+    results = [
+        test_cached_entry_decisions(),
+        test_background_refresh_and_lot_tiers()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test for hash-indexed alert de-duplication
+Duplicate checks are keyed lookups; expiry follows the alert window
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.utils.expiring_index import ExpiringIndex
+from src.processors.alert_processor import AlertProcessor
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_expiring_index():
+    """Keys expire on time; re-added keys keep their newest expiry; stale heap entries are skipped"""
+    print("\n" + "="*80)
+    print("TEST 1: EXPIRING INDEX")
+    print("="*80)
+
+    clock = FakeClock()
+    index = ExpiringIndex(300, clock=clock)
+    index.add("a", 1)
+    index.add("b", 2, ttl=10)
+    index.add("old", 3, ttl=-5)  # already outside the window
+
+    assert index.contains("a") and index.contains("b") and not index.contains("old")
+    clock.now += 11
+    assert not index.contains("b")
+    assert index.expire() == 1 and len(index) == 1
+
+    index.add("a", 4)  # re-add: old heap entry for "a" must not evict the new one
+    clock.now += 290
+    assert index.expire() == 0 and index.contains("a")
+    assert list(index.values()) == [4]
+    clock.now += 11
+    assert index.expire() == 1 and len(index) == 0
+
+    stats = index.get_stats()
+    assert stats["size"] == 0 and stats["evictions"] == 2
+    assert stats["lookups"] == 5 and stats["hits"] == 3
+    print(f"[PASS] Expiry, re-add and stats correct (hit rate {stats['hit_rate']:.2f})")
+    return True
+
+def test_alert_processor_duplicates():
+    """Same key inside the window is rejected; other keys and aged-out alerts pass"""
+    print("\n" + "="*80)
+    print("TEST 2: ALERT PROCESSOR DEDUP")
+    print("="*80)
+
+    processor = AlertProcessor({})
+    trend = {"type": "trend", "symbol": "EURUSD", "signal": "bull", "tf": "1h"}
+
+    assert processor.validate_alert(dict(trend))
+    assert not processor.validate_alert(dict(trend))
+    assert processor.validate_alert(dict(trend, tf="15m"))
+    assert processor.validate_alert(dict(trend, signal="bear"))
+
+    # Timestamped 6 minutes ago: already outside the window, never blocks a later alert
+    stale = dict(trend, symbol="GBPUSD", timestamp=(datetime.now() - timedelta(minutes=6)).isoformat())
+    assert processor.validate_alert(dict(stale))
+    assert processor.validate_alert(dict(trend, symbol="GBPUSD"))
+
+    # Timezone-aware timestamps are handled
+    aware = dict(trend, symbol="XAUUSD", timestamp="2099-01-01T00:00:00+00:00")
+    assert processor.validate_alert(dict(aware))
+    assert not processor.validate_alert(dict(aware))
+
+    # A burst over 10 symbols x 4 timeframes stays one entry per key
+    symbols = ['XAUUSD', 'EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD', 'NZDUSD', 'EURJPY', 'GBPJPY', 'AUDJPY']
+    for _ in range(3):
+        for symbol in symbols:
+            for tf in ['1h', '15m', '5m', '1d']:
+                processor.validate_alert({"type": "bias", "symbol": symbol, "signal": "bull", "tf": tf})
+
+    stats = processor.get_dedup_stats()
+    assert stats["size"] == 5 + 40, stats
+    assert stats["hits"] == 2 + 80, stats
+    assert len(processor.get_recent_alerts(alert_type="bias", symbol="EURUSD")) == 4
+    print(f"[PASS] {stats['size']} live keys, {stats['hits']} duplicates rejected (hit rate {stats['hit_rate']:.2f})")
+    return True
+
+def main():
+    results = [
+        test_expiring_index(),
+        test_alert_processor_duplicates()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
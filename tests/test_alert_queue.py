@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test for the asynchronous alert queue
+Strict order within a symbol, concurrency across symbols, bounded depth
+"""
+import sys
+import os
+import asyncio
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Alert
+from src.services.alert_queue import AlertQueue
+
+def make_alert(symbol, price):
+    return Alert(type="entry", symbol=symbol, signal="buy", tf="5m", price=price)
+
+class RecordingEngine:
+    """process_alert look-alike that records ordering and overlap"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.order = {}
+        self.running = {}
+        self.max_parallel = 0
+        self.overlap_same_symbol = False
+
+    async def process_alert(self, alert):
+        self.running[alert.symbol] = self.running.get(alert.symbol, 0) + 1
+        if self.running[alert.symbol] > 1:
+            self.overlap_same_symbol = True
+        self.max_parallel = max(self.max_parallel, sum(self.running.values()))
+        await asyncio.sleep(self.delay)
+        self.order.setdefault(alert.symbol, []).append(alert.price)
+        self.running[alert.symbol] -= 1
+        if alert.price < 0:
+            raise RuntimeError("broker rejected")
+        return alert.price != 0
+
+def test_per_symbol_order_and_cross_symbol_concurrency():
+    """Alerts per symbol finish in submit order; symbols run in parallel"""
+    print("\n" + "="*80)
+    print("TEST 1: ORDERING + CONCURRENCY")
+    print("="*80)
+
+    engine = RecordingEngine(delay=0.02)
+    queue = AlertQueue(engine.process_alert, {"alert_queue_config": {"workers": 4}})
+    symbols = ["XAUUSD", "EURUSD", "GBPUSD", "USDJPY"]
+
+    async def scenario():
+        await queue.start()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ids = [queue.submit(make_alert(symbol, i + 1)) for i in range(5) for symbol in symbols]
+        await queue.stop()  # drains
+        return ids, loop.time() - started
+
+    ids, elapsed = asyncio.run(scenario())
+
+    assert all(engine.order[symbol] == [1, 2, 3, 4, 5] for symbol in symbols), engine.order
+    assert not engine.overlap_same_symbol
+    assert engine.max_parallel == 4
+    # 5 sequential alerts x 20ms per symbol; serial processing would take ~400ms
+    assert elapsed < 0.3, f"took {elapsed*1000:.0f}ms"
+    assert all(queue.get_status(alert_id)["status"] == "processed" for alert_id in ids)
+    assert queue.get_stats()["processed"] == 20 and queue.depth == 0
+    print(f"[PASS] 20 alerts over 4 symbols in {elapsed*1000:.0f}ms, per-symbol order kept")
+    return True
+
+def test_backpressure_and_status():
+    """Full queue refuses alerts; status reports queued position, failures and errors"""
+    print("\n" + "="*80)
+    print("TEST 2: BACKPRESSURE + STATUS")
+    print("="*80)
+
+    engine = RecordingEngine(delay=0.01)
+    queue = AlertQueue(engine.process_alert, {"alert_queue_config": {"workers": 2, "max_queue_size": 3}})
+
+    async def scenario():
+        first = queue.submit(make_alert("XAUUSD", 1))
+        failed = queue.submit(make_alert("XAUUSD", 0))
+        error = queue.submit(make_alert("EURUSD", -1))
+        refused = queue.submit(make_alert("GBPUSD", 2))
+        before = (queue.get_status(first), queue.get_status(failed))
+        await queue.start()
+        await queue.stop()
+        return first, failed, error, refused, before
+
+    first, failed, error, refused, before = asyncio.run(scenario())
+
+    assert refused is None
+    assert before[0]["status"] == "queued" and before[0]["position"] == 0
+    assert before[1]["position"] == 1
+    assert queue.get_status(first)["status"] == "processed"
+    assert queue.get_status(failed)["status"] == "failed"
+    assert queue.get_status(error)["status"] == "error" and "broker" in queue.get_status(error)["error"]
+    assert queue.get_status("missing") is None
+    stats = queue.get_stats()
+    assert stats["rejected_full"] == 1 and stats["errors"] == 1 and stats["failed"] == 1
+    print("[PASS] 4th alert refused at depth 3; processed/failed/error statuses reported")
+    return True
+
+def main():
+    results = [
+        test_per_symbol_order_and_cross_symbol_concurrency(),
+        test_backpressure_and_status()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test for SQL-side analytics aggregation
+GROUP BY reports must match the old Python loops and use the trades indexes
+"""
+import sys
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import TradeDatabase
+from src.models import Trade
+from src.services.analytics_engine import AnalyticsEngine
+
+def seed_trades(db, count, rng):
+    now = datetime.now()
+    for i in range(count):
+        # Mostly inside the 30-day window, some older rows that must be ignored
+        closed = now - timedelta(days=rng.uniform(0, 45))
+        db.save_trade(Trade(
+            symbol=rng.choice(["XAUUSD", "EURUSD", "GBPUSD"]), entry=1.0, sl=0.9, tp=1.1,
+            lot_size=0.1, direction="buy", strategy=rng.choice(["LOGIC1", "LOGIC2", "LOGIC3"]),
+            open_time=(closed - timedelta(hours=1)).isoformat(), close_time=closed.isoformat(),
+            pnl=round(rng.uniform(-50, 50), 2), status="closed", trade_id=i
+        ))
+    db.flush()
+
+def python_report(trades):
+    """Reference implementation: the previous AnalyticsEngine loops"""
+    wins = [t['pnl'] for t in trades if t['pnl'] > 0]
+    losses = [t['pnl'] for t in trades if t['pnl'] < 0]
+    groups = {'symbol': {}, 'strategy': {}}
+    for column, stats in groups.items():
+        for t in trades:
+            entry = stats.setdefault(t[column], {'trades': 0, 'pnl': 0, 'wins': 0})
+            entry['trades'] += 1
+            entry['pnl'] += t['pnl']
+            entry['wins'] += 1 if t['pnl'] > 0 else 0
+    return {
+        'total_trades': len(trades),
+        'winning_trades': len(wins),
+        'losing_trades': len(losses),
+        'total_pnl': sum(t['pnl'] for t in trades),
+        'average_win': sum(wins) / len(wins) if wins else 0,
+        'average_loss': sum(losses) / len(losses) if losses else 0
+    }, groups
+
+def test_sql_reports_match_python_loops():
+    """Summary, pair and strategy reports equal the row-by-row aggregation"""
+    print("\n" + "="*80)
+    print("TEST 1: SQL AGGREGATES VS PYTHON LOOPS")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TradeDatabase(os.path.join(tmp, "trades.db"))
+        seed_trades(db, 2000, random.Random(7))
+        analytics = AnalyticsEngine(db)
+
+        expected, groups = python_report(db.get_trade_history(30))
+        report = analytics.get_performance_report()
+        pairs = analytics.get_pair_performance()
+        strategies = analytics.get_strategy_performance()
+        db.close()
+
+    assert 0 < expected['total_trades'] < 2000
+    for key, value in expected.items():
+        assert abs(report[key] - value) < 1e-6, (key, report[key], value)
+    assert abs(report['win_rate'] - expected['winning_trades'] / expected['total_trades'] * 100) < 1e-9
+    for actual, reference in ((pairs, groups['symbol']), (strategies, groups['strategy'])):
+        assert actual.keys() == reference.keys()
+        for name, stats in reference.items():
+            assert actual[name]['trades'] == stats['trades']
+            assert actual[name]['wins'] == stats['wins']
+            assert abs(actual[name]['pnl'] - stats['pnl']) < 1e-6
+    print(f"[PASS] {expected['total_trades']} windowed trades: summary, pair and strategy reports match")
+    return True
+
+def test_report_queries_use_indexes():
+    """Query planner searches trades through the new indexes instead of a full scan"""
+    print("\n" + "="*80)
+    print("TEST 2: INDEXED QUERY PLANS")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TradeDatabase(os.path.join(tmp, "trades.db"))
+        indexes = {row[1] for row in db.conn.execute("PRAGMA index_list(trades)")}
+        plan = " ".join(row[3] for row in db.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM trades WHERE close_time >= datetime('now', '-30 days')"
+        ))
+        db.close()
+
+    assert {"idx_trades_close_time", "idx_trades_symbol", "idx_trades_strategy",
+            "idx_trades_profit_chain"} <= indexes
+    assert "idx_trades_close_time" in plan, plan
+    print(f"[PASS] Plan: {plan}")
+    return True
+
+def main():
+    results = [
+        test_sql_reports_match_python_loops(),
+        test_report_queries_use_indexes()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test for the async MT5 facade
+Verifies terminal calls run on one dedicated thread without blocking the event loop
+"""
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.clients.async_mt5_client import AsyncMT5Client
+
+class SlowTerminal:
+    """Blocking MT5Client look-alike: every call sleeps like a slow broker round trip"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.initialized = True
+        self.threads = set()
+
+    def _blocking_call(self, result):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return result
+
+    def get_current_price(self, symbol):
+        return self._blocking_call(2650.0)
+
+    def get_account_balance(self):
+        return self._blocking_call(10000.0)
+
+    def place_order(self, symbol, order_type, lot_size, price, sl, tp=None, comment=""):
+        return self._blocking_call(123456)
+
+    def close_position(self, position_id, percentage=100):
+        return self._blocking_call(True)
+
+def test_calls_do_not_block_event_loop():
+    """Loop keeps ticking while terminal calls run serially on the mt5 thread"""
+    print("\n" + "="*80)
+    print("TEST 1: EVENT LOOP STAYS RESPONSIVE")
+    print("="*80)
+
+    terminal = SlowTerminal(delay=0.1)
+    client = AsyncMT5Client(terminal, {})
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        results = await asyncio.gather(
+            client.get_current_price("XAUUSD"),
+            client.get_account_balance(),
+            client.place_order("XAUUSD", "buy", 0.1, 2650.0, 2640.0, tp=2665.0)
+        )
+        beat.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    client.close()
+
+    assert results == [2650.0, 10000.0, 123456]
+    assert ticks >= 15, f"event loop starved: only {ticks} heartbeats"
+    assert len(terminal.threads) == 1 and next(iter(terminal.threads)).startswith("mt5")
+    print(f"[PASS] 3 blocking calls ran on one '{next(iter(terminal.threads))}' thread, loop ticked {ticks} times")
+    return True
+
+def test_timeout_returns_failure_value():
+    """A call slower than its timeout returns the failure value and is counted"""
+    print("\n" + "="*80)
+    print("TEST 2: PER-CALL TIMEOUT + LATENCY HISTOGRAM")
+    print("="*80)
+
+    terminal = SlowTerminal(delay=0.2)
+    client = AsyncMT5Client(terminal, {"mt5_async_config": {"price_timeout_seconds": 0.05}})
+
+    async def scenario():
+        price = await client.get_current_price("EURUSD")
+        balance = await client.get_account_balance()
+        return price, balance
+
+    price, balance = asyncio.run(scenario())
+    client.close()
+    stats = client.get_stats()
+
+    assert price == 0.0
+    assert balance == 10000.0
+    assert stats["get_current_price"]["timeouts"] == 1
+    assert stats["get_current_price"]["histogram"]["<=100ms"] == 1
+    # The balance call queues behind the abandoned price call on the single worker
+    assert stats["get_account_balance"]["calls"] == 1
+    assert sum(stats["get_account_balance"]["histogram"].values()) == 1
+    assert stats["get_account_balance"]["max_ms"] >= 200
+    print("[PASS] Timed-out price call returned 0.0, latencies bucketed")
+    return True
+
+def test_slow_orders_are_not_abandoned():
+    """An order call slower than its timeout still hands back the broker's result"""
+    print("\n" + "="*80)
+    print("TEST 3: SLOW ORDERS RETURN THEIR LATE RESULT")
+    print("="*80)
+
+    terminal = SlowTerminal(delay=0.2)
+    client = AsyncMT5Client(terminal, {"mt5_async_config": {"order_timeout_seconds": 0.05}})
+
+    async def scenario():
+        ticket = await client.place_order("XAUUSD", "buy", 0.1, 2650.0, 2640.0, tp=2665.0)
+        closed = await client.close_position(ticket)
+        return ticket, closed
+
+    ticket, closed = asyncio.run(scenario())
+    client.close()
+    stats = client.get_stats()
+
+    # The fill arrived after the timeout: the caller tracks it instead of leaving an orphan
+    assert ticket == 123456 and closed is True
+    assert stats["place_order"]["timeouts"] == 1 and stats["place_order"]["max_ms"] >= 200
+    assert stats["close_position"]["timeouts"] == 1
+    print("[PASS] Late fill returned ticket 123456, late close reported success")
+    return True
+
+def main():
+    results = [
+        test_calls_do_not_block_event_loop(),
+        test_timeout_returns_failure_value(),
+        test_slow_orders_are_not_abandoned()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test for the tick-replay backtest
+Historical ticks and alerts drive the real engine on a virtual clock
+"""
+import sys
+import os
+import asyncio
+import contextlib
+import tempfile
+from datetime import datetime
+import numpy as np
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade
+from src.utils.clock import VirtualClock
+from src.managers.reentry_manager import ReEntryManager
+from src.backtest.tick_feed import (TICK_DTYPE, load_tick_csv, load_bar_csv, save_ticks,
+                                    open_ticks, merge_ticks)
+from src.backtest.replay import BacktestRunner, BacktestConfig
+
+START = datetime(2025, 1, 6, 9, 0).timestamp()
+
+def test_virtual_clock_and_reentry_windows():
+    """Sleeps wake on virtual time; recovery window and cooldown follow the clock"""
+    print("\n" + "="*80)
+    print("TEST 1: VIRTUAL CLOCK + RE-ENTRY WINDOWS")
+    print("="*80)
+
+    clock = VirtualClock(START)
+    woken = []
+
+    async def sleeper(name, seconds):
+        await clock.sleep(seconds)
+        woken.append((name, clock.time() - START))
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(sleeper("b", 10)), asyncio.ensure_future(sleeper("a", 5))]
+        await asyncio.sleep(0)
+        clock.advance(4)
+        await asyncio.sleep(0)
+        assert woken == []
+        clock.advance_to(START + 30)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert woken == [("a", 30), ("b", 30)]
+    clock.advance_to(START)  # never goes backwards
+    assert clock.time() == START + 30
+
+    config = BacktestConfig()
+    reentry = ReEntryManager(config, clock=clock)
+    trade = Trade(symbol="XAUUSD", entry=2650.0, sl=2640.0, tp=2665.0, lot_size=0.1, direction="buy",
+                  strategy="LOGIC1", open_time=clock.now().isoformat(), trade_id=1)
+    reentry.create_chain(trade)
+    reentry.record_sl_hit(trade)
+    window = config["re_entry_config"]["recovery_window_minutes"] * 60
+    cooldown = config["re_entry_config"]["min_time_between_re_entries"]
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        clock.advance(cooldown / 2)
+        assert not reentry.check_reentry_opportunity("XAUUSD", "buy", 2645.0)["is_reentry"]
+        clock.advance(cooldown)
+        assert reentry.check_reentry_opportunity("XAUUSD", "buy", 2645.0)["is_reentry"]
+        clock.advance(window)
+        assert not reentry.check_reentry_opportunity("XAUUSD", "buy", 2645.0)["is_reentry"]
+    print("[PASS] Sleepers woke in deadline order; cooldown and recovery window in virtual time")
+    return True
+
+def test_tick_files():
+    """CSV, memory-mapped .npy and bar files load into time-ordered ticks"""
+    print("\n" + "="*80)
+    print("TEST 2: TICK / BAR FILES")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "ticks.csv")
+        with open(csv_path, "w") as f:
+            f.write("time,symbol,bid,ask\n")
+            f.write("2025-01-06T09:00:02,EURUSD,1.0850,1.0851\n")
+            f.write(f"{START},XAUUSD,2650.0,2650.2\n")
+            f.write(f"{START + 1},EURUSD,1.0849,1.0850\n")
+            f.write(f"{START + 3},XAUUSD,2650.5,2650.7\n")
+        series = load_tick_csv(csv_path)
+        merged = list(merge_ticks(series))
+        assert [tick[0] - START for tick in merged] == [0, 1, 2, 3]
+        assert [tick[1] for tick in merged] == ["XAUUSD", "EURUSD", "EURUSD", "XAUUSD"]
+
+        npy_path = os.path.join(workdir, "XAUUSD.npy")
+        save_ticks(npy_path, series["XAUUSD"])
+        mapped = open_ticks(npy_path)
+        assert isinstance(mapped, np.memmap) and mapped["ask"].tolist() == [2650.2, 2650.7]
+
+        bar_path = os.path.join(workdir, "bars.csv")
+        with open(bar_path, "w") as f:
+            f.write("time,open,high,low,close\n")
+            f.write(f"{START},2650,2655,2648,2654\n")  # up bar: open, low, high, close
+            f.write(f"{START + 60},2654,2656,2651,2652\n")  # down bar: open, high, low, close
+        bars = load_bar_csv(bar_path, "XAUUSD", pip_size=0.01, spread_pips=20)["XAUUSD"]
+        assert bars["bid"].tolist() == [2650, 2648, 2655, 2654, 2654, 2656, 2651, 2652]
+        assert bars["time"][-1] - START == 105 and abs(bars["ask"][0] - bars["bid"][0] - 0.2) < 1e-9
+    print("[PASS] Multi-symbol merge ordered; .npy memory-mapped; bars expand to adverse intrabar path")
+    return True
+
+def synthetic_session(n=20000):
+    """Gold rallies for 8000 seconds, then sells off"""
+    steps = np.where(np.arange(n) < 8000, 0.01, -0.012)
+    mid = 2650 + np.cumsum(steps)
+    ticks = np.zeros(n, TICK_DTYPE)
+    ticks["time"] = START + np.arange(n)
+    ticks["bid"], ticks["ask"] = mid - 0.1, mid + 0.1
+    alerts = [
+        (START + 1, {"type": "trend", "symbol": "XAUUSD", "signal": "bull", "tf": "1h"}),
+        (START + 2, {"type": "trend", "symbol": "XAUUSD", "signal": "bull", "tf": "15m"}),
+        (START + 10, {"type": "entry", "symbol": "XAUUSD", "signal": "buy", "tf": "5m", "price": 2650.1})
+    ]
+    return ticks, alerts
+
+def run_session():
+    ticks, alerts = synthetic_session()
+    runner = BacktestRunner()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        result = asyncio.run(runner.run(merge_ticks({"XAUUSD": ticks}), alerts))
+    return runner, result
+
+def test_replay_drives_engine():
+    """Alerts open dual orders; profit booking and TP exits fill on replayed ticks, deterministically"""
+    print("\n" + "="*80)
+    print("TEST 3: REPLAY THROUGH THE REAL ENGINE")
+    print("="*80)
+
+    runner, result = run_session()
+    summary = result.summary()
+    assert summary["ticks"] == 20000 and summary["alerts"] == 3 and summary["alerts_failed"] == 0
+    assert result.orders > 2  # Order A + Order B + profit-booking levels
+    assert result.deals and all(START <= deal.time <= START + 20000 for deal in result.deals)
+    assert abs(result.final_balance - 10000.0 - sum(deal.profit for deal in result.deals)) < 1e-6
+    chains = runner.engine.profit_booking_manager.get_all_chains().values()
+    assert any(chain.current_level >= 1 for chain in chains)  # profit booking levelled up offline
+    assert result.speedup > 50
+
+    # Same inputs, same fills
+    _, again = run_session()
+    key = lambda r: [(d.ticket, d.price_close, round(d.profit, 6), d.reason, d.time) for d in r.deals]
+    assert key(again) == key(result)
+    print(f"[PASS] {result.orders} orders, {len(result.deals)} deals, net ${result.net_pnl:.2f}; "
+          f"{result.virtual_seconds / 3600:.1f}h replayed in {result.wall_seconds:.2f}s")
+    return True
+
+def test_alerts_validated_like_webhook():
+    """Recorded alerts pass through AlertProcessor: invalid ones and repeats inside 5 minutes are dropped"""
+    print("\n" + "="*80)
+    print("TEST 4: REPLAYED ALERTS VALIDATED + DEDUPLICATED")
+    print("="*80)
+
+    ticks, alerts = synthetic_session(n=1200)
+    entry = alerts[-1][1]
+    alerts = alerts + [
+        (START + 70, dict(entry)),  # same signal 1 minute later: duplicate
+        (START + 80, {"type": "entry", "symbol": "XAUUSD", "signal": "buy", "price": 2650.9}),  # no tf
+        (START + 400, dict(entry, price=2653.0))  # outside the 5-minute window: accepted
+    ]
+    runner = BacktestRunner()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        result = asyncio.run(runner.run(merge_ticks({"XAUUSD": ticks}), alerts))
+
+    assert result.alerts == 6 and result.alerts_rejected == 2 and result.alerts_failed == 0
+    assert result.summary()["alerts_rejected"] == 2
+    print("[PASS] 6 recorded alerts: duplicate and invalid rejected, 4 processed")
+    return True
+
+def main():
+    results = [
+        test_virtual_clock_and_reentry_windows(),
+        test_tick_files(),
+        test_replay_drives_engine(),
+        test_alerts_validated_like_webhook()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
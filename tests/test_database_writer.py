@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Test for the batched background SQLite writer
+Queued writes are group-committed, durable writes are on disk on return (or on confirm()
+from the event loop), close() loses nothing
+"""
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import TradeDatabase
+from src.managers.profit_booking_manager import ProfitBookingManager
+from src.models import Trade, ProfitBookingChain
+
+def make_trade(i, status="closed"):
+    return Trade(
+        symbol="XAUUSD", entry=2650.0 + i, sl=2640.0, tp=2660.0, lot_size=0.1,
+        direction="buy", strategy="LOGIC1", open_time="2025-01-01T00:00:00",
+        close_time="2025-01-01T01:00:00" if status == "closed" else None,
+        pnl=5.0, status=status, trade_id=1000 + i
+    )
+
+def count_rows(db_path, table):
+    # Fresh connection: only committed data is visible
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_group_commit_and_flush():
+    """A burst of writes lands in a handful of transactions; reads see it after flush()"""
+    print("\n" + "="*80)
+    print("TEST 1: GROUP COMMIT + FLUSH")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "trades.db")
+        db = TradeDatabase(db_path, {"database_config": {"batch_window_ms": 100}})
+
+        started = time.perf_counter()
+        for i in range(16):
+            db.save_trade(make_trade(i))
+            db.save_profit_booking_event(f"chain_{i}", 1, 7.5, 1, 2)
+        enqueue_ms = (time.perf_counter() - started) * 1000
+
+        assert db.flush()
+        assert count_rows(db_path, "trades") == 16
+        assert count_rows(db_path, "profit_booking_events") == 16
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        stats = db.get_stats()
+        db.close()
+
+    # 16 closed trades (row + rollup + lifecycle event each) + 16 profit booking events
+    assert stats["writes_committed"] == stats["writes_queued"] == 64 and stats["writes_failed"] == 0
+    assert stats["commits"] <= 3, stats
+    print(f"[PASS] 64 writes queued in {enqueue_ms:.1f}ms, committed in {stats['commits']} transaction(s)")
+    return True
+
+def test_durable_order_writes():
+    """Order placement records are committed before save returns; others wait for the window"""
+    print("\n" + "="*80)
+    print("TEST 2: DURABLE ORDER WRITES")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "trades.db")
+        db = TradeDatabase(db_path, {"database_config": {"batch_window_ms": 2000}})
+
+        db.save_profit_booking_event("chain_1", 1, 7.5, 1, 2)
+        db.save_trade(make_trade(1, status="open"))
+        # The durable write commits the batch it joined, including the event before it
+        assert count_rows(db_path, "trades") == 1
+        assert count_rows(db_path, "profit_booking_events") == 1
+
+        db.save_profit_booking_order("order_1", "chain_1", 1, 7.0, 10, "OPEN")
+        assert count_rows(db_path, "profit_booking_orders") == 1
+
+        db.save_sl_event("1001", "XAUUSD", 2640.0, 2650.0)
+        assert count_rows(db_path, "sl_events") == 0  # still inside the 2s window
+
+        stats = db.get_stats()
+        db.close()
+        assert count_rows(db_path, "sl_events") == 1
+
+    assert stats["durable_writes"] == 2
+    print("[PASS] Open trade and profit order durable on return; SL event batched")
+    return True
+
+def test_close_flushes_concurrent_writers():
+    """Writes from several threads all survive close(); bad SQL does not poison the batch"""
+    print("\n" + "="*80)
+    print("TEST 3: CONCURRENT WRITERS + CLOSE")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "trades.db")
+        db = TradeDatabase(db_path, {"database_config": {"batch_window_ms": 1000}})
+
+        def writer(offset):
+            for i in range(50):
+                db.save_reversal_exit_event(str(offset + i), "EURUSD", 1.085, "REVERSAL_BEAR", -2.0)
+
+        threads = [threading.Thread(target=writer, args=(n * 100,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        db._write("INSERT INTO missing_table VALUES (1)")
+        for thread in threads:
+            thread.join()
+
+        db.close()
+        db.close()  # idempotent
+        rows = count_rows(db_path, "reversal_exit_events")
+        stats = db.get_stats()
+
+    assert rows == 200, rows
+    assert stats["writes_failed"] == 1
+    print(f"[PASS] {rows} rows from 4 threads flushed on close; failed statement isolated")
+    return True
+
+def test_durable_writes_do_not_block_loop():
+    """On the event loop a durable save returns at once; confirm() awaits the commit"""
+    print("\n" + "="*80)
+    print("TEST 4: DURABLE WRITES FROM THE EVENT LOOP")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "trades.db")
+        db = TradeDatabase(db_path, {"database_config": {"batch_window_ms": 50}})
+
+        # Hold the writer's first commit so a blocking save would stall the loop
+        gate = threading.Event()
+        commit_batch = db._commit_batch
+        def held_commit(conn, batch):
+            gate.wait(5.0)
+            commit_batch(conn, batch)
+        db._commit_batch = held_commit
+
+        async def scenario():
+            ticks = []
+            async def heartbeat():
+                while True:
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+            beat = asyncio.create_task(heartbeat())
+
+            started = time.perf_counter()
+            pending = db.save_trade(make_trade(1, status="open"))
+            save_ms = (time.perf_counter() - started) * 1000
+            assert isinstance(pending, asyncio.Future) and not pending.done()
+            assert db.save_trade(make_trade(2)) is None  # closed trades are not durable
+
+            await asyncio.sleep(0.2)
+            assert count_rows(db_path, "trades") == 0
+            gate.set()
+            confirmed = await db.confirm(pending)
+            rows = count_rows(db_path, "trades")
+            beat.cancel()
+            return save_ms, confirmed, rows, len(ticks)
+
+        save_ms, confirmed, rows, ticks = asyncio.run(scenario())
+        stats = db.get_stats()
+        db.close()
+
+    assert save_ms < 50, save_ms
+    assert confirmed and rows >= 1
+    assert ticks >= 10, ticks  # heartbeat kept running while the commit was held
+    assert stats["durable_writes"] == 1
+    print(f"[PASS] Durable save returned in {save_ms:.1f}ms; loop ran {ticks} heartbeats until confirm()")
+    return True
+
+def test_failed_durable_writes_are_reported():
+    """A durable write whose statement fails or whose commit rolls back confirms False"""
+    print("\n" + "="*80)
+    print("TEST 5: FAILED DURABLE WRITES")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TradeDatabase(os.path.join(tmp, "trades.db"), {"database_config": {"batch_window_ms": 50}})
+
+        async def scenario():
+            bad = db._write("INSERT INTO missing_table VALUES (1)", durable=True)
+            good = db.save_trade(make_trade(1, status="open"))
+            statement = await db.confirm_all([bad, good])
+
+            class DiskFull:
+                """Writer connection whose commit fails, so the batch rolls back"""
+                def __init__(self, conn):
+                    self.conn = conn
+
+                def __getattr__(self, name):
+                    return getattr(self.conn, name)
+
+                def commit(self):
+                    raise sqlite3.OperationalError("database or disk is full")
+
+            commit_batch = db._commit_batch
+            db._commit_batch = lambda conn, batch: commit_batch(DiskFull(conn), batch)
+            lost = await db.confirm(db.save_trade(make_trade(2, status="open")))
+            db._commit_batch = commit_batch
+            return statement, lost
+
+        statement, lost = asyncio.run(scenario())
+        stats = db.get_stats()
+        db.close()
+
+    assert statement == [False, True], statement
+    assert lost is False
+    assert stats["writes_failed"] >= 2
+    print(f"[PASS] Failed statement -> {statement[0]}, its batch-mate -> {statement[1]}, rolled back commit -> {lost}")
+    return True
+
+def test_level_up_records_share_one_commit():
+    """16 order records queued then confirmed together cost one FULL commit; lost ones alert"""
+    print("\n" + "="*80)
+    print("TEST 6: LEVEL-UP ORDER RECORDS")
+    print("="*80)
+
+    class Alerts:
+        def __init__(self):
+            self.sent = []
+
+        def send_message(self, message, priority=False, group=None):
+            self.sent.append((message, priority))
+
+    class Engine:
+        telegram_bot = Alerts()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "trades.db")
+        db = TradeDatabase(db_path, {"database_config": {"batch_window_ms": 50}})
+        manager = ProfitBookingManager({"profit_booking_config": {"enabled": True}}, None, None, None, db,
+                                       async_mt5_client=object(), price_cache=object())
+        chain = ProfitBookingChain(
+            chain_id="PROFIT_1", symbol="EURUSD", direction="buy", base_lot=0.1, current_level=1,
+            max_level=4, total_profit=0.0, active_orders=[], status="ACTIVE",
+            created_at="2025-01-01T00:00:00", updated_at="2025-01-01T00:00:00"
+        )
+        engine = Engine()
+
+        db.flush()
+        before = db.get_stats()
+        saved = asyncio.run(manager._save_order_records(chain, list(range(5000, 5016)), 4, 160.0, 50, engine))
+        after = db.get_stats()
+        rows = count_rows(db_path, "profit_booking_orders")
+        assert not engine.telegram_bot.sent
+
+        # Records that cannot be written are retried once, then raised as a priority alert
+        db.conn.execute("DROP TABLE profit_booking_orders")
+        lost = asyncio.run(manager._save_order_records(chain, [6001, 6002], 4, 160.0, 50, engine))
+        failed = db.get_stats()["writes_failed"] - after["writes_failed"]
+        db.close()
+
+    commits = after["commits"] - before["commits"]
+    assert saved and rows == 16
+    assert after["durable_writes"] - before["durable_writes"] == 16
+    assert commits <= 2, commits
+    assert lost is False and failed == 4, failed
+    message, priority = engine.telegram_bot.sent[-1]
+    assert priority and "6001, 6002" in message
+    print(f"[PASS] 16 order records in {commits} commit(s); lost records retried and alerted")
+    return True
+
+def main():
+    results = [
+        test_group_commit_and_flush(),
+        test_durable_order_writes(),
+        test_close_flushes_concurrent_writers(),
+        test_durable_writes_do_not_block_loop(),
+        test_failed_durable_writes_are_reported(),
+        test_level_up_records_share_one_commit()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
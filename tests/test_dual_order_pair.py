@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test for paired Order A / Order B submission
+Both legs go out back to back; a half-filled pair is compensated per policy
+"""
+import sys
+import os
+import time
+import asyncio
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.managers.dual_order_manager import DualOrderManager
+
+def make_config(policy="close_survivor"):
+    dual_config = {"enabled": True}
+    if policy is not None:
+        dual_config["leg_failure_policy"] = policy
+    return {
+        "simulate_orders": False,
+        "dual_order_config": dual_config,
+        "symbol_config": {"XAUUSD": {"pip_size": 0.01, "pip_value_per_std_lot": 1.0}}
+    }
+
+class FakeMT5:
+    """Each fill lands 0.02 higher than the previous one; chosen comments are rejected"""
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.calls = []
+        self.fill_prices = {}
+        self.price = 2650.00
+        self.next_ticket = 700
+
+    def place_order(self, symbol, order_type, lot_size, price, sl, tp=None, comment=""):
+        time.sleep(0.002)
+        self.calls.append(("open", comment))
+        if comment in self.reject:
+            return None
+        self.next_ticket += 1
+        self.fill_prices[self.next_ticket] = self.price
+        self.price = round(self.price + 0.02, 2)
+        return self.next_ticket
+
+    def close_position(self, position_id, percentage=100):
+        self.calls.append(("close", position_id))
+        return True
+
+    def pop_fill_price(self, ticket):
+        return self.fill_prices.pop(ticket, None)
+
+def legs():
+    common = dict(symbol="XAUUSD", entry=2650.0, sl=2640.0, tp=2660.0, lot_size=0.1,
+                  direction="buy", strategy="LOGIC1", open_time="2025-01-01T00:00:00")
+    return Trade(order_type="TP_TRAIL", **common), Trade(order_type="PROFIT_TRAIL", **common)
+
+def run_pair(mt5, policy):
+    config = make_config(policy)
+    client = AsyncMT5Client(mt5, config)
+    manager = DualOrderManager(config, None, mt5, None, async_mt5_client=client)
+    order_a, order_b = legs()
+    pair = asyncio.run(manager.place_order_pair(order_a, order_b, "A", "B"))
+    client.close()
+    return manager, pair, order_a, order_b
+
+def test_pair_fills_and_metrics():
+    """Both legs fill back to back; gap and price difference are measured"""
+    print("\n" + "="*80)
+    print("TEST 1: PAIR FILL + GAP METRICS")
+    print("="*80)
+
+    mt5 = FakeMT5()
+    manager, pair, order_a, order_b = run_pair(mt5, "close_survivor")
+
+    assert pair["order_a_placed"] and pair["order_b_placed"] and not pair["errors"]
+    assert (order_a.trade_id, order_b.trade_id) == (701, 702)
+    assert mt5.calls == [("open", "A"), ("open", "B")]
+    assert abs(pair["price_diff_pips"] - 2.0) < 1e-6  # 0.02 apart on 0.01 pips
+    assert 0 < pair["fill_gap_ms"] < 1000
+    stats = manager.get_pair_stats()
+    assert stats["pairs"] == 1 and stats["both_filled"] == 1
+    assert stats["max_price_diff_pips"] == stats["avg_price_diff_pips"] == pair["price_diff_pips"]
+    print(f"[PASS] A->B gap {pair['fill_gap_ms']:.1f}ms, price diff {pair['price_diff_pips']:.1f} pips")
+    return True
+
+def test_leg_failure_policies():
+    """close_survivor closes the filled leg; keep (the default) leaves it open"""
+    print("\n" + "="*80)
+    print("TEST 2: LEG FAILURE POLICY")
+    print("="*80)
+
+    mt5 = FakeMT5(reject={"B"})
+    manager, pair, order_a, order_b = run_pair(mt5, "close_survivor")
+    assert not pair["order_a_placed"] and not pair["order_b_placed"]
+    assert ("close", 701) in mt5.calls and order_a.trade_id is None
+    stats = manager.get_pair_stats()
+    assert stats["one_leg_failed"] == 1 and stats["compensated"] == 1
+
+    mt5 = FakeMT5(reject={"A"})
+    manager, pair, order_a, order_b = run_pair(mt5, "keep")
+    assert not pair["order_a_placed"] and pair["order_b_placed"] and order_b.trade_id == 701
+    assert all(kind == "open" for kind, _ in mt5.calls)
+    assert manager.get_pair_stats()["compensated"] == 0
+
+    # No policy configured (or an unknown one): the filled leg keeps running
+    for policy in (None, "bogus"):
+        mt5 = FakeMT5(reject={"B"})
+        manager, pair, order_a, order_b = run_pair(mt5, policy)
+        assert manager.get_leg_failure_policy() == "keep"
+        assert pair["order_a_placed"] and order_a.trade_id == 701 and ("close", 701) not in mt5.calls
+    print("[PASS] Survivor closed under close_survivor, kept under keep and by default")
+    return True
+
+def main():
+    results = [
+        test_pair_fills_and_metrics(),
+        test_leg_failure_policies()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test for the vectorized exposure engine
+One NumPy pass must agree with the per-trade PnL formula
+"""
+import sys
+import os
+import random
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade
+from src.utils.trade_book import TradeBook
+from src.services.exposure_engine import ExposureEngine
+
+CONFIG = {
+    "symbol_config": {
+        "XAUUSD": {"pip_size": 0.01, "pip_value_per_std_lot": 1.0},
+        "EURUSD": {"pip_size": 0.0001, "pip_value_per_std_lot": 10.0},
+        "USDJPY": {"pip_size": 0.01, "pip_value_per_std_lot": 9.0}
+    }
+}
+PRICES = {"XAUUSD": 2650.0, "EURUSD": 1.0850, "USDJPY": 149.50}
+
+def scalar_pnl(trade, price):
+    symbol_config = CONFIG["symbol_config"][trade.symbol]
+    price_diff = price - trade.entry if trade.direction == "buy" else trade.entry - price
+    return price_diff / symbol_config["pip_size"] * symbol_config["pip_value_per_std_lot"] * trade.lot_size
+
+def random_trade(i, rng):
+    symbol = rng.choice(list(PRICES))
+    entry = PRICES[symbol] * rng.uniform(0.995, 1.005)
+    direction = rng.choice(["buy", "sell"])
+    stop = PRICES[symbol] * 0.003
+    return Trade(
+        symbol=symbol, entry=entry, sl=entry - stop if direction == "buy" else entry + stop,
+        tp=entry, lot_size=rng.choice([0.01, 0.05, 0.1, 0.5]), direction=direction,
+        strategy="LOGIC1", open_time="2025-01-01T00:00:00", trade_id=i,
+        profit_chain_id=rng.choice([None, "PROFIT_A", "PROFIT_B", "PROFIT_C"])
+    )
+
+def test_snapshot_matches_scalar_formula():
+    """Random opens/closes; snapshot sums equal the per-trade formula"""
+    print("\n" + "="*80)
+    print("TEST 1: VECTORIZED SNAPSHOT VS PER-TRADE PNL")
+    print("="*80)
+
+    rng = random.Random(5)
+    exposure = ExposureEngine(CONFIG, capacity=4)  # forces several grows
+    book = TradeBook(listeners=[exposure])
+    for i in range(3000):
+        book.add(random_trade(i, rng))
+        if rng.random() < 0.45:
+            book.remove(rng.choice(list(book)))
+
+    trades = list(book)
+    snapshot = exposure.snapshot(PRICES)
+
+    assert len(exposure) == len(trades) == snapshot["positions"] == snapshot["priced_positions"]
+    assert abs(snapshot["unrealized_pnl"] - sum(scalar_pnl(t, PRICES[t.symbol]) for t in trades)) < 1e-6
+    for symbol, row in snapshot["symbols"].items():
+        mine = [t for t in trades if t.symbol == symbol]
+        assert row["positions"] == len(mine)
+        assert abs(row["net_lots"] - sum(t.lot_size if t.direction == "buy" else -t.lot_size for t in mine)) < 1e-6
+        assert abs(row["unrealized_pnl"] - sum(scalar_pnl(t, PRICES[symbol]) for t in mine)) < 1e-6
+        assert abs(row["margin_at_risk"] + sum(scalar_pnl(t, t.sl) for t in mine)) < 1e-6
+    for chain_id in ["PROFIT_A", "PROFIT_B", "PROFIT_C"]:
+        expected = sum(scalar_pnl(t, PRICES[t.symbol]) for t in trades if t.profit_chain_id == chain_id)
+        assert abs(snapshot["chains"][chain_id] - expected) < 1e-6
+
+    # Unpriced symbols contribute nothing; chains disappear with their last order
+    partial = exposure.snapshot({"EURUSD": PRICES["EURUSD"]})
+    assert partial["priced_positions"] == snapshot["symbols"]["EURUSD"]["positions"]
+    for trade in book.by_profit_chain("PROFIT_A"):
+        book.remove(trade)
+    assert "PROFIT_A" not in exposure.snapshot(PRICES)["chains"]
+    print(f"[PASS] {len(trades)} positions: totals, per-symbol and per-chain sums match")
+    return True
+
+def test_call_sites_share_formula():
+    """close_trade, chain PnL and reversal exit now give identical numbers"""
+    print("\n" + "="*80)
+    print("TEST 2: ONE FORMULA FOR EVERY CALL SITE")
+    print("="*80)
+
+    exposure = ExposureEngine(CONFIG)
+    book = TradeBook(listeners=[exposure])
+    gold = Trade(symbol="XAUUSD", entry=2650.0, sl=2640.0, tp=2660.0, lot_size=0.1, direction="sell",
+                 strategy="LOGIC1", open_time="2025-01-01T00:00:00", trade_id=1)
+    legs = [Trade(symbol="EURUSD", entry=1.0800 + i * 0.001, sl=1.07, tp=1.09, lot_size=0.1,
+                  direction="buy", strategy="LOGIC2", open_time="2025-01-01T00:00:00", trade_id=10 + i)
+            for i in range(3)]
+    for trade in [gold] + legs:
+        book.add(trade)
+
+    # Gold: 5.00 down for a sell = 500 pips x $1 x 0.1 lot (the old *10000*100 path said $500,000)
+    assert abs(exposure.trade_pnl(gold, 2645.0) - 50.0) < 1e-9
+    assert abs(exposure.trade_pips(gold, 2645.0) - 500.0) < 1e-9
+    combined = exposure.positions_pnl(legs, 1.0850)
+    assert abs(combined - sum(scalar_pnl(t, 1.0850) for t in legs)) < 1e-9
+    untracked = Trade(symbol="EURUSD", entry=1.0800, sl=1.07, tp=1.09, lot_size=0.1, direction="buy",
+                      strategy="LOGIC2", open_time="2025-01-01T00:00:00")
+    assert abs(exposure.positions_pnl(legs + [untracked], 1.0850) - combined - 50.0) < 1e-9
+    print("[PASS] Gold reversal exit PnL $50.00; chain sum equals per-leg formula")
+    return True
+
+def main():
+    results = [
+        test_snapshot_matches_scalar_formula(),
+        test_call_sites_share_formula()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Test for the fake MT5 terminal
+Order book and deal history, broker-side SL/TP, injected latency and errors,
+MT5Client against the fake, and the engine reconciling with it
+"""
+import sys
+import os
+import asyncio
+import contextlib
+import tempfile
+import time
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Alert
+from src.database import TradeDatabase
+from src.managers.risk_manager import RiskManager
+from src.processors.alert_processor import AlertProcessor
+from src.core.trading_engine import TradingEngine
+from src.clients.mt5_client import MT5Client
+from src.clients.fake_mt5 import FakeMT5Terminal
+from src.backtest.replay import BacktestConfig, ReplayNotifier
+
+CREDENTIALS = {"mt5_login": 1001, "mt5_password": "secret", "mt5_server": "FakeMT5-Local", "mt5_wait": 0}
+
+def make_config(**fake_overrides):
+    return BacktestConfig({**CREDENTIALS, "fake_mt5_config": {"seed": 5, **fake_overrides}})
+
+def connected(**fake_overrides):
+    terminal = FakeMT5Terminal(make_config(**fake_overrides))
+    assert terminal.initialize() and terminal.login(1001, "secret", "FakeMT5-Local")
+    return terminal
+
+def market(terminal, symbol, order_type, volume, sl=0.0, tp=0.0, position=None):
+    tick = terminal.symbol_info_tick(symbol)
+    buy = order_type == terminal.ORDER_TYPE_BUY
+    request = {"action": terminal.TRADE_ACTION_DEAL, "symbol": symbol, "volume": volume, "type": order_type,
+               "price": tick.ask if buy else tick.bid, "deviation": 20, "sl": sl, "tp": tp}
+    if position:
+        request["position"] = position
+    return terminal.order_send(request)
+
+def test_order_book_and_history():
+    """Market deals open, partially close and close positions; every deal is in the history"""
+    print("\n" + "="*80)
+    print("TEST 1: ORDER BOOK + DEAL HISTORY")
+    print("="*80)
+
+    terminal = connected(balance=10000)
+    info = terminal.symbol_info("GOLD")
+    assert info.digits == 3 and terminal.symbol_info("XAUUSD") is None  # broker names only
+    tick = terminal.symbol_info_tick("GOLD")
+    assert abs((tick.ask - tick.bid) - 0.02) < 1e-9
+
+    opened = market(terminal, "GOLD", terminal.ORDER_TYPE_BUY, 1.0, sl=2640.0, tp=2670.0)
+    assert opened.retcode == terminal.TRADE_RETCODE_DONE and opened.price == tick.ask
+    (position,) = terminal.positions_get(ticket=opened.order)
+    assert position.volume == 1.0 and position.sl == 2640.0 and position.symbol == "GOLD"
+
+    terminal.set_price("GOLD", 2655.0)
+    partial = market(terminal, "GOLD", terminal.ORDER_TYPE_SELL, 0.4, position=opened.order)
+    assert partial.retcode == terminal.TRADE_RETCODE_DONE
+    assert terminal.positions_get(ticket=opened.order)[0].volume == 0.6
+    closed = market(terminal, "GOLD", terminal.ORDER_TYPE_SELL, 0.6, position=opened.order)
+    assert closed.retcode == terminal.TRADE_RETCODE_DONE and terminal.positions_get() == ()
+    again = market(terminal, "GOLD", terminal.ORDER_TYPE_SELL, 0.6, position=opened.order)
+    assert again.retcode == terminal.TRADE_RETCODE_POSITION_CLOSED
+
+    # 2650.01 -> 2655.00 on gold (pip 0.01, $1/pip per lot): 499 pips x 1.0 lot
+    deals = terminal.history_deals_get(position=opened.order)
+    assert [deal.entry for deal in deals] == [terminal.DEAL_ENTRY_IN, terminal.DEAL_ENTRY_OUT, terminal.DEAL_ENTRY_OUT]
+    assert abs(sum(deal.profit for deal in deals) - 499.0) < 1e-6
+    assert abs(terminal.account_info().balance - 10499.0) < 1e-6
+
+    # Rejections: stale price, stops on the wrong side, margin
+    stale = terminal.order_send({"action": terminal.TRADE_ACTION_DEAL, "symbol": "GOLD", "volume": 0.1,
+                                 "type": terminal.ORDER_TYPE_BUY, "price": 2600.0, "deviation": 20})
+    assert stale.retcode == terminal.TRADE_RETCODE_REQUOTE
+    assert market(terminal, "GOLD", terminal.ORDER_TYPE_SELL, 0.1, sl=2650.0).retcode == \
+        terminal.TRADE_RETCODE_INVALID_STOPS
+    assert market(terminal, "GOLD", terminal.ORDER_TYPE_BUY, 50.0).retcode == terminal.TRADE_RETCODE_NO_MONEY
+    assert terminal.stats["rejections"] == {terminal.TRADE_RETCODE_POSITION_CLOSED: 1, terminal.TRADE_RETCODE_REQUOTE: 1,
+                                            terminal.TRADE_RETCODE_INVALID_STOPS: 1, terminal.TRADE_RETCODE_NO_MONEY: 1}
+    print("[PASS] Open / partial / full close with realized PnL; requote, invalid stops, no money")
+    return True
+
+def test_broker_stops():
+    """Price moves through SL or TP close positions on the broker side"""
+    print("\n" + "="*80)
+    print("TEST 2: BROKER-SIDE SL / TP")
+    print("="*80)
+
+    terminal = connected()
+    buy = market(terminal, "EURUSD", terminal.ORDER_TYPE_BUY, 0.1, sl=1.0800, tp=1.0900).order
+    sell = market(terminal, "EURUSD", terminal.ORDER_TYPE_SELL, 0.1, sl=1.0900, tp=1.0800).order
+    terminal.set_price("EURUSD", 1.0850)
+    assert len(terminal.positions_get(symbol="EURUSD")) == 2
+
+    terminal.set_price("EURUSD", 1.0905)  # buy hits TP, sell (ask 1.0907) hits SL
+    assert terminal.positions_get() == ()
+    reasons = {deal.position_id: deal.reason for deal in terminal.history_deals_get()
+               if deal.entry == terminal.DEAL_ENTRY_OUT}
+    assert reasons == {buy: terminal.DEAL_REASON_TP, sell: terminal.DEAL_REASON_SL}
+    assert terminal.stats["sl_hits"] == 1 and terminal.stats["tp_hits"] == 1
+
+    # Random walk moves the quote between reads
+    walking = connected(volatility_pips_per_second=50)
+    first = walking.symbol_info_tick("USDJPY").bid
+    time.sleep(0.05)
+    assert walking.symbol_info_tick("USDJPY").bid != first
+    print("[PASS] TP and SL filled at the broker with deal reasons; random walk moves prices")
+    return True
+
+def test_latency_and_errors():
+    """Configured latency delays calls; injected failures look like MT5 failures"""
+    print("\n" + "="*80)
+    print("TEST 3: LATENCY + INJECTED ERRORS")
+    print("="*80)
+
+    terminal = connected(latency_ms=20)
+    started = time.perf_counter()
+    for _ in range(5):
+        terminal.symbol_info_tick("GOLD")
+    assert time.perf_counter() - started >= 0.1
+
+    terminal = connected()
+    terminal.fail_next("order_send", terminal.TRADE_RETCODE_REQUOTE)
+    terminal.fail_next("positions_get")
+    assert market(terminal, "GOLD", terminal.ORDER_TYPE_BUY, 0.1).retcode == terminal.TRADE_RETCODE_REQUOTE
+    assert terminal.positions_get() is None and terminal.last_error()[0] == terminal.RES_E_NO_IPC
+    assert market(terminal, "GOLD", terminal.ORDER_TYPE_BUY, 0.1).retcode == terminal.TRADE_RETCODE_DONE
+    assert len(terminal.positions_get()) == 1
+
+    flaky = connected(error_rate=0.3, api_error_rate=0.3)
+    request = {"action": flaky.TRADE_ACTION_DEAL, "symbol": "GOLD", "volume": 0.01, "type": flaky.ORDER_TYPE_BUY}
+    rejected = sum(flaky.order_send(request).retcode != flaky.TRADE_RETCODE_DONE for _ in range(300))
+    ticks = [flaky.symbol_info_tick("GOLD") for _ in range(300)]
+    assert 0.15 < rejected / 300 < 0.45 and rejected == flaky.stats["orders_rejected"]
+    assert 50 < ticks.count(None) == flaky.stats["api_errors"] < 130
+    assert set(flaky.stats["rejections"]) <= set(flaky.error_codes)
+    print(f"[PASS] 5 calls >= 100 ms; scripted failures; {rejected}/300 rejected at 30% error rate")
+    return True
+
+def test_mt5_client_on_fake():
+    """MT5Client drives the fake through its usual code paths"""
+    print("\n" + "="*80)
+    print("TEST 4: MT5Client AGAINST THE FAKE")
+    print("="*80)
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        terminal = FakeMT5Terminal(make_config())
+        client = MT5Client(make_config(), terminal=terminal)
+        assert client.initialize() and terminal.logged_in
+        ticket = client.place_order("XAUUSD", "buy", 0.5, 2650.0, sl=2640.0, tp=2670.0, comment="TEST")
+        assert ticket and client.pop_fill_price(ticket) == terminal.positions_get(ticket=ticket)[0].price_open
+        assert [p.ticket for p in client.get_positions()] == [ticket]
+        assert client.get_tick("XAUUSD") == {"bid": 2649.99, "ask": 2650.01}
+        assert client.get_account_info()["margin"] == 500.0
+
+        terminal.fail_next("positions_get")
+        assert client.get_positions() is None  # API error, not "no positions"
+        terminal.set_price("GOLD", 2639.0)
+        assert client.get_positions() == [] and client.close_position(ticket)  # already closed by SL
+
+        # Wrong password: login refused on every retry
+        bad = MT5Client(BacktestConfig({**CREDENTIALS, "mt5_password": "nope"}), terminal=FakeMT5Terminal(
+            BacktestConfig({"fake_mt5_config": {"password": "secret"}})))
+        assert not bad.initialize()
+
+        # fake_mt5_config.enabled selects the fake without code changes
+        auto = MT5Client(BacktestConfig({**CREDENTIALS, "fake_mt5_config": {"enabled": True}}))
+        assert isinstance(auto.mt5, FakeMT5Terminal) and auto.initialize()
+    print("[PASS] place/get/close through MT5Client; API errors stay None; enabled flag selects the fake")
+    return True
+
+def test_engine_reconciles_with_fake():
+    """Engine trades land at the broker; broker SL closes are reconciled out of the bot's book"""
+    print("\n" + "="*80)
+    print("TEST 5: ENGINE + RECONCILIATION")
+    print("="*80)
+
+    async def scenario(engine, terminal):
+        assert await engine.initialize()
+        try:
+            for tf in ("1h", "15m"):
+                await engine.process_alert(Alert(type="trend", symbol="XAUUSD", signal="bull", tf=tf))
+            await engine.process_alert(Alert(type="entry", symbol="XAUUSD", signal="buy", tf="5m", price=2650.01))
+
+            trades = [trade for trade in engine.open_trades if trade.status != "closed"]
+            broker = {position.ticket: position for position in terminal.positions_get()}
+            assert trades and {trade.trade_id for trade in trades} == set(broker)
+            for trade in trades:
+                assert broker[trade.trade_id].sl == trade.sl and broker[trade.trade_id].volume == trade.lot_size
+
+            terminal.set_price("GOLD", min(trade.sl for trade in trades) - 1.0)
+            await engine.reconcile_with_mt5()
+            assert terminal.positions_get() == ()
+            assert all(trade.status == "closed" for trade in trades)
+            assert not [trade for trade in engine.open_trades if trade.status != "closed"]
+            return len(trades)
+        finally:
+            await engine.price_monitor.stop()
+            await engine.tick_stream.stop()
+            await engine.account_snapshot.stop()
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(open(os.devnull, "w")):
+        config = make_config()
+        terminal = FakeMT5Terminal(config)
+        risk_manager = RiskManager(config, stats_file=os.path.join(workdir, "stats.json"))
+        risk_manager.reset_daily_stats()
+        risk_manager.reset_lifetime_loss()
+        engine = TradingEngine(
+            config, risk_manager, MT5Client(config, terminal=terminal), ReplayNotifier(), AlertProcessor(config),
+            db=TradeDatabase(os.path.join(workdir, "trades.db"), config)
+        )
+        engine.trend_manager.config_file = os.path.join(workdir, "timeframe_trends.json")
+        engine.trend_manager.trends = engine.trend_manager.load_trends()
+        try:
+            placed = asyncio.run(scenario(engine, terminal))
+        finally:
+            engine.async_mt5_client.close()
+            engine.db.close()
+    assert terminal.stats["sl_hits"] == placed
+    print(f"[PASS] {placed} engine orders mirrored at the broker; SL closes reconciled")
+    return True
+
+def main():
+    results = [
+        test_order_book_and_history(),
+        test_broker_stops(),
+        test_latency_and_errors(),
+        test_mt5_client_on_fake(),
+        test_engine_reconciles_with_fake()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Test for pipelined profit-booking level-ups
+Closes and opens of a level go to the MT5 worker as one contiguous batch
+"""
+import sys
+import os
+import time
+import asyncio
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade, ProfitBookingChain
+from src.utils.trade_book import TradeBook
+from src.clients.async_mt5_client import AsyncMT5Client
+from src.services.order_batch_executor import BatchOrderExecutor, OrderRequest
+from src.managers.profit_booking_manager import ProfitBookingManager
+
+CONFIG = {
+    "simulate_orders": False,
+    "profit_booking_config": {"enabled": True},
+    "symbol_config": {"EURUSD": {"pip_size": 0.0001, "pip_value_per_std_lot": 10.0}}
+}
+
+class FakeMT5:
+    """Blocking terminal look-alike: logs call order, fails chosen closes and the first N opens"""
+
+    def __init__(self, fail_closes=(), fail_opens=0, delay=0.003):
+        self.delay = delay
+        self.calls = []
+        self.fail_closes = set(fail_closes)
+        self.fail_opens = fail_opens
+        self.next_ticket = 5000
+        self.initialized = True
+
+    def close_position(self, position_id, percentage=100):
+        time.sleep(0.003)
+        self.calls.append(("close", position_id))
+        return position_id not in self.fail_closes
+
+    def place_order(self, symbol, order_type, lot_size, price, sl, tp=None, comment=""):
+        time.sleep(self.delay)
+        self.calls.append(("open", comment))
+        if self.fail_opens:
+            self.fail_opens -= 1
+            return None
+        self.next_ticket += 1
+        return self.next_ticket
+
+    def get_current_price(self, symbol):
+        time.sleep(0.003)
+        self.calls.append(("price", symbol))
+        return 1.1
+
+    def get_account_balance(self):
+        return 10000.0
+
+    def get_account_info(self):
+        return {"balance": 10000.0, "equity": 10000.0, "margin": 0.0, "free_margin": 10000.0}
+
+def open_trade(ticket, level=0):
+    return Trade(
+        symbol="EURUSD", entry=1.0800, sl=1.0700, tp=1.0900, lot_size=0.1, direction="buy",
+        strategy="LOGIC1", open_time="2025-01-01T00:00:00", trade_id=ticket,
+        order_type="PROFIT_TRAIL", profit_chain_id="PROFIT_1", profit_level=level
+    )
+
+def test_batch_is_contiguous_and_reports_failures():
+    """Closes then opens run back to back; a concurrent caller cannot interleave; failures listed"""
+    print("\n" + "="*80)
+    print("TEST 1: PIPELINED BATCH")
+    print("="*80)
+
+    mt5 = FakeMT5(fail_closes={2}, fail_opens=1)
+    client = AsyncMT5Client(mt5, CONFIG)
+    executor = BatchOrderExecutor(client, CONFIG)
+    closes = [open_trade(1), open_trade(2)]
+    opens = [OrderRequest("EURUSD", "buy", 0.1, 1.085, 1.08, 1.09, comment=f"L1_{i}") for i in range(4)]
+
+    async def poll_prices():
+        for _ in range(5):
+            await client.get_current_price("EURUSD")
+
+    async def scenario():
+        poller = asyncio.ensure_future(poll_prices())  # another caller sharing the worker
+        await asyncio.sleep(0.004)
+        result = await executor.execute(closes, opens)
+        await poller
+        return result
+
+    result = asyncio.run(scenario())
+    client.close()
+
+    kinds = [kind for kind, _ in mt5.calls]
+    first = kinds.index("close")
+    assert kinds[first:first + 6] == ["close", "close", "open", "open", "open", "open"], kinds
+    assert kinds.count("price") == 5
+    assert result.closed == [closes[0]] and result.close_failed == [closes[1]]
+    assert len(result.opened) == 3 and result.open_failed == [opens[0]]
+    assert not result.complete
+    assert result.latencies_ms == sorted(result.latencies_ms)  # later orders waited behind earlier ones
+    stats = executor.get_stats()
+    assert stats["batches"] == 1 and stats["orders"] == 6 and stats["failed"] == 2 and stats["partial_batches"] == 1
+    print(f"[PASS] 6 orders in one contiguous batch, last filled after {result.latencies_ms[-1]:.1f}ms")
+    return True
+
+def test_queued_legs_do_not_time_out():
+    """16 legs queued on the worker: every one fills and none is counted as timed out"""
+    print("\n" + "="*80)
+    print("TEST 2: LARGE LEVEL QUEUED BEHIND ITS OWN ORDERS")
+    print("="*80)
+
+    mt5 = FakeMT5(delay=0.03)
+    config = {**CONFIG, "mt5_async_config": {"order_timeout_seconds": 0.1}}
+    client = AsyncMT5Client(mt5, config)
+    executor = BatchOrderExecutor(client, config)
+    opens = [OrderRequest("EURUSD", "buy", 0.1, 1.085, 1.08, 1.09, comment=f"L4_{i}") for i in range(16)]
+
+    result = asyncio.run(executor.execute([], opens))
+    client.close()
+
+    # The last leg waited ~450ms in the queue, well past the 100ms order timeout
+    assert len(result.opened) == 16 and not result.open_failed
+    assert result.latencies_ms[-1] >= 450
+    assert client.get_stats()["place_order"]["timeouts"] == 0
+    print(f"[PASS] 16/16 legs filled, last after {result.latencies_ms[-1]:.0f}ms, no timeouts")
+    return True
+
+class Recorder:
+    """No-op stand-in that accepts any method call"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+class FakeDB(Recorder):
+    async def confirm(self, pending):
+        return True
+
+    async def confirm_all(self, pending):
+        return [True] * len(pending)
+
+class FakeEngine:
+    def __init__(self, book):
+        self.open_trades = book
+        self.telegram_bot = Recorder()
+        self.closed = []
+
+    async def close_trade(self, trade, reason, price, broker_closed=False):
+        assert broker_closed
+        trade.status = "closed"
+        self.open_trades.remove(trade)
+        self.closed.append(trade)
+
+    def add_open_trade(self, trade):
+        self.open_trades.add(trade)
+
+class FakePrices:
+    async def get_price(self, symbol):
+        return 1.0850
+
+class FakePips:
+    def calculate_sl_price(self, symbol, price, direction, lot_size, balance, adjustment):
+        return price - 0.0050 * adjustment, 0.0050 * adjustment
+
+    def calculate_tp_price(self, price, sl, direction, rr):
+        return price + (price - sl) * rr
+
+class FakeRisk:
+    def get_fixed_lot_size(self, balance):
+        return 0.1
+
+    def get_risk_tier(self, balance):
+        return "10000"
+
+def test_level_up_applies_partial_result_once():
+    """A level-up with one failed close and one failed open advances with the filled orders only"""
+    print("\n" + "="*80)
+    print("TEST 3: LEVEL-UP WITH PARTIAL FAILURE")
+    print("="*80)
+
+    mt5 = FakeMT5(fail_closes={2}, fail_opens=1)
+    client = AsyncMT5Client(mt5, CONFIG)
+    manager = ProfitBookingManager(CONFIG, mt5, FakePips(), FakeRisk(), FakeDB(),
+                                   async_mt5_client=client, price_cache=FakePrices())
+    book = TradeBook()
+    engine = FakeEngine(book)
+    level0 = [open_trade(1), open_trade(2)]
+    for trade in level0:
+        book.add(trade)
+    chain = ProfitBookingChain(
+        chain_id="PROFIT_1", symbol="EURUSD", direction="buy", base_lot=0.1, current_level=0,
+        max_level=4, created_at="2025-01-01T00:00:00", updated_at="2025-01-01T00:00:00",
+        metadata={"strategy": "LOGIC1"}
+    )
+
+    success = asyncio.run(manager.execute_profit_booking(chain, book, engine))
+
+    # Level 1 wants 2 orders; one open failed -> 1 filled
+    assert success and chain.current_level == 1 and chain.status == "ACTIVE"
+    new_order = chain.active_orders[0]
+    assert book.get(new_order).profit_level == 1
+    assert engine.closed == [level0[0]] and level0[1] in book  # failed close stays open for retry
+    assert chain.active_orders == [new_order, 2]  # ...and stays tracked by the chain
+    assert abs(chain.total_profit - 50.0) < 1e-9  # only the closed order: 50 pips x $10 x 0.1 lot
+    assert chain.metadata["last_batch"]["close_failed"] == 1 and chain.metadata["last_batch"]["open_failed"] == 1
+
+    # Next level-up closes the carried level-0 order together with level 1
+    mt5.fail_closes.clear()
+    success = asyncio.run(manager.execute_profit_booking(chain, book, engine))
+    client.close()
+    assert success and chain.current_level == 2
+    assert [trade.trade_id for trade in engine.closed] == [1, new_order, 2]
+    assert len(chain.active_orders) == 4 and all(book.get(t).profit_level == 2 for t in chain.active_orders)
+    print("[PASS] Chain advanced with 1/2 orders; failed close kept in the chain and retried next level")
+    return True
+
+def main():
+    results = [
+        test_batch_is_contiguous_and_reports_failures(),
+        test_queued_legs_do_not_time_out(),
+        test_level_up_applies_partial_result_once()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test for the parallel parameter sweep
+Grid / random sampling, process-pool replays and resuming from the results file
+"""
+import sys
+import os
+import contextlib
+import tempfile
+from datetime import datetime
+import numpy as np
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.backtest.tick_feed import TICK_DTYPE
+from src.backtest.sweep import (ParameterSweep, grid, random_sample, validate_space, to_overrides,
+                                config_id, results_table)
+
+START = datetime(2025, 1, 6, 9, 0).timestamp()
+
+SPACE = {
+    "profit_booking_config.profit_targets": [[10, 20, 40, 80, 160], [5, 10, 20, 40, 80]],
+    "re_entry_config.sl_hunt_offset_pips": [0.5, 1.0, 2.0],
+    "re_entry_config.max_chain_levels": [1, 2]
+}
+
+def session(n=6000):
+    """Gold rallies, then sells off"""
+    steps = np.where(np.arange(n) < 4000, 0.01, -0.012)
+    mid = 2650 + np.cumsum(steps)
+    ticks = np.zeros(n, TICK_DTYPE)
+    ticks["time"] = START + np.arange(n)
+    ticks["bid"], ticks["ask"] = mid - 0.1, mid + 0.1
+    alerts = [
+        (START + 1, {"type": "trend", "symbol": "XAUUSD", "signal": "bull", "tf": "1h"}),
+        (START + 2, {"type": "trend", "symbol": "XAUUSD", "signal": "bull", "tf": "15m"}),
+        (START + 10, {"type": "entry", "symbol": "XAUUSD", "signal": "buy", "tf": "5m", "price": 2650.1})
+    ]
+    return {"XAUUSD": ticks}, alerts
+
+def test_grid_and_sampling():
+    """Grid covers every combination; samples are distinct, seeded grid points"""
+    print("\n" + "="*80)
+    print("TEST 1: GRID + RANDOM SAMPLE")
+    print("="*80)
+
+    points = grid(SPACE)
+    assert len(points) == 12 and len({config_id(p) for p in points}) == 12
+    sample = random_sample(SPACE, 5, seed=3)
+    assert len(sample) == 5 and len({config_id(p) for p in sample}) == 5
+    assert all(point in points for point in sample)
+    assert sample == random_sample(SPACE, 5, seed=3)
+    assert len(random_sample(SPACE, 50)) == 12
+
+    assert to_overrides(points[0]) == {
+        "profit_booking_config": {"profit_targets": [10, 20, 40, 80, 160]},
+        "re_entry_config": {"max_chain_levels": 1, "sl_hunt_offset_pips": 0.5}
+    }
+    config = {"re_entry_config": {"sl_hunt_offset_pips": 1.0}}
+    validate_space({"re_entry_config.sl_hunt_offset_pips": [1]}, config)
+    for bad in ({"re_entry_config.sl_hunt_ofset_pips": [1]}, {"re_entry_config": [1]},
+                {"re_entry_config.sl_hunt_offset_pips": []}):
+        try:
+            validate_space(bad, config)
+            assert False, f"accepted {bad}"
+        except ValueError:
+            pass
+    print("[PASS] 12-point grid, seeded distinct samples, overrides and key validation")
+    return True
+
+def test_pool_sweep_and_resume():
+    """Pool and in-process results match; an interrupted sweep resumes without re-running rows"""
+    print("\n" + "="*80)
+    print("TEST 2: PROCESS POOL + RESUME")
+    print("="*80)
+
+    series, alerts = session()
+    points = grid({
+        "profit_booking_config.profit_targets": SPACE["profit_booking_config.profit_targets"],
+        "re_entry_config.sl_hunt_offset_pips": [0.5, 2.0]
+    })
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(open(os.devnull, "w")):
+        results_path = os.path.join(workdir, "sweep", "results.csv")
+
+        # "Interrupted" after the first configuration
+        first = ParameterSweep(series, alerts, results_path, workers=1)
+        first.run(points[:1])
+        assert first.stats["evaluated"] == 1
+
+        resumed = ParameterSweep(series, alerts, results_path, workers=2)
+        rows = resumed.run(points)
+        assert resumed.stats == {**resumed.stats, "evaluated": 3, "skipped": 1, "failed": 0}
+        assert len(rows) == 4 and {row["config_id"] for row in rows} == {config_id(p) for p in points}
+        assert [row["net_pnl"] for row in rows] == sorted((row["net_pnl"] for row in rows), reverse=True)
+
+        # Everything already on disk: nothing to evaluate
+        again = ParameterSweep(series, alerts, results_path, workers=2)
+        assert again.run(points) == rows and again.stats["evaluated"] == 0 and again.stats["skipped"] == 4
+
+        # Worker processes replay exactly what an in-process run does
+        inline = ParameterSweep(series, alerts, os.path.join(workdir, "inline.csv"), workers=1).run(points)
+        key = lambda row: (row["config_id"], row["net_pnl"], row["max_drawdown"], row["deals"],
+                           row["chains"], row["chain_completion_rate"])
+        assert sorted(map(key, inline)) == sorted(map(key, rows))
+
+        table = results_table(rows)
+    assert all(row["deals"] > 0 and row["chains"] >= 1 for row in rows)
+    assert len(table.splitlines()) == 5 and "chain_done%" in table
+    print(table)
+    print("[PASS] 3 configurations run in the pool after resuming 1; pool matches in-process replay")
+    return True
+
+def main():
+    results = [
+        test_grid_and_sampling(),
+        test_pool_sweep_and_resume()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
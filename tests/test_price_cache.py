@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test for the shared per-symbol price snapshot cache
+Broker calls must grow with the number of symbols, not the number of trades
+"""
+import sys
+import os
+import asyncio
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.services.price_cache import PriceCache
+
+class CountingTerminal:
+    """AsyncMT5Client look-alike that counts tick requests"""
+
+    def __init__(self, ticks):
+        self.ticks = ticks
+        self.calls = []
+
+    async def get_tick(self, symbol):
+        self.calls.append(symbol)
+        await asyncio.sleep(0.01)  # Broker round trip
+        return self.ticks.get(symbol)
+
+def test_one_fetch_per_symbol_per_cycle():
+    """16-order pyramid on two symbols costs two broker calls"""
+    print("\n" + "="*80)
+    print("TEST 1: BROKER CALLS SCALE WITH SYMBOLS")
+    print("="*80)
+
+    terminal = CountingTerminal({
+        "XAUUSD": {"bid": 2649.8, "ask": 2650.2},
+        "EURUSD": {"bid": 1.0849, "ask": 1.0851}
+    })
+    cache = PriceCache(terminal, {"price_cache_config": {"ttl_seconds": 60}})
+    trade_symbols = ["XAUUSD"] * 16 + ["EURUSD"] * 4
+
+    async def scenario():
+        await cache.refresh(trade_symbols)
+        prices = [await cache.get_price(symbol) for symbol in trade_symbols]
+        entry = await cache.get_entry_price("XAUUSD", "buy")
+        return prices, entry
+
+    prices, entry = asyncio.run(scenario())
+    stats = cache.get_stats()
+
+    assert sorted(terminal.calls) == ["EURUSD", "XAUUSD"]
+    assert abs(prices[0] - 2650.0) < 1e-9 and abs(prices[-1] - 1.085) < 1e-9
+    assert entry == 2650.2
+    assert stats["broker_calls"] == 2 and stats["misses"] == 2 and stats["hits"] == 21
+    print(f"[PASS] {len(trade_symbols)} trades served by {stats['broker_calls']} broker calls, hit rate {stats['hit_rate']:.0%}")
+    return True
+
+def test_concurrent_misses_and_ttl():
+    """Concurrent misses share one request; expired snapshots are refetched; failures are not cached"""
+    print("\n" + "="*80)
+    print("TEST 2: IN-FLIGHT COALESCING + TTL EXPIRY")
+    print("="*80)
+
+    terminal = CountingTerminal({"GBPUSD": {"bid": 1.2649, "ask": 1.2651}})
+    cache = PriceCache(terminal, {"price_cache_config": {"ttl_seconds": 0.05}})
+
+    async def scenario():
+        first = await asyncio.gather(*(cache.get_price("GBPUSD") for _ in range(10)))
+        await asyncio.sleep(0.1)
+        second = await cache.get_price("GBPUSD")
+        missing = [await cache.get_price("USDJPY") for _ in range(2)]
+        return first, second, missing
+
+    first, second, missing = asyncio.run(scenario())
+    stats = cache.get_stats()
+
+    assert len(set(first)) == 1 and abs(first[0] - 1.265) < 1e-9
+    assert abs(second - 1.265) < 1e-9
+    assert missing == [0.0, 0.0]
+    assert terminal.calls == ["GBPUSD", "GBPUSD", "USDJPY", "USDJPY"]
+    assert stats["coalesced"] == 9 and stats["fetch_failures"] == 2
+    print("[PASS] 10 concurrent lookups -> 1 request, expired snapshot refetched, failures retried")
+    return True
+
+def main():
+    results = [
+        test_one_fetch_per_symbol_per_cycle(),
+        test_concurrent_misses_and_ttl()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
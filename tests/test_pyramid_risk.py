@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test for the profit-booking pyramid Monte Carlo
+Outcome tables, sampled frequencies, tier breach probabilities, probability
+estimates from profit_booking_events and the /pyramid_risk command
+"""
+import sys
+import os
+import contextlib
+import tempfile
+import time
+import numpy as np
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import ProfitBookingChain
+from src.database import TradeDatabase
+from src.managers.risk_manager import RiskManager
+from src.clients.telegram_bot import TelegramBot
+from src.services.pyramid_risk import PyramidRiskSimulator
+from src.backtest.replay import BacktestConfig
+
+def make_simulator(workdir, **sim_overrides):
+    config = BacktestConfig({"risk_simulation_config": {"seed": 7, **sim_overrides}})
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        risk_manager = RiskManager(config, stats_file=os.path.join(workdir, "stats.json"))
+    return config, risk_manager, PyramidRiskSimulator(config, risk_manager)
+
+def test_outcomes_match_analytic():
+    """Sampled outcome frequencies and mean PnL converge to the exact chain distribution"""
+    print("\n" + "="*80)
+    print("TEST 1: MONTE CARLO vs EXACT CHAIN DISTRIBUTION")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config, risk_manager, simulator = make_simulator(workdir)
+        p = [0.6, 0.55, 0.5, 0.45, 0.4]
+        tables = simulator.outcome_tables(p, "XAUUSD")
+        assert len(tables["probability"]) == 6 and abs(tables["probability"].sum() - 1) < 1e-12
+        assert abs(tables["probability"][0] - 0.4) < 1e-12  # miss level 0
+        assert abs(tables["probability"][-1] - np.prod(p)) < 1e-12  # book every level, TP at the top
+        assert tables["booked"].tolist() == [0, 10, 30, 70, 150, 150]
+        for level in range(5):
+            expected = risk_manager.calculate_profit_booking_risk(level, 1.0, "XAUUSD", 0.0)["total_risk"]
+            assert abs(tables["unit_loss"][level] - expected) < 1e-9
+
+        started = time.perf_counter()
+        report = simulator.simulate("XAUUSD", paths=1000000, probabilities=p)
+        elapsed = time.perf_counter() - started
+        frequencies = np.array(report["simulated_outcome_frequencies"])
+        assert np.abs(frequencies - tables["probability"]).max() < 0.003
+        for tier, result in report["tiers"].items():
+            assert abs(result["simulated_profit_per_chain"] - result["expected_profit_per_chain"]) \
+                < max(2.0, 0.02 * result["worst_chain_loss"])
+            quantiles = list(result["daily_loss_quantiles"].values())
+            assert quantiles == sorted(quantiles)
+            assert 0.0 <= result["daily_breach_probability"] <= 1.0
+        assert set(report["tiers"]) == set(config["risk_tiers"])
+        assert elapsed < 5.0
+    print(f"[PASS] 1,000,000 chains x {len(report['tiers'])} tiers in {elapsed * 1000:.0f} ms; "
+          f"frequencies within 0.3% of exact")
+    return True
+
+def test_breach_probabilities():
+    """Certain outcomes give exact breach results; bigger lots breach more often"""
+    print("\n" + "="*80)
+    print("TEST 2: DAILY / LIFETIME CAP BREACHES")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config, risk_manager, simulator = make_simulator(workdir, chains_per_day=4, horizon_days=10)
+        unit_loss0 = simulator.outcome_tables([0.5] * 5, "XAUUSD")["unit_loss"][0]
+
+        # Level 0 always misses: every chain loses exactly one level-0 SL
+        report = simulator.simulate("XAUUSD", paths=40000, probabilities=[0.0, 1, 1, 1, 1])
+        for tier, result in report["tiers"].items():
+            daily = 4 * unit_loss0 * result["lot_size"]
+            assert abs(result["daily_loss_quantiles"]["p50"] - daily) < 1e-6
+            assert result["daily_breach_probability"] == (1.0 if daily >= result["daily_loss_limit"] else 0.0)
+            assert result["lifetime_breach_probability"] == (1.0 if daily * 10 >= result["max_total_loss"] else 0.0)
+            assert abs(result["expected_profit_per_chain"] + unit_loss0 * result["lot_size"]) < 1e-6
+
+        # Every level books and the top level reaches TP: no losses at all
+        report = simulator.simulate("XAUUSD", paths=40000, probabilities=[1.0] * 5)
+        assert all(r["daily_breach_probability"] == 0.0 and r["daily_loss_quantiles"]["p99.9"] == 0.0
+                   for r in report["tiers"].values())
+
+        report = simulator.simulate("XAUUSD", paths=200000, probabilities=[0.6, 0.55, 0.5, 0.45, 0.4])
+        small, large = report["tiers"]["5000"], report["tiers"]["100000"]
+        assert large["lot_size"] > small["lot_size"]
+        assert large["worst_chain_loss"] / large["lot_size"] == small["worst_chain_loss"] / small["lot_size"]
+    print("[PASS] Deterministic cases exact; losses scale with tier lot size")
+    return True
+
+def test_probabilities_from_history():
+    """Finished chains in profit_booking_events give per-level hit rates"""
+    print("\n" + "="*80)
+    print("TEST 3: PROBABILITIES FROM PROFIT BOOKING HISTORY")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config, risk_manager, simulator = make_simulator(workdir, min_samples=20)
+        db = TradeDatabase(os.path.join(workdir, "history.db"), config)
+        try:
+            # 40 finished chains: 10 never booked, 20 booked L0 only, 10 booked L0 and L1
+            # plus 5 ACTIVE chains that must be ignored
+            top_levels = [-1] * 10 + [0] * 20 + [1] * 10
+            for index, top in enumerate(top_levels + [1] * 5):
+                chain = ProfitBookingChain(
+                    chain_id=f"PB{index}", symbol="XAUUSD", direction="buy", base_lot=0.1,
+                    current_level=top + 1, max_level=4, status="STOPPED" if index < 40 else "ACTIVE",
+                    created_at="2025-01-06T09:00:00", updated_at="2025-01-06T10:00:00"
+                )
+                db.save_profit_chain(chain)
+                for level in range(top + 1):
+                    db.save_profit_booking_event(chain.chain_id, level, 10.0 * (level + 1), 1, 2)
+            db.flush()
+
+            assert db.get_profit_level_reach_counts() == {-1: 10, 0: 20, 1: 10}
+            probabilities, sources = simulator.estimate_probabilities(db)
+            assert abs(probabilities[0] - 30 / 40) < 1e-12 and sources[0] == "history (30/40)"
+            assert abs(probabilities[1] - 10 / 30) < 1e-12
+            # Level 2 was reached by only 10 chains (< min_samples): configured value
+            defaults = config["risk_simulation_config"]["level_hit_probabilities"]
+            assert probabilities[2:] == defaults[2:] and sources[2:] == ["config"] * 3
+        finally:
+            db.close()
+    print("[PASS] Hit rates 75% / 33% from history; sparse levels fall back to config")
+    return True
+
+def test_telegram_command():
+    """/pyramid_risk replies with per-tier results"""
+    print("\n" + "="*80)
+    print("TEST 4: /pyramid_risk COMMAND")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config, risk_manager, _ = make_simulator(workdir)
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            bot = TelegramBot(config)
+        bot.risk_manager = risk_manager
+        sent = []
+        bot.send_message = lambda message, *args, **kwargs: sent.append(message)
+
+        bot.handle_pyramid_risk({"text": "/pyramid_risk XAUUSD 100000"})
+        assert len(sent) == 1 and "PYRAMID RISK - XAUUSD" in sent[0]
+        assert sent[0].count("P(daily limit") == len(config["risk_tiers"])
+
+        bot.handle_pyramid_risk({"text": "/pyramid_risk NOPE"})
+        bot.handle_pyramid_risk({"text": "/pyramid_risk XAUUSD lots"})
+        bot.handle_pyramid_risk({"text": "/pyramid_risk XAUUSD 10"})
+        assert sent[1].startswith("❌ Unknown symbol") and sent[2].startswith("❌ Usage")
+        assert sent[3].startswith("❌ PATHS")
+    print("[PASS] Report sent for every tier; bad arguments answered with usage")
+    return True
+
+def main():
+    results = [
+        test_outcomes_match_analytic(),
+        test_breach_probabilities(),
+        test_probabilities_from_history(),
+        test_telegram_command()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test for the non-blocking Telegram notification pipeline
+Runs a local HTTP endpoint that mimics Telegram's sendMessage API
+"""
+import sys
+import os
+import asyncio
+import time
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from aiohttp import web
+from src.clients.telegram_notifier import TelegramNotifier
+
+class DictConfig(dict):
+    """Minimal Config stand-in exposing the same get() interface"""
+    pass
+
+def make_config(**overrides):
+    notify_config = {
+        "queue_size": 10,
+        "per_chat_interval_seconds": 0.0,
+        "global_messages_per_second": 1000,
+        "max_retries": 2,
+        "retry_backoff_seconds": 0.01,
+        "request_timeout_seconds": 2
+    }
+    notify_config.update(overrides)
+    return DictConfig(telegram_notification_config=notify_config)
+
+async def start_fake_telegram(responses):
+    """Serve sendMessage; responses is a list of (status, json) consumed in order, then 200"""
+    received = []
+
+    async def send_message(request):
+        received.append(await request.json())
+        if responses:
+            status, body = responses.pop(0)
+            return web.json_response(body, status=status)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/sendMessage", send_message)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", received
+
+def test_enqueue_is_non_blocking_and_delivers_in_order():
+    """send returns immediately; worker delivers everything before stop() returns"""
+    print("\n" + "="*80)
+    print("TEST 1: NON-BLOCKING ENQUEUE + ORDERED DELIVERY")
+    print("="*80)
+
+    async def scenario():
+        runner, base_url, received = await start_fake_telegram([])
+        notifier = TelegramNotifier(make_config(), base_url)
+        await notifier.start()
+
+        started = time.perf_counter()
+        for i in range(5):
+            assert notifier.enqueue({"chat_id": 1, "text": f"msg {i}"})
+        enqueue_time = time.perf_counter() - started
+
+        await notifier.stop()
+        await runner.cleanup()
+        return enqueue_time, received, notifier.get_stats()
+
+    enqueue_time, received, stats = asyncio.run(scenario())
+
+    assert enqueue_time < 0.05, f"enqueue took {enqueue_time:.3f}s"
+    assert [m["text"] for m in received] == [f"msg {i}" for i in range(5)]
+    assert stats["sent"] == 5 and stats["failed"] == 0 and stats["queue_depth"] == 0
+    print(f"[PASS] 5 messages enqueued in {enqueue_time*1000:.2f}ms and delivered in order")
+    return True
+
+def test_retry_after_rate_limit():
+    """429 with retry_after is retried; permanent 400 is not"""
+    print("\n" + "="*80)
+    print("TEST 2: RETRY ON 429, NO RETRY ON 400")
+    print("="*80)
+
+    async def scenario():
+        responses = [
+            (429, {"ok": False, "parameters": {"retry_after": 0.01}}),
+            (200, {"ok": True}),
+            (400, {"ok": False, "description": "Bad Request"})
+        ]
+        runner, base_url, received = await start_fake_telegram(responses)
+        notifier = TelegramNotifier(make_config(), base_url)
+        await notifier.start()
+        notifier.enqueue({"chat_id": 1, "text": "rate limited"})
+        notifier.enqueue({"chat_id": 1, "text": "bad"})
+        await notifier.stop()
+        await runner.cleanup()
+        return received, notifier.get_stats()
+
+    received, stats = asyncio.run(scenario())
+
+    assert [m["text"] for m in received] == ["rate limited", "rate limited", "bad"]
+    assert stats["sent"] == 1 and stats["failed"] == 1 and stats["retries"] == 1
+    print("[PASS] 429 retried after retry_after, 400 failed without retry")
+    return True
+
+def test_queue_full_drops():
+    """Bounded queue drops and counts overflow instead of blocking"""
+    print("\n" + "="*80)
+    print("TEST 3: BOUNDED QUEUE DROP COUNT")
+    print("="*80)
+
+    async def scenario():
+        runner, base_url, received = await start_fake_telegram([])
+        notifier = TelegramNotifier(make_config(queue_size=3), base_url)
+        await notifier.start()
+        results = [notifier.enqueue({"chat_id": 1, "text": str(i)}) for i in range(5)]
+        await notifier.stop()
+        await runner.cleanup()
+        return results, notifier.get_stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert results == [True, True, True, False, False]
+    assert stats["dropped"] == 2 and stats["sent"] == 3
+    print("[PASS] Overflow dropped and counted")
+    return True
+
+def test_coalescing_and_priority_lane():
+    """Grouped burst becomes one digest; priority skips the window and is never dropped"""
+    print("\n" + "="*80)
+    print("TEST 4: DIGEST COALESCING + PRIORITY LANE")
+    print("="*80)
+
+    async def scenario():
+        runner, base_url, received = await start_fake_telegram([])
+        notifier = TelegramNotifier(
+            make_config(queue_size=1, coalesce_window_seconds=0.2, max_digest_messages=50),
+            base_url
+        )
+        await notifier.start()
+        for i in range(16):
+            assert notifier.enqueue({"chat_id": 1, "text": f"TRADE CLOSED #{i}"}, group="chain:PB1")
+        assert notifier.enqueue({"chat_id": 1, "text": "filler"})
+        # Queue is full, but priority messages bypass capacity
+        assert notifier.enqueue({"chat_id": 1, "text": "⛔ Trading paused"}, priority=True)
+        pending = notifier.get_stats()["coalescing_pending"]
+        await asyncio.sleep(0.4)
+        await notifier.stop()
+        await runner.cleanup()
+        return pending, received, notifier.get_stats()
+
+    pending, received, stats = asyncio.run(scenario())
+
+    texts = [m["text"] for m in received]
+    assert pending == 16
+    assert texts[0] == "⛔ Trading paused", texts
+    assert len(texts) == 3
+    digest = texts[2]
+    assert digest.startswith("📦 DIGEST: 16 updates (chain:PB1)")
+    assert "TRADE CLOSED #0" in digest and "TRADE CLOSED #15" in digest
+    assert stats["digests_sent"] == 1 and stats["coalesced_messages"] == 16
+    assert stats["priority_sent"] == 1 and stats["dropped"] == 0
+    print("[PASS] 16 chain messages merged into 1 digest, priority alert delivered first")
+    return True
+
+def main():
+    results = [
+        test_enqueue_is_non_blocking_and_delivers_in_order(),
+        test_retry_after_rate_limit(),
+        test_queue_full_drops(),
+        test_coalescing_and_priority_lane()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test for the event-driven tick stream
+Only watched symbols are polled; moving prices are published within one fast interval
+"""
+import sys
+import os
+import asyncio
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.services.price_cache import PriceCache
+from src.services.tick_stream import TickStream
+
+class MovableTerminal:
+    """AsyncMT5Client look-alike whose prices the test moves by hand"""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.polled = []
+
+    async def get_tick(self, symbol):
+        self.polled.append(symbol)
+        price = self.prices[symbol]
+        return {"bid": price, "ask": price + 0.2}
+
+def make_stream(terminal):
+    config = {
+        "price_cache_config": {"ttl_seconds": 1.0},
+        "tick_stream_config": {"fast_interval_ms": 10, "idle_interval_ms": 80, "subscriber_queue_size": 4}
+    }
+    return TickStream(PriceCache(terminal, config), config)
+
+def test_publishes_ticks_for_watched_symbols_only():
+    """Price change on a watched symbol reaches subscribers within one fast interval"""
+    print("\n" + "="*80)
+    print("TEST 1: WATCHED SYMBOLS + FAST PUBLISH")
+    print("="*80)
+
+    terminal = MovableTerminal({"XAUUSD": 2650.0, "EURUSD": 1.085})
+    stream = make_stream(terminal)
+
+    async def scenario():
+        queue = stream.subscribe()
+        await stream.start()
+        stream.set_interest("price_monitor", {"XAUUSD"})
+        first = await stream.wait_for_symbols(queue, timeout=0.5)
+
+        loop = asyncio.get_running_loop()
+        terminal.prices["XAUUSD"] = 2651.0
+        moved_at = loop.time()
+        second = await asyncio.wait_for(queue.get(), timeout=0.5)
+        reaction = loop.time() - moved_at
+
+        await stream.stop()
+        return first, second, reaction
+
+    first, second, reaction = asyncio.run(scenario())
+
+    assert first == {"XAUUSD"}
+    assert second["symbol"] == "XAUUSD" and second["bid"] == 2651.0
+    assert reaction < 0.1, f"tick took {reaction*1000:.0f}ms"
+    assert "EURUSD" not in terminal.polled
+    assert stream.price_cache.snapshots["XAUUSD"]["bid"] == 2651.0
+    print(f"[PASS] Price move published in {reaction*1000:.0f}ms; unwatched symbol never polled")
+    return True
+
+def test_adaptive_backoff_and_interest_removal():
+    """Unchanged ticks back off to the idle rate; dropped interest stops polling"""
+    print("\n" + "="*80)
+    print("TEST 2: ADAPTIVE RATE + INTEREST REMOVAL")
+    print("="*80)
+
+    terminal = MovableTerminal({"GBPUSD": 1.265})
+    stream = make_stream(terminal)
+
+    async def scenario():
+        await stream.start()
+        stream.set_interest("trade_manager", {"GBPUSD"})
+        await asyncio.sleep(0.3)
+        interval_ms = stream.get_stats()["watched_symbols"]["GBPUSD"]
+        polls_while_watched = len(terminal.polled)
+
+        stream.set_interest("trade_manager", set())
+        await asyncio.sleep(0.2)
+        polls_after = len(terminal.polled)
+        await stream.stop()
+        return interval_ms, polls_while_watched, polls_after
+
+    interval_ms, polls_while_watched, polls_after = asyncio.run(scenario())
+
+    assert interval_ms == 80
+    # 10 -> 20 -> 40 -> 80ms: far fewer polls than a fixed 10ms rate (~30)
+    assert 3 <= polls_while_watched <= 10, polls_while_watched
+    assert polls_after == polls_while_watched
+    print(f"[PASS] Idle symbol backed off to {interval_ms}ms ({polls_while_watched} polls), polling stopped after unwatch")
+    return True
+
+def main():
+    results = [
+        test_publishes_ticks_for_watched_symbols_only(),
+        test_adaptive_backoff_and_interest_removal()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test for the shared in-memory trade book
+Indexed lookups must match a full scan; managers share one instance
+"""
+import sys
+import os
+import random
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade, ProfitBookingChain
+from src.utils.trade_book import TradeBook
+from src.managers.profit_booking_manager import ProfitBookingManager
+
+def make_trade(ticket, rng):
+    profit_chain_id = rng.choice([None, "PROFIT_A", "PROFIT_B"])
+    return Trade(
+        symbol=rng.choice(["XAUUSD", "EURUSD", "GBPUSD"]), entry=1.0, sl=0.9, tp=1.1, lot_size=0.1,
+        direction="buy", strategy=rng.choice(["LOGIC1", "LOGIC2", "LOGIC3"]),
+        open_time="2025-01-01T00:00:00", trade_id=ticket,
+        chain_id=rng.choice([None, "CHAIN_1", "CHAIN_2"]),
+        profit_chain_id=profit_chain_id, profit_level=rng.randint(0, 2) if profit_chain_id else 0
+    )
+
+def test_indexes_match_scan():
+    """Random inserts and closes; every index agrees with a list scan"""
+    print("\n" + "="*80)
+    print("TEST 1: INDEXED LOOKUPS VS SCAN")
+    print("="*80)
+
+    rng = random.Random(7)
+    book = TradeBook()
+    reference = []
+
+    for ticket in range(1, 2001):
+        trade = make_trade(ticket, rng)
+        book.add(trade)
+        reference.append(trade)
+        if rng.random() < 0.4:
+            victim = reference.pop(rng.randrange(len(reference)))
+            assert book.remove(victim)
+            assert not book.remove(victim)
+
+    book.add(reference[0])  # adding twice is a no-op
+    assert len(book) == len(reference)
+    assert [t.trade_id for t in book] == [t.trade_id for t in reference]
+    assert all(book.get(t.trade_id) is t and t in book for t in reference)
+    assert book.get(-1) is None
+
+    for symbol in ["XAUUSD", "EURUSD", "GBPUSD"]:
+        assert book.by_symbol(symbol) == [t for t in reference if t.symbol == symbol]
+    for strategy in ["LOGIC1", "LOGIC2", "LOGIC3"]:
+        assert book.by_strategy(strategy) == [t for t in reference if t.strategy == strategy]
+    for chain_id in ["CHAIN_1", "CHAIN_2"]:
+        assert book.by_chain(chain_id) == [t for t in reference if t.chain_id == chain_id]
+    for profit_chain_id in ["PROFIT_A", "PROFIT_B"]:
+        assert book.by_profit_chain(profit_chain_id) == [
+            t for t in reference if t.profit_chain_id == profit_chain_id
+        ]
+        for level in range(3):
+            assert book.by_profit_level(profit_chain_id, level) == [
+                t for t in reference if t.profit_chain_id == profit_chain_id and t.profit_level == level
+            ]
+
+    # Closing while iterating is safe; purge drops trades closed elsewhere
+    for trade in book:
+        if trade.symbol == "GBPUSD":
+            book.remove(trade)
+    for trade in reference[:10]:
+        trade.status = "closed"
+    purged = book.purge_closed()
+    remaining = [t for t in reference if t.symbol != "GBPUSD" and t.status != "closed"]
+    assert len(book) == len(remaining) and "GBPUSD" not in book.symbols()
+    assert all(t.status == "closed" for t in purged)
+    print(f"[PASS] {len(reference)} trades after 2000 inserts; all five indexes match a scan")
+    return True
+
+def test_profit_manager_uses_book():
+    """Chain lookups, validation and orphan cleanup go through the shared book"""
+    print("\n" + "="*80)
+    print("TEST 2: PROFIT BOOKING MANAGER ON THE BOOK")
+    print("="*80)
+
+    config = {
+        "profit_booking_config": {"enabled": True},
+        "symbol_config": {"EURUSD": {"pip_size": 0.0001, "pip_value_per_std_lot": 10.0}}
+    }
+    manager = ProfitBookingManager(config, None, None, None, None,
+                                   async_mt5_client=object(), price_cache=object())
+    rng = random.Random(1)
+    book = TradeBook()
+    live = make_trade(1, rng)
+    live.symbol, live.profit_chain_id, live.profit_level = "EURUSD", "PROFIT_LIVE", 0
+    orphan = make_trade(2, rng)
+    orphan.symbol, orphan.profit_chain_id, orphan.profit_level = "EURUSD", "PROFIT_GONE", 1
+    book.add(live)
+    book.add(orphan)
+
+    class Chain:
+        chain_id = "PROFIT_LIVE"
+        current_level = 0
+        symbol = "EURUSD"
+        active_orders = [1, 99]
+    manager.active_chains["PROFIT_LIVE"] = Chain
+
+    pnl = manager.calculate_combined_pnl(Chain, book, current_price=1.0010)
+    assert abs(pnl - 10.0) < 1e-6, pnl  # 10 pips x $10 x 0.1 lot
+    assert manager.validate_chain_state(Chain, book)
+
+    manager.handle_orphaned_orders(book)
+    assert orphan.profit_chain_id is None and orphan.profit_level == 0
+    assert book.by_profit_chain("PROFIT_GONE") == []
+    assert book.by_profit_chain("PROFIT_LIVE") == [live]
+    print("[PASS] Combined PnL from the level index; orphan cleared and re-indexed")
+    return True
+
+class RecordingDB:
+    def __init__(self):
+        self.saved = []
+
+    def save_profit_chain(self, chain):
+        self.saved.append((chain.chain_id, chain.status))
+
+def test_chain_orders_closed_elsewhere():
+    """Orders closed outside profit booking leave the chain once; a chain with none left is stopped"""
+    print("\n" + "="*80)
+    print("TEST 3: CHAIN VALIDATION DROPS CLOSED ORDERS")
+    print("="*80)
+
+    db = RecordingDB()
+    manager = ProfitBookingManager({"profit_booking_config": {"enabled": True}}, None, None, None, db,
+                                   async_mt5_client=object(), price_cache=object())
+    warnings = []
+    manager.logger.warning = warnings.append
+
+    rng = random.Random(2)
+    book = TradeBook()
+    first, second = make_trade(1, rng), make_trade(2, rng)
+    for trade in (first, second):
+        trade.profit_chain_id, trade.profit_level = "PROFIT_1", 0
+        book.add(trade)
+    chain = ProfitBookingChain(
+        chain_id="PROFIT_1", symbol=first.symbol, direction="buy", base_lot=0.1, current_level=0,
+        max_level=4, active_orders=[1, 2], created_at="2025-01-01T00:00:00", updated_at="2025-01-01T00:00:00"
+    )
+    manager.active_chains["PROFIT_1"] = chain
+
+    # Order 2 hit its SL: reported once, then no longer tracked
+    book.remove(second)
+    assert manager.validate_chain_state(chain, book) and chain.active_orders == [1]
+    assert manager.validate_chain_state(chain, book)
+    assert len(warnings) == 1 and "missing order: 2" in warnings[0]
+    assert chain.status == "ACTIVE" and db.saved == []
+
+    # Last order closed elsewhere: nothing left to book, the chain stops
+    book.remove(first)
+    assert not manager.validate_chain_state(chain, book)
+    assert chain.status == "STOPPED" and chain.active_orders == [] and db.saved == [("PROFIT_1", "STOPPED")]
+    print("[PASS] Closed orders dropped after one warning; empty chain stopped and saved")
+    return True
+
+def main():
+    results = [
+        test_indexes_match_scan(),
+        test_profit_manager_uses_book(),
+        test_chain_orders_closed_elsewhere()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test for the trade lifecycle store
+One current-state row per ticket, append-only events with a monotonic cursor
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import TradeDatabase
+from src.models import Trade
+
+def open_trade(trade_id):
+    return Trade(
+        symbol="XAUUSD", entry=2650.0, sl=2640.0, tp=2660.0, lot_size=0.1,
+        direction="buy", strategy="LOGIC1", open_time="2025-01-01T00:00:00", trade_id=trade_id
+    )
+
+def test_upsert_and_event_log():
+    """Open, level-up and repeated close saves give one row and exactly one event each"""
+    print("\n" + "="*80)
+    print("TEST 1: CURRENT-STATE UPSERT + EVENT LOG")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TradeDatabase(os.path.join(tmp, "trades.db"))
+        trade = open_trade(5001)
+        db.save_trade(trade)
+        db.record_trade_event(5001, "level_up", chain_id="PROFIT_1", level=1)
+
+        trade.status = "closed"
+        trade.close_time = "2025-01-01T01:00:00"
+        trade.exit_price = 2655.0
+        trade.pnl = 50.0
+        db.save_trade(trade)
+        db.save_trade(trade)  # reversal exit handler saves the closed ticket again
+        db.save_trade(open_trade(5002))
+        db.flush()
+
+        rows = db.conn.execute(
+            "SELECT trade_id, status, exit_price, pnl FROM trades ORDER BY trade_id"
+        ).fetchall()
+        events = db.get_trade_events()
+        first_page = db.get_trade_events(limit=2)
+        tail = db.get_trade_events(after_seq=first_page[-1]['seq'])
+        only_5001 = db.get_trade_events(trade_id=5001)
+        try:
+            db.record_trade_event(5001, "teleported")
+            rejected = False
+        except ValueError:
+            rejected = True
+        db.close()
+
+    assert rows == [("5001", "closed", 2655.0, 50.0), ("5002", "open", None, None)], rows
+    assert [(e['trade_id'], e['event']) for e in events] == [
+        ("5001", "opened"), ("5001", "level_up"), ("5001", "closed"), ("5002", "opened")
+    ]
+    assert [e['seq'] for e in events] == sorted(e['seq'] for e in events)
+    assert events[2]['data'] == {"exit_price": 2655.0, "pnl": 50.0}
+    assert first_page + tail == events
+    assert len(only_5001) == 3
+    assert rejected
+    print(f"[PASS] 2 ticket rows, {len(events)} events; cursor paging returns the log in order")
+    return True
+
+def test_legacy_duplicates_migrated():
+    """Existing duplicate rows collapse to the latest one and bogus exit_price text is cleared"""
+    print("\n" + "="*80)
+    print("TEST 2: LEGACY DUPLICATE MIGRATION")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "trades.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE trades (
+                id INTEGER PRIMARY KEY, trade_id TEXT, symbol TEXT, entry_price REAL,
+                exit_price REAL, sl_price REAL, tp_price REAL, lot_size REAL, direction TEXT,
+                strategy TEXT, pnl REAL, status TEXT, open_time DATETIME, close_time DATETIME,
+                chain_id TEXT, chain_level INTEGER, is_re_entry BOOLEAN
+            )
+        ''')
+        legacy = [
+            ("7001", None, None, "open", "2025-01-01T00:00:00", None),
+            ("7001", "2025-01-01T02:00:00", 12.5, "closed", "2025-01-01T00:00:00", "2025-01-01T02:00:00"),
+            ("7001", "2025-01-01T02:00:01", 12.5, "closed", "2025-01-01T00:00:00", "2025-01-01T02:00:01"),
+            ("7002", None, None, "open", "2025-01-02T00:00:00", None)
+        ]
+        for trade_id, exit_price, pnl, status, open_time, close_time in legacy:
+            conn.execute(
+                "INSERT INTO trades VALUES (NULL,?,'EURUSD',1.08,?,1.07,1.09,0.1,'buy','LOGIC1',?,?,?,?,NULL,1,0)",
+                (trade_id, exit_price, pnl, status, open_time, close_time)
+            )
+        conn.commit()
+        conn.close()
+
+        db = TradeDatabase(db_path)
+        rows = db.conn.execute(
+            "SELECT trade_id, status, exit_price, close_time FROM trades ORDER BY trade_id"
+        ).fetchall()
+        db.close()
+
+    assert rows == [("7001", "closed", None, "2025-01-01T02:00:01"), ("7002", "open", None, None)], rows
+    print("[PASS] 4 legacy rows collapsed to 2 tickets; exit_price text cleared")
+    return True
+
+def main():
+    results = [
+        test_upsert_and_event_log(),
+        test_legacy_duplicates_migrated()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
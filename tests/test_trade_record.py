@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test for the slotted Trade record and its pydantic boundary model
+"""
+import sys
+import os
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from pydantic import ValidationError
+from src.models import Trade, TradeModel, TRADE_FIELDS
+
+def test_slotted_record_and_conversion():
+    """Trade has no __dict__, converts losslessly to TradeModel and back, validates only in from_dict"""
+    print("\n" + "="*80)
+    print("TEST 1: SLOTTED TRADE <-> TRADE MODEL")
+    print("="*80)
+
+    trade = Trade(
+        symbol="XAUUSD", entry=2650.0, sl=2640.0, tp=2660.0, lot_size=0.1, direction="buy",
+        strategy="LOGIC1", open_time="2025-01-01T00:00:00", trade_id=42,
+        original_entry=2650.0, parent_trade_id=41, profit_chain_id="PROFIT_1", profit_level=2
+    )
+    assert not hasattr(trade, "__dict__")
+    try:
+        trade.unknown_field = 1
+        extended = True
+    except AttributeError:
+        extended = False
+    assert not extended
+
+    model = trade.to_model()
+    assert isinstance(model, TradeModel)
+    assert Trade.from_model(model) == trade
+    assert set(TRADE_FIELDS) == set(TradeModel.model_fields)
+
+    restored = Trade.from_dict(dict(trade.to_dict(), trade_id="42", entry="2650.0"))
+    assert restored.trade_id == 42 and restored.entry == 2650.0  # coerced at the boundary
+    try:
+        Trade.from_dict({"symbol": "XAUUSD", "entry": "not a price"})
+        rejected = False
+    except ValidationError:
+        rejected = True
+    assert rejected
+    print("[PASS] No per-instance dict; model round trip is lossless; from_dict validates")
+    return True
+
+def main():
+    results = [
+        test_slotted_record_and_conversion()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
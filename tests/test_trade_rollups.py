@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test for incrementally maintained performance rollups
+Rollups must equal a full rebuild and the raw-row SQL reports
+"""
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.database import TradeDatabase
+from src.models import Trade
+from src.services.analytics_engine import AnalyticsEngine
+
+def closed_trade(i, rng, now):
+    closed = now - timedelta(days=rng.uniform(0, 20))
+    return Trade(
+        symbol=rng.choice(["XAUUSD", "EURUSD"]), entry=1.0, sl=0.9, tp=1.1, lot_size=0.1,
+        direction="buy", strategy=rng.choice(["LOGIC1", "LOGIC2"]),
+        order_type=rng.choice([None, "TP_TRAIL", "PROFIT_TRAIL"]),
+        open_time=(closed - timedelta(hours=1)).isoformat(), close_time=closed.isoformat(),
+        pnl=rng.choice([0.0, round(rng.uniform(-40, 60), 2)]), status="closed", trade_id=i
+    )
+
+def rollup_rows(db):
+    return db.conn.execute('SELECT * FROM trade_rollups ORDER BY day, symbol, strategy, order_type').fetchall()
+
+def test_incremental_matches_rebuild():
+    """Rollups updated on close equal a rebuild; re-saving a closed ticket is not double counted"""
+    print("\n" + "="*80)
+    print("TEST 1: INCREMENTAL ROLLUPS VS REBUILD")
+    print("="*80)
+
+    rng = random.Random(11)
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TradeDatabase(os.path.join(tmp, "trades.db"))
+        trades = [closed_trade(i, rng, now) for i in range(500)]
+        for trade in trades:
+            db.save_trade(trade)
+        # Reversal handler path saves some closed tickets a second time
+        for trade in trades[:50]:
+            db.save_trade(trade)
+        db.flush()
+
+        incremental = rollup_rows(db)
+        rebuilt_count = db.rebuild_rollups()
+        rebuilt = rollup_rows(db)
+
+        analytics = AnalyticsEngine(db)
+        report = analytics.get_performance_report()
+        # Plain scan of the trades rows as the reference
+        raw_total = db.conn.execute(
+            "SELECT COUNT(*) FROM trades WHERE close_time >= datetime('now', '-30 days')"
+        ).fetchone()[0]
+        pairs = analytics.get_pair_performance()
+        raw_pairs = {row[0] for row in db.conn.execute(
+            "SELECT DISTINCT symbol FROM trades WHERE close_time >= datetime('now', '-30 days')"
+        )}
+        db.close()
+
+    assert len(incremental) == rebuilt_count
+    for row_a, row_b in zip(incremental, rebuilt):
+        assert row_a[:7] == row_b[:7], (row_a, row_b)
+        assert all(abs(a - b) < 1e-6 for a, b in zip(row_a[7:], row_b[7:])), (row_a, row_b)
+
+    # Neither the rollups nor the upserted trades rows count the 50 repeat closes
+    assert report['total_trades'] == 500 == raw_total
+    assert report['max_win'] == max(t.pnl for t in trades)
+    assert report['max_loss'] == min(t.pnl for t in trades)
+    assert abs(report['total_pnl'] - sum(t.pnl for t in trades)) < 1e-6
+    assert report['winning_trades'] + report['losing_trades'] < 500  # breakeven trades counted in neither
+    assert set(pairs) == raw_pairs
+    print(f"[PASS] {len(incremental)} rollup rows match a full rebuild; duplicate closes ignored")
+    return True
+
+def test_backfill_existing_database():
+    """A database created before rollups existed is backfilled on open"""
+    print("\n" + "="*80)
+    print("TEST 2: BACKFILL ON OPEN")
+    print("="*80)
+
+    rng = random.Random(3)
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "trades.db")
+        db = TradeDatabase(db_path)
+        for i in range(100):
+            db.save_trade(closed_trade(i, rng, now))
+        db.close()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute('DROP TABLE trade_rollups')
+        conn.commit()
+        conn.close()
+
+        db = TradeDatabase(db_path)
+        summary = db.get_rollup_summary(30)
+        profit_trail = db.get_rollup_summary(30, order_type="PROFIT_TRAIL")
+        db.close()
+
+    assert summary['total_trades'] == 100
+    assert 0 < profit_trail['total_trades'] < 100
+    print(f"[PASS] 100 legacy trades backfilled ({profit_trail['total_trades']} PROFIT_TRAIL)")
+    return True
+
+def main():
+    results = [
+        test_incremental_matches_rebuild(),
+        test_backfill_existing_database()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test for the per-symbol price trigger index
+Crossed triggers must match a brute-force scan exactly
+"""
+import sys
+import os
+import random
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.utils.trigger_index import PriceTriggerIndex, ABOVE, BELOW
+
+def brute_force(triggers, symbol, price):
+    return {
+        key for key, (sym, level, direction) in triggers.items()
+        if sym == symbol and ((direction == ABOVE and price >= level) or
+                              (direction == BELOW and price <= level))
+    }
+
+def test_crossed_matches_linear_scan():
+    """Random SL/TP levels, inserts and removals agree with a full scan"""
+    print("\n" + "="*80)
+    print("TEST 1: INDEX VS BRUTE-FORCE SCAN")
+    print("="*80)
+
+    rng = random.Random(42)
+    index = PriceTriggerIndex()
+    triggers = {}
+
+    for i in range(600):
+        symbol = rng.choice(["XAUUSD", "EURUSD"])
+        base = 2650.0 if symbol == "XAUUSD" else 1.085
+        level = round(base * rng.uniform(0.99, 1.01), 5)
+        direction = rng.choice([ABOVE, BELOW])
+        index.add(("SL", i), symbol, level, direction, payload=i)
+        triggers[("SL", i)] = (symbol, level, direction)
+
+    for key in rng.sample(sorted(triggers), 200):
+        assert index.remove(key)
+        del triggers[key]
+    assert not index.remove(("SL", -1))
+
+    for _ in range(200):
+        symbol = rng.choice(["XAUUSD", "EURUSD"])
+        base = 2650.0 if symbol == "XAUUSD" else 1.085
+        price = round(base * rng.uniform(0.985, 1.015), 5)
+        assert set(index.crossed(symbol, price)) == brute_force(triggers, symbol, price)
+
+    assert len(index) == 400
+    assert index.get(next(iter(triggers))) is not None
+    print("[PASS] 200 random price updates matched the linear scan over 400 live triggers")
+    return True
+
+def test_exact_levels_and_split_quotes():
+    """Level equal to price fires; ABOVE uses ask and BELOW uses bid; re-adding moves a trigger"""
+    print("\n" + "="*80)
+    print("TEST 2: BOUNDARIES, BID/ASK, MOVE")
+    print("="*80)
+
+    index = PriceTriggerIndex()
+    index.add("buy_tp", "XAUUSD", 2660.0, ABOVE)
+    index.add("buy_sl", "XAUUSD", 2640.0, BELOW)
+    index.add("sell_reentry", "XAUUSD", 2650.0, BELOW)
+
+    assert index.crossed("XAUUSD", 2655.0) == []
+    assert index.crossed("XAUUSD", 2660.0) == ["buy_tp"]
+    assert set(index.crossed("XAUUSD", 2640.0)) == {"sell_reentry", "buy_sl"}
+    # ask reaches the TP while bid is still above the sell re-entry
+    assert index.crossed("XAUUSD", 2660.1, 2650.1) == ["buy_tp"]
+    assert index.crossed("GBPUSD", 1.0) == []
+
+    index.add("buy_tp", "XAUUSD", 2670.0, ABOVE)
+    assert index.crossed("XAUUSD", 2665.0, 2665.0) == []
+    assert len(index) == 3
+
+    for key in ["buy_tp", "buy_sl", "sell_reentry"]:
+        index.remove(key)
+    assert index.symbols() == []
+    print("[PASS] Boundary levels, split bid/ask quotes and trigger moves handled")
+    return True
+
+def main():
+    results = [
+        test_crossed_matches_linear_scan(),
+        test_exact_levels_and_split_quotes()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Test for the injectable clock
+Dedup window, trend-reversal grace, time exits and loop sleeps follow a
+virtual or accelerated clock instead of the wall clock
+"""
+import sys
+import os
+import asyncio
+import contextlib
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Trade, Alert
+from src.utils.clock import Clock, AcceleratedClock, VirtualClock, make_clock
+from src.utils.exit_strategies import ExitStrategyManager
+from src.processors.alert_processor import AlertProcessor
+from src.backtest.replay import BacktestRunner, BacktestConfig
+from src.services.price_cache import PriceCache
+from src.services.account_snapshot import AccountSnapshotService
+from src.services.alert_queue import AlertQueue
+
+START = datetime(2025, 1, 6, 9, 0)
+
+def make_trade(clock, trade_id=1):
+    return Trade(symbol="XAUUSD", entry=2650.0, sl=2640.0, tp=2665.0, lot_size=0.1, direction="buy",
+                 strategy="LOGIC1", open_time=clock.now().isoformat(), trade_id=trade_id)
+
+def test_clock_modes():
+    """clock_config selects wall / accelerated / virtual; accelerated sleeps divide by speed"""
+    print("\n" + "="*80)
+    print("TEST 1: CLOCK MODES")
+    print("="*80)
+
+    assert type(make_clock({})) is Clock
+    assert type(make_clock({"clock_config": {"mode": "wall"}})) is Clock
+    virtual = make_clock({"clock_config": {"mode": "virtual", "start": START.isoformat()}})
+    assert isinstance(virtual, VirtualClock) and virtual.now() == START
+    fast = make_clock({"clock_config": {"mode": "accelerated", "speed": 3600, "start": START.isoformat()}})
+    assert isinstance(fast, AcceleratedClock)
+    try:
+        make_clock({"clock_config": {"mode": "sundial"}})
+        assert False, "unknown mode accepted"
+    except ValueError:
+        pass
+
+    async def scenario():
+        started = time.perf_counter()
+        await fast.sleep(180)  # 3 simulated minutes
+        try:
+            await fast.wait_for(asyncio.Event().wait(), 180)
+            assert False, "timeout did not fire"
+        except asyncio.TimeoutError:
+            pass
+        return time.perf_counter() - started
+
+    wall = asyncio.run(scenario())
+    assert wall < 1.0
+    assert fast.now() >= START + timedelta(minutes=6)
+    print(f"[PASS] 6 simulated minutes took {wall * 1000:.0f} ms at speed 3600")
+    return True
+
+def test_alert_dedup_window():
+    """The 5-minute duplicate window is measured on the injected clock"""
+    print("\n" + "="*80)
+    print("TEST 2: ALERT DEDUP WINDOW")
+    print("="*80)
+
+    clock = VirtualClock(START)
+    processor = AlertProcessor(BacktestConfig(), clock=clock)
+    alert = lambda: {"type": "trend", "symbol": "XAUUSD", "signal": "bull", "tf": "15m"}
+
+    first = processor.parse_alert(alert())
+    assert first is not None and first.timestamp == START.isoformat()
+    clock.advance(240)
+    assert processor.parse_alert(alert()) is None  # duplicate inside the window
+    clock.advance(61)
+    assert processor.parse_alert(alert()) is not None
+
+    # An alert stamped 4 minutes ago only blocks duplicates for the remaining minute
+    stamped = {**alert(), "tf": "1h", "timestamp": (clock.now() - timedelta(minutes=4)).isoformat()}
+    assert processor.parse_alert(dict(stamped)) is not None
+    clock.advance(59)
+    assert processor.parse_alert({**alert(), "tf": "1h"}) is None
+    clock.advance(2)
+    assert processor.parse_alert({**alert(), "tf": "1h"}) is not None
+    print("[PASS] Duplicates rejected for 5 virtual minutes from the alert timestamp")
+    return True
+
+def test_engine_uses_clock():
+    """Trend-reversal grace and timestamps written by the engine follow its clock"""
+    print("\n" + "="*80)
+    print("TEST 3: ENGINE GRACE PERIOD + TIMESTAMPS")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(open(os.devnull, "w")):
+        clock, _, engine = BacktestRunner()._build(workdir, START.timestamp())
+        try:
+            assert engine.alert_processor.clock is clock and engine.risk_manager.clock is clock
+            for component in (engine.dual_order_manager, engine.profit_booking_manager,
+                              engine.reversal_handler, engine.trend_manager, engine.db, engine.tick_stream):
+                assert component.clock is clock
+
+            trade = make_trade(clock)
+            engine.trend_manager.update_trend("XAUUSD", "1h", "bear")
+            engine.trend_manager.update_trend("XAUUSD", "15m", "bear")
+            assert engine.trend_manager.trends["symbols"]["XAUUSD"]["15m"]["last_update"] == START.isoformat()
+
+            clock.advance(299)
+            assert not engine.should_exit_by_trend_reversal(trade)  # still in the 5-minute grace
+            clock.advance(2)
+            assert engine.should_exit_by_trend_reversal(trade)
+        finally:
+            engine.async_mt5_client.close()
+            engine.db.close()
+    print("[PASS] Reversal exit held for 5 virtual minutes; trend timestamps on the virtual clock")
+    return True
+
+class RecordingEngine:
+    """Trading engine stand-in for ExitStrategyManager"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.closed = []
+
+    async def close_trade(self, trade, reason, current_price):
+        self.closed.append((trade.trade_id, reason, current_price, self.clock.now()))
+
+class FixedPrice:
+    def get_current_price(self, symbol):
+        return 2655.0
+
+def test_time_exit_loop_runs_fast():
+    """A 5-second monitor loop covers 8 virtual hours in well under a second"""
+    print("\n" + "="*80)
+    print("TEST 4: TIME-BASED EXIT LOOP ON A VIRTUAL CLOCK")
+    print("="*80)
+
+    clock = VirtualClock(START)
+    engine = RecordingEngine(clock)
+    manager = ExitStrategyManager(FixedPrice(), engine)
+    assert manager.clock is clock
+
+    async def scenario():
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            manager.add_time_based_exit(make_trade(clock, 1), exit_after_hours=2)
+            manager.add_time_based_exit(make_trade(clock, 2), exit_after_hours=6)
+        manager.start_monitoring()
+        started = time.perf_counter()
+        await clock.run_for(8 * 3600)
+        wall = time.perf_counter() - started
+        manager.stop_monitoring()
+        await clock.run_for(5)
+        assert clock.next_wakeup() is None  # loop exited
+        return wall
+
+    wall = asyncio.run(scenario())
+    assert [closed[:3] for closed in engine.closed] == [(1, "TIME_BASED_EXIT", 2655.0), (2, "TIME_BASED_EXIT", 2655.0)]
+    assert START + timedelta(hours=2) <= engine.closed[0][3] <= START + timedelta(hours=2, seconds=5)
+    assert START + timedelta(hours=6) <= engine.closed[1][3] <= START + timedelta(hours=6, seconds=5)
+    assert manager.active_strategies == {}
+    minutes_per_second = 8 * 60 / wall
+    assert minutes_per_second > 1000
+    print(f"[PASS] 5760 loop iterations; {minutes_per_second:,.0f} simulated minutes per second")
+    return True
+
+def test_virtual_wait_for():
+    """wait_for times out on virtual time and returns early when the awaitable finishes"""
+    print("\n" + "="*80)
+    print("TEST 5: VIRTUAL wait_for")
+    print("="*80)
+
+    clock = VirtualClock(START)
+
+    async def scenario():
+        queue = asyncio.Queue()
+        waiter = asyncio.ensure_future(clock.wait_for(queue.get(), 30))
+        await clock.run_for(10)
+        assert not waiter.done()
+        queue.put_nowait("tick")
+        assert await waiter == "tick"
+
+        waiter = asyncio.ensure_future(clock.wait_for(queue.get(), 30))
+        await clock.run_for(30)
+        assert waiter.done()
+        try:
+            waiter.result()
+            assert False, "timeout did not fire"
+        except asyncio.TimeoutError:
+            pass
+        assert clock.next_wakeup() is None
+
+    asyncio.run(scenario())
+    print("[PASS] Virtual timeouts fire at the deadline; early results cancel the timer")
+    return True
+
+class CountingBroker:
+    """AsyncMT5Client stand-in counting tick and account round trips"""
+
+    def __init__(self):
+        self.tick_calls = 0
+        self.info_calls = 0
+
+    async def get_tick(self, symbol):
+        self.tick_calls += 1
+        return {"bid": 2649.9, "ask": 2650.1}
+
+    async def get_account_info(self):
+        self.info_calls += 1
+        return {"balance": 10000.0, "equity": 10000.0, "margin": 0.0, "free_margin": 10000.0}
+
+class FixedRisk:
+    def get_risk_tier(self, balance):
+        return "10000"
+
+    def get_fixed_lot_size(self, balance):
+        return 0.1
+
+def test_services_follow_clock():
+    """Price cache and account snapshot TTLs, the snapshot refresh loop and alert queue stamps use the clock"""
+    print("\n" + "="*80)
+    print("TEST 6: CACHES AND QUEUE ON VIRTUAL TIME")
+    print("="*80)
+
+    clock = VirtualClock(START)
+    broker = CountingBroker()
+    cache = PriceCache(broker, {"price_cache_config": {"ttl_seconds": 1.0}}, clock=clock)
+    snapshot = AccountSnapshotService(broker, FixedRisk(), {"account_snapshot_config": {"ttl_seconds": 5.0}},
+                                      clock=clock)
+
+    async def handler(alert):
+        await clock.sleep(2)
+        return True
+
+    queue = AlertQueue(handler, {"alert_queue_config": {"workers": 1}}, clock=clock)
+
+    async def scenario():
+        await cache.get_price("XAUUSD")
+        time.sleep(0.02)  # wall time passing does not age the snapshot
+        await cache.get_price("XAUUSD")
+        assert broker.tick_calls == 1
+        clock.advance(1.5)
+        await cache.get_price("XAUUSD")
+        assert broker.tick_calls == 2
+
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            await snapshot.start()
+            await queue.start()
+        account = await snapshot.get()
+        assert broker.info_calls == 1 and account.age == 0.0 \
+            and account.taken_at == (START + timedelta(seconds=1.5)).isoformat()
+        # The background loop refreshes once per virtual TTL: 4 more in 20 simulated seconds
+        # (its wait_for timeout takes a few more loop turns to unwind than a plain sleep)
+        await clock.run_for(20, settle_steps=10)
+        assert broker.info_calls == 5 and snapshot.snapshot.age <= 5.0
+
+        alert_id = queue.submit(Alert(type="entry", symbol="XAUUSD", signal="buy", tf="5m", price=2650.0))
+        await clock.run_for(3)
+        status = queue.get_status(alert_id)
+        assert status["status"] == "processed" and status["processing_ms"] == 2000.0
+        assert status["enqueued_at"] == START.timestamp() + 21.5
+
+        await queue.stop()
+        await snapshot.stop()
+
+    started = time.perf_counter()
+    asyncio.run(scenario())
+    assert time.perf_counter() - started < 1.0
+    print("[PASS] TTLs, refresh loop and queue timings measured in simulated seconds")
+    return True
+
+def main():
+    results = [
+        test_clock_modes(),
+        test_alert_dedup_window(),
+        test_engine_uses_clock(),
+        test_time_exit_loop_runs_fast(),
+        test_virtual_wait_for(),
+        test_services_follow_clock()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test for the single-parse webhook ingestion path
+The payload is decoded once and validated into one immutable Alert
+"""
+import sys
+import os
+import json
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    os.system('chcp 65001 >nul 2>&1')
+    sys.stdout.reconfigure(encoding='utf-8') if hasattr(sys.stdout, 'reconfigure') else None
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.models import Alert
+from src.processors.alert_processor import AlertProcessor
+from src.utils import json_codec
+
+def test_parse_alert_returns_frozen_alert():
+    """parse_alert yields an immutable Alert without a raw_data copy; invalid payloads give None"""
+    print("\n" + "="*80)
+    print("TEST 1: PARSE ONCE INTO A FROZEN ALERT")
+    print("="*80)
+
+    processor = AlertProcessor({})
+    body = b'{"type": "entry", "symbol": "XAUUSD", "signal": "buy", "tf": "5m", "price": 2650.5}'
+    alert = processor.parse_alert(json_codec.loads(body))
+
+    assert isinstance(alert, Alert)
+    assert alert.price == 2650.5 and alert.timestamp is not None
+    assert alert.raw_data is None
+    try:
+        alert.signal = "sell"
+        mutated = True
+    except Exception:
+        mutated = False
+    assert not mutated, "Alert must be immutable"
+
+    assert processor.parse_alert(json_codec.loads(body)) is None  # duplicate
+    assert processor.parse_alert({"type": "entry", "symbol": "XAUUSD", "signal": "bull", "tf": "1h"}) is None
+    assert processor.parse_alert({"type": "entry", "symbol": "BTCUSD", "signal": "buy", "tf": "1h"}) is None
+    assert processor.parse_alert({"type": "entry", "symbol": "XAUUSD", "signal": "buy"}) is None  # tf required
+    assert processor.validate_alert({"type": "trend", "symbol": "EURUSD", "signal": "bear", "tf": "1d"})
+    print("[PASS] Frozen Alert returned; duplicates and invalid payloads rejected")
+    return True
+
+def test_json_codec_round_trip():
+    """Fast codec decodes bytes/str and emits compact UTF-8 bytes"""
+    print("\n" + "="*80)
+    print("TEST 2: JSON CODEC")
+    print("="*80)
+
+    payload = {"status": "success", "message": "Alert processed", "symbol": "XAUUSD", "emoji": "✅"}
+    encoded = json_codec.dumps(payload)
+
+    assert isinstance(encoded, bytes) and b" " not in encoded.replace(b"Alert processed", b"")
+    assert json.loads(encoded) == payload
+    assert json_codec.loads(encoded) == payload
+    assert json_codec.loads(encoded.decode("utf-8")) == payload
+    print(f"[PASS] Round trip OK with backend '{json_codec.BACKEND}'")
+    return True
+
+def test_batch_orders_state_updates_first():
+    """parse_batch validates every item and puts bias/trend ahead of entries, keeping arrival order otherwise"""
+    print("\n" + "="*80)
+    print("TEST 3: BATCH VALIDATION + ORDERING")
+    print("="*80)
+
+    processor = AlertProcessor({})
+    batch = [
+        {"type": "entry", "symbol": "USDJPY", "signal": "buy", "tf": "5m"},
+        {"type": "trend", "symbol": "USDJPY", "signal": "bull", "tf": "15m"},
+        "not an alert",
+        {"type": "exit", "symbol": "EURUSD", "signal": "bear", "tf": "15m"},
+        {"type": "bias", "symbol": "USDJPY", "signal": "bull", "tf": "1h"},
+        {"type": "trend", "symbol": "USDJPY", "signal": "bull", "tf": "15m"}  # duplicate inside the batch
+    ]
+    parsed = processor.parse_batch(batch)
+
+    assert [index for index, _ in parsed] == [1, 4, 5, 0, 2, 3]
+    accepted = {index: alert for index, alert in parsed if alert is not None}
+    assert sorted(accepted) == [0, 1, 3, 4]
+    assert accepted[1].type == "trend" and accepted[0].type == "entry"
+    print("[PASS] Trend/bias first, entry and exit in arrival order; junk and in-batch duplicate rejected")
+    return True
+
+def main():
+    results = [
+        test_parse_alert_returns_frozen_alert(),
+        test_json_codec_round_trip(),
+        test_batch_orders_state_updates_first()
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)